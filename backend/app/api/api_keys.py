@@ -13,11 +13,12 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.core.api_key_usage import api_key_usage
 from app.core.auth import get_current_user
+from app.core.auth_cache import UserSnapshot
 from app.core.database import get_db
 from app.core.plan_validation import HTTP_402_PAYMENT_REQUIRED
-from app.crud import api_key as crud_api_key
-from app.models.user import User
+from app.crud.api_key import api_key as crud_api_key
 from app.schemas.api_key import (
     APIKeyCreate,
     APIKeyListResponse,
@@ -25,6 +26,7 @@ from app.schemas.api_key import (
     APIKeyScopesUpdate,
     APIKeyStats,
     APIKeyUpdate,
+    APIKeyUsage,
     APIKeyWithPlainKey,
 )
 
@@ -38,7 +40,7 @@ router = APIRouter()
 
 @router.get("/", response_model=APIKeyListResponse)
 async def list_api_keys(
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
     active_only: bool = True,
 ):
@@ -69,7 +71,7 @@ async def list_api_keys(
 
 @router.get("/stats", response_model=APIKeyStats)
 async def get_api_key_stats(
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -94,29 +96,48 @@ async def get_api_key_stats(
         key for key in active_keys if key.expires_at and key.expires_at <= now
     ]
 
-    # Keys never used
-    never_used = [key for key in all_keys if not key.last_used_at]
-
     # Scope usage summary
     scopes_summary = {}
     for key in active_keys:
         for scope in key.scopes or []:
             scopes_summary[scope] = scopes_summary.get(scope, 0) + 1
 
+    # Per-key usage (persisted counters + this worker's not yet flushed usage)
+    pending = api_key_usage.pending(key.id for key in all_keys)
+    usage_by_key = []
+    for key in all_keys:
+        pending_count, pending_last_used = pending.get(key.id, (0, None))
+        last_used_at = key.last_used_at
+        if pending_last_used and (not last_used_at or pending_last_used > last_used_at):
+            last_used_at = pending_last_used
+        usage_by_key.append(
+            APIKeyUsage(
+                id=key.id,
+                name=key.name,
+                key_prefix=key.key_prefix,
+                is_active=key.is_active,
+                request_count=(key.request_count or 0) + pending_count,
+                last_used_at=last_used_at,
+            )
+        )
+    usage_by_key.sort(key=lambda usage: usage.request_count, reverse=True)
+
     return APIKeyStats(
         total_keys=len(all_keys),
         active_keys=len(active_keys),
         inactive_keys=len(inactive_keys),
         expired_keys=len(expired_keys),
-        never_used_keys=len(never_used),
+        never_used_keys=sum(1 for usage in usage_by_key if not usage.last_used_at),
         scopes_summary=scopes_summary,
+        total_requests=sum(usage.request_count for usage in usage_by_key),
+        usage_by_key=usage_by_key,
     )
 
 
 @router.get("/{key_id}", response_model=APIKeyResponse)
 async def get_api_key(
     key_id: UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -154,7 +175,7 @@ async def get_api_key(
 )
 async def create_api_key(
     key_data: APIKeyCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -210,7 +231,7 @@ async def create_api_key(
 async def update_api_key(
     key_id: UUID,
     key_data: APIKeyUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -254,7 +275,7 @@ async def update_api_key(
 async def update_api_key_scopes(
     key_id: UUID,
     scopes_data: APIKeyScopesUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -276,7 +297,7 @@ async def update_api_key_scopes(
 @router.post("/{key_id}/revoke", response_model=APIKeyResponse)
 async def revoke_api_key(
     key_id: UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -298,7 +319,7 @@ async def revoke_api_key(
 @router.post("/{key_id}/activate", response_model=APIKeyResponse)
 async def activate_api_key(
     key_id: UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -324,7 +345,7 @@ async def activate_api_key(
 @router.delete("/{key_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_api_key(
     key_id: UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -352,7 +373,7 @@ async def delete_api_key(
     "/system", response_model=APIKeyWithPlainKey, status_code=status.HTTP_201_CREATED
 )
 async def create_system_api_key(
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from app.core.deps import get_database
@@ -11,13 +11,21 @@ from app.crud.budget import budget, budget_period
 from app.crud.user import user
 from app.schemas.budget import (
     Budget,
+    BudgetAlertBatch,
+    BudgetAlertsMarkSent,
     BudgetCreate,
     BudgetPeriod,
     BudgetSummary,
     BudgetUpdate,
     BudgetWithCurrentPeriod,
 )
+from app.schemas.job import BackgroundJobEnqueued
 from app.services.budget_service import budget_service
+from app.services.job_runner import (
+    BUDGET_PERIOD_ROLLOVER,
+    BUDGET_RECALCULATION,
+    job_runner,
+)
 from app.services.usage_service import usage_service
 
 router = APIRouter()
@@ -40,11 +48,6 @@ def criar_orcamento(*, db: Session = Depends(get_database), budget_in: BudgetCre
     if not db_user:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
 
-    # Verificar limite de orçamentos do plano
-    can_create, error_msg = usage_service.check_can_create(db, db_user, "budget")
-    if not can_create:
-        raise HTTPException(status_code=HTTP_402_PAYMENT_REQUIRED, detail=error_msg)
-
     # Verificar se já existe orçamento ativo para esta categoria
     existing_budget = budget.get_by_user_and_category(
         db, usuario_id=budget_in.usuario_id, categoria_id=budget_in.categoria_id
@@ -55,6 +58,12 @@ def criar_orcamento(*, db: Session = Depends(get_database), budget_in: BudgetCre
             status_code=400, detail="Já existe um orçamento ativo para esta categoria"
         )
 
+    # Reservar um orçamento do limite do plano (atômico; a criação abaixo
+    # faz o commit da reserva)
+    can_create, error_msg = usage_service.reserve_quota(db, db_user, "budget")
+    if not can_create:
+        raise HTTPException(status_code=HTTP_402_PAYMENT_REQUIRED, detail=error_msg)
+
     # Criar orçamento
     db_budget = budget.create(db, obj_in=budget_in)
 
@@ -171,57 +180,15 @@ def resumo_orcamento(*, db: Session = Depends(get_database), budget_id: UUID):
     "/orcamentos/usuario/{usuario_id}/resumo", response_model=List[BudgetSummary]
 )
 def resumo_orcamentos_usuario(*, db: Session = Depends(get_database), usuario_id: UUID):
-    """Retorna resumo de todos os orçamentos ativos do usuário."""
-    user_budgets = budget.get_by_user(db, usuario_id=usuario_id, ativo_only=True)
-
-    summaries = []
-    for db_budget in user_budgets:
-        current_period = budget_period.get_current_period(db, budget_id=db_budget.id)
-
-        if current_period:
-            # Calcular percentual gasto
-            percentual_gasto = (
-                (current_period.valor_gasto / current_period.valor_limite * 100)
-                if current_period.valor_limite > 0
-                else 0
-            )
-
-            # Calcular dias restantes
-            if hasattr(current_period.data_fim, "date"):
-                data_fim = current_period.data_fim.date()
-            else:
-                data_fim = current_period.data_fim
-
-            # Ensure we always use a date object for comparison
-            from datetime import date
-
-            data_atual = date.today()
-
-            # Convert data_fim to date if it's a datetime
-            if hasattr(data_fim, "date"):
-                data_fim = data_fim.date()
-
-            dias_restantes = (data_fim - data_atual).days
-
-            summaries.append(
-                BudgetSummary(
-                    id=db_budget.id,
-                    nome=db_budget.nome,
-                    categoria_id=db_budget.categoria_id,
-                    categoria_nome=(
-                        db_budget.categoria.nome if db_budget.categoria else None
-                    ),
-                    valor_limite=current_period.valor_limite,
-                    valor_gasto=current_period.valor_gasto,
-                    percentual_gasto=percentual_gasto,
-                    status=current_period.status,
-                    periodicidade=db_budget.periodicidade,
-                    dias_restantes=max(0, dias_restantes),
-                    ativo=db_budget.ativo,
-                )
-            )
+    """
+    Retorna resumo de todos os orçamentos ativos do usuário com período atual.
 
-    return summaries
+    Uma consulta para orçamentos, categorias e períodos atuais (só leitura:
+    os períodos que faltarem são criados pelo job de rollover).
+    """
+    return budget_service.get_dashboard_summary(
+        db, str(usuario_id), create_missing=False
+    )
 
 
 @router.post("/orcamentos/{budget_id}/criar-periodo")
@@ -290,6 +257,7 @@ def verificar_alertas_orcamentos(
                 "valor_gasto": item["period"].valor_gasto,
                 "periodicidade": item["budget"].periodicidade,
                 "period_id": item["period"].id,
+                "tipo_alerta": item["tipo_alerta"],
             }
         )
 
@@ -303,30 +271,76 @@ def marcar_alerta_enviado(*, db: Session = Depends(get_database), period_id: UUI
     return {"message": "Alerta marcado como enviado"}
 
 
-@router.post("/sistema/criar-proximos-periodos")
+@router.get("/sistema/orcamentos/alertas", response_model=BudgetAlertBatch)
+def listar_alertas_pendentes(
+    *,
+    db: Session = Depends(get_database),
+    limit: int = Query(500, ge=1, le=5000),
+):
+    """
+    Lote de alertas pendentes de todos os usuários (uma consulta), maiores
+    percentuais primeiro.
+
+    Após entregar, marque com POST /sistema/orcamentos/alertas/marcar-enviados:
+    a próxima chamada traz o lote seguinte.
+    """
+    alerts = [
+        budget_service.build_alert_event(*row)
+        for row in budget_period.get_pending_alerts(db, limit=limit)
+    ]
+
+    return {"total_alertas": len(alerts), "alertas": alerts}
+
+
+@router.post("/sistema/orcamentos/alertas/marcar-enviados")
+def marcar_alertas_enviados(
+    *, db: Session = Depends(get_database), alertas_in: BudgetAlertsMarkSent
+):
+    """
+    Marca o alerta como enviado em vários períodos (um UPDATE).
+
+    Informe em estouro_period_ids os períodos cujo alerta entregue foi
+    'estouro', para que não voltem como estouro pendente.
+    """
+    marcados = budget_period.mark_alerts_sent(
+        db,
+        period_ids=alertas_in.period_ids,
+        estouro_period_ids=alertas_in.estouro_period_ids,
+    )
+    return {"message": "Alertas marcados como enviados", "marcados": marcados}
+
+
+@router.post(
+    "/sistema/criar-proximos-periodos",
+    response_model=BackgroundJobEnqueued,
+    status_code=status.HTTP_202_ACCEPTED,
+)
 def criar_proximos_periodos_job(*, db: Session = Depends(get_database)):
-    """Job automático para criar próximos períodos de orçamento."""
-    created_periods = budget_service.create_next_periods_if_needed(db)
+    """
+    Enfileira o job que cria os próximos períodos de orçamento.
 
-    return {
-        "message": "Job executado com sucesso",
-        "periodos_criados": len(created_periods),
-        "detalhes": created_periods,
-    }
+    Acompanhe em GET /sistema/jobs/{job_id}.
+    """
+    job = job_runner.enqueue(db, BUDGET_PERIOD_ROLLOVER)
+
+    return {"message": "Job enfileirado", "job": job}
 
 
-@router.post("/sistema/recalcular-orcamentos")
+@router.post(
+    "/sistema/recalcular-orcamentos",
+    response_model=BackgroundJobEnqueued,
+    status_code=status.HTTP_202_ACCEPTED,
+)
 def recalcular_todos_orcamentos(*, db: Session = Depends(get_database)):
-    """Recalcula todos os valores gastos dos orçamentos\
-        baseado nas transações existentes."""
-    resultado = budget_service.recalculate_all_budgets(db)
+    """
+    Enfileira o recálculo dos valores gastos de todos os orçamentos
+    baseado nas transações existentes.
 
-    return {
-        "message": "Recálculo executado com sucesso",
-        "orcamentos_atualizados": resultado["updated_budgets"],
-        "periodos_criados": resultado["created_periods"],
-        "detalhes": resultado["details"],
-    }
+    Acompanhe em GET /sistema/jobs/{job_id}.
+    """
+    job = job_runner.enqueue(db, BUDGET_RECALCULATION)
+
+    return {"message": "Job enfileirado", "job": job}
 
 
 @router.post("/orcamentos/usuario/{usuario_id}/recalcular")
@@ -4,8 +4,8 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
 from app.core.deps import get_database
-from app.crud.category import category
 from app.schemas.category import Category
+from app.services.category_catalog import category_catalog
 
 router = APIRouter()
 
@@ -13,10 +13,10 @@ router = APIRouter()
 @router.get("/categorias/", response_model=List[Category])
 def listar_categorias(db: Session = Depends(get_database)):
     """Lista todas as categorias disponíveis."""
-    return category.get_multi(db)
+    return category_catalog.get(db).entries
 
 
 @router.get("/categorias/{tipo}", response_model=List[Category])
 def listar_categorias_por_tipo(tipo: str, db: Session = Depends(get_database)):
     """Lista categorias por tipo (despesa ou receita)."""
-    return category.get_by_tipo(db, tipo=tipo)
+    return category_catalog.get(db).by_tipo(tipo)
@@ -2,11 +2,11 @@ from datetime import date, datetime
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_database
+from app.core.deps import get_database, get_read_database
 from app.core.plan_validation import HTTP_402_PAYMENT_REQUIRED, require_feature
 from app.crud.commitment import commitment, user_google_auth
 from app.crud.user import user
@@ -19,7 +19,9 @@ from app.schemas.commitment import (
     CommitmentUpdate,
     GoogleAuthStatus,
 )
+from app.schemas.job import BackgroundJobEnqueued
 from app.services.google_calendar_service import google_calendar_service
+from app.services.job_runner import COMMITMENT_GOOGLE_SYNC, job_runner
 from app.services.usage_service import usage_service
 
 router = APIRouter()
@@ -44,8 +46,9 @@ def criar_compromisso(
     if not db_user:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
 
-    # Verificar limite de compromissos do plano
-    can_create, error_msg = usage_service.check_can_create(db, db_user, "commitment")
+    # Reservar um compromisso do limite do plano (atômico; a criação abaixo
+    # faz o commit da reserva)
+    can_create, error_msg = usage_service.reserve_quota(db, db_user, "commitment")
     if not can_create:
         raise HTTPException(status_code=HTTP_402_PAYMENT_REQUIRED, detail=error_msg)
 
@@ -139,7 +142,7 @@ def excluir_compromisso(*, db: Session = Depends(get_database), commitment_id: U
 @router.get("/compromissos/usuario/{usuario_id}/agenda", response_model=AgendaResponse)
 def agenda_usuario(
     *,
-    db: Session = Depends(get_database),
+    db: Session = Depends(get_read_database),
     usuario_id: UUID,
     data_inicio: date = Query(..., description="Data de início (YYYY-MM-DD)"),
     data_fim: date = Query(..., description="Data de fim (YYYY-MM-DD)"),
@@ -351,12 +354,20 @@ def desconectar_google_calendar(
 # Jobs e utilitários
 
 
-@router.post("/sistema/compromissos/sincronizar-pendentes")
+@router.post(
+    "/sistema/compromissos/sincronizar-pendentes",
+    response_model=BackgroundJobEnqueued,
+    status_code=status.HTTP_202_ACCEPTED,
+)
 def job_sincronizar_pendentes(*, db: Session = Depends(get_database)):
-    """Job para sincronizar compromissos pendentes."""
-    results = google_calendar_service.sync_pending_commitments(db)
+    """
+    Enfileira o job para sincronizar compromissos pendentes.
+
+    Acompanhe em GET /sistema/jobs/{job_id}.
+    """
+    job = job_runner.enqueue(db, COMMITMENT_GOOGLE_SYNC)
 
-    return {"message": "Job de sincronização executado", "results": results}
+    return {"message": "Job enfileirado", "job": job}
 
 
 @router.get("/compromissos/lembretes-pendentes")
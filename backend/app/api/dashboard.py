@@ -1,13 +1,13 @@
 from datetime import date, timedelta
-from decimal import Decimal
 from typing import Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import and_, desc
+from sqlalchemy import desc
 from sqlalchemy.orm import Session, joinedload
 
-from app.core.deps import get_database
+from app.core.deps import get_read_database
+from app.crud.transaction import transaction
 from app.models.transaction import Transaction
 from app.schemas.dashboard import (
     DashboardData,
@@ -43,7 +43,7 @@ def get_last_30_days_dates():
 @router.get("/dashboard/{usuario_id}/dados", response_model=DashboardData)
 def obter_dados_dashboard(
     *,
-    db: Session = Depends(get_database),
+    db: Session = Depends(get_read_database),
     usuario_id: UUID,
     data_inicio: Optional[date] = Query(None),
     data_fim: Optional[date] = Query(None),
@@ -54,45 +54,23 @@ def obter_dados_dashboard(
     if not data_inicio or not data_fim:
         data_inicio, data_fim = get_current_month_dates()
 
-    # Buscar todas as transações do período
-    transacoes = (
-        db.query(Transaction)
-        .options(joinedload(Transaction.categoria))
-        .filter(
-            and_(
-                Transaction.usuario_id == usuario_id,
-                Transaction.data_transacao >= data_inicio,
-                Transaction.data_transacao <= data_fim,
-            )
-        )
-        .all()
+    # 1. Calcular resumo financeiro (totais por tipo no banco)
+    totais = transaction.get_summary_by_user(
+        db, usuario_id=usuario_id, data_inicio=data_inicio, data_fim=data_fim
     )
 
-    # 1. Calcular resumo financeiro
-    receitas = [t for t in transacoes if t.tipo == "receita"]
-    despesas = [t for t in transacoes if t.tipo == "despesa"]
-
-    total_receitas = sum(t.valor for t in receitas)
-    total_despesas = sum(t.valor for t in despesas)
-    saldo = total_receitas - total_despesas
-
     resumo = ResumoFinanceiro(
-        total_receitas=total_receitas, total_despesas=total_despesas, saldo=saldo
+        total_receitas=totais["total_receitas"],
+        total_despesas=totais["total_despesas"],
+        saldo=totais["saldo"],
     )
 
     # 2. Gastos por categoria (apenas despesas)
-    gastos_categoria_dict = {}
-    for transacao in despesas:
-        categoria_nome = (
-            transacao.categoria.nome if transacao.categoria else "Sem categoria"
-        )
-        if categoria_nome not in gastos_categoria_dict:
-            gastos_categoria_dict[categoria_nome] = Decimal("0")
-        gastos_categoria_dict[categoria_nome] += transacao.valor
-
     gastos_por_categoria = [
-        GastoCategoria(categoria=categoria, valor=valor)
-        for categoria, valor in gastos_categoria_dict.items()
+        GastoCategoria(categoria=row.categoria, valor=row.valor)
+        for row in transaction.get_expenses_by_category(
+            db, usuario_id=usuario_id, data_inicio=data_inicio, data_fim=data_fim
+        )
     ]
 
     # 3. Transações recentes (últimas 10)
@@ -121,54 +99,18 @@ def obter_dados_dashboard(
     # 4. Evolução diária (últimos 30 dias)
     start_30_days, end_30_days = get_last_30_days_dates()
 
-    # Buscar transações dos últimos 30 dias
-    transacoes_30_dias = (
-        db.query(Transaction)
-        .filter(
-            and_(
-                Transaction.usuario_id == usuario_id,
-                Transaction.data_transacao >= start_30_days,
-                Transaction.data_transacao <= end_30_days,
-            )
+    # Dias sem movimento já vêm zerados e o saldo acumulado vem calculado
+    evolucao_diaria = [
+        EvolucaoDiaria(
+            data=row.dia.isoformat(),
+            receitas=row.receitas,
+            despesas=row.despesas,
+            saldo=row.saldo,
         )
-        .all()
-    )
-
-    # Agrupar por data
-    dados_diarios = {}
-    current_date = start_30_days
-    while current_date <= end_30_days:
-        dados_diarios[current_date] = {
-            "receitas": Decimal("0"),
-            "despesas": Decimal("0"),
-        }
-        current_date += timedelta(days=1)
-
-    for transacao in transacoes_30_dias:
-        data_transacao = transacao.data_transacao
-        if data_transacao in dados_diarios:
-            if transacao.tipo == "receita":
-                dados_diarios[data_transacao]["receitas"] += transacao.valor
-            else:
-                dados_diarios[data_transacao]["despesas"] += transacao.valor
-
-    # Calcular saldo acumulado
-    evolucao_diaria = []
-    saldo_acumulado = Decimal("0")
-
-    for data_item in sorted(dados_diarios.keys()):
-        dados_dia = dados_diarios[data_item]
-        saldo_dia = dados_dia["receitas"] - dados_dia["despesas"]
-        saldo_acumulado += saldo_dia
-
-        evolucao_diaria.append(
-            EvolucaoDiaria(
-                data=data_item.isoformat(),
-                receitas=dados_dia["receitas"],
-                despesas=dados_dia["despesas"],
-                saldo=saldo_acumulado,
-            )
+        for row in transaction.get_daily_evolution(
+            db, usuario_id=usuario_id, data_inicio=start_30_days, data_fim=end_30_days
         )
+    ]
 
     # 5. Mês de referência
     meses = [
@@ -199,45 +141,28 @@ def obter_dados_dashboard(
 @router.get("/dashboard/{usuario_id}/periodo", response_model=PeriodSummary)
 def obter_resumo_periodo(
     *,
-    db: Session = Depends(get_database),
+    db: Session = Depends(get_read_database),
     usuario_id: UUID,
     data_inicio: date = Query(...),
     data_fim: date = Query(...),
 ):
     """Obter resumo financeiro para um período específico."""
 
-    # Buscar transações do período
-    transacoes = (
-        db.query(Transaction)
-        .filter(
-            and_(
-                Transaction.usuario_id == usuario_id,
-                Transaction.data_transacao >= data_inicio,
-                Transaction.data_transacao <= data_fim,
-            )
-        )
-        .all()
+    totais = transaction.get_summary_by_user(
+        db, usuario_id=usuario_id, data_inicio=data_inicio, data_fim=data_fim
     )
 
-    # Calcular totais
-    receitas = [t for t in transacoes if t.tipo == "receita"]
-    despesas = [t for t in transacoes if t.tipo == "despesa"]
-
-    total_receitas = sum(t.valor for t in receitas)
-    total_despesas = sum(t.valor for t in despesas)
-    saldo = total_receitas - total_despesas
-
     return PeriodSummary(
         periodo={
             "data_inicio": data_inicio.isoformat(),
             "data_fim": data_fim.isoformat(),
         },
         resumo={
-            "total_receitas": total_receitas,
-            "total_despesas": total_despesas,
-            "saldo": saldo,
-            "quantidade_receitas": len(receitas),
-            "quantidade_despesas": len(despesas),
-            "total_transacoes": len(transacoes),
+            "total_receitas": totais["total_receitas"],
+            "total_despesas": totais["total_despesas"],
+            "saldo": totais["saldo"],
+            "quantidade_receitas": totais["receitas"],
+            "quantidade_despesas": totais["despesas"],
+            "total_transacoes": totais["receitas"] + totais["despesas"],
         },
     )
@@ -0,0 +1,59 @@
+"""
+API endpoints para acompanhar e disparar os jobs de manutenção.
+"""
+
+from typing import List, Literal, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.core.api_key_auth import require_api_key
+from app.core.deps import get_database
+from app.crud.job import background_job
+from app.schemas.job import BackgroundJob, BackgroundJobEnqueued
+from app.services.job_runner import job_runner
+
+# Só integrações com API key (n8n, cron) acompanham e disparam os jobs
+router = APIRouter(dependencies=[Depends(require_api_key)])
+
+
+@router.get("/sistema/jobs", response_model=List[BackgroundJob])
+def listar_jobs(
+    *,
+    db: Session = Depends(get_database),
+    name: Optional[str] = Query(None, description="Nome do job"),
+    status: Optional[Literal["pending", "running", "succeeded", "failed"]] = None,
+    limit: int = Query(50, ge=1, le=500),
+):
+    """Execuções dos jobs de manutenção, mais recentes primeiro."""
+    return background_job.get_multi(db, name=name, status=status, limit=limit)
+
+
+@router.get("/sistema/jobs/{job_id}", response_model=BackgroundJob)
+def obter_job(*, db: Session = Depends(get_database), job_id: UUID):
+    """Status, progresso (checkpoint) e resultado de uma execução."""
+    job = background_job.get(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job
+
+
+@router.post(
+    "/sistema/jobs/{name}/executar",
+    response_model=BackgroundJobEnqueued,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def executar_job(*, db: Session = Depends(get_database), name: str):
+    """
+    Enfileira o job para rodar agora.
+
+    Se já houver uma execução pendente ou rodando, retorna essa execução.
+    """
+    if not job_runner.is_registered(name):
+        raise HTTPException(
+            status_code=404,
+            detail=f"Job não encontrado. Disponíveis: {', '.join(job_runner.job_names)}",
+        )
+
+    return {"message": "Job enfileirado", "job": job_runner.enqueue(db, name)}
@@ -1,21 +1,32 @@
+import asyncio
 import re
 from datetime import datetime, timedelta
-from typing import Optional
+from decimal import Decimal
+from typing import Literal, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
-from sqlalchemy import func
-from sqlalchemy.orm import Session, joinedload
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Request,
+    UploadFile,
+    status,
+)
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
-from app.core.database import get_db
-from app.core.rate_limiter import auth_rate_limit
+from app.core.config import settings
+from app.core.database import get_async_db, get_async_read_db, get_db
+from app.core.rate_limiter import client_rate_limit
 from app.core.validators import format_phone, sanitize_input, validate_phone
 from app.crud.budget import budget as budget_crud
 from app.crud.commitment import commitment as commitment_crud
 from app.crud.transaction import transaction as transaction_crud
-from app.crud.user_phone import user_phone as user_phone_crud
 from app.models.user import User
-from app.models.user_phone import UserPhone
 from app.schemas.n8n import (
     CategoryFilterRequest,
     CategoryFilterResponse,
@@ -24,6 +35,8 @@ from app.schemas.n8n import (
     N8NBudgetDelete,
     N8NBudgetResponse,
     N8NBudgetUpdate,
+    N8NBulkTransactionCreate,
+    N8NBulkTransactionResponse,
     N8NCommitmentCreate,
     N8NCommitmentDelete,
     N8NCommitmentMarkDone,
@@ -40,10 +53,21 @@ from app.schemas.n8n import (
     UserLookupRequest,
     UserLookupResponse,
 )
+from app.services.category_catalog import category_catalog
 from app.services.category_filter import (
     category_filter_service,
     find_category_by_name_flexible,
 )
+from app.services.identity_resolver import identity_resolver
+from app.services.transaction_import import (
+    ImportFormatError,
+    ImportRow,
+    decode_file,
+    parse_csv,
+    parse_ofx,
+    transaction_import_service,
+)
+from app.services.usage_service import usage_service
 
 router = APIRouter()
 
@@ -66,11 +90,15 @@ def detect_search_type(query: str) -> str:
 
 
 @router.post(
-    "/user/lookup", response_model=UserLookupResponse, status_code=status.HTTP_200_OK
+    "/user/lookup",
+    response_model=UserLookupResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(client_rate_limit)],
 )
-@auth_rate_limit()
 async def lookup_user(
-    request: Request, lookup_data: UserLookupRequest, db: Session = Depends(get_db)
+    request: Request,
+    lookup_data: UserLookupRequest,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Lookup user by phone, name, or lid (WhatsApp identifier).
@@ -104,34 +132,22 @@ async def lookup_user(
 
             formatted_phone = format_phone(query)
             # Search in UserPhone table
-            user_phone = (
-                db.query(UserPhone)
-                .filter(UserPhone.phone_number == formatted_phone)
-                .filter(UserPhone.is_active.is_(True))
-                .first()
+            user = await identity_resolver.resolve_async(
+                db, phone_number=formatted_phone
             )
-            if user_phone:
-                user = db.query(User).filter(User.id == user_phone.user_id).first()
-            else:
-                user = None
 
         elif search_type == "lid":
             # LID search via UserPhone table
             clean_lid = query.lstrip("@")
-            user_phone = user_phone_crud.get_by_lid(db, lid=clean_lid)
-            if user_phone:
-                user = db.query(User).filter(User.id == user_phone.user_id).first()
-            else:
-                user = None
+            user = await identity_resolver.resolve_async(db, lid=clean_lid)
 
         elif search_type == "name":
             # Name search - partial match, case-insensitive
             search_pattern = f"%{query.lower()}%"
-            user = (
-                db.query(User)
-                .filter(func.lower(User.nome).like(search_pattern))
-                .first()
+            result = await db.execute(
+                select(User).where(func.lower(User.nome).like(search_pattern)).limit(1)
             )
+            user = result.scalars().first()
 
         else:
             return UserLookupResponse(
@@ -178,10 +194,13 @@ async def lookup_user(
     "/user/lookup/{query}",
     response_model=UserLookupResponse,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(client_rate_limit)],
 )
-@auth_rate_limit()
 async def lookup_user_get(
-    request: Request, query: str, search_type: str = None, db: Session = Depends(get_db)
+    request: Request,
+    query: str,
+    search_type: str = None,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     GET version of user lookup endpoint for simple queries.
@@ -201,10 +220,12 @@ async def lookup_user_get(
     "/categorias/filter",
     response_model=CategoryFilterResponse,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(client_rate_limit)],
 )
-@auth_rate_limit()
 async def filter_categories(
-    request: Request, filter_data: CategoryFilterRequest, db: Session = Depends(get_db)
+    request: Request,
+    filter_data: CategoryFilterRequest,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Filter categories based on message content to optimize AI token usage.
@@ -229,13 +250,21 @@ async def filter_categories(
         )
 
     try:
+        # Embedding classifier prediction (None = keyword matching)
+        prediction = None
+        if filter_data.strategy == "embedding":
+            prediction = await category_filter_service.predict_category_async(
+                db, message
+            )
+
         # Use the category filter service
-        result = category_filter_service.filter_categories(
-            db=db,
+        result = await db.run_sync(
+            category_filter_service.filter_categories,
             message=message,
             max_categories=filter_data.max_categories,
             min_score=filter_data.min_score,
             remove_emojis=filter_data.remove_emojis,
+            prediction=prediction,
         )
 
         # Convert to response format
@@ -254,10 +283,12 @@ async def filter_categories(
     "/categorias/filter/compact",
     response_model=CompactCategoryResponse,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(client_rate_limit)],
 )
-@auth_rate_limit()
 async def filter_categories_compact(
-    request: Request, filter_data: CategoryFilterRequest, db: Session = Depends(get_db)
+    request: Request,
+    filter_data: CategoryFilterRequest,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Ultra-compact category filtering for maximum token efficiency.
@@ -282,13 +313,21 @@ async def filter_categories_compact(
         )
 
     try:
+        # Embedding classifier prediction (None = keyword matching)
+        prediction = None
+        if filter_data.strategy == "embedding":
+            prediction = await category_filter_service.predict_category_async(
+                db, message
+            )
+
         # Use the category filter service
-        result = category_filter_service.filter_categories(
-            db=db,
+        result = await db.run_sync(
+            category_filter_service.filter_categories,
             message=message,
             max_categories=filter_data.max_categories,
             min_score=filter_data.min_score,
             remove_emojis=filter_data.remove_emojis,
+            prediction=prediction,
         )
 
         # Get compact format
@@ -304,7 +343,7 @@ async def filter_categories_compact(
 
 
 @router.get("/categorias/all", status_code=status.HTTP_200_OK)
-async def get_all_categories_structured(db: Session = Depends(get_db)):
+async def get_all_categories_structured(db: AsyncSession = Depends(get_async_db)):
     """
     Get all categories structured by type for N8N workflows.
 
@@ -312,10 +351,9 @@ async def get_all_categories_structured(db: Session = Depends(get_db)):
     for workflows that need the complete category list.
     """
     try:
-        from app.crud.category import category
-
-        despesas = category.get_by_tipo(db, tipo="despesa")
-        receitas = category.get_by_tipo(db, tipo="receita")
+        catalog = await category_catalog.get_async(db)
+        despesas = catalog.by_tipo("despesa")
+        receitas = catalog.by_tipo("receita")
 
         return {
             "despesas": [{"id": cat.id, "nome": cat.nome} for cat in despesas],
@@ -336,12 +374,12 @@ async def get_all_categories_structured(db: Session = Depends(get_db)):
     "/transaction/create",
     response_model=N8NTransactionResponse,
     status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(client_rate_limit)],
 )
-@auth_rate_limit()
 async def create_transaction(
     request: Request,
     transaction_data: N8NTransactionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Create a new transaction for N8N integration.
@@ -363,7 +401,9 @@ async def create_transaction(
 
         if transaction_data.usuario_id:
             # Direct user ID lookup
-            user = db.query(User).filter(User.id == transaction_data.usuario_id).first()
+            user = await identity_resolver.resolve_async(
+                db, usuario_id=transaction_data.usuario_id
+            )
             user_identification_method = "user_id"
 
         elif transaction_data.telefone:
@@ -379,26 +419,15 @@ async def create_transaction(
                 )
 
             formatted_phone = format_phone(transaction_data.telefone)
-            user_phone = (
-                db.query(UserPhone)
-                .filter(UserPhone.phone_number == formatted_phone)
-                .filter(UserPhone.is_active.is_(True))
-                .first()
+            user = await identity_resolver.resolve_async(
+                db, phone_number=formatted_phone
             )
-            if user_phone:
-                user = db.query(User).filter(User.id == user_phone.user_id).first()
-            else:
-                user = None
             user_identification_method = "phone"
 
         elif transaction_data.lid:
             # LID lookup via UserPhone table
             clean_lid = transaction_data.lid.lstrip("@")
-            user_phone = user_phone_crud.get_by_lid(db, lid=clean_lid)
-            if user_phone:
-                user = db.query(User).filter(User.id == user_phone.user_id).first()
-            else:
-                user = None
+            user = await identity_resolver.resolve_async(db, lid=clean_lid)
             user_identification_method = "lid"
 
         if not user:
@@ -449,8 +478,8 @@ async def create_transaction(
 
         if not transaction_data.categoria_id and transaction_data.mensagem_original:
             # Use our category filter service to suggest a category
-            filter_result = category_filter_service.filter_categories(
-                db=db,
+            filter_result = await db.run_sync(
+                category_filter_service.filter_categories,
                 message=transaction_data.mensagem_original,
                 max_categories=1,
                 min_score=0.5,  # Higher threshold for auto-assignment
@@ -469,9 +498,7 @@ async def create_transaction(
         # Step 3: Find category by ID or name, then validate
         cat = None
         if final_categoria_id:
-            from app.crud.category import category
-
-            cat = category.get(db, id=final_categoria_id)
+            cat = (await category_catalog.get_async(db)).get(final_categoria_id)
             if not cat:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -482,8 +509,8 @@ async def create_transaction(
                 )
         elif transaction_data.categoria_nome:
             # Search by name using flexible search with type filter
-            cat = find_category_by_name_flexible(
-                db, transaction_data.categoria_nome, transaction_data.tipo
+            cat = (await category_catalog.get_async(db)).find_by_name(
+                transaction_data.categoria_nome, transaction_data.tipo
             )
             if not cat:
                 raise HTTPException(
@@ -524,6 +551,20 @@ async def create_transaction(
                     },
                 )
 
+        # Reserve one unit of the plan limit (atomic; committed with the
+        # transaction created below, released on rollback)
+        can_create, limit_message = await db.run_sync(
+            usage_service.reserve_quota, user, "transaction"
+        )
+        if not can_create:
+            raise HTTPException(
+                status_code=status.HTTP_402_PAYMENT_REQUIRED,
+                detail={
+                    "error_code": "PLAN_LIMIT_REACHED",
+                    "message": limit_message,
+                },
+            )
+
         # Step 5: Create the transaction with budget update
         from decimal import Decimal
 
@@ -541,8 +582,10 @@ async def create_transaction(
         )
 
         # Create transaction with budget update and alert detection
-        new_transaction, budget_alert = transaction_crud.create_with_budget_update(
-            db=db, obj_in=transaction_create_data
+        new_transaction, budget_alert = (
+            await transaction_crud.create_with_budget_update_async(
+                db=db, obj_in=transaction_create_data, with_categoria=False
+            )
         )
 
         # Step 6: Prepare response with related data
@@ -563,11 +606,8 @@ async def create_transaction(
             "data_registro": new_transaction.data_registro.isoformat(),
         }
 
-        # Add category info if available
+        # Add category info if available (from the category catalog)
         if final_categoria_id:
-            from app.crud.category import category
-
-            cat = category.get(db, id=final_categoria_id)
             if cat:
                 transaction_dict["categoria"] = {
                     "id": cat.id,
@@ -601,7 +641,7 @@ async def create_transaction(
         # Re-raise HTTPException as-is
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={
@@ -611,12 +651,230 @@ async def create_transaction(
         )
 
 
+async def _resolve_bulk_user(
+    db: AsyncSession,
+    usuario_id: Optional[UUID],
+    telefone: Optional[str],
+    lid: Optional[str],
+) -> User:
+    """
+    Resolve the user of a bulk request (once) and check the transactions feature.
+    Raises HTTPException like create_transaction.
+    """
+    user = None
+
+    if usuario_id:
+        user = await identity_resolver.resolve_async(db, usuario_id=usuario_id)
+    elif telefone:
+        phone_validation = validate_phone(telefone)
+        if not phone_validation["is_valid"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "error_code": "INVALID_PHONE",
+                    "message": f"Invalid phone format: {', '.join(phone_validation['issues'])}",
+                },
+            )
+        user = await identity_resolver.resolve_async(
+            db, phone_number=format_phone(telefone)
+        )
+    elif lid:
+        clean_lid = sanitize_input(lid, 50).lstrip("@")
+        user = await identity_resolver.resolve_async(db, lid=clean_lid)
+
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "error_code": "USER_NOT_FOUND",
+                "message": "User not found with provided identification",
+            },
+        )
+
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={
+                "error_code": "USER_INACTIVE",
+                "message": "User account is not active",
+            },
+        )
+
+    if not user.plano:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={"error_code": "NO_PLAN", "message": "User has no active plan"},
+        )
+
+    if not user.plano.has_feature("transactions_enabled"):
+        raise HTTPException(
+            status_code=status.HTTP_402_PAYMENT_REQUIRED,
+            detail={
+                "error_code": "FEATURE_NOT_AVAILABLE",
+                "message": "User plan does not support transactions feature",
+                "required_feature": "transactions_enabled",
+            },
+        )
+
+    return user
+
+
+async def _import_transaction_rows(
+    db: AsyncSession, user: User, rows: list, canal: str, strategy: str
+) -> N8NBulkTransactionResponse:
+    """Create the parsed rows in one database transaction (per-row results)."""
+    try:
+        result = await db.run_sync(
+            transaction_import_service.import_rows,
+            user,
+            rows,
+            canal=canal,
+            strategy=strategy,
+        )
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "error_code": "INTERNAL_ERROR",
+                "message": f"Error importing transactions: {str(e)}",
+            },
+        )
+
+    return N8NBulkTransactionResponse(
+        success=result["created"] > 0,
+        created=result["created"],
+        failed=result["failed"],
+        results=result["results"],
+        budget_alerts=result["budget_alerts"],
+        message=f"{result['created']} of {len(rows)} transactions created",
+    )
+
+
+@router.post(
+    "/transaction/bulk-create",
+    response_model=N8NBulkTransactionResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(client_rate_limit)],
+)
+async def bulk_create_transactions(
+    request: Request,
+    bulk_data: N8NBulkTransactionCreate,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Create up to TRANSACTION_IMPORT_MAX_ROWS transactions for one user.
+
+    The user is resolved once, missing categories are suggested in batch and
+    all valid rows are inserted together. Invalid rows and rows beyond the
+    plan limit are reported per row (error_code) without failing the others.
+    """
+    if len(bulk_data.transactions) > settings.TRANSACTION_IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail={
+                "error_code": "TOO_MANY_ROWS",
+                "message": f"At most {settings.TRANSACTION_IMPORT_MAX_ROWS} transactions per request",
+            },
+        )
+
+    user = await _resolve_bulk_user(
+        db, bulk_data.usuario_id, bulk_data.telefone, bulk_data.lid
+    )
+
+    rows = []
+    for index, item in enumerate(bulk_data.transactions):
+        row = ImportRow(
+            index=index,
+            valor=Decimal(str(item.valor)),
+            descricao=item.descricao,
+            tipo=item.tipo,
+            categoria_id=item.categoria_id,
+            categoria_nome=item.categoria_nome,
+            mensagem_original=item.mensagem_original,
+        )
+        if item.data_transacao:
+            try:
+                row.data_transacao = datetime.strptime(
+                    item.data_transacao, "%Y-%m-%d"
+                ).date()
+            except ValueError:
+                row.error = "Invalid date format. Use YYYY-MM-DD"
+        rows.append(row)
+
+    return await _import_transaction_rows(
+        db, user, rows, bulk_data.canal, bulk_data.strategy
+    )
+
+
+@router.post(
+    "/transaction/import",
+    response_model=N8NBulkTransactionResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(client_rate_limit)],
+)
+async def import_transactions_file(
+    request: Request,
+    file: UploadFile = File(..., description="CSV or OFX bank statement"),
+    formato: Optional[Literal["csv", "ofx"]] = Form(
+        None, description="File format - detected from the file name if omitted"
+    ),
+    usuario_id: Optional[UUID] = Form(None),
+    telefone: Optional[str] = Form(None),
+    lid: Optional[str] = Form(None),
+    strategy: Literal["keywords", "embedding"] = Form("keywords"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Import a CSV or OFX statement (multipart upload) for one user.
+
+    CSV needs a header with data, descricao and valor columns (tipo and
+    categoria optional); OFX rows come from <STMTTRN>. Same per-row results
+    as /transaction/bulk-create.
+    """
+    user = await _resolve_bulk_user(db, usuario_id, telefone, lid)
+
+    if formato is None:
+        formato = "ofx" if (file.filename or "").lower().endswith(".ofx") else "csv"
+
+    max_bytes = settings.TRANSACTION_IMPORT_MAX_FILE_BYTES
+    raw = await file.read(max_bytes + 1)
+    if len(raw) > max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail={
+                "error_code": "FILE_TOO_LARGE",
+                "message": f"File larger than {max_bytes} bytes",
+            },
+        )
+
+    parser = parse_ofx if formato == "ofx" else parse_csv
+    try:
+        # Parsing is CPU-bound: keep it off the event loop
+        rows = await asyncio.to_thread(
+            parser, decode_file(raw), settings.TRANSACTION_IMPORT_MAX_ROWS
+        )
+    except ImportFormatError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error_code": "INVALID_FILE", "message": str(e)},
+        )
+
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error_code": "EMPTY_FILE", "message": "No transactions in file"},
+        )
+
+    return await _import_transaction_rows(db, user, rows, "webApp", strategy)
+
+
 @router.post(
     "/budget/create",
     response_model=N8NBudgetResponse,
     status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(client_rate_limit)],
 )
-@auth_rate_limit()
 async def create_budget(
     request: Request, budget_data: N8NBudgetCreate, db: Session = Depends(get_db)
 ):
@@ -640,7 +898,7 @@ async def create_budget(
 
         if budget_data.usuario_id:
             # Direct user ID lookup
-            user = db.query(User).filter(User.id == budget_data.usuario_id).first()
+            user = identity_resolver.resolve(db, usuario_id=budget_data.usuario_id)
             user_identification_method = "user_id"
 
         elif budget_data.telefone:
@@ -656,26 +914,13 @@ async def create_budget(
                 )
 
             formatted_phone = format_phone(budget_data.telefone)
-            user_phone = (
-                db.query(UserPhone)
-                .filter(UserPhone.phone_number == formatted_phone)
-                .filter(UserPhone.is_active.is_(True))
-                .first()
-            )
-            if user_phone:
-                user = db.query(User).filter(User.id == user_phone.user_id).first()
-            else:
-                user = None
+            user = identity_resolver.resolve(db, phone_number=formatted_phone)
             user_identification_method = "phone"
 
         elif budget_data.lid:
             # LID lookup via UserPhone table
             clean_lid = budget_data.lid.lstrip("@")
-            user_phone = user_phone_crud.get_by_lid(db, lid=clean_lid)
-            if user_phone:
-                user = db.query(User).filter(User.id == user_phone.user_id).first()
-            else:
-                user = None
+            user = identity_resolver.resolve(db, lid=clean_lid)
             user_identification_method = "lid"
 
         if not user:
@@ -735,9 +980,7 @@ async def create_budget(
 
         # Try to find category by ID first, then by name
         if budget_data.categoria_id:
-            from app.crud.category import category
-
-            cat = category.get(db, id=budget_data.categoria_id)
+            cat = category_catalog.get(db).get(budget_data.categoria_id)
             if not cat:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -775,6 +1018,18 @@ async def create_budget(
                 },
             )
 
+        # Reserve one unit of the plan limit (atomic; committed with the
+        # budget created below, released on rollback)
+        can_create, limit_message = usage_service.reserve_quota(db, user, "budget")
+        if not can_create:
+            raise HTTPException(
+                status_code=status.HTTP_402_PAYMENT_REQUIRED,
+                detail={
+                    "error_code": "PLAN_LIMIT_REACHED",
+                    "message": limit_message,
+                },
+            )
+
         # Step 4: Create the budget
         from decimal import Decimal
 
@@ -857,8 +1112,8 @@ async def create_budget(
     "/compromisso/create",
     response_model=N8NCommitmentResponse,
     status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(client_rate_limit)],
 )
-@auth_rate_limit()
 async def create_commitment_for_n8n(
     request: Request,
     commitment_data: N8NCommitmentCreate,
@@ -883,12 +1138,7 @@ async def create_commitment_for_n8n(
 
         if commitment_data.usuario_id:
             # Direct user lookup by ID with plan
-            user = (
-                db.query(User)
-                .options(joinedload(User.plano))
-                .filter(User.id == commitment_data.usuario_id)
-                .first()
-            )
+            user = identity_resolver.resolve(db, usuario_id=commitment_data.usuario_id)
             if not user:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -902,21 +1152,7 @@ async def create_commitment_for_n8n(
             if commitment_data.telefone:
                 phone = format_phone(commitment_data.telefone)
                 # Search in UserPhone table
-                user_phone = (
-                    db.query(UserPhone)
-                    .filter(UserPhone.phone_number == phone)
-                    .filter(UserPhone.is_active.is_(True))
-                    .first()
-                )
-                if user_phone:
-                    user = (
-                        db.query(User)
-                        .options(joinedload(User.plano))
-                        .filter(User.id == user_phone.user_id)
-                        .first()
-                    )
-                else:
-                    user = None
+                user = identity_resolver.resolve(db, phone_number=phone)
 
                 if not user:
                     raise HTTPException(
@@ -929,16 +1165,7 @@ async def create_commitment_for_n8n(
             elif commitment_data.lid:
                 lid = commitment_data.lid.lstrip("@")  # Remove @ if present
                 # LID lookup via UserPhone table
-                user_phone = user_phone_crud.get_by_lid(db, lid=lid)
-                if user_phone:
-                    user = (
-                        db.query(User)
-                        .options(joinedload(User.plano))
-                        .filter(User.id == user_phone.user_id)
-                        .first()
-                    )
-                else:
-                    user = None
+                user = identity_resolver.resolve(db, lid=lid)
 
                 if not user:
                     raise HTTPException(
@@ -1081,6 +1308,18 @@ async def create_commitment_for_n8n(
             minutos_antes_lembrete=commitment_data.minutos_antes_lembrete,
         )
 
+        # Reserve one unit of the plan limit (atomic; committed with the
+        # commitment created below, released on rollback)
+        can_create, limit_message = usage_service.reserve_quota(db, user, "commitment")
+        if not can_create:
+            raise HTTPException(
+                status_code=status.HTTP_402_PAYMENT_REQUIRED,
+                detail={
+                    "error_code": "PLAN_LIMIT_REACHED",
+                    "message": limit_message,
+                },
+            )
+
         # Create commitment with sync flag
         new_commitment = commitment_crud.create_with_sync_flag(
             db, obj_in=commitment_create_data
@@ -1181,10 +1420,12 @@ async def create_commitment_for_n8n(
     "/relatorio/generate",
     response_model=N8NReportResponse,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(client_rate_limit)],
 )
-@auth_rate_limit()
 async def generate_report_for_n8n(
-    request: Request, report_data: N8NReportCreate, db: Session = Depends(get_db)
+    request: Request,
+    report_data: N8NReportCreate,
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """
     Generate financial report for N8N integration.
@@ -1206,7 +1447,9 @@ async def generate_report_for_n8n(
 
         if report_data.usuario_id:
             # Direct user lookup by ID
-            user = db.query(User).filter(User.id == report_data.usuario_id).first()
+            user = await identity_resolver.resolve_async(
+                db, usuario_id=report_data.usuario_id
+            )
             if not user:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -1220,16 +1463,7 @@ async def generate_report_for_n8n(
             if report_data.telefone:
                 phone = format_phone(report_data.telefone)
                 # Search in UserPhone table
-                user_phone = (
-                    db.query(UserPhone)
-                    .filter(UserPhone.phone_number == phone)
-                    .filter(UserPhone.is_active.is_(True))
-                    .first()
-                )
-                if user_phone:
-                    user = db.query(User).filter(User.id == user_phone.user_id).first()
-                else:
-                    user = None
+                user = await identity_resolver.resolve_async(db, phone_number=phone)
 
                 if not user:
                     raise HTTPException(
@@ -1242,11 +1476,7 @@ async def generate_report_for_n8n(
             elif report_data.lid:
                 lid = report_data.lid.lstrip("@")  # Remove @ if present
                 # LID lookup via UserPhone table
-                user_phone = user_phone_crud.get_by_lid(db, lid=lid)
-                if user_phone:
-                    user = db.query(User).filter(User.id == user_phone.user_id).first()
-                else:
-                    user = None
+                user = await identity_resolver.resolve_async(db, lid=lid)
 
                 if not user:
                     raise HTTPException(
@@ -1318,10 +1548,9 @@ async def generate_report_for_n8n(
             )
 
         # Step 3: Build base query
-        from app.models.category import Category
         from app.models.transaction import Transaction
 
-        base_query = db.query(Transaction).filter(
+        base_query = select(Transaction).where(
             Transaction.usuario_id == user.id,
             Transaction.data_transacao >= data_inicio,
             Transaction.data_transacao <= data_fim,
@@ -1329,41 +1558,37 @@ async def generate_report_for_n8n(
 
         # Step 4: Apply type filter
         if report_data.tipo != "ambos":
-            base_query = base_query.filter(Transaction.tipo == report_data.tipo)
+            base_query = base_query.where(Transaction.tipo == report_data.tipo)
 
         # Step 5: Apply category filters
         filtered_category_ids = []
 
         if report_data.categorias_nomes:
+            catalog = await category_catalog.get_async(db)
+
             # If tipo is "ambos", we need to search categories in both despesa and receita
             # Otherwise, filter by the specific tipo
             if report_data.tipo == "ambos":
                 # Search in both types
                 for categoria_nome in report_data.categorias_nomes:
                     # Try despesa
-                    cat_despesa = find_category_by_name_flexible(
-                        db, categoria_nome, tipo="despesa"
-                    )
+                    cat_despesa = catalog.find_by_name(categoria_nome, tipo="despesa")
                     if cat_despesa:
                         filtered_category_ids.append(cat_despesa.id)
 
                     # Try receita
-                    cat_receita = find_category_by_name_flexible(
-                        db, categoria_nome, tipo="receita"
-                    )
+                    cat_receita = catalog.find_by_name(categoria_nome, tipo="receita")
                     if cat_receita:
                         filtered_category_ids.append(cat_receita.id)
             else:
                 # Search only in the specified tipo
                 for categoria_nome in report_data.categorias_nomes:
-                    cat = find_category_by_name_flexible(
-                        db, categoria_nome, tipo=report_data.tipo
-                    )
+                    cat = catalog.find_by_name(categoria_nome, tipo=report_data.tipo)
                     if cat:
                         filtered_category_ids.append(cat.id)
 
             if filtered_category_ids:
-                base_query = base_query.filter(
+                base_query = base_query.where(
                     Transaction.categoria_id.in_(filtered_category_ids)
                 )
             else:
@@ -1376,63 +1601,49 @@ async def generate_report_for_n8n(
                     },
                 )
 
-        # Step 6: Get transactions with category info
-        transactions_query = base_query.join(
-            Category, Transaction.categoria_id == Category.id, isouter=True
+        # Step 6: Summary by category and type (daily rollup, no transaction scan)
+        category_totals = await transaction_crud.get_category_totals_async(
+            db,
+            usuario_id=user.id,
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+            tipo=report_data.tipo if report_data.tipo != "ambos" else None,
+            categoria_ids=filtered_category_ids or None,
         )
 
-        transactions = transactions_query.all()
-
         # Step 7: Calculate summary data
         total_receitas = 0.0
         total_despesas = 0.0
-        category_data = (
-            {}
-        )  # Key: (categoria_nome, tipo) to allow same category for receita/despesa
-
-        for transaction in transactions:
-            valor = float(transaction.valor)
-            categoria_nome = (
-                transaction.categoria.nome if transaction.categoria else "Sem categoria"
-            )
+        quantidade_transacoes = 0
+        por_categoria = []  # Same category may appear for both receita and despesa
 
-            if transaction.tipo == "receita":
+        for row in category_totals:
+            valor = float(row.valor)
+            if row.tipo == "receita":
                 total_receitas += valor
             else:
                 total_despesas += valor
+            quantidade_transacoes += row.quantidade
 
-            # Group by category AND type (allows same category for both receita and despesa)
-            category_key = (categoria_nome, transaction.tipo)
-            if category_key not in category_data:
-                category_data[category_key] = {
-                    "valor": 0.0,
-                    "quantidade": 0,
-                }
-            category_data[category_key]["valor"] += valor
-            category_data[category_key]["quantidade"] += 1
-
-        saldo = total_receitas - total_despesas
-
-        # Step 8: Prepare category breakdown
-        por_categoria = []
-        for (categoria_nome, tipo), data in category_data.items():
             por_categoria.append(
                 {
-                    "categoria": categoria_nome,
-                    "valor": data["valor"],
-                    "quantidade": data["quantidade"],
-                    "tipo": tipo,
+                    "categoria": row.categoria,
+                    "valor": valor,
+                    "quantidade": row.quantidade,
+                    "tipo": row.tipo,
                 }
             )
 
-        # Sort by value (descending)
-        por_categoria.sort(key=lambda x: x["valor"], reverse=True)
+        saldo = total_receitas - total_despesas
 
-        # Step 9: Prepare transaction details (if detailed format)
+        # Step 8: Prepare transaction details (if detailed format)
         transaction_details = None
         if report_data.formato_saida == "detalhado":
+            result = await db.execute(
+                base_query.options(selectinload(Transaction.categoria))
+            )
             transaction_details = []
-            for transaction in transactions:
+            for transaction in result.scalars().all():
                 transaction_details.append(
                     {
                         "id": str(transaction.id),
@@ -1449,7 +1660,7 @@ async def generate_report_for_n8n(
                     }
                 )
 
-        # Step 10: Build response
+        # Step 9: Build response
         from app.schemas.n8n import (
             ReportCategoryData,
             ReportData,
@@ -1461,7 +1672,7 @@ async def generate_report_for_n8n(
             total_receitas=total_receitas,
             total_despesas=total_despesas,
             saldo=saldo,
-            quantidade_transacoes=len(transactions),
+            quantidade_transacoes=quantidade_transacoes,
         )
 
         categorias_response = [
@@ -1535,27 +1746,13 @@ async def _identify_user_from_request(
     user = None
 
     if usuario_id:
-        user = db.query(User).filter(User.id == usuario_id).first()
+        user = identity_resolver.resolve(db, usuario_id=usuario_id)
     elif telefone:
         formatted_phone = format_phone(telefone)
-        user_phone = (
-            db.query(UserPhone)
-            .filter(UserPhone.phone_number == formatted_phone)
-            .filter(UserPhone.is_active.is_(True))
-            .first()
-        )
-        if user_phone:
-            user = user_phone.user
+        user = identity_resolver.resolve(db, phone_number=formatted_phone)
     elif lid:
         clean_lid = sanitize_input(lid, 50).lstrip("@")
-        user_phone = (
-            db.query(UserPhone)
-            .filter(UserPhone.lid == clean_lid)
-            .filter(UserPhone.is_active.is_(True))
-            .first()
-        )
-        if user_phone:
-            user = user_phone.user
+        user = identity_resolver.resolve(db, lid=clean_lid)
 
     if not user:
         raise HTTPException(
@@ -1585,8 +1782,8 @@ async def _identify_user_from_request(
     "/compromisso/update",
     response_model=N8NUpdateResponse,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(client_rate_limit)],
 )
-@auth_rate_limit()
 async def update_commitment(
     request: Request, update_data: N8NCommitmentUpdate, db: Session = Depends(get_db)
 ):
@@ -1685,8 +1882,8 @@ async def update_commitment(
     "/compromisso/mark-done",
     response_model=N8NUpdateResponse,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(client_rate_limit)],
 )
-@auth_rate_limit()
 async def mark_commitment_done(
     request: Request, mark_data: N8NCommitmentMarkDone, db: Session = Depends(get_db)
 ):
@@ -1757,8 +1954,8 @@ async def mark_commitment_done(
     "/compromisso/delete",
     response_model=N8NUpdateResponse,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(client_rate_limit)],
 )
-@auth_rate_limit()
 async def delete_commitment(
     request: Request, delete_data: N8NCommitmentDelete, db: Session = Depends(get_db)
 ):
@@ -1824,9 +2021,11 @@ async def delete_commitment(
 
 
 @router.patch(
-    "/budget/update", response_model=N8NUpdateResponse, status_code=status.HTTP_200_OK
+    "/budget/update",
+    response_model=N8NUpdateResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(client_rate_limit)],
 )
-@auth_rate_limit()
 async def update_budget(
     request: Request, update_data: N8NBudgetUpdate, db: Session = Depends(get_db)
 ):
@@ -1911,9 +2110,11 @@ async def update_budget(
 
 
 @router.delete(
-    "/budget/delete", response_model=N8NUpdateResponse, status_code=status.HTTP_200_OK
+    "/budget/delete",
+    response_model=N8NUpdateResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(client_rate_limit)],
 )
-@auth_rate_limit()
 async def delete_budget(
     request: Request, delete_data: N8NBudgetDelete, db: Session = Depends(get_db)
 ):
@@ -1980,8 +2181,8 @@ async def delete_budget(
     "/transaction/update",
     response_model=N8NUpdateResponse,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(client_rate_limit)],
 )
-@auth_rate_limit()
 async def update_transaction(
     request: Request, update_data: N8NTransactionUpdate, db: Session = Depends(get_db)
 ):
@@ -2087,8 +2288,8 @@ async def update_transaction(
     "/transaction/delete",
     response_model=N8NUpdateResponse,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(client_rate_limit)],
 )
-@auth_rate_limit()
 async def delete_transaction(
     request: Request, delete_data: N8NTransactionDelete, db: Session = Depends(get_db)
 ):
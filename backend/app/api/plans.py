@@ -4,9 +4,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.core.auth import get_current_user
+from app.core.auth_cache import UserSnapshot
 from app.core.database import get_db
 from app.crud import plan
-from app.models.user import User
 from app.schemas.plan import (
     PlanCreate,
     PlanResponse,
@@ -66,7 +66,7 @@ async def get_plan(plan_id: int, db: Session = Depends(get_db)):
 @router.get("/admin/all", response_model=List[PlanResponse])
 async def admin_list_all_plans(
     include_inactive: bool = False,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -87,7 +87,7 @@ async def admin_list_all_plans(
 )
 async def admin_create_plan(
     plan_data: PlanCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -120,7 +120,7 @@ async def admin_create_plan(
 async def admin_update_plan(
     plan_id: int,
     plan_data: PlanUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -161,7 +161,7 @@ async def admin_update_plan(
 @router.patch("/admin/{plan_id}/activate", response_model=PlanResponse)
 async def admin_activate_plan(
     plan_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -187,7 +187,7 @@ async def admin_activate_plan(
 @router.patch("/admin/{plan_id}/deactivate", response_model=PlanResponse)
 async def admin_deactivate_plan(
     plan_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -215,7 +215,7 @@ async def admin_deactivate_plan(
 @router.patch("/admin/{plan_id}/set-default", response_model=PlanResponse)
 async def admin_set_default_plan(
     plan_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -244,7 +244,7 @@ async def admin_set_default_plan(
 @router.delete("/admin/{plan_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def admin_delete_plan(
     plan_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -4,14 +4,16 @@ from typing import List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app.core.auth import get_current_user
-from app.core.database import get_db
+from app.core.auth_cache import UserSnapshot
+from app.core.database import get_async_db, get_async_read_db
 from app.core.plan_validation import HTTP_402_PAYMENT_REQUIRED, require_feature
 from app.crud import transaction
 from app.models.transaction import Transaction
-from app.models.user import User
 from app.schemas.transaction import (
     CategorySummary,
     PaginatedTransactions,
@@ -21,6 +23,7 @@ from app.schemas.transaction import (
     TransactionUpdate,
     TransactionWithCategory,
 )
+from app.services.category_catalog import category_catalog
 from app.services.usage_service import usage_service
 
 router = APIRouter()
@@ -36,8 +39,8 @@ async def list_transactions(
     categoria_id: Optional[int] = Query(None, description="Filtrar por categoria"),
     data_inicio: Optional[date] = Query(None, description="Data inicial (YYYY-MM-DD)"),
     data_fim: Optional[date] = Query(None, description="Data final (YYYY-MM-DD)"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     """Listar transações do usuário com filtros e paginação."""
 
@@ -45,7 +48,7 @@ async def list_transactions(
     skip = (page - 1) * size
 
     # Build query
-    query = db.query(Transaction).filter(Transaction.usuario_id == current_user.id)
+    query = select(Transaction).where(Transaction.usuario_id == current_user.id)
 
     # Apply filters
     if tipo:
@@ -54,23 +57,26 @@ async def list_transactions(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Tipo deve ser 'despesa' ou 'receita'",
             )
-        query = query.filter(Transaction.tipo == tipo)
+        query = query.where(Transaction.tipo == tipo)
 
     if categoria_id:
-        query = query.filter(Transaction.categoria_id == categoria_id)
+        query = query.where(Transaction.categoria_id == categoria_id)
 
     if data_inicio:
-        query = query.filter(Transaction.data_transacao >= data_inicio)
+        query = query.where(Transaction.data_transacao >= data_inicio)
 
     if data_fim:
-        query = query.filter(Transaction.data_transacao <= data_fim)
+        query = query.where(Transaction.data_transacao <= data_fim)
 
     # Get total count
-    total = query.count()
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
 
     # Get paginated results with all filters applied - Fixed AttributeError
-    filtered_query = query.order_by(Transaction.data_transacao.desc())
-    transactions = filtered_query.offset(skip).limit(size).all()
+    filtered_query = query.options(selectinload(Transaction.categoria)).order_by(
+        Transaction.data_transacao.desc()
+    )
+    result = await db.execute(filtered_query.offset(skip).limit(size))
+    transactions = result.scalars().all()
 
     # Calculate pagination info
     pages = math.ceil(total / size) if total > 0 else 1
@@ -84,12 +90,12 @@ async def list_transactions(
 async def get_transaction_stats(
     data_inicio: Optional[date] = Query(None, description="Data inicial"),
     data_fim: Optional[date] = Query(None, description="Data final"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     """Obter estatísticas das transações do usuário."""
 
-    stats = transaction.get_summary_by_user(
+    stats = await transaction.get_summary_by_user_async(
         db=db, usuario_id=current_user.id, data_inicio=data_inicio, data_fim=data_fim
     )
 
@@ -100,12 +106,12 @@ async def get_transaction_stats(
 async def get_categories_summary(
     data_inicio: Optional[date] = Query(None, description="Data inicial"),
     data_fim: Optional[date] = Query(None, description="Data final"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     """Obter resumo por categorias."""
 
-    summary = transaction.get_by_category_summary(
+    summary = await transaction.get_by_category_summary_async(
         db=db, usuario_id=current_user.id, data_inicio=data_inicio, data_fim=data_fim
     )
 
@@ -115,12 +121,12 @@ async def get_categories_summary(
 @router.get("/{transaction_id}", response_model=TransactionWithCategory)
 async def get_transaction(
     transaction_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     """Obter uma transação específica."""
 
-    db_transaction = transaction.get(db=db, id=transaction_id)
+    db_transaction = await transaction.get_with_category_async(db=db, id=transaction_id)
 
     if not db_transaction:
         raise HTTPException(
@@ -145,8 +151,8 @@ async def get_transaction(
 )
 async def create_transaction(
     transaction_in: TransactionBase,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     """
     Criar nova transação.
@@ -154,13 +160,6 @@ async def create_transaction(
     Requer: Feature 'transactions_enabled' no plano
     Limite: max_transactions_per_month
     """
-    # Verificar limite de transações do plano
-    can_create, error_msg = usage_service.check_can_create(
-        db, current_user, "transaction"
-    )
-    if not can_create:
-        raise HTTPException(status_code=HTTP_402_PAYMENT_REQUIRED, detail=error_msg)
-
     # Definir o usuário da transação
     transaction_in = TransactionCreate(
         mensagem_original=transaction_in.mensagem_original,
@@ -175,17 +174,24 @@ async def create_transaction(
 
     # Validar categoria se fornecida
     if transaction_in.categoria_id:
-        from app.crud import category
-
-        db_category = category.get(db=db, id=transaction_in.categoria_id)
+        catalog = await category_catalog.get_async(db)
+        db_category = catalog.get(transaction_in.categoria_id)
         if not db_category:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Categoria não encontrada",
             )
 
+    # Reservar uma transação do limite mensal do plano (atômico; a criação
+    # abaixo faz o commit da reserva)
+    can_create, error_msg = await db.run_sync(
+        usage_service.reserve_quota, current_user, "transaction"
+    )
+    if not can_create:
+        raise HTTPException(status_code=HTTP_402_PAYMENT_REQUIRED, detail=error_msg)
+
     # Criar transação com atualização de orçamento
-    db_transaction, alert_info = transaction.create_with_budget_update(
+    db_transaction, alert_info = await transaction.create_with_budget_update_async(
         db=db, obj_in=transaction_in
     )
 
@@ -201,13 +207,13 @@ async def create_transaction(
 async def update_transaction(
     transaction_id: UUID,
     transaction_in: TransactionUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     """Atualizar transação existente."""
 
     # Buscar transação
-    db_transaction = transaction.get(db=db, id=transaction_id)
+    db_transaction = await transaction.get_with_category_async(db=db, id=transaction_id)
 
     if not db_transaction:
         raise HTTPException(
@@ -223,9 +229,8 @@ async def update_transaction(
 
     # Validar categoria se fornecida
     if transaction_in.categoria_id:
-        from app.crud import category
-
-        db_category = category.get(db=db, id=transaction_in.categoria_id)
+        catalog = await category_catalog.get_async(db)
+        db_category = catalog.get(transaction_in.categoria_id)
         if not db_category:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -233,9 +238,10 @@ async def update_transaction(
             )
 
     # Atualizar transação
-    updated_transaction = transaction.update(
+    updated_transaction = await transaction.update_async(
         db=db, db_obj=db_transaction, obj_in=transaction_in
     )
+    await db.refresh(updated_transaction, attribute_names=["categoria"])
 
     return updated_transaction
 
@@ -243,13 +249,13 @@ async def update_transaction(
 @router.delete("/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_transaction(
     transaction_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     """Deletar transação."""
 
     # Buscar transação
-    db_transaction = transaction.get(db=db, id=transaction_id)
+    db_transaction = await transaction.get_async(db=db, id=transaction_id)
 
     if not db_transaction:
         raise HTTPException(
@@ -264,6 +270,6 @@ async def delete_transaction(
         )
 
     # Deletar transação
-    transaction.remove(db=db, id=transaction_id)
+    await transaction.remove_async(db=db, id=transaction_id)
 
     return None
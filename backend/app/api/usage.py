@@ -8,8 +8,8 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
 from app.core.auth import get_current_user
+from app.core.auth_cache import UserSnapshot
 from app.core.database import get_db
-from app.models.user import User
 from app.services.usage_service import usage_service
 
 router = APIRouter()
@@ -17,7 +17,7 @@ router = APIRouter()
 
 @router.get("/summary", response_model=Dict)
 async def get_usage_summary(
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -40,7 +40,7 @@ async def get_usage_summary(
 @router.get("/check/{resource_type}")
 async def check_can_create_resource(
     resource_type: str,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -64,7 +64,7 @@ async def check_can_create_resource(
 
 @router.get("/features")
 async def get_plan_features(
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     """
     Obter lista de features disponíveis no plano atual do usuário.
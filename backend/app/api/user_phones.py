@@ -9,17 +9,18 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.core.auth import get_current_user
+from app.core.auth_cache import UserSnapshot
 from app.core.config import settings
 from app.core.database import get_db
 from app.core.plan_validation import HTTP_402_PAYMENT_REQUIRED
 from app.crud import user_phone as crud_user_phone
-from app.models.user import User
 from app.schemas.user_phone import (
     PhoneVerificationConfirm,
     UserPhoneCreate,
     UserPhoneListResponse,
     UserPhoneResponse,
 )
+from app.services.usage_service import usage_service
 
 router = APIRouter()
 
@@ -31,7 +32,7 @@ router = APIRouter()
 
 @router.get("/", response_model=UserPhoneListResponse)
 async def list_user_phones(
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """Listar todos os telefones do usuário atual."""
@@ -51,7 +52,7 @@ async def list_user_phones(
 
 @router.get("/primary", response_model=UserPhoneResponse)
 async def get_primary_phone(
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """Obter telefone principal do usuário."""
@@ -74,7 +75,7 @@ async def get_primary_phone(
 @router.post("/", response_model=UserPhoneResponse, status_code=status.HTTP_201_CREATED)
 async def add_phone(
     phone_data: UserPhoneCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -105,17 +106,14 @@ async def add_phone(
                 detail="Multiple phones require plan upgrade. Feature: multi_phone_enabled",
             )
 
-    # Verificar limite de telefones do plano
-    max_phones = (
-        current_user.plano.max_phones
-        if current_user.plano and current_user.plano.max_phones is not None
-        else 1
-    )
-    if phone_count >= max_phones:
-        raise HTTPException(
-            status_code=HTTP_402_PAYMENT_REQUIRED,
-            detail=f"Phone limit reached. Current: {phone_count}, Limit: {max_phones}. Please upgrade your plan.",
+    # Reservar um telefone do limite do plano (atômico; sem max_phones no
+    # plano o limite é 1). A criação abaixo faz o commit da reserva
+    if current_user.plano:
+        can_create, error_msg = usage_service.reserve_quota(
+            db, current_user, "phone", default_limit=1
         )
+        if not can_create:
+            raise HTTPException(status_code=HTTP_402_PAYMENT_REQUIRED, detail=error_msg)
 
     # Criar telefone
     phone = crud_user_phone.create_phone(
@@ -137,7 +135,7 @@ async def add_phone(
 @router.patch("/{phone_id}/set-primary", response_model=UserPhoneResponse)
 async def set_primary_phone(
     phone_id: UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -156,7 +154,7 @@ async def set_primary_phone(
 @router.patch("/{phone_id}/deactivate", response_model=UserPhoneResponse)
 async def deactivate_phone(
     phone_id: UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -176,7 +174,7 @@ async def deactivate_phone(
 @router.patch("/{phone_id}/activate", response_model=UserPhoneResponse)
 async def activate_phone(
     phone_id: UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """Reativar telefone desativado."""
@@ -203,7 +201,7 @@ async def activate_phone(
 @router.post("/{phone_id}/request-verification", status_code=status.HTTP_200_OK)
 async def request_phone_verification(
     phone_id: UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -276,7 +274,7 @@ async def request_phone_verification(
 async def verify_phone(
     phone_id: UUID,
     verification_data: PhoneVerificationConfirm,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -303,7 +301,7 @@ async def verify_phone(
 @router.delete("/{phone_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_phone(
     phone_id: UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
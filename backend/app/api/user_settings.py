@@ -2,9 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.core.auth import get_current_user
+from app.core.auth_cache import UserSnapshot
 from app.core.database import get_db
 from app.crud import user_settings
-from app.models.user import User
 from app.schemas.user_settings import (
     GoogleCalendarStatus,
     UserSettings,
@@ -16,7 +16,8 @@ router = APIRouter()
 
 @router.get("/", response_model=UserSettings)
 async def get_user_settings(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
     """
     Get user settings. Creates default settings if none exist.
@@ -28,7 +29,7 @@ async def get_user_settings(
 @router.put("/", response_model=UserSettings)
 async def update_user_settings(
     settings_update: UserSettingsUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -47,7 +48,8 @@ async def update_user_settings(
 
 @router.get("/google-calendar", response_model=GoogleCalendarStatus)
 async def get_google_calendar_status(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
     """
     Get Google Calendar integration status.
@@ -65,7 +67,8 @@ async def get_google_calendar_status(
 
 @router.post("/google-calendar/connect")
 async def connect_google_calendar(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
     """
     Initiate Google Calendar connection.
@@ -82,7 +85,8 @@ async def connect_google_calendar(
 
 @router.post("/google-calendar/disconnect")
 async def disconnect_google_calendar(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: Session = Depends(get_db),
 ):
     """
     Disconnect Google Calendar integration.
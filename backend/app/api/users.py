@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 from app.core.auth import (
     create_access_token,
     create_refresh_token,
+    get_current_db_user,
     get_current_user,
     refresh_access_token,
 )
@@ -328,7 +329,7 @@ async def get_current_user_profile(
 @router.put("/me", response_model=UserResponse)
 async def update_current_user(
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_db_user),
     db: Session = Depends(get_db),
 ):
     """Atualizar dados do usuário atual."""
@@ -364,7 +365,7 @@ async def update_current_user(
 @router.post("/change-password", response_model=dict)
 async def change_current_user_password(
     password_data: ChangePasswordRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_db_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -7,20 +7,24 @@ Security features:
 - Scope/permission validation
 - IP whitelisting support
 - Expiration checking
-- Usage tracking (last_used_at)
+- Usage tracking (last_used_at, request_count) - batched, off the request path
+- Verified key cache (bcrypt only on the first request within the TTL)
 - Dual authentication fallback (Bearer Token → API Key)
 """
 
 import logging
 from typing import Optional
+from uuid import UUID
 
 from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 
+from app.core.api_key_cache import VerifiedAPIKey, api_key_cache
+from app.core.api_key_usage import api_key_usage
+from app.core.auth_cache import UserSnapshot, user_snapshot_cache
 from app.core.database import get_db
 from app.models.api_key import APIKey
-from app.models.user import User
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -29,34 +33,24 @@ logger = logging.getLogger(__name__)
 security = HTTPBearer(auto_error=False)
 
 
-def get_user_from_api_key(
-    x_api_key: Optional[str] = Header(None),
-    request: Request = None,
-    db: Session = Depends(get_db),
-) -> Optional[User]:
+def verify_api_key(
+    x_api_key: str, request: Optional[Request], db: Session
+) -> VerifiedAPIKey:
     """
-    Authenticate user via API Key from X-API-Key header.
+    Verify an API key (steps 1-7 of get_user_from_api_key).
 
-    Flow:
-    1. Extract key from X-API-Key header
-    2. Lookup by key_prefix (first 8 chars) for performance
-    3. Verify full key hash with bcrypt
-    4. Check if key is valid (active + not expired)
-    5. Check IP whitelist if configured
-    6. Update last_used_at timestamp
-    7. Return associated User
-
-    Returns:
-        User: Authenticated user if API key is valid
-        None: If no API key provided or authentication fails
+    The result is memoized on request.state, so the rate limiter and the
+    authentication dependency verify (and count) the key once per request.
 
     Raises:
         HTTPException 401: If API key is invalid/expired
         HTTPException 403: If IP not allowed
     """
 
-    if not x_api_key:
-        return None
+    if request is not None:
+        memoized = getattr(request.state, "verified_api_key", None)
+        if memoized and memoized[0] == x_api_key:
+            return memoized[1]
 
     # Validate key format (should be "zpg_" + 48 hex chars)
     if not x_api_key.startswith("zpg_") or len(x_api_key) != 52:
@@ -70,7 +64,13 @@ def get_user_from_api_key(
     # Extract prefix for database lookup (performance optimization)
     key_prefix = x_api_key[:8]  # "zpg_1a2b"
 
-    try:
+    # Repeat requests skip the DB lookup and bcrypt (verified key cache)
+    verified = api_key_cache.get(x_api_key)
+    cache_hit = verified is not None
+
+    if not cache_hit:
+        generation = api_key_cache.generation
+
         # Find API key by prefix
         api_key = (
             db.query(APIKey)
@@ -98,37 +98,80 @@ def get_user_from_api_key(
                 headers={"WWW-Authenticate": "ApiKey"},
             )
 
-        # Check if key is valid (active + not expired)
-        if not api_key.is_valid():
-            logger.warning(f"[API_KEY_AUTH] API key expired or inactive: {key_prefix}")
+        verified = VerifiedAPIKey.from_model(api_key)
+
+    # Check if key is valid (active + not expired)
+    if not verified.is_valid():
+        logger.warning(f"[API_KEY_AUTH] API key expired or inactive: {key_prefix}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="API key expired or deactivated",
+            headers={"WWW-Authenticate": "ApiKey"},
+        )
+
+    # Check IP whitelist if configured
+    if request:
+        client_ip = request.client.host if request.client else None
+        if client_ip and not verified.is_ip_allowed(client_ip):
+            logger.warning(
+                f"[API_KEY_AUTH] IP not allowed for key {key_prefix}: {client_ip}"
+            )
             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="API key expired or deactivated",
-                headers={"WWW-Authenticate": "ApiKey"},
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="API key not allowed from this IP address",
             )
 
-        # Check IP whitelist if configured
-        if request:
-            client_ip = request.client.host if request.client else None
-            if client_ip and not api_key.is_ip_allowed(client_ip):
-                logger.warning(
-                    f"[API_KEY_AUTH] IP not allowed for key {key_prefix}: {client_ip}"
-                )
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="API key not allowed from this IP address",
-                )
+    if not cache_hit:
+        api_key_cache.set(x_api_key, verified, generation)
+
+    # Track usage in memory (last_used_at/request_count flushed in batches)
+    api_key_usage.touch(verified.id)
+
+    if request is not None:
+        request.state.verified_api_key = (x_api_key, verified)
+
+    return verified
+
+
+def get_user_from_api_key(
+    x_api_key: Optional[str] = Header(None),
+    request: Request = None,
+    db: Session = Depends(get_db),
+) -> Optional[UserSnapshot]:
+    """
+    Authenticate user via API Key from X-API-Key header.
+
+    Flow:
+    1. Extract key from X-API-Key header
+    2. Look up the verified key cache (HMAC of the key); on a hit skip 3-4
+    3. Lookup by key_prefix (first 8 chars) for performance
+    4. Verify full key hash with bcrypt
+    5. Check if key is valid (active + not expired)
+    6. Check IP whitelist if configured
+    7. Cache the verified key and record usage (flushed in batches)
+    8. Return associated User
+
+    Returns:
+        User: Authenticated user if API key is valid
+        None: If no API key provided or authentication fails
+
+    Raises:
+        HTTPException 401: If API key is invalid/expired
+        HTTPException 403: If IP not allowed
+    """
 
-        # Update last_used_at timestamp
-        api_key.update_last_used()
-        db.commit()
+    if not x_api_key:
+        return None
+
+    try:
+        verified = verify_api_key(x_api_key, request, db)
 
-        # Get associated user
-        user = db.query(User).filter(User.id == api_key.user_id).first()
+        # Get associated user (snapshot cache)
+        user = user_snapshot_cache.get_or_load(db, verified.user_id)
 
         if not user:
             logger.error(
-                f"[API_KEY_AUTH] User not found for API key: {api_key.user_id}"
+                f"[API_KEY_AUTH] User not found for API key: {verified.user_id}"
             )
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -145,7 +188,7 @@ def get_user_from_api_key(
             )
 
         logger.info(
-            f"[API_KEY_AUTH] Successfully authenticated user {user.id} via API key {key_prefix}"
+            f"[API_KEY_AUTH] Successfully authenticated user {user.id} via API key {verified.key_prefix}"
         )
         return user
 
@@ -161,8 +204,8 @@ def get_user_from_api_key(
 
 
 def require_api_key(
-    user: Optional[User] = Depends(get_user_from_api_key),
-) -> User:
+    user: Optional[UserSnapshot] = Depends(get_user_from_api_key),
+) -> UserSnapshot:
     """
     Require API Key authentication (raises 401 if not provided).
 
@@ -191,7 +234,7 @@ def get_current_user_flexible(
     x_api_key: Optional[str] = Header(None),
     request: Request = None,
     db: Session = Depends(get_db),
-) -> User:
+) -> UserSnapshot:
     """
     Dual authentication: Accept EITHER Bearer Token OR API Key.
 
@@ -220,7 +263,6 @@ def get_current_user_flexible(
 
     # Import here to avoid circular dependency
     from app.core.auth import verify_token
-    from app.models.user import User
 
     user = None
 
@@ -236,8 +278,8 @@ def get_current_user_flexible(
                     detail="Invalid token",
                 )
 
-            # Get user from database directly
-            user = db.query(User).filter(User.id == subject).first()
+            # Get user snapshot (cache, or one query with plan and phones)
+            user = user_snapshot_cache.get_or_load(db, UUID(subject))
 
             if not user:
                 raise HTTPException(
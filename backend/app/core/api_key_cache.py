@@ -0,0 +1,144 @@
+"""
+Verified API key cache.
+
+A verificação bcrypt de uma API key custa dezenas de ms de CPU e o n8n faz
+várias chamadas por mensagem. Depois da primeira verificação, os dados da key
+(id, usuário, scopes, expiração, IPs permitidos) ficam em cache por alguns
+segundos, indexados por um HMAC-SHA256 da key apresentada: a key em texto
+puro nunca é guardada.
+
+Revogar, desativar, alterar scopes/IPs ou apagar uma key via ORM invalida o
+cache no commit; o TTL curto limita a defasagem entre workers.
+"""
+
+import hashlib
+import hmac
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import (
+    PendingInvalidation,
+    TTLCache,
+    has_changes,
+    register_commit_invalidation,
+)
+from app.core.config import settings
+from app.models.api_key import APIKey
+
+# Campos que não afetam a autenticação (atualizados a cada uso)
+_API_KEY_IGNORED_FIELDS = ("last_used_at", "request_count", "updated_at")
+
+
+@dataclass(frozen=True)
+class VerifiedAPIKey:
+    """Dados de uma API key já verificada (somente leitura)."""
+
+    id: UUID
+    user_id: UUID
+    key_prefix: str
+    scopes: Tuple[str, ...]
+    expires_at: Optional[datetime]
+    allowed_ips: Optional[Tuple[str, ...]]
+    rate_limit: Optional[int]
+
+    @classmethod
+    def from_model(cls, api_key: APIKey) -> "VerifiedAPIKey":
+        return cls(
+            id=api_key.id,
+            user_id=api_key.user_id,
+            key_prefix=api_key.key_prefix,
+            scopes=tuple(api_key.scopes or ()),
+            expires_at=api_key.expires_at,
+            allowed_ips=tuple(api_key.allowed_ips) if api_key.allowed_ips else None,
+            rate_limit=api_key.rate_limit,
+        )
+
+    def is_valid(self) -> bool:
+        """Não expirada (keys inativas nunca entram no cache)."""
+        if self.expires_at:
+            return datetime.now(timezone.utc) < self.expires_at
+        return True
+
+    def is_ip_allowed(self, ip_address: str) -> bool:
+        return not self.allowed_ips or ip_address in self.allowed_ips
+
+    def has_scope(self, scope: str) -> bool:
+        return scope in self.scopes
+
+
+class APIKeyCache:
+    """
+    Cache de API keys verificadas, por HMAC-SHA256 da key apresentada.
+
+    Uma verificação iniciada antes de uma revogação não é instalada no cache
+    (geração do TTLCache).
+    """
+
+    def __init__(self, secret: str, maxsize: int, ttl: float):
+        self._secret = secret.encode()
+        self._cache: TTLCache[VerifiedAPIKey] = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def fingerprint(self, plain_key: str) -> str:
+        return hmac.new(self._secret, plain_key.encode(), hashlib.sha256).hexdigest()
+
+    @property
+    def generation(self) -> int:
+        return self._cache.generation
+
+    def get(self, plain_key: str) -> Optional[VerifiedAPIKey]:
+        return self._cache.get(self.fingerprint(plain_key))
+
+    def set(self, plain_key: str, verified: VerifiedAPIKey, generation: int) -> None:
+        """Guarda a key verificada, se nada foi invalidado desde `generation`."""
+        self._cache.set(self.fingerprint(plain_key), verified, generation=generation)
+
+    # ========================================================================
+    # Invalidation
+    # ========================================================================
+
+    def invalidate_keys(self, api_key_ids) -> None:
+        ids = set(api_key_ids)
+        self._cache.remove_where(lambda _key, verified: verified.id in ids)
+
+    def invalidate_all(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+api_key_cache = APIKeyCache(
+    secret=settings.SECRET_KEY,
+    maxsize=settings.API_KEY_CACHE_MAX_SIZE,
+    ttl=settings.API_KEY_CACHE_TTL_SECONDS,
+)
+
+
+# ============================================================================
+# Cache Invalidation (ORM events)
+# ============================================================================
+
+
+def _collect_api_key_changes(
+    session: Session, api_key: APIKey, pending: PendingInvalidation
+) -> None:
+    # Uma key nova ainda não está no cache
+    if api_key in session.new:
+        return
+    if api_key in session.deleted or has_changes(
+        api_key, exclude=_API_KEY_IGNORED_FIELDS
+    ):
+        pending.ids.add(api_key.id)
+
+
+register_commit_invalidation(
+    "api_key_cache_pending",
+    models=(APIKey,),
+    collect=_collect_api_key_changes,
+    invalidate=api_key_cache.invalidate_keys,
+    invalidate_all=api_key_cache.invalidate_all,
+)
@@ -0,0 +1,139 @@
+"""
+Batched API key usage tracking.
+
+Cada requisição autenticada por API key só registra o uso em memória
+(contagem + último acesso por key). Um flusher em background grava tudo em um
+único UPDATE a cada API_KEY_USAGE_FLUSH_INTERVAL_SECONDS e no shutdown, sem
+transação de escrita no caminho da autenticação nem disputa de lock na linha
+da key de sistema do n8n.
+"""
+
+import asyncio
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import DateTime, Integer, column, func, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.api_key import APIKey
+
+logger = logging.getLogger(__name__)
+
+# (requisições, último uso) acumulados por key desde o último flush
+Usage = Tuple[int, datetime]
+
+
+class APIKeyUsageTracker:
+    """Acumula o uso por key em memória e grava em lote."""
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self._pending: Dict[UUID, Usage] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def touch(self, api_key_id: UUID, used_at: Optional[datetime] = None) -> None:
+        """Registra um uso da key (O(1), sem acesso ao banco)."""
+        used_at = used_at or datetime.now(timezone.utc)
+        with self._lock:
+            count, last_used_at = self._pending.get(api_key_id, (0, used_at))
+            self._pending[api_key_id] = (count + 1, max(last_used_at, used_at))
+
+    def pending(self, api_key_ids: Iterable[UUID]) -> Dict[UUID, Usage]:
+        """Uso ainda não gravado (deste processo) para as keys informadas."""
+        with self._lock:
+            return {
+                key_id: self._pending[key_id]
+                for key_id in api_key_ids
+                if key_id in self._pending
+            }
+
+    def _merge_back(self, batch: Dict[UUID, Usage]) -> None:
+        with self._lock:
+            for key_id, (count, last_used_at) in batch.items():
+                pending_count, pending_last = self._pending.get(
+                    key_id, (0, last_used_at)
+                )
+                self._pending[key_id] = (
+                    pending_count + count,
+                    max(pending_last, last_used_at),
+                )
+
+    def flush(self) -> int:
+        """
+        Grava o uso acumulado em um único UPDATE ... FROM (VALUES ...).
+
+        Se a escrita falhar, o lote volta para a fila e é tentado no próximo
+        flush. Returns: número de keys atualizadas.
+        """
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+
+        usage = values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("requests", Integer),
+            column("last_used_at", DateTime(timezone=True)),
+            name="usage",
+        ).data([(key_id, count, last) for key_id, (count, last) in batch.items()])
+
+        api_keys = APIKey.__table__
+        statement = (
+            update(api_keys)
+            .where(api_keys.c.id == usage.c.id)
+            .values(
+                request_count=api_keys.c.request_count + usage.c.requests,
+                last_used_at=func.greatest(
+                    func.coalesce(api_keys.c.last_used_at, usage.c.last_used_at),
+                    usage.c.last_used_at,
+                ),
+            )
+        )
+
+        try:
+            # Core, fora da Session: não dispara a invalidação do cache de keys
+            with engine.begin() as connection:
+                connection.execute(statement)
+        except Exception:
+            logger.exception("[API_KEY_USAGE] Failed to flush usage; will retry")
+            self._merge_back(batch)
+            return 0
+
+        return len(batch)
+
+    # ========================================================================
+    # Background flusher
+    # ========================================================================
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await run_in_threadpool(self.flush)
+
+    def start(self) -> None:
+        """Inicia o flusher periódico (chamado no startup da aplicação)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Para o flusher e grava o que estiver pendente (shutdown)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await run_in_threadpool(self.flush)
+
+
+api_key_usage = APIKeyUsageTracker(
+    flush_interval=settings.API_KEY_USAGE_FLUSH_INTERVAL_SECONDS
+)
@@ -9,6 +9,12 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 
+from app.core.auth_cache import (
+    TokenClaims,
+    UserSnapshot,
+    token_claims_cache,
+    user_snapshot_cache,
+)
 from app.core.config import settings
 from app.core.database import get_db
 from app.models.user import User
@@ -56,33 +62,47 @@ def create_refresh_token(
     return encoded_jwt
 
 
+def decode_token(token: str) -> TokenClaims:
+    """
+    Decode JWT token and verify its signature.
+
+    Decoded claims are cached by token signature, so repeat requests with the
+    same token skip the HMAC verification and JSON decoding.
+
+    Raises:
+        JWTError: If the token is malformed, tampered with or expired
+    """
+    claims = token_claims_cache.get(token)
+    if claims is None:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+        claims = TokenClaims(
+            sub=payload.get("sub"), type=payload.get("type"), exp=payload.get("exp")
+        )
+        token_claims_cache.set(token, claims)
+    return claims
+
+
 def verify_token(token: str, token_type: str = "access") -> Optional[str]:
     """Verify JWT token and return subject if valid."""
 
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-
-        token_sub: str = payload.get("sub")
-        token_exp: datetime = payload.get("exp")
-        token_type_claim: str = payload.get("type")
+        claims = decode_token(token)
 
-        if token_sub is None:
+        if claims.sub is None:
             logger.warning("[AUTH] Token verification failed: subject is None")
             return None
 
-        if token_type_claim != token_type:
+        if claims.type != token_type:
             logger.warning(
-                f"[AUTH] Token verification failed: type mismatch. Expected: {token_type}, Got: {token_type_claim}"
+                f"[AUTH] Token verification failed: type mismatch. Expected: {token_type}, Got: {claims.type}"
             )
             return None
 
-        current_timestamp = datetime.now(timezone.utc).timestamp()
-
-        if token_exp is None or current_timestamp > token_exp:
+        if claims.is_expired():
             logger.warning("[AUTH] Token verification failed: token expired")
             return None
 
-        return token_sub
+        return claims.sub
     except JWTError as e:
         logger.error(f"[AUTH] JWTError in verify_token: {str(e)}")
         return None
@@ -94,8 +114,14 @@ def verify_token(token: str, token_type: str = "access") -> Optional[str]:
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db),
-) -> User:
-    """Get current authenticated user."""
+) -> UserSnapshot:
+    """
+    Get current authenticated user.
+
+    Returns a read-only UserSnapshot (user status, plan features and limits)
+    from the snapshot cache: with a warm cache authentication needs no query.
+    Endpoints that modify the user should depend on get_current_db_user.
+    """
 
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -119,10 +145,10 @@ def get_current_user(
         logger.error(f"[AUTH] Unexpected error during token verification: {str(e)}")
         raise credentials_exception
 
-    # Get user from database
+    # Get user snapshot (cache, or one query with plan and phones)
     try:
         user_uuid = UUID(subject)
-        user = db.query(User).filter(User.id == user_uuid).first()
+        user = user_snapshot_cache.get_or_load(db, user_uuid)
 
     except ValueError as e:
         logger.error(f"[AUTH] ValueError converting subject to UUID: {str(e)}")
@@ -152,14 +178,27 @@ def get_current_user(
             detail="Account is locked due to too many failed login attempts",
         )
 
-    # Update last activity timestamp (optional)
-    user.last_login_at = datetime.now(timezone.utc)
-    db.commit()
+    return user
 
+
+def get_current_db_user(
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> User:
+    """Get current authenticated user as a model attached to the session."""
+    user = db.query(User).filter(User.id == current_user.id).first()
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
 
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+def get_current_active_user(
+    current_user: UserSnapshot = Depends(get_current_user),
+) -> UserSnapshot:
     """Get current active user."""
     if not current_user.is_active:
         raise HTTPException(
@@ -171,7 +210,7 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
 def get_optional_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     db: Session = Depends(get_db),
-) -> Optional[User]:
+) -> Optional[UserSnapshot]:
     """Get current user if authenticated, None otherwise."""
     if not credentials:
         return None
@@ -185,7 +224,7 @@ def get_optional_user(
 
         try:
             user_uuid = UUID(subject)
-            user = db.query(User).filter(User.id == user_uuid).first()
+            user = user_snapshot_cache.get_or_load(db, user_uuid)
         except ValueError:
             return None
 
@@ -0,0 +1,258 @@
+"""
+Authentication fast path caches.
+
+- Claims: tokens JWT já decodificados (HMAC verificado uma vez), indexados pela
+  assinatura; a expiração continua sendo checada a cada uso.
+- User snapshot: dados do usuário usados na autenticação e nas checagens de
+  plano (status, features, limites, telefones), somente leitura, com TTL curto.
+
+Com os dois quentes, autenticar e checar features não acessa o banco.
+Alterações em User, Plan ou UserPhone via ORM invalidam os snapshots no commit;
+o TTL curto limita a defasagem entre workers.
+"""
+
+import hmac
+import time
+from dataclasses import dataclass, fields
+from decimal import Decimal
+from typing import Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.cache import (
+    PendingInvalidation,
+    TTLCache,
+    has_changes,
+    register_commit_invalidation,
+)
+from app.core.config import settings
+from app.models.plan import Plan
+from app.models.user import User
+from app.models.user_phone import UserPhone
+
+# Campos do User copiados no snapshot; mudanças em outros (ex: last_login_at)
+# não invalidam o cache
+_USER_SNAPSHOT_FIELDS = (
+    "nome",
+    "email",
+    "is_active",
+    "is_verified",
+    "email_verified",
+    "failed_login_attempts",
+    "plano_id",
+)
+
+
+# ============================================================================
+# Token claims
+# ============================================================================
+
+
+@dataclass(frozen=True)
+class TokenClaims:
+    """Claims de um token JWT com assinatura já verificada."""
+
+    sub: Optional[str]
+    type: Optional[str]
+    exp: Optional[int]
+
+    def is_expired(self) -> bool:
+        return self.exp is None or time.time() > self.exp
+
+
+class TokenClaimsCache:
+    """
+    Claims decodificados, pela assinatura do token.
+
+    A entrada guarda o token inteiro: um token forjado com a assinatura de
+    outro não reaproveita os claims do original.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache: TTLCache[Tuple[str, TokenClaims]] = TTLCache(
+            maxsize=maxsize, ttl=ttl
+        )
+
+    @staticmethod
+    def _signature(token: str) -> str:
+        return token.rsplit(".", 1)[-1]
+
+    def get(self, token: str) -> Optional[TokenClaims]:
+        entry = self._cache.get(self._signature(token))
+        if entry is None or not hmac.compare_digest(entry[0], token):
+            return None
+        return entry[1]
+
+    def set(self, token: str, claims: TokenClaims) -> None:
+        # Não guarda além da expiração do próprio token
+        ttl = min(self._cache.ttl, max(0.0, (claims.exp or 0) - time.time()))
+        if ttl > 0:
+            self._cache.set(self._signature(token), (token, claims), ttl=ttl)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+token_claims_cache = TokenClaimsCache(
+    maxsize=settings.TOKEN_CLAIMS_CACHE_MAX_SIZE,
+    ttl=settings.TOKEN_CLAIMS_CACHE_TTL_SECONDS,
+)
+
+
+# ============================================================================
+# User snapshots
+# ============================================================================
+
+
+@dataclass(frozen=True)
+class PlanSnapshot:
+    """Features e limites do plano (mesma interface de leitura do model Plan)."""
+
+    id: int
+    nome: str
+    valor_mensal: Decimal
+    valor_anual: Decimal
+    description: Optional[str]
+    color: Optional[str]
+
+    transactions_enabled: bool
+    budgets_enabled: bool
+    commitments_enabled: bool
+    reports_advanced: bool
+    google_calendar_sync: bool
+    multi_phone_enabled: bool
+    api_access: bool
+    priority_support: bool
+
+    max_transactions_per_month: Optional[int]
+    max_budgets: Optional[int]
+    max_commitments: Optional[int]
+    max_categories: Optional[int]
+    max_phones: Optional[int]
+    data_retention_months: int
+    api_rate_limit: Optional[int]
+
+    @classmethod
+    def from_model(cls, plan: Plan) -> "PlanSnapshot":
+        return cls(**{f.name: getattr(plan, f.name) for f in fields(cls)})
+
+    has_feature = Plan.has_feature
+    get_limit = Plan.get_limit
+    is_within_limit = Plan.is_within_limit
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """
+    Usuário autenticado (somente leitura).
+
+    Retornado pelas dependências de autenticação; endpoints que alteram o
+    usuário carregam o model com get_current_db_user.
+    """
+
+    id: UUID
+    nome: Optional[str]
+    email: Optional[str]
+    is_active: bool
+    is_verified: bool
+    email_verified: bool
+    failed_login_attempts: int
+    plano_id: Optional[int]
+    plano: Optional[PlanSnapshot]
+    primary_phone: Optional[str]
+    phone_numbers: Tuple[str, ...]
+
+    @classmethod
+    def from_model(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            nome=user.nome,
+            email=user.email,
+            is_active=user.is_active,
+            is_verified=user.is_verified,
+            email_verified=user.email_verified,
+            failed_login_attempts=user.failed_login_attempts or 0,
+            plano_id=user.plano_id,
+            plano=PlanSnapshot.from_model(user.plano) if user.plano else None,
+            primary_phone=user.primary_phone,
+            phone_numbers=tuple(p.phone_number for p in user.phones if p.is_active),
+        )
+
+
+class UserSnapshotCache:
+    """
+    Snapshots de usuário por id.
+
+    Um snapshot carregado antes de uma invalidação não é instalado no cache
+    (geração do TTLCache).
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache: TTLCache[UserSnapshot] = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get_or_load(self, db: Session, user_id: UUID) -> Optional[UserSnapshot]:
+        """Snapshot do cache ou do banco (uma query: usuário + plano + telefones)."""
+        snapshot = self._cache.get(str(user_id))
+        if snapshot is not None:
+            return snapshot
+
+        generation = self._cache.generation
+        user = (
+            db.query(User)
+            .options(joinedload(User.plano), joinedload(User.phones))
+            .filter(User.id == user_id)
+            .first()
+        )
+        if user is None:
+            return None
+
+        snapshot = UserSnapshot.from_model(user)
+        self._cache.set(str(user_id), snapshot, generation=generation)
+        return snapshot
+
+    # ========================================================================
+    # Invalidation
+    # ========================================================================
+
+    def invalidate_users(self, user_ids) -> None:
+        for user_id in user_ids:
+            self._cache.pop(str(user_id))
+
+    def invalidate_all(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+user_snapshot_cache = UserSnapshotCache(
+    maxsize=settings.USER_SNAPSHOT_CACHE_MAX_SIZE,
+    ttl=settings.USER_SNAPSHOT_CACHE_TTL_SECONDS,
+)
+
+
+# ============================================================================
+# Cache Invalidation (ORM events)
+# ============================================================================
+
+
+def _collect_user_snapshot_changes(
+    session: Session, obj, pending: PendingInvalidation
+) -> None:
+    if isinstance(obj, UserPhone):
+        pending.ids.add(obj.user_id)
+    elif isinstance(obj, User):
+        if obj in session.deleted or has_changes(obj, _USER_SNAPSHOT_FIELDS):
+            pending.ids.add(obj.id)
+    else:  # Plan: afeta todos os usuários do plano
+        pending.all = True
+
+
+register_commit_invalidation(
+    "user_snapshot_cache_pending",
+    models=(User, UserPhone, Plan),
+    collect=_collect_user_snapshot_changes,
+    invalidate=user_snapshot_cache.invalidate_users,
+    invalidate_all=user_snapshot_cache.invalidate_all,
+)
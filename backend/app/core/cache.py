@@ -0,0 +1,197 @@
+"""
+In-process TTL/LRU cache.
+
+Usado para dados quentes e pequenos (identidade do usuário, catálogos) que
+podem ficar alguns segundos desatualizados entre workers. Cada processo tem
+sua própria cópia; invalidações são locais ao processo.
+
+register_commit_invalidation liga um cache aos eventos do ORM: o que muda em
+uma sessão só é invalidado no commit (e descartado no rollback).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """
+    Cache LRU com expiração por TTL (thread-safe).
+
+    Cada invalidação (pop, remove_where, clear) incrementa a geração: quem lê
+    a geração antes de carregar um valor do banco e a passa para set() não
+    instala um valor carregado antes de uma alteração.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(
+        self,
+        key: Hashable,
+        value: V,
+        ttl: Optional[float] = None,
+        generation: Optional[int] = None,
+    ) -> None:
+        """Guarda o valor (com generation, só se nada foi invalidado desde ela)."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            self._generation += 1
+            item = self._data.pop(key, None)
+            return item[1] if item else None
+
+    def remove_where(self, predicate: Callable[[Hashable, V], bool]) -> int:
+        """Remove as entradas para as quais predicate(key, value) é verdadeiro."""
+        with self._lock:
+            self._generation += 1
+            keys = [k for k, (_, v) in self._data.items() if predicate(k, v)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# ============================================================================
+# Cache Invalidation (ORM events)
+# ============================================================================
+
+
+@dataclass
+class PendingInvalidation:
+    """Invalidações de um cache acumuladas na sessão até o commit."""
+
+    ids: Set[Hashable] = field(default_factory=set)
+    all: bool = False
+
+
+def has_changes(
+    obj: Any, fields: Optional[Iterable[str]] = None, exclude: Iterable[str] = ()
+) -> bool:
+    """Algum atributo de obj (os de fields, ou todos menos exclude) mudou."""
+    state = inspect(obj)
+    keys = state.attrs.keys() if fields is None else fields
+    return any(
+        state.attrs[key].history.has_changes() for key in keys if key not in exclude
+    )
+
+
+def register_commit_invalidation(
+    name: str,
+    *,
+    models: Tuple[type, ...],
+    collect: Callable[[Session, Any, PendingInvalidation], None],
+    invalidate: Callable[[Set[Hashable]], None],
+    invalidate_all: Callable[[], None],
+) -> None:
+    """
+    Invalida um cache no commit da sessão que alterou os dados.
+
+    Depois de cada flush, collect(session, obj, pending) é chamado para cada
+    objeto de models novo, alterado ou removido e anota os ids (ou all) em
+    pending. UPDATE/DELETE em massa de models não passam pelo flush e
+    invalidam tudo. No commit: invalidate(ids) ou invalidate_all(); no
+    rollback o pendente é descartado. name é a chave em session.info.
+    """
+
+    def pending(session: Session) -> PendingInvalidation:
+        return session.info.setdefault(name, PendingInvalidation())
+
+    def after_flush(session: Session, flush_context) -> None:
+        for obj in chain(session.new, session.dirty, session.deleted):
+            if isinstance(obj, models):
+                collect(session, obj, pending(session))
+
+    def do_orm_execute(orm_execute_state) -> None:
+        if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+            return
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and issubclass(mapper.class_, models):
+            pending(orm_execute_state.session).all = True
+
+    def after_commit(session: Session) -> None:
+        changes = session.info.pop(name, None)
+        if changes is None:
+            return
+        if changes.all:
+            invalidate_all()
+        elif changes.ids:
+            invalidate(changes.ids)
+
+    def after_rollback(session: Session) -> None:
+        session.info.pop(name, None)
+
+    event.listen(Session, "after_flush", after_flush)
+    event.listen(Session, "do_orm_execute", do_orm_execute)
+    event.listen(Session, "after_commit", after_commit)
+    event.listen(Session, "after_rollback", after_rollback)
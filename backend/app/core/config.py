@@ -7,6 +7,19 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
 
+    # Database connection pool
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # segundos esperando uma conexão livre
+    DB_POOL_RECYCLE: int = 1800  # segundos; evita conexões velhas após failover
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: Optional[int] = None  # None = sem limite
+
+    # Read replica (optional) - dashboard, reports and listings read from it
+    DATABASE_REPLICA_URL: Optional[str] = None
+    DB_REPLICA_MAX_LAG_SECONDS: float = 10.0  # acima disso lê do primário
+    DB_REPLICA_CHECK_INTERVAL_SECONDS: float = 5.0
+
     # Security & Authentication
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
@@ -14,9 +27,66 @@ class Settings(BaseSettings):
     EMAIL_VERIFICATION_EXPIRE_HOURS: int = 24
     PASSWORD_RESET_EXPIRE_HOURS: int = 1
 
+    # Auth fast path - per process, snapshots invalidated on ORM user/plan writes
+    TOKEN_CLAIMS_CACHE_TTL_SECONDS: float = 300.0  # nunca além do exp do token
+    TOKEN_CLAIMS_CACHE_MAX_SIZE: int = 10000
+    USER_SNAPSHOT_CACHE_TTL_SECONDS: float = 30.0
+    USER_SNAPSHOT_CACHE_MAX_SIZE: int = 10000
+
+    # Identity resolver cache (n8n user lookup by phone/lid) - per process
+    IDENTITY_CACHE_TTL_SECONDS: float = 60.0
+    IDENTITY_CACHE_MAX_SIZE: int = 10000
+
+    # Verified API key cache (skips bcrypt on repeat requests) - per process
+    API_KEY_CACHE_TTL_SECONDS: float = 30.0
+    API_KEY_CACHE_MAX_SIZE: int = 10000
+    API_KEY_USAGE_FLUSH_INTERVAL_SECONDS: float = 10.0  # last_used_at/request_count
+
+    # API rate limiting (token bucket) - n8n/integration endpoints
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" (per process) | "redis"
+    REDIS_URL: Optional[str] = None
+    API_RATE_LIMIT_DEFAULT: int = 120  # req/min: key/plan sem limite próprio
+    API_RATE_LIMIT_ANONYMOUS: int = 5  # req/min por IP, sem key nem token
+    API_RATE_LIMIT_PLAN_CACHE_TTL_SECONDS: float = 60.0
+    FAILED_LOGIN_STORE_MAX_SIZE: int = 100000  # IPs rastreados (backend memory)
+
+    # Per-user usage counters (plan limits) - maintained on ORM create/delete
+    USAGE_COUNTERS_ENABLED: bool = False  # rode rebuild_usage_counters.py antes
+
+    # Bulk transaction ingestion (n8n bulk-create / CSV/OFX import)
+    TRANSACTION_IMPORT_MAX_ROWS: int = 10000  # linhas por requisição/arquivo
+    TRANSACTION_IMPORT_MAX_FILE_BYTES: int = 5 * 1024 * 1024
+
+    # Background jobs (/sistema/* maintenance) - DB queue, per process worker
+    JOBS_ENABLED: bool = True  # False: só enfileira, outro processo executa
+    JOB_POLL_INTERVAL_SECONDS: float = 5.0
+    JOB_LEASE_SECONDS: float = 300.0  # renovado a cada trecho do job
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BASE_SECONDS: float = 60.0  # backoff: base * 2^(tentativa - 1)
+    JOB_CHUNK_SIZE: int = 1000  # orçamentos/compromissos por trecho
+    # Intervalo entre execuções agendadas (segundos; 0 = só sob demanda)
+    JOB_BUDGET_ROLLOVER_INTERVAL_SECONDS: float = 6 * 3600
+    JOB_BUDGET_RECALCULATION_INTERVAL_SECONDS: float = 24 * 3600
+    JOB_COMMITMENT_SYNC_INTERVAL_SECONDS: float = 15 * 60
+    JOB_API_KEY_CLEANUP_INTERVAL_SECONDS: float = 24 * 3600
+    JOB_BUDGET_ALERT_INTERVAL_SECONDS: float = 60  # só com o webhook configurado
+
+    # Category catalog cache - per process, invalidated on ORM category writes
+    CATEGORY_CACHE_TTL_SECONDS: float = 300.0
+
+    # Embedding category classifier (optional) - k-NN over labelled expressions
+    CATEGORY_CLASSIFIER_BACKEND: Optional[str] = None  # "pgvector" | "local"
+    CATEGORY_CLASSIFIER_EMBEDDER: str = "openai"  # "openai" | "hashing"
+    CATEGORY_CLASSIFIER_EMBEDDING_MODEL: str = "text-embedding-3-small"
+    CATEGORY_CLASSIFIER_INDEX_PATH: str = "data/expression_index.npz"  # local
+    CATEGORY_CLASSIFIER_K: int = 10
+
     # n8n Integration
     N8N_WEBHOOK_URL: Optional[str] = None
     N8N_PHONE_VERIFICATION_WEBHOOK_URL: Optional[str] = None
+    N8N_BUDGET_ALERT_WEBHOOK_URL: Optional[str] = None  # lotes de alertas
+    BUDGET_ALERT_BATCH_SIZE: int = 500  # alertas por chamada do webhook
+    BUDGET_ALERT_WEBHOOK_TIMEOUT_SECONDS: float = 30.0
 
     # CORS
     CORS_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
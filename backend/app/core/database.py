@@ -1,17 +1,187 @@
-from typing import Generator
+import logging
+import threading
+import time
+from typing import Any, AsyncGenerator, Dict, Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
 
 from .config import settings
+from .pool_metrics import (
+    TimedAsyncAdaptedQueuePool,
+    TimedQueuePool,
+    get_pool_status,
+)
 
-engine = create_engine(settings.DATABASE_URL)
+logger = logging.getLogger(__name__)
+
+
+def _async_database_url(url: str) -> str:
+    """Converte a DATABASE_URL (psycopg2) para o driver asyncpg."""
+    async_url = make_url(url).set(drivername="postgresql+asyncpg")
+    # asyncpg não entende "sslmode"; o equivalente é "ssl"
+    if "sslmode" in async_url.query:
+        query = dict(async_url.query)
+        query["ssl"] = query.pop("sslmode")
+        async_url = async_url.set(query=query)
+    return async_url.render_as_string(hide_password=False)
+
+
+def _pool_options(pool_name: str) -> Dict[str, Any]:
+    """Opções de pool compartilhadas pelos engines (configuradas via settings)."""
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_logging_name": pool_name,
+    }
+
+
+def _connect_args(async_driver: bool = False) -> Dict[str, Any]:
+    """statement_timeout padrão aplicado a cada nova conexão, se configurado."""
+    if not settings.DB_STATEMENT_TIMEOUT_MS:
+        return {}
+    timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+    if async_driver:
+        return {"server_settings": {"statement_timeout": timeout}}
+    return {"options": f"-c statement_timeout={timeout}"}
+
+
+engine = create_engine(
+    settings.DATABASE_URL,
+    poolclass=TimedQueuePool,
+    connect_args=_connect_args(),
+    **_pool_options("primary"),
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine (asyncpg) for async def routes - does not block the event loop
+async_engine = create_async_engine(
+    _async_database_url(settings.DATABASE_URL),
+    poolclass=TimedAsyncAdaptedQueuePool,
+    connect_args=_connect_args(async_driver=True),
+    **_pool_options("primary_async"),
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+# Read replica engines (optional) - used by get_read_db / get_async_read_db
+replica_engine = None
+ReadSessionLocal = None
+async_replica_engine = None
+AsyncReadSessionLocal = None
+
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_engine(
+        settings.DATABASE_REPLICA_URL,
+        poolclass=TimedQueuePool,
+        connect_args=_connect_args(),
+        **_pool_options("replica"),
+    )
+    ReadSessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, bind=replica_engine
+    )
+    async_replica_engine = create_async_engine(
+        _async_database_url(settings.DATABASE_REPLICA_URL),
+        poolclass=TimedAsyncAdaptedQueuePool,
+        connect_args=_connect_args(async_driver=True),
+        **_pool_options("replica_async"),
+    )
+    AsyncReadSessionLocal = async_sessionmaker(
+        bind=async_replica_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
 Base = declarative_base()
 
 
+# ============================================================================
+# Replica Lag Check
+# ============================================================================
+
+# Lag em segundos; 0 se a réplica já aplicou tudo que recebeu (ou não é standby)
+REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+_replica_state: Dict[str, Any] = {
+    "checked_at": 0.0,
+    "usable": False,
+    "lag": None,
+    "probing": False,
+}
+_replica_lock = threading.Lock()
+
+
+def _probe_replica() -> tuple:
+    """Mede o lag da réplica. Returns: (usable, lag)."""
+    try:
+        with replica_engine.connect() as connection:
+            lag = connection.execute(REPLICA_LAG_SQL).scalar()
+        lag = float(lag) if lag is not None else None
+        usable = lag is not None and lag <= settings.DB_REPLICA_MAX_LAG_SECONDS
+        if not usable:
+            logger.warning(
+                f"[DB_REPLICA] Replica lag {lag}s above limit - reading from primary"
+            )
+    except Exception as e:
+        lag = None
+        usable = False
+        logger.warning(f"[DB_REPLICA] Replica unavailable - reading from primary: {e}")
+    return usable, lag
+
+
+def replica_is_usable() -> bool:
+    """
+    Indica se a réplica pode atender leituras.
+
+    O lag é medido no máximo a cada DB_REPLICA_CHECK_INTERVAL_SECONDS; réplica
+    fora do ar ou atrasada mais que DB_REPLICA_MAX_LAG_SECONDS cai no primário.
+    Uma requisição mede, fora da trava; as demais usam o último resultado
+    enquanto isso (réplica travada não segura as leituras no timeout).
+    """
+    if replica_engine is None:
+        return False
+
+    with _replica_lock:
+        if _replica_state["probing"] or (
+            time.monotonic() - _replica_state["checked_at"]
+            < settings.DB_REPLICA_CHECK_INTERVAL_SECONDS
+        ):
+            return _replica_state["usable"]
+        _replica_state["probing"] = True
+
+    usable, lag = False, None
+    try:
+        usable, lag = _probe_replica()
+    finally:
+        with _replica_lock:
+            _replica_state.update(
+                {
+                    "checked_at": time.monotonic(),
+                    "usable": usable,
+                    "lag": lag,
+                    "probing": False,
+                }
+            )
+    return usable
+
+
 def get_db() -> Generator[Session, None, None]:
     """Dependency to get database session."""
     db = SessionLocal()
@@ -19,3 +189,62 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency to get async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    """
+    Dependency to get a read-only database session.
+
+    Usa a réplica quando configurada e em dia; caso contrário, o primário.
+    """
+    session_factory = ReadSessionLocal if replica_is_usable() else SessionLocal
+    db = session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Async version of get_read_db."""
+    use_replica = replica_engine is not None and await run_in_threadpool(
+        replica_is_usable
+    )
+    session_factory = AsyncReadSessionLocal if use_replica else AsyncSessionLocal
+    async with session_factory() as db:
+        yield db
+
+
+def set_statement_timeout(db: Session, timeout_ms: int) -> None:
+    """
+    Define o statement_timeout apenas para a transação atual da sessão.
+
+    Sobrescreve DB_STATEMENT_TIMEOUT_MS (ex: relatórios pesados ou webhooks que
+    precisam falhar rápido). Volta ao padrão no commit/rollback.
+    """
+    db.execute(text(f"SET LOCAL statement_timeout = {int(timeout_ms)}"))
+
+
+async def set_statement_timeout_async(db: AsyncSession, timeout_ms: int) -> None:
+    """Versão assíncrona de set_statement_timeout."""
+    await db.execute(text(f"SET LOCAL statement_timeout = {int(timeout_ms)}"))
+
+
+def get_pool_metrics() -> Dict[str, Dict[str, Any]]:
+    """Estado dos pools de conexão (checked-out, idle, overflow, espera)."""
+    metrics = {
+        "primary": get_pool_status(engine),
+        "primary_async": get_pool_status(async_engine.sync_engine),
+    }
+    if replica_engine is not None:
+        metrics["replica"] = get_pool_status(replica_engine)
+        metrics["replica_async"] = get_pool_status(async_replica_engine.sync_engine)
+        metrics["replica"]["lag_seconds"] = _replica_state["lag"]
+        metrics["replica"]["in_use"] = _replica_state["usable"]
+    return metrics
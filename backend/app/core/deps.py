@@ -1,10 +1,22 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from .database import get_db
+from .database import get_async_db, get_db, get_read_db
 
 
 # Database dependency
 def get_database() -> Generator[Session, None, None]:
     yield from get_db()
+
+
+# Read-only database dependency (replica when available)
+def get_read_database() -> Generator[Session, None, None]:
+    yield from get_read_db()
+
+
+# Async database dependency
+async def get_async_database() -> AsyncGenerator[AsyncSession, None]:
+    async for db in get_async_db():
+        yield db
@@ -0,0 +1,187 @@
+"""
+Failed login attempt tracking.
+
+Contador de janela deslizante por cliente (IP) em O(1): guarda só a contagem
+da janela fixa atual e da anterior, e estima a janela deslizante ponderando a
+anterior pela fração que ainda cai dentro dela. Bloqueios têm expiração
+própria.
+
+Dois stores com a mesma interface:
+- memory: LRU limitado no processo, entradas expiram com a janela/bloqueio
+- redis:  contadores e bloqueios compartilhados entre workers (INCR atômico,
+  TTL do Redis); qualquer cliente compatível com redis-py serve
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+from app.core.config import settings
+
+
+def _sliding_count(current: float, previous: float, window: float, now: float):
+    """Estimativa da janela deslizante a partir das duas janelas fixas."""
+    elapsed = now % window
+    return current + previous * (1 - elapsed / window)
+
+
+class InMemoryAttemptStore:
+    """Tentativas no processo (LRU limitado; expira com a janela e o bloqueio)."""
+
+    def __init__(self, maxsize: int = 100000):
+        self.maxsize = maxsize
+        # key -> [índice da janela, atual, anterior, bloqueado até, expira em]
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entry(self, key: str, window: float, now: float) -> List[float]:
+        index = math.floor(now / window)
+        entry = self._entries.get(key)
+        if entry is None or entry[4] <= now:
+            entry = [index, 0, 0, 0.0, 0.0]
+        elif entry[0] != index:
+            # Avança a janela: a atual vira a anterior (ou zera, se ficou
+            # mais de uma janela sem tentativas)
+            entry[2] = entry[1] if entry[0] == index - 1 else 0
+            entry[1] = 0
+            entry[0] = index
+        return entry
+
+    def _store(self, key: str, entry: List[float], window: float, now: float):
+        entry[4] = max((entry[0] + 2) * window, entry[3])
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+
+        # Mais antigas primeiro: remove as expiradas e o excesso do LRU
+        while self._entries:
+            oldest_key, oldest = next(iter(self._entries.items()))
+            if oldest[4] > now and len(self._entries) <= self.maxsize:
+                break
+            del self._entries[oldest_key]
+
+    def increment(self, key: str, window: float, now: float) -> float:
+        """Registra uma tentativa. Returns: contagem na janela deslizante."""
+        with self._lock:
+            entry = self._entry(key, window, now)
+            entry[1] += 1
+            self._store(key, entry, window, now)
+            return _sliding_count(entry[1], entry[2], window, now)
+
+    def count(self, key: str, window: float, now: float) -> float:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[4] <= now:
+                return 0.0
+            entry = self._entry(key, window, now)
+            return _sliding_count(entry[1], entry[2], window, now)
+
+    def block(self, key: str, seconds: float, window: float, now: float) -> None:
+        with self._lock:
+            entry = self._entry(key, window, now)
+            entry[3] = now + seconds
+            self._store(key, entry, window, now)
+
+    def blocked_for(self, key: str, now: float) -> float:
+        """Segundos restantes de bloqueio (0 se não bloqueado)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return 0.0
+            return max(0.0, entry[3] - now)
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class RedisAttemptStore:
+    """
+    Tentativas no Redis, compartilhadas entre workers.
+
+    Um hash por cliente com a contagem de cada janela fixa (HINCRBY atômico)
+    e uma chave de bloqueio com TTL.
+    """
+
+    def __init__(self, client, prefix: str = "failed_login:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisAttemptStore":
+        import redis  # dependência opcional, só com RATE_LIMIT_BACKEND=redis
+
+        return cls(redis.Redis.from_url(url))
+
+    def _counter(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def _blocked(self, key: str) -> str:
+        return f"{self.prefix}{key}:blocked"
+
+    def increment(self, key: str, window: float, now: float) -> float:
+        index = math.floor(now / window)
+        counter = self._counter(key)
+
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hincrby(counter, index, 1)
+        pipe.hget(counter, index - 1)
+        pipe.hdel(counter, index - 2)
+        pipe.expire(counter, math.ceil(window * 2))
+        current, previous, _, _ = pipe.execute()
+
+        return _sliding_count(float(current), float(previous or 0), window, now)
+
+    def count(self, key: str, window: float, now: float) -> float:
+        index = math.floor(now / window)
+        current, previous = self.client.hmget(self._counter(key), index, index - 1)
+        return _sliding_count(float(current or 0), float(previous or 0), window, now)
+
+    def block(self, key: str, seconds: float, window: float, now: float) -> None:
+        self.client.set(self._blocked(key), 1, px=max(1, math.ceil(seconds * 1000)))
+
+    def blocked_for(self, key: str, now: float) -> float:
+        remaining_ms = self.client.pttl(self._blocked(key))
+        return remaining_ms / 1000 if remaining_ms and remaining_ms > 0 else 0.0
+
+    def clear(self, key: str) -> None:
+        self.client.delete(self._counter(key), self._blocked(key))
+
+
+def build_attempt_store(backend: str):
+    """Cria o store configurado ("memory" ou "redis")."""
+    if backend == "memory":
+        return InMemoryAttemptStore(maxsize=settings.FAILED_LOGIN_STORE_MAX_SIZE)
+    if backend == "redis":
+        if not settings.REDIS_URL:
+            raise ValueError("REDIS_URL is required for the redis rate limit backend")
+        return RedisAttemptStore.from_url(settings.REDIS_URL)
+    raise ValueError(f"Unknown rate limit backend: {backend}")
+
+
+class FailedAttemptTracker:
+    """Tentativas de login falhas por cliente, sobre um store plugável."""
+
+    def __init__(self, store):
+        self.store = store
+
+    def record(self, key: str, window: float, now: Optional[float] = None) -> float:
+        return self.store.increment(key, window, time.time() if now is None else now)
+
+    def count(self, key: str, window: float, now: Optional[float] = None) -> float:
+        return self.store.count(key, window, time.time() if now is None else now)
+
+    def block(
+        self, key: str, seconds: float, window: float, now: Optional[float] = None
+    ) -> None:
+        self.store.block(key, seconds, window, time.time() if now is None else now)
+
+    def blocked_for(self, key: str, now: Optional[float] = None) -> float:
+        return self.store.blocked_for(key, time.time() if now is None else now)
+
+    def clear(self, key: str) -> None:
+        self.store.clear(key)
+
+
+failed_attempts = FailedAttemptTracker(build_attempt_store(settings.RATE_LIMIT_BACKEND))
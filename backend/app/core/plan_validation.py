@@ -89,6 +89,10 @@ def require_limit(limit_name: str, count_func: Callable):
     """
     Dependency factory para verificar se usuário está dentro do limite.
 
+    Verificação prévia (contagem e criação em passos separados): para criar
+    recursos sem estourar o limite sob concorrência, use
+    usage_service.reserve_quota na mesma transação da criação.
+
     Usage:
         async def count_user_budgets(user: User, db: Session) -> int:
             return db.query(Budget).filter(Budget.usuario_id == user.id).count()
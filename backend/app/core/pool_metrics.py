@@ -0,0 +1,113 @@
+"""
+Métricas do pool de conexões do banco.
+
+Expõe conexões em uso (checked-out), ociosas (idle), overflow e o tempo de
+espera para obter uma conexão, para que a saturação do pool fique visível
+antes de virar latência.
+"""
+
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolWaitStats:
+    """Acumula os tempos de espera por conexão de um pool (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+
+    def record(self, wait: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.total_wait += wait
+                self.last_wait = wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            avg_wait = self.total_wait / self.checkouts if self.checkouts else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(avg_wait * 1000, 3),
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "last_wait_ms": round(self.last_wait * 1000, 3),
+            }
+
+
+# Stats por nome do pool (pool_logging_name) - sobrevivem a engine.dispose()
+_wait_stats: Dict[str, PoolWaitStats] = {}
+_wait_stats_lock = threading.Lock()
+
+
+def get_wait_stats(pool_name: str) -> PoolWaitStats:
+    with _wait_stats_lock:
+        return _wait_stats.setdefault(pool_name, PoolWaitStats())
+
+
+class _TimedPoolMixin:
+    """
+    Mede o tempo até o pool entregar uma conexão (espera + conexão nova).
+
+    Guarda max_overflow e o nome do pool como recebidos do create_engine
+    (pool_logging_name), sem ler atributos internos do SQLAlchemy.
+    """
+
+    def __init__(self, *args, max_overflow: int = 10, logging_name=None, **kwargs):
+        super().__init__(
+            *args, max_overflow=max_overflow, logging_name=logging_name, **kwargs
+        )
+        self.max_overflow = max_overflow
+        self.pool_name = logging_name or "default"
+
+    def connect(self):
+        stats = get_wait_stats(self.pool_name)
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        stats.record(time.perf_counter() - started)
+        return connection
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    """QueuePool com medição de tempo de espera."""
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool com medição de tempo de espera."""
+
+
+def get_pool_status(engine: Engine) -> Dict[str, Any]:
+    """
+    Retorna o estado atual do pool de um engine (TimedQueuePool ou
+    TimedAsyncAdaptedQueuePool).
+
+    Para engines assíncronos, passe ``async_engine.sync_engine``.
+    """
+    pool = engine.pool
+    status = {
+        "pool_class": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool.max_overflow,
+    }
+    status.update(get_wait_stats(pool.pool_name).snapshot())
+    return status
@@ -1,13 +1,16 @@
-from datetime import datetime, timedelta
-from typing import Dict
+from typing import Optional, Tuple
 
-from fastapi import HTTPException, Request, status
+from fastapi import Depends, Header, HTTPException, Request, Response, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from slowapi import Limiter
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
+from sqlalchemy.orm import Session
 
-# In-memory storage for rate limiting (in production, use Redis)
-failed_attempts: Dict[str, Dict[str, any]] = {}
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.failed_attempts import failed_attempts
 
 
 def get_client_ip(request: Request):
@@ -23,56 +26,29 @@ def check_failed_attempts(
     client_ip: str, max_attempts: int = 5, window_minutes: int = 15
 ):
     """Check if client has exceeded failed login attempts."""
-    now = datetime.utcnow()
-
-    if client_ip in failed_attempts:
-        attempt_data = failed_attempts[client_ip]
-
-        # Reset if window has expired
-        if now - attempt_data["first_attempt"] > timedelta(minutes=window_minutes):
-            failed_attempts[client_ip] = {
-                "count": 1,
-                "first_attempt": now,
-                "blocked_until": None,
-            }
-            return False
-
-        # Check if currently blocked
-        if attempt_data.get("blocked_until") and now < attempt_data["blocked_until"]:
-            return True
-
-        # Check if max attempts exceeded
-        if attempt_data["count"] >= max_attempts:
-            # Block for increasing durations (exponential backoff)
-            block_duration = min(
-                2 ** (attempt_data["count"] - max_attempts), 60
-            )  # Max 60 minutes
-            failed_attempts[client_ip]["blocked_until"] = now + timedelta(
-                minutes=block_duration
-            )
-            return True
+    if failed_attempts.blocked_for(client_ip) > 0:
+        return True
+
+    count = int(failed_attempts.count(client_ip, window_minutes * 60))
+
+    # Check if max attempts exceeded (sliding window)
+    if count >= max_attempts:
+        # Block for increasing durations (exponential backoff)
+        block_duration = min(2 ** (count - max_attempts), 60)  # Max 60 minutes
+        failed_attempts.block(client_ip, block_duration * 60, window_minutes * 60)
+        return True
 
     return False
 
 
-def record_failed_attempt(client_ip: str):
+def record_failed_attempt(client_ip: str, window_minutes: int = 15):
     """Record a failed login attempt."""
-    now = datetime.utcnow()
-
-    if client_ip in failed_attempts:
-        failed_attempts[client_ip]["count"] += 1
-    else:
-        failed_attempts[client_ip] = {
-            "count": 1,
-            "first_attempt": now,
-            "blocked_until": None,
-        }
+    failed_attempts.record(client_ip, window_minutes * 60)
 
 
 def clear_failed_attempts(client_ip: str):
     """Clear failed attempts for successful login."""
-    if client_ip in failed_attempts:
-        del failed_attempts[client_ip]
+    failed_attempts.clear(client_ip)
 
 
 def clear_user_failed_attempts(user_id: str, db):
@@ -114,13 +90,10 @@ def is_user_locked(user_id: str, db) -> bool:
 
 def get_rate_limit_message(client_ip: str) -> str:
     """Get appropriate rate limit message."""
-    if client_ip in failed_attempts:
-        attempt_data = failed_attempts[client_ip]
-        if attempt_data.get("blocked_until"):
-            remaining = attempt_data["blocked_until"] - datetime.utcnow()
-            if remaining.total_seconds() > 0:
-                minutes = int(remaining.total_seconds() / 60) + 1
-                return f"Too many failed attempts. Try again in {minutes} minute(s)."
+    remaining = failed_attempts.blocked_for(client_ip)
+    if remaining > 0:
+        minutes = int(remaining / 60) + 1
+        return f"Too many failed attempts. Try again in {minutes} minute(s)."
 
     return "Rate limit exceeded. Please try again later."
 
@@ -158,3 +131,119 @@ def api_rate_limit():
 def strict_rate_limit():
     """Strict rate limit for sensitive endpoints."""
     return limiter.limit("10/minute")
+
+
+# ============================================================================
+# Per-client token bucket (API key / user / IP)
+# ============================================================================
+
+# user_id -> (plans.api_rate_limit,) - tupla para cachear também o "sem limite"
+_plan_rate_limits = TTLCache(
+    maxsize=10000, ttl=settings.API_RATE_LIMIT_PLAN_CACHE_TTL_SECONDS
+)
+
+
+def get_plan_rate_limit(db, user_id) -> Optional[int]:
+    """Limite por minuto do plano do usuário (None = padrão global)."""
+    from app.models.plan import Plan
+    from app.models.user import User
+
+    cached = _plan_rate_limits.get(str(user_id))
+    if cached is None:
+        limit = (
+            db.query(Plan.api_rate_limit)
+            .join(User, User.plano_id == Plan.id)
+            .filter(User.id == user_id)
+            .scalar()
+        )
+        cached = (limit,)
+        _plan_rate_limits.set(str(user_id), cached)
+    return cached[0]
+
+
+def api_key_bucket(
+    db, api_key_id, user_id, rate_limit: Optional[int]
+) -> Tuple[str, int]:
+    """Balde de uma API key: limite da key > plano do dono > padrão global."""
+    limit = (
+        rate_limit
+        or get_plan_rate_limit(db, user_id)
+        or settings.API_RATE_LIMIT_DEFAULT
+    )
+    return f"key:{api_key_id}", limit
+
+
+def resolve_rate_limit_client(
+    request: Request, x_api_key: Optional[str], bearer_token: Optional[str], db
+) -> Tuple[str, int]:
+    """
+    Identificar o cliente e seu limite por minuto.
+
+    - API key válida: balde da key; limite da key > plano do dono > padrão
+    - Token Bearer válido: balde do usuário; limite do plano > padrão
+    - Sem credencial válida: balde do IP com API_RATE_LIMIT_ANONYMOUS (5/min,
+      o limite original dos endpoints n8n)
+
+    Returns:
+        (chave do balde, limite por minuto)
+    """
+    from app.core.api_key_auth import verify_api_key
+    from app.core.auth import verify_token
+
+    if x_api_key:
+        try:
+            verified = verify_api_key(x_api_key, request, db)
+            return api_key_bucket(
+                db, verified.id, verified.user_id, verified.rate_limit
+            )
+        except HTTPException:
+            # Key inválida não ganha limite próprio: cai no balde do IP
+            pass
+
+    if bearer_token:
+        subject = verify_token(bearer_token, "access")
+        if subject:
+            limit = get_plan_rate_limit(db, subject) or settings.API_RATE_LIMIT_DEFAULT
+            return f"user:{subject}", limit
+
+    return f"ip:{get_client_ip(request)}", settings.API_RATE_LIMIT_ANONYMOUS
+
+
+def client_rate_limit(
+    request: Request,
+    response: Response,
+    x_api_key: Optional[str] = Header(None),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(
+        HTTPBearer(auto_error=False)
+    ),
+    db: Session = Depends(get_db),
+):
+    """
+    Rate limit por cliente (token bucket) para endpoints de integração.
+
+    Usage:
+        @router.post("/...", dependencies=[Depends(client_rate_limit)])
+
+    Adiciona X-RateLimit-Limit/Remaining/Reset à resposta; ao exceder o
+    limite, 429 com Retry-After.
+    """
+    from app.core.token_bucket import token_bucket_limiter
+
+    key, limit = resolve_rate_limit_client(
+        request, x_api_key, credentials.credentials if credentials else None, db
+    )
+    decision = token_bucket_limiter.hit(key, limit)
+
+    headers = decision.headers()
+
+    if not decision.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={
+                "message": "Rate limit exceeded. Please try again later.",
+                "retry_after": int(headers["Retry-After"]),
+            },
+            headers=headers,
+        )
+
+    response.headers.update(headers)
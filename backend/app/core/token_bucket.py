@@ -0,0 +1,187 @@
+"""
+Token-bucket rate limiting.
+
+Cada cliente (API key, usuário ou IP) tem um balde com capacidade igual ao
+limite por minuto, reabastecido continuamente (limite/60 tokens por segundo);
+cada requisição consome um token. Rajadas até o limite passam direto e o
+ritmo médio fica limitado, sem o "efeito fronteira" de janelas fixas.
+
+O estado dos baldes fica em um store plugável:
+- memory: dicionário no processo (padrão; um balde por worker)
+- redis:  script Lua atômico, compartilhado entre workers. Qualquer cliente
+  compatível com redis-py serve (inclusive fakeredis nos testes)
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    """Resultado de uma requisição contra o balde do cliente."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float  # segundos até o balde encher de novo
+    retry_after: float  # segundos até o próximo token (0 se permitido)
+
+    def headers(self) -> Dict[str, str]:
+        """Cabeçalhos X-RateLimit-* (e Retry-After quando bloqueado)."""
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+# ============================================================================
+# Stores
+# ============================================================================
+
+
+class InMemoryBucketStore:
+    """Baldes no processo (LRU: baldes ociosos são descartados primeiro)."""
+
+    def __init__(self, maxsize: int = 100000):
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(
+        self, key: str, capacity: int, refill_rate: float, now: float
+    ) -> Tuple[bool, float]:
+        """Consome um token. Returns: (permitido, tokens restantes)."""
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - updated_at) * refill_rate)
+
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            # Um balde descartado volta cheio: só acontece com baldes ociosos
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+
+            return allowed, tokens
+
+
+class RedisBucketStore:
+    """Baldes no Redis (script Lua: leitura, recarga e consumo atômicos)."""
+
+    SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local updated_at = tonumber(state[2])
+if tokens == nil then
+    tokens = capacity
+    updated_at = now
+end
+
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * refill_rate)
+
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+-- Expira quando o balde estaria cheio de novo (equivalente a não existir)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / refill_rate * 1000) + 1000)
+
+return {allowed, tostring(tokens)}
+"""
+
+    def __init__(self, client, prefix: str = "ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(self.SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBucketStore":
+        import redis  # dependência opcional, só com RATE_LIMIT_BACKEND=redis
+
+        return cls(redis.Redis.from_url(url))
+
+    def consume(
+        self, key: str, capacity: int, refill_rate: float, now: float
+    ) -> Tuple[bool, float]:
+        allowed, tokens = self._script(
+            keys=[self.prefix + key], args=[capacity, refill_rate, now]
+        )
+        return bool(int(allowed)), float(tokens)
+
+
+def build_bucket_store(backend: str):
+    """Cria o store configurado ("memory" ou "redis")."""
+    if backend == "memory":
+        return InMemoryBucketStore()
+    if backend == "redis":
+        if not settings.REDIS_URL:
+            raise ValueError("REDIS_URL is required for the redis rate limit backend")
+        return RedisBucketStore.from_url(settings.REDIS_URL)
+    raise ValueError(f"Unknown rate limit backend: {backend}")
+
+
+# ============================================================================
+# Limiter
+# ============================================================================
+
+
+class TokenBucketLimiter:
+    """Limite de requisições por minuto por cliente, sobre um store de baldes."""
+
+    def __init__(self, store, period: float = 60.0):
+        self.store = store
+        self.period = period
+
+    def hit(
+        self, key: str, limit: int, now: Optional[float] = None
+    ) -> RateLimitDecision:
+        """
+        Registra uma requisição de `key` com `limit` requisições por período.
+
+        Se o store falhar (Redis fora do ar), a requisição é permitida: o
+        limite protege a API, não deve derrubá-la.
+        """
+        refill_rate = limit / self.period
+        now = time.time() if now is None else now
+
+        try:
+            allowed, tokens = self.store.consume(key, limit, refill_rate, now)
+        except Exception as e:
+            logger.warning(f"[RATE_LIMIT] Bucket store unavailable: {str(e)}")
+            return RateLimitDecision(True, limit, limit, 0.0, 0.0)
+
+        return RateLimitDecision(
+            allowed=allowed,
+            limit=limit,
+            remaining=max(0, math.floor(tokens)),
+            reset_after=(limit - tokens) / refill_rate,
+            retry_after=0.0 if allowed else (1 - tokens) / refill_rate,
+        )
+
+
+token_bucket_limiter = TokenBucketLimiter(
+    build_bucket_store(settings.RATE_LIMIT_BACKEND)
+)
@@ -342,22 +342,25 @@ class CRUDAPIKey(CRUDBase[APIKey, APIKeyCreate, APIKeyUpdate]):
         self, db: Session, *, api_key_id: UUID
     ) -> tuple[bool, Optional[int]]:
         """
-        Check if API key is within rate limit.
+        Consume one request from the API key's token bucket.
 
         Returns:
-            tuple[bool, Optional[int]]: (is_allowed, custom_rate_limit)
+            tuple[bool, Optional[int]]: (is_allowed, effective_rate_limit)
 
         Note:
-            This is a placeholder for rate limiting logic.
-            Actual implementation would use Redis or similar.
+            Same bucket as the n8n endpoints (client_rate_limit): key limit,
+            then the owner's plan limit, then API_RATE_LIMIT_DEFAULT.
         """
+        from app.core.rate_limiter import api_key_bucket
+        from app.core.token_bucket import token_bucket_limiter
 
         api_key = db.query(APIKey).filter(APIKey.id == api_key_id).first()
 
         if not api_key:
             return False, None
 
-        return True, api_key.rate_limit
+        key, limit = api_key_bucket(db, api_key.id, api_key.user_id, api_key.rate_limit)
+        return token_bucket_limiter.hit(key, limit).allowed, limit
 
 
 # Singleton instance
@@ -1,14 +1,38 @@
 import calendar
 from datetime import datetime
 from decimal import Decimal
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple
 from uuid import UUID
 
-from sqlalchemy import and_, desc
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import (
+    Date,
+    DateTime,
+    Integer,
+    Numeric,
+    String,
+    and_,
+    bindparam,
+    case,
+    cast,
+    column,
+    desc,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    true,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, aliased, contains_eager, joinedload
 
 from app.crud.base import CRUDBase
 from app.models.budget import Budget, BudgetPeriod
+from app.models.transaction import TransactionDailyRollup
 from app.schemas.budget import (
     BudgetCreate,
     BudgetPeriodCreate,
@@ -16,6 +40,8 @@ from app.schemas.budget import (
     BudgetUpdate,
 )
 
+PERIODICIDADES = ("mensal", "quinzenal", "semanal")
+
 
 class CRUDBudget(CRUDBase[Budget, BudgetCreate, BudgetUpdate]):
     def get_by_user(
@@ -38,6 +64,51 @@ class CRUDBudget(CRUDBase[Budget, BudgetCreate, BudgetUpdate]):
 
         return query.order_by(desc(Budget.criado_em)).offset(skip).limit(limit).all()
 
+    def get_by_user_with_current_period(
+        self,
+        db: Session,
+        *,
+        usuario_id: UUID,
+        current_date: Optional[datetime] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> List[Tuple[Budget, Optional[BudgetPeriod]]]:
+        """
+        Orçamentos ativos do usuário com a categoria e o período atual, em
+        uma consulta.
+
+        O período vem de um LEFT JOIN LATERAL (... LIMIT 1) por orçamento,
+        resolvido no índice ix_budget_periods_budget_dates; None se o
+        orçamento ainda não tem período cobrindo current_date.
+        """
+        if current_date is None:
+            current_date = datetime.now()
+
+        current_period = aliased(
+            BudgetPeriod,
+            select(BudgetPeriod)
+            .where(
+                BudgetPeriod.budget_id == Budget.id,
+                BudgetPeriod.data_inicio <= current_date,
+                BudgetPeriod.data_fim >= current_date,
+            )
+            .order_by(desc(BudgetPeriod.data_inicio))
+            .limit(1)
+            .lateral("current_period"),
+        )
+
+        return [
+            tuple(row)
+            for row in db.query(Budget, current_period)
+            .outerjoin(current_period, true())
+            .options(joinedload(Budget.categoria))
+            .filter(Budget.usuario_id == usuario_id, Budget.ativo)
+            .order_by(desc(Budget.criado_em))
+            .offset(skip)
+            .limit(limit)
+            .all()
+        ]
+
     def get_by_user_and_category(
         self, db: Session, *, usuario_id: UUID, categoria_id: int
     ) -> Optional[Budget]:
@@ -111,25 +182,114 @@ class CRUDBudgetPeriod(CRUDBase[BudgetPeriod, BudgetPeriodCreate, BudgetPeriodUp
 
         return query.first()
 
-    def update_valor_gasto(
-        self, db: Session, *, period_id: UUID, valor_adicional: Decimal
-    ) -> Optional[BudgetPeriod]:
-        period = db.query(BudgetPeriod).filter(BudgetPeriod.id == period_id).first()
-        if not period:
-            return None
+    @staticmethod
+    def spend_update(delta):
+        """
+        UPDATE atômico que soma delta ao gasto do período (sem WHERE do período).
+
+        valor_gasto = valor_gasto + delta é calculado pelo banco, então
+        despesas simultâneas no mesmo período não se perdem. O mesmo comando
+        ajusta o status, libera alerta_enviado quando o gasto volta abaixo de
+        notificar_em (e estouro_enviado quando volta ao limite) e devolve
+        (RETURNING) o período atualizado junto com tipo_alerta: 'estouro'
+        (acima de 100%), 'aviso' (atingiu notificar_em% e o alerta ainda não
+        foi enviado) ou NULL.
+        """
+        valor_gasto = BudgetPeriod.valor_gasto + delta
+        valor_limite = BudgetPeriod.valor_limite
+
+        # Em RETURNING as colunas já têm os valores novos
+        tipo_alerta = case(
+            (
+                and_(valor_limite > 0, BudgetPeriod.valor_gasto > valor_limite),
+                "estouro",
+            ),
+            (
+                and_(
+                    valor_limite > 0,
+                    BudgetPeriod.valor_gasto * 100
+                    >= valor_limite * Budget.notificar_em,
+                    BudgetPeriod.alerta_enviado.is_not(True),
+                ),
+                "aviso",
+            ),
+        )
 
-        period.valor_gasto += valor_adicional
+        return (
+            update(BudgetPeriod)
+            .where(BudgetPeriod.budget_id == Budget.id)
+            .values(
+                {
+                    BudgetPeriod.valor_gasto: valor_gasto,
+                    BudgetPeriod.status: case(
+                        (valor_gasto > valor_limite, "excedido"),
+                        (BudgetPeriod.status == "excedido", "ativo"),
+                        else_=BudgetPeriod.status,
+                    ),
+                    BudgetPeriod.alerta_enviado: case(
+                        (valor_gasto * 100 < valor_limite * Budget.notificar_em, False),
+                        else_=BudgetPeriod.alerta_enviado,
+                    ),
+                    BudgetPeriod.estouro_enviado: case(
+                        (valor_gasto <= valor_limite, False),
+                        else_=BudgetPeriod.estouro_enviado,
+                    ),
+                }
+            )
+            .returning(BudgetPeriod, tipo_alerta.label("tipo_alerta"))
+            .execution_options(populate_existing=True, synchronize_session=False)
+        )
 
-        # Atualizar status se necessário
-        if period.valor_gasto > period.valor_limite:
-            period.status = "excedido"
-        elif period.status == "excedido" and period.valor_gasto <= period.valor_limite:
-            period.status = "ativo"
+    def update_valor_gasto(
+        self,
+        db: Session,
+        *,
+        valor_adicional: Decimal,
+        period_id: Optional[UUID] = None,
+        budget_id: Optional[UUID] = None,
+        target_date: Optional[datetime] = None,
+        commit: bool = True,
+    ) -> Optional[Tuple[BudgetPeriod, Optional[str]]]:
+        """
+        Soma valor_adicional (negativo para estornos) ao gasto do período.
+
+        Um único UPDATE ... RETURNING (ver spend_update). O período é o
+        period_id ou, sem ele, o período de budget_id que contém target_date.
+        commit=False deixa o commit para quem chama (mesma unidade de
+        trabalho).
+
+        Returns:
+            tuple: (BudgetPeriod atualizado, tipo_alerta) ou None se o período
+                não existe
+        """
+        stmt = self.spend_update(valor_adicional)
+        if period_id is not None:
+            stmt = stmt.where(BudgetPeriod.id == period_id)
+        else:
+            if target_date is None:
+                target_date = datetime.now()
+            current = aliased(BudgetPeriod)
+            stmt = stmt.where(
+                BudgetPeriod.id
+                == select(current.id)
+                .where(
+                    current.budget_id == budget_id,
+                    current.data_inicio <= target_date,
+                    current.data_fim >= target_date,
+                )
+                .limit(1)
+                .scalar_subquery()
+            )
 
-        db.add(period)
-        db.commit()
-        db.refresh(period)
-        return period
+        row = db.execute(stmt).first()
+        if row is None:
+            return None
+
+        period, tipo_alerta = row
+        if commit:
+            db.commit()
+            db.refresh(period)
+        return period, tipo_alerta
 
     def get_periods_for_alert(
         self, db: Session, *, usuario_id: UUID, percentual_minimo: float = 80.0
@@ -147,7 +307,7 @@ class CRUDBudgetPeriod(CRUDBase[BudgetPeriod, BudgetPeriodCreate, BudgetPeriodUp
                     BudgetPeriod.status == "ativo",
                     BudgetPeriod.data_inicio <= current_date,
                     BudgetPeriod.data_fim >= current_date,
-                    not BudgetPeriod.alerta_enviado,
+                    BudgetPeriod.alerta_enviado.is_not(True),
                     (BudgetPeriod.valor_gasto / BudgetPeriod.valor_limite * 100)
                     >= percentual_minimo,
                 )
@@ -155,25 +315,147 @@ class CRUDBudgetPeriod(CRUDBase[BudgetPeriod, BudgetPeriodCreate, BudgetPeriodUp
             .all()
         )
 
-    def create_period_for_budget(
-        self, db: Session, *, budget: Budget, target_date: Optional[datetime] = None
-    ) -> Optional[BudgetPeriod]:
-        """Cria automaticamente um período para um orçamento."""
-        if target_date is None:
-            target_date = datetime.now()
+    @staticmethod
+    def get_min_notificar_em(db: Session) -> Optional[Decimal]:
+        """Menor notificar_em dos orçamentos ativos (ix_budgets_notificar_em)."""
+        return db.scalar(select(func.min(Budget.notificar_em)).where(Budget.ativo))
 
+    @staticmethod
+    def get_pending_alerts(
+        db: Session,
+        *,
+        usuario_id: Optional[UUID] = None,
+        limit: Optional[int] = None,
+        current_date: Optional[datetime] = None,
+        percentual_minimo: Optional[Decimal] = None,
+    ) -> List[Tuple[BudgetPeriod, Budget, str]]:
+        """
+        Períodos atuais com alerta pendente, de todos os usuários (ou só de
+        usuario_id): atingiram notificar_em% do limite sem aviso enviado, ou
+        passaram de 100% sem estouro enviado (mesmo que o aviso já tenha ido).
+
+        Uma consulta, com o orçamento e a categoria já carregados, do maior
+        percentual gasto para o menor: lê de trás para frente o índice parcial
+        ix_budget_periods_alert_pending (percentual dos períodos com alerta
+        pendente) até o menor notificar_em dos orçamentos ativos, sem passar
+        pelos períodos vigentes abaixo dele. Marcados os enviados
+        (mark_alerts_sent), a próxima chamada traz os seguintes.
+
+        Args:
+            percentual_minimo: menor notificar_em dos orçamentos ativos (ver
+                get_min_notificar_em); consultado se não informado
+
+        Returns:
+            List[Tuple]: (período, orçamento, tipo_alerta), com tipo_alerta
+                'estouro' (acima de 100%, estouro não enviado) ou 'aviso'
+        """
+        if current_date is None:
+            current_date = datetime.now()
+        if percentual_minimo is None:
+            percentual_minimo = CRUDBudgetPeriod.get_min_notificar_em(db)
+            if percentual_minimo is None:
+                return []
+
+        # Mesma expressão e predicado do índice parcial (literal, não parâmetro)
+        percentual_gasto = (
+            BudgetPeriod.valor_gasto * literal_column("100") / BudgetPeriod.valor_limite
+        )
+        aviso_pendente = BudgetPeriod.alerta_enviado.is_not(True)
+        estouro_pendente = and_(
+            BudgetPeriod.valor_gasto > BudgetPeriod.valor_limite,
+            BudgetPeriod.estouro_enviado.is_not(True),
+        )
+        tipo_alerta = case((estouro_pendente, "estouro"), else_="aviso")
+        query = (
+            db.query(BudgetPeriod, Budget, tipo_alerta.label("tipo_alerta"))
+            .join(Budget, BudgetPeriod.budget_id == Budget.id)
+            .outerjoin(Budget.categoria)
+            .options(contains_eager(Budget.categoria))
+            .filter(
+                # Predicado do índice (ALERT_PENDING_PREDICATE)
+                BudgetPeriod.valor_limite > literal_column("0"),
+                or_(aviso_pendente, estouro_pendente),
+                # Estouro (acima de 100%) vale mesmo com notificar_em maior
+                percentual_gasto >= min(percentual_minimo, Decimal(100)),
+                or_(
+                    and_(aviso_pendente, percentual_gasto >= Budget.notificar_em),
+                    estouro_pendente,
+                ),
+                BudgetPeriod.valor_gasto > 0,
+                BudgetPeriod.data_inicio <= current_date,
+                BudgetPeriod.data_fim >= current_date,
+                Budget.ativo,
+            )
+        )
+
+        if usuario_id:
+            query = query.filter(Budget.usuario_id == usuario_id)
+
+        query = query.order_by(percentual_gasto.desc(), BudgetPeriod.id)
+        if limit:
+            query = query.limit(limit)
+
+        return [tuple(row) for row in query.all()]
+
+    @staticmethod
+    def mark_alerts_sent(
+        db: Session,
+        *,
+        period_ids: List[UUID],
+        estouro_period_ids: Sequence[UUID] = (),
+        commit: bool = True,
+    ) -> int:
+        """
+        Marca os alertas enviados em um único UPDATE: alerta_enviado em todos
+        os períodos e estouro_enviado nos de estouro_period_ids (alertas do
+        tipo 'estouro').
+
+        Returns: quantos períodos foram marcados agora (os já marcados não
+        contam).
+        """
+        estouro_ids = list(estouro_period_ids)
+        ids = list({*period_ids, *estouro_ids})
+        if not ids:
+            return 0
+
+        is_estouro = BudgetPeriod.id.in_(estouro_ids)
+        marked = db.execute(
+            update(BudgetPeriod)
+            .where(
+                BudgetPeriod.id.in_(ids),
+                or_(
+                    BudgetPeriod.alerta_enviado.is_not(True),
+                    and_(is_estouro, BudgetPeriod.estouro_enviado.is_not(True)),
+                ),
+            )
+            .values(
+                alerta_enviado=True,
+                estouro_enviado=case(
+                    (is_estouro, True), else_=BudgetPeriod.estouro_enviado
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+        if commit:
+            db.commit()
+        return marked
+
+    @staticmethod
+    def period_bounds(periodicidade: str, target_date: datetime) -> tuple:
+        """
+        Período que contém target_date para a periodicidade do orçamento.
+
+        Returns:
+            tuple: (ano, mes, quinzena, semana, data_inicio, data_fim)
+        """
         year = target_date.year
         month = target_date.month
+        quinzena = None
+        semana = None
 
         # Calcular datas de início e fim baseado na periodicidade
-        if budget.periodicidade == "mensal":
-            data_inicio = datetime(year, month, 1)
-            last_day = calendar.monthrange(year, month)[1]
-            data_fim = datetime(year, month, last_day, 23, 59, 59)
-            quinzena = None
-            semana = None
-
-        elif budget.periodicidade == "quinzenal":
+        if periodicidade == "quinzenal":
             if target_date.day <= 15:
                 # Primeira quinzena
                 data_inicio = datetime(year, month, 1)
@@ -185,9 +467,8 @@ class CRUDBudgetPeriod(CRUDBase[BudgetPeriod, BudgetPeriodCreate, BudgetPeriodUp
                 last_day = calendar.monthrange(year, month)[1]
                 data_fim = datetime(year, month, last_day, 23, 59, 59)
                 quinzena = 2
-            semana = None
 
-        elif budget.periodicidade == "semanal":
+        elif periodicidade == "semanal":
             # Calcular semana do mês (simplificado)
             semana = (target_date.day - 1) // 7 + 1
             week_start = (semana - 1) * 7 + 1
@@ -195,34 +476,390 @@ class CRUDBudgetPeriod(CRUDBase[BudgetPeriod, BudgetPeriodCreate, BudgetPeriodUp
 
             data_inicio = datetime(year, month, week_start)
             data_fim = datetime(year, month, week_end, 23, 59, 59)
-            quinzena = None
-
-        # Verificar se período já existe
-        existing = self.get_by_period(
-            db,
-            budget_id=budget.id,
-            ano=year,
-            mes=month,
-            quinzena=quinzena,
-            semana=semana,
-        )
-
-        if existing:
-            return existing
-
-        # Criar novo período
-        period_data = BudgetPeriodCreate(
-            budget_id=budget.id,
-            ano=year,
-            mes=month,
-            quinzena=quinzena,
-            semana=semana,
-            valor_limite=budget.valor_limite,
-            data_inicio=data_inicio,
-            data_fim=data_fim,
-        )
-
-        return self.create(db, obj_in=period_data)
+
+        else:
+            # mensal
+            data_inicio = datetime(year, month, 1)
+            last_day = calendar.monthrange(year, month)[1]
+            data_fim = datetime(year, month, last_day, 23, 59, 59)
+
+        return year, month, quinzena, semana, data_inicio, data_fim
+
+    @staticmethod
+    def lock_period_creation(db: Session, *, wait: bool = True) -> bool:
+        """
+        Trava consultiva da criação de períodos, até o fim da transação.
+
+        A uq_budget_period não barra duplicatas com quinzena/semana NULL: quem
+        cria períodos (rollover, recálculo, importação, criação avulsa) pega
+        esta trava e só então confere quais já existem.
+
+        Returns: False se wait=False e a trava está ocupada.
+        """
+        lock_key = func.hashtext("budget_period_rollover")
+        if wait:
+            db.execute(select(func.pg_advisory_xact_lock(lock_key)))
+            return True
+        return bool(db.scalar(select(func.pg_try_advisory_xact_lock(lock_key))))
+
+    def create_period_for_budget(
+        self,
+        db: Session,
+        *,
+        budget: Budget,
+        target_date: Optional[datetime] = None,
+        commit: bool = True,
+    ) -> Optional[BudgetPeriod]:
+        """
+        Cria automaticamente um período para um orçamento.
+
+        commit=False só faz flush (mesma unidade de trabalho de quem chama).
+        """
+        if target_date is None:
+            target_date = datetime.now()
+
+        year, month, quinzena, semana, data_inicio, data_fim = self.period_bounds(
+            budget.periodicidade, target_date
+        )
+
+        # Sob a trava, cria o período só se ainda não existe (mesmos dois
+        # comandos de conferir e criar); se já existe, devolve o existente
+        self.lock_period_creation(db)
+        same_period = (
+            select(BudgetPeriod.id)
+            .where(
+                BudgetPeriod.budget_id == budget.id,
+                BudgetPeriod.ano == year,
+                BudgetPeriod.mes == month,
+                BudgetPeriod.quinzena.is_not_distinct_from(quinzena),
+                BudgetPeriod.semana.is_not_distinct_from(semana),
+            )
+            .exists()
+        )
+        source = select(
+            func.gen_random_uuid(),
+            literal(budget.id, PG_UUID(as_uuid=True)),
+            literal(year, Integer),
+            literal(month, Integer),
+            literal(quinzena, Integer),
+            literal(semana, Integer),
+            literal(budget.valor_limite, Numeric(10, 2)),
+            literal(0),
+            literal("ativo"),
+            literal(data_inicio, DateTime),
+            literal(data_fim, DateTime),
+            literal(False),
+        ).where(~same_period)
+        stmt = (
+            pg_insert(BudgetPeriod)
+            .from_select(
+                [
+                    "id",
+                    "budget_id",
+                    "ano",
+                    "mes",
+                    "quinzena",
+                    "semana",
+                    "valor_limite",
+                    "valor_gasto",
+                    "status",
+                    "data_inicio",
+                    "data_fim",
+                    "alerta_enviado",
+                ],
+                source,
+            )
+            .on_conflict_do_nothing(constraint="uq_budget_period")
+            .returning(BudgetPeriod)
+            .execution_options(populate_existing=True)
+        )
+        period = db.scalars(stmt).first()
+
+        if period is None:
+            return self.get_by_period(
+                db,
+                budget_id=budget.id,
+                ano=year,
+                mes=month,
+                quinzena=quinzena,
+                semana=semana,
+            )
+
+        if commit:
+            db.commit()
+            db.refresh(period)
+        return period
+
+    @staticmethod
+    def _chunk_filters(
+        usuario_id: Optional[UUID],
+        after_id: Optional[UUID],
+        last_id: Optional[UUID] = None,
+    ) -> list:
+        """Orçamentos ativos do trecho (after_id, last_id] por id."""
+        filters = [Budget.ativo]
+        if usuario_id is not None:
+            filters.append(Budget.usuario_id == usuario_id)
+        if after_id is not None:
+            filters.append(Budget.id > after_id)
+        if last_id is not None:
+            filters.append(Budget.id <= last_id)
+        return filters
+
+    def create_periods_for_date(
+        self,
+        db: Session,
+        *,
+        target_date: datetime,
+        usuario_id: Optional[UUID] = None,
+        after_id: Optional[UUID] = None,
+        chunk_size: int = 1000,
+        wait: bool = True,
+    ) -> Tuple[Optional[UUID], int, int]:
+        """
+        Cria o período que contém target_date para um trecho de orçamentos
+        ativos (sem commit).
+
+        Os limites do período dependem só da periodicidade e da data, então
+        saem de period_bounds (um por periodicidade) como VALUES de um único
+        INSERT ... SELECT. Orçamentos que já têm período cobrindo a data são
+        ignorados via NOT EXISTS (a uq_budget_period não barra duplicatas com
+        quinzena/semana NULL). Uma trava consultiva serializa execuções
+        simultâneas até o commit.
+
+        Trechos por id (keyset): after_id é o último id do trecho anterior;
+        usuario_id limita aos orçamentos de um usuário. wait=False não espera
+        a trava (jobs de rollover/recálculo em andamento): se ocupada, não
+        cria nada.
+
+        Returns:
+            tuple: (último budget_id do trecho ou None se não há mais
+                orçamentos ou a trava está ocupada, orçamentos no trecho,
+                períodos criados)
+        """
+        if not self.lock_period_creation(db, wait=wait):
+            return None, 0, 0
+
+        chunk = select(Budget.id).where(*self._chunk_filters(usuario_id, after_id))
+        budget_ids = db.scalars(chunk.order_by(Budget.id).limit(chunk_size)).all()
+        if not budget_ids:
+            return None, 0, 0
+
+        bounds = values(
+            column("periodicidade", String),
+            column("ano", Integer),
+            column("mes", Integer),
+            column("quinzena", Integer),
+            column("semana", Integer),
+            column("data_inicio", DateTime),
+            column("data_fim", DateTime),
+            name="bounds",
+        ).data(
+            [
+                (periodicidade, *self.period_bounds(periodicidade, target_date))
+                for periodicidade in PERIODICIDADES
+            ]
+        )
+        # Periodicidade desconhecida vale como mensal (igual a period_bounds)
+        periodicidade = case(
+            (Budget.periodicidade.in_(PERIODICIDADES), Budget.periodicidade),
+            else_="mensal",
+        )
+        already_covered = (
+            select(BudgetPeriod.id)
+            .where(
+                BudgetPeriod.budget_id == Budget.id,
+                BudgetPeriod.data_inicio <= target_date,
+                BudgetPeriod.data_fim >= target_date,
+            )
+            .exists()
+        )
+
+        source = (
+            select(
+                func.gen_random_uuid(),
+                Budget.id,
+                bounds.c.ano,
+                bounds.c.mes,
+                bounds.c.quinzena,
+                bounds.c.semana,
+                Budget.valor_limite,
+                literal(0),
+                literal("ativo"),
+                bounds.c.data_inicio,
+                bounds.c.data_fim,
+                literal(False),
+            )
+            .join_from(Budget, bounds, bounds.c.periodicidade == periodicidade)
+            .where(
+                *self._chunk_filters(usuario_id, after_id, budget_ids[-1]),
+                ~already_covered,
+            )
+        )
+        stmt = (
+            pg_insert(BudgetPeriod)
+            .from_select(
+                [
+                    "id",
+                    "budget_id",
+                    "ano",
+                    "mes",
+                    "quinzena",
+                    "semana",
+                    "valor_limite",
+                    "valor_gasto",
+                    "status",
+                    "data_inicio",
+                    "data_fim",
+                    "alerta_enviado",
+                ],
+                source,
+            )
+            .on_conflict_do_nothing(constraint="uq_budget_period")
+        )
+        created = db.execute(stmt).rowcount
+
+        return budget_ids[-1], len(budget_ids), created
+
+    def recalculate_spend(
+        self,
+        db: Session,
+        *,
+        last_id: UUID,
+        usuario_id: Optional[UUID] = None,
+        after_id: Optional[UUID] = None,
+        current_date: Optional[datetime] = None,
+    ) -> List[dict]:
+        """
+        Recalcula o gasto dos períodos atuais de um trecho de orçamentos
+        (sem commit).
+
+        Um SELECT soma as despesas do rollup diário para todos os pares
+        (orçamento, período) do trecho (JOIN + GROUP BY) e só os períodos com
+        gasto ou status diferente são gravados, em um único
+        UPDATE ... FROM unnest(...), que também libera alerta_enviado e
+        estouro_enviado como spend_update. Os totais são Decimal do banco até o
+        UPDATE. Um período alterado por uma despesa entre o SELECT e o UPDATE
+        não é sobrescrito (o UPDATE confere o gasto lido).
+
+        Returns:
+            Alterações gravadas: budget_id, budget_name, period_id,
+                valor_gasto_anterior, valor_gasto e status
+        """
+        if current_date is None:
+            current_date = datetime.now()
+
+        total = func.coalesce(func.sum(TransactionDailyRollup.total), 0)
+        rows = db.execute(
+            select(
+                BudgetPeriod.id,
+                BudgetPeriod.valor_gasto,
+                BudgetPeriod.valor_limite,
+                BudgetPeriod.status,
+                Budget.id.label("budget_id"),
+                Budget.nome,
+                total.label("total"),
+            )
+            .join(Budget, Budget.id == BudgetPeriod.budget_id)
+            .outerjoin(
+                TransactionDailyRollup,
+                and_(
+                    TransactionDailyRollup.usuario_id == Budget.usuario_id,
+                    TransactionDailyRollup.categoria_id == Budget.categoria_id,
+                    TransactionDailyRollup.tipo == "despesa",
+                    TransactionDailyRollup.data >= cast(BudgetPeriod.data_inicio, Date),
+                    TransactionDailyRollup.data <= cast(BudgetPeriod.data_fim, Date),
+                ),
+            )
+            .where(
+                *self._chunk_filters(usuario_id, after_id, last_id),
+                BudgetPeriod.data_inicio <= current_date,
+                BudgetPeriod.data_fim >= current_date,
+            )
+            .group_by(BudgetPeriod.id, Budget.id)
+        ).all()
+
+        changes = []
+        for row in rows:
+            # Mesma regra de status do UPDATE incremental (spend_update)
+            if row.total > row.valor_limite:
+                status = "excedido"
+            elif row.status == "excedido":
+                status = "ativo"
+            else:
+                status = row.status
+
+            if row.total != row.valor_gasto or status != row.status:
+                changes.append(
+                    {
+                        "budget_id": str(row.budget_id),
+                        "budget_name": row.nome,
+                        "period_id": row.id,
+                        "valor_gasto_anterior": row.valor_gasto,
+                        "valor_gasto": row.total,
+                        "status": status,
+                    }
+                )
+
+        if not changes:
+            return []
+
+        # Uma linha por período, como VALUES, mas com um parâmetro (array) por
+        # coluna: o SQL é o mesmo em todo trecho (cache de compilação) em vez
+        # de milhares de parâmetros renderizados a cada trecho
+        columns = {
+            "id": ("period_id", PG_UUID(as_uuid=True)),
+            "anterior": ("valor_gasto_anterior", Numeric(10, 2)),
+            "valor_gasto": ("valor_gasto", Numeric(10, 2)),
+            "status": ("status", String),
+        }
+        recalculated = (
+            func.unnest(
+                *[
+                    bindparam(
+                        name, [change[key] for change in changes], type_=ARRAY(type_)
+                    )
+                    for name, (key, type_) in columns.items()
+                ]
+            )
+            .table_valued(*columns)
+            .render_derived(name="recalculated")
+        )
+        valor_gasto = recalculated.c.valor_gasto
+        # Períodos com despesa concorrente (valor_gasto mudou desde a soma) não
+        # são gravados nem informados como corrigidos
+        updated_ids = set(
+            db.scalars(
+                update(BudgetPeriod)
+                .where(
+                    BudgetPeriod.id == recalculated.c.id,
+                    BudgetPeriod.valor_gasto == recalculated.c.anterior,
+                    BudgetPeriod.budget_id == Budget.id,
+                )
+                .values(
+                    {
+                        BudgetPeriod.valor_gasto: valor_gasto,
+                        BudgetPeriod.status: recalculated.c.status,
+                        # Mesmas regras de spend_update para liberar os alertas
+                        BudgetPeriod.alerta_enviado: case(
+                            (
+                                valor_gasto * 100
+                                < BudgetPeriod.valor_limite * Budget.notificar_em,
+                                False,
+                            ),
+                            else_=BudgetPeriod.alerta_enviado,
+                        ),
+                        BudgetPeriod.estouro_enviado: case(
+                            (valor_gasto <= BudgetPeriod.valor_limite, False),
+                            else_=BudgetPeriod.estouro_enviado,
+                        ),
+                    }
+                )
+                .returning(BudgetPeriod.id)
+                .execution_options(synchronize_session=False)
+            )
+        )
+        return [change for change in changes if change["period_id"] in updated_ids]
 
 
 budget = CRUDBudget(Budget)
@@ -120,15 +120,27 @@ class CRUDCommitment(CRUDBase[Commitment, CommitmentCreate, CommitmentUpdate]):
         )
 
     def get_pendentes_sincronizacao(
-        self, db: Session, *, usuario_id: Optional[UUID] = None, limit: int = 100
+        self,
+        db: Session,
+        *,
+        usuario_id: Optional[UUID] = None,
+        after_id: Optional[UUID] = None,
+        limit: int = 100,
     ) -> List[Commitment]:
-        """Busca compromissos que precisam ser sincronizados com Google."""
+        """
+        Busca compromissos que precisam ser sincronizados com Google.
+
+        Em ordem de id: after_id pagina os pendentes (os que falharam
+        continuam pendentes e não voltam na próxima página).
+        """
         query = db.query(Commitment).filter(Commitment.precisa_sincronizar)
 
         if usuario_id:
             query = query.filter(Commitment.usuario_id == usuario_id)
+        if after_id:
+            query = query.filter(Commitment.id > after_id)
 
-        return query.limit(limit).all()
+        return query.order_by(Commitment.id).limit(limit).all()
 
     def create_with_sync_flag(
         self, db: Session, *, obj_in: CommitmentCreate
@@ -0,0 +1,331 @@
+"""
+Fila dos jobs de manutenção (tabela background_jobs).
+
+Um job é reservado por um único worker com UPDATE ... WHERE id = (SELECT ...
+FOR UPDATE SKIP LOCKED) RETURNING: workers concorrentes (processos do
+uvicorn, réplicas) nunca pegam o mesmo job e não esperam um pelo outro. A
+reserva vale por um lease renovado a cada progresso; se o worker morrer, o job
+volta a ser reservado quando o lease expira e continua do checkpoint.
+
+Toda escrita de um job reservado confere locked_by: um worker que perdeu o
+lease não sobrescreve o estado gravado por quem o reservou depois.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.models.job import JOB_ACTIVE_STATUSES, BackgroundJob
+
+
+class CRUDBackgroundJob:
+    """Enfileiramento, reserva com lease e conclusão dos jobs."""
+
+    # ========================================================================
+    # Read Operations
+    # ========================================================================
+
+    @staticmethod
+    def get(db: Session, job_id: UUID) -> Optional[BackgroundJob]:
+        """Busca um job pelo id."""
+        return db.get(BackgroundJob, job_id, populate_existing=True)
+
+    @staticmethod
+    def get_multi(
+        db: Session,
+        *,
+        name: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[BackgroundJob]:
+        """Jobs mais recentes primeiro, opcionalmente por nome e status."""
+        query = db.query(BackgroundJob)
+
+        if name:
+            query = query.filter(BackgroundJob.name == name)
+        if status:
+            query = query.filter(BackgroundJob.status == status)
+
+        return query.order_by(BackgroundJob.created_at.desc()).limit(limit).all()
+
+    @staticmethod
+    def get_active(db: Session, name: str) -> Optional[BackgroundJob]:
+        """Job pendente ou rodando com esse nome (no máximo um)."""
+        return (
+            db.query(BackgroundJob)
+            .filter(
+                BackgroundJob.name == name,
+                BackgroundJob.status.in_(JOB_ACTIVE_STATUSES),
+            )
+            .populate_existing()
+            .first()
+        )
+
+    @staticmethod
+    def get_active_names(db: Session) -> List[str]:
+        """Nomes com job pendente ou rodando."""
+        return db.scalars(
+            select(BackgroundJob.name).where(
+                BackgroundJob.status.in_(JOB_ACTIVE_STATUSES)
+            )
+        ).all()
+
+    @staticmethod
+    def get_last_finished_at(db: Session, name: str) -> Optional[datetime]:
+        """Fim da última execução concluída (com sucesso ou não) do job."""
+        return db.scalar(
+            select(func.max(BackgroundJob.finished_at)).where(
+                BackgroundJob.name == name
+            )
+        )
+
+    # ========================================================================
+    # Enqueue
+    # ========================================================================
+
+    @staticmethod
+    def enqueue(
+        db: Session,
+        *,
+        name: str,
+        max_attempts: int,
+        triggered_by: str = "manual",
+        run_at: Optional[datetime] = None,
+        commit: bool = True,
+    ) -> BackgroundJob:
+        """
+        Enfileira o job, sem duplicar: se já houver um pendente ou rodando com
+        esse nome, retorna esse job.
+
+        Disparo manual de um job pendente para o futuro antecipa-o para agora.
+        """
+        stmt = (
+            pg_insert(BackgroundJob)
+            .values(
+                name=name,
+                status="pending",
+                triggered_by=triggered_by,
+                run_at=run_at if run_at is not None else func.now(),
+                max_attempts=max_attempts,
+            )
+            .on_conflict_do_nothing(
+                index_elements=[BackgroundJob.name],
+                index_where=BackgroundJob.status.in_(JOB_ACTIVE_STATUSES),
+            )
+            .returning(BackgroundJob)
+            .execution_options(populate_existing=True)
+        )
+        job = db.scalars(stmt).first()
+
+        if job is None:
+            job = CRUDBackgroundJob.get_active(db, name)
+            if job is not None and job.status == "pending" and run_at is None:
+                job = db.scalars(
+                    update(BackgroundJob)
+                    .where(BackgroundJob.id == job.id)
+                    .values(
+                        run_at=func.least(BackgroundJob.run_at, func.now()),
+                        triggered_by=triggered_by,
+                    )
+                    .returning(BackgroundJob)
+                    .execution_options(
+                        populate_existing=True, synchronize_session=False
+                    )
+                ).first()
+
+        if commit:
+            db.commit()
+        return job
+
+    # ========================================================================
+    # Worker Operations (lease)
+    # ========================================================================
+
+    @staticmethod
+    def claim(
+        db: Session, *, names: Sequence[str], worker_id: str, lease_seconds: float
+    ) -> Optional[BackgroundJob]:
+        """
+        Reserva o próximo job vencido (pendente com run_at no passado, ou
+        rodando com lease expirado e tentativas sobrando) para worker_id.
+
+        Conta uma tentativa e faz commit. Returns: o job reservado ou None.
+        """
+        candidate = (
+            select(BackgroundJob.id)
+            .where(
+                BackgroundJob.name.in_(names),
+                or_(
+                    and_(
+                        BackgroundJob.status == "pending",
+                        BackgroundJob.run_at <= func.now(),
+                    ),
+                    and_(
+                        BackgroundJob.status == "running",
+                        BackgroundJob.lease_expires_at < func.now(),
+                        BackgroundJob.attempts < BackgroundJob.max_attempts,
+                    ),
+                ),
+            )
+            .order_by(BackgroundJob.run_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        job = db.scalars(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == candidate)
+            .values(
+                status="running",
+                locked_by=worker_id,
+                lease_expires_at=func.now() + timedelta(seconds=lease_seconds),
+                attempts=BackgroundJob.attempts + 1,
+                started_at=func.coalesce(BackgroundJob.started_at, func.now()),
+            )
+            .returning(BackgroundJob)
+            .execution_options(populate_existing=True, synchronize_session=False)
+        ).first()
+        db.commit()
+        return job
+
+    @staticmethod
+    def _owned(job_id: UUID, worker_id: str):
+        return and_(
+            BackgroundJob.id == job_id,
+            BackgroundJob.status == "running",
+            BackgroundJob.locked_by == worker_id,
+        )
+
+    @staticmethod
+    def heartbeat(
+        db: Session,
+        *,
+        job_id: UUID,
+        worker_id: str,
+        lease_seconds: float,
+        progress: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """
+        Renova o lease (e grava o checkpoint, se informado).
+
+        Returns: False se o job não está mais reservado para worker_id.
+        """
+        values = {"lease_expires_at": func.now() + timedelta(seconds=lease_seconds)}
+        if progress is not None:
+            values["progress"] = progress
+
+        updated = db.execute(
+            update(BackgroundJob)
+            .where(CRUDBackgroundJob._owned(job_id, worker_id))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return updated > 0
+
+    @staticmethod
+    def complete(
+        db: Session, *, job_id: UUID, worker_id: str, result: Dict[str, Any]
+    ) -> bool:
+        """Marca o job como concluído (sem commit). False se perdeu o lease."""
+        return (
+            db.execute(
+                update(BackgroundJob)
+                .where(CRUDBackgroundJob._owned(job_id, worker_id))
+                .values(
+                    status="succeeded",
+                    result=result,
+                    error=None,
+                    locked_by=None,
+                    lease_expires_at=None,
+                    finished_at=func.now(),
+                )
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            > 0
+        )
+
+    @staticmethod
+    def fail(
+        db: Session,
+        *,
+        job_id: UUID,
+        worker_id: str,
+        error: str,
+        retry_in_seconds: Optional[float] = None,
+    ) -> bool:
+        """
+        Registra a falha (sem commit): volta para pendente em
+        retry_in_seconds, ou falha de vez se None. False se perdeu o lease.
+        """
+        if retry_in_seconds is not None:
+            values = {
+                "status": "pending",
+                "run_at": func.now() + timedelta(seconds=retry_in_seconds),
+            }
+        else:
+            values = {"status": "failed", "finished_at": func.now()}
+
+        return (
+            db.execute(
+                update(BackgroundJob)
+                .where(CRUDBackgroundJob._owned(job_id, worker_id))
+                .values(error=error, locked_by=None, lease_expires_at=None, **values)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            > 0
+        )
+
+    @staticmethod
+    def release(db: Session, *, job_id: UUID, worker_id: str) -> bool:
+        """
+        Devolve o job para a fila sem contar a tentativa (worker encerrando).
+        """
+        released = db.execute(
+            update(BackgroundJob)
+            .where(CRUDBackgroundJob._owned(job_id, worker_id))
+            .values(
+                status="pending",
+                run_at=func.now(),
+                attempts=BackgroundJob.attempts - 1,
+                locked_by=None,
+                lease_expires_at=None,
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return released > 0
+
+    @staticmethod
+    def fail_abandoned(db: Session) -> List[str]:
+        """
+        Falha de vez os jobs com lease expirado e sem tentativas sobrando
+        (o worker morreu em todas). Returns: nomes dos jobs falhados.
+        """
+        names = db.scalars(
+            update(BackgroundJob)
+            .where(
+                BackgroundJob.status == "running",
+                BackgroundJob.lease_expires_at < func.now(),
+                BackgroundJob.attempts >= BackgroundJob.max_attempts,
+            )
+            .values(
+                status="failed",
+                error="Lease expirado: worker interrompido na última tentativa",
+                locked_by=None,
+                lease_expires_at=None,
+                finished_at=func.now(),
+            )
+            .returning(BackgroundJob.name)
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.commit()
+        return names
+
+
+background_job = CRUDBackgroundJob()
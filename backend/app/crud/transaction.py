@@ -1,29 +1,140 @@
+from collections import Counter
 from datetime import date, datetime
-from typing import List, Optional
-from uuid import UUID
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Union
+from uuid import UUID, uuid4
 
-from sqlalchemy import and_, desc, func
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Date, and_, cast, desc, func, insert, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 
+from app.core.config import settings
 from app.crud.base import CRUDBase
+from app.crud.transaction_rollup import transaction_rollup
+from app.crud.usage_counter import usage_counter
 from app.models.category import Category
-from app.models.transaction import Transaction
+from app.models.transaction import Transaction, TransactionDailyRollup
 from app.schemas.transaction import TransactionCreate, TransactionUpdate
 
 
 class CRUDTransaction(CRUDBase[Transaction, TransactionCreate, TransactionUpdate]):
+    # ========================================================================
+    # Write Operations (rollup diário e gasto dos orçamentos no mesmo commit)
+    # ========================================================================
+
+    def create(self, db: Session, *, obj_in: TransactionCreate) -> Transaction:
+        db_obj = self.create_flush(db, obj_in=obj_in)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def create_flush(self, db: Session, *, obj_in: TransactionCreate) -> Transaction:
+        """
+        Cria a transação sem commit (flush), com o rollup na mesma transação.
+
+        O INSERT ... RETURNING já traz os defaults do banco (data_transacao,
+        data_registro), então o objeto pode ser usado sem refresh.
+        """
+        db_obj = self.model(**self._create_data(obj_in))
+        db.add(db_obj)
+        transaction_rollup.apply(db, new=transaction_rollup.entry_for(db_obj))
+        db.flush()
+        return db_obj
+
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: Transaction,
+        obj_in: Union[TransactionUpdate, Dict[str, Any]],
+    ) -> Transaction:
+        from app.services.budget_service import budget_service
+
+        old = transaction_rollup.entry_for(db_obj)
+        self._set_fields(db_obj, obj_in)
+        new = transaction_rollup.entry_for(db_obj)
+        transaction_rollup.apply(db, old=old, new=new)
+        budget_service.apply_transaction_change(db, old=old, new=new)
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def remove(self, db: Session, *, id: Any) -> Transaction:
+        from app.services.budget_service import budget_service
+
+        obj = db.query(self.model).get(id)
+        old = transaction_rollup.entry_for(obj)
+        transaction_rollup.apply(db, old=old)
+        budget_service.apply_transaction_change(db, old=old)
+        db.delete(obj)
+        db.commit()
+        return obj
+
+    def create_bulk(self, db: Session, *, rows: List[Dict[str, Any]]) -> List[UUID]:
+        """
+        Insere várias transações de uma vez (sem commit).
+
+        Um INSERT de várias linhas (executemany em lotes do driver) no lugar
+        de um flush por objeto; rollup e contadores de uso recebem os deltas
+        agregados do lote na mesma transação.
+
+        Args:
+            rows: Colunas de cada transação (usuario_id, valor, tipo, ...)
+
+        Returns:
+            IDs das transações, na ordem de rows
+        """
+        if not rows:
+            return []
+
+        today = date.today()
+        rows = [
+            {**row, "id": uuid4(), "data_transacao": row.get("data_transacao") or today}
+            for row in rows
+        ]
+        # INSERT na tabela (Core): o bulk do ORM quebra o lote a cada troca
+        # de colunas None (ex: categoria_id), gerando um comando por trecho
+        db.execute(insert(Transaction.__table__), rows)
+
+        transaction_rollup.apply_bulk(
+            db,
+            (
+                {
+                    "usuario_id": row["usuario_id"],
+                    "data": row["data_transacao"],
+                    "categoria_id": row.get("categoria_id") or 0,
+                    "tipo": row["tipo"],
+                    "valor": row["valor"],
+                }
+                for row in rows
+            ),
+        )
+
+        if settings.USAGE_COUNTERS_ENABLED:
+            per_user = Counter(row["usuario_id"] for row in rows)
+            for usuario_id, amount in per_user.items():
+                usage_counter.record_created(
+                    db, user_id=usuario_id, counter="transactions", amount=amount
+                )
+
+        return [row["id"] for row in rows]
+
     def create_with_budget_update(
         self, db: Session, *, obj_in: TransactionCreate
     ) -> tuple[Transaction, Optional[dict]]:
         """
         Cria transação e atualiza orçamentos automaticamente.
 
+        Uma única unidade de trabalho: transação, rollup, contadores de uso
+        (e reservas de limite já feitas na sessão) e gasto do orçamento vão
+        no mesmo commit.
+
         Returns:
             tuple: (Transaction, alert_info dict ou None)
                 alert_info contém informações do alerta se houver estouro/aviso
         """
-        # Criar transação normalmente
-        transaction = self.create(db, obj_in=obj_in)
+        transaction = self.create_flush(db, obj_in=obj_in)
 
         alert_info = None
 
@@ -43,6 +154,7 @@ class CRUDTransaction(CRUDBase[Transaction, TransactionCreate, TransactionUpdate
                 tipo=transaction.tipo,
             )
 
+        db.commit()
         return transaction, alert_info
 
     def get_by_user(
@@ -73,6 +185,20 @@ class CRUDTransaction(CRUDBase[Transaction, TransactionCreate, TransactionUpdate
             .all()
         )
 
+    # ========================================================================
+    # Summaries (transaction_daily_rollup: custo O(dias), não O(transações))
+    # ========================================================================
+
+    @staticmethod
+    def _rollup_filters(
+        usuario_id: UUID, data_inicio: Optional[date], data_fim: Optional[date]
+    ) -> list:
+        filters = [TransactionDailyRollup.usuario_id == usuario_id]
+        if data_inicio and data_fim:
+            filters.append(TransactionDailyRollup.data >= data_inicio)
+            filters.append(TransactionDailyRollup.data <= data_fim)
+        return filters
+
     def get_summary_by_user(
         self,
         db: Session,
@@ -81,30 +207,31 @@ class CRUDTransaction(CRUDBase[Transaction, TransactionCreate, TransactionUpdate
         data_inicio: Optional[date] = None,
         data_fim: Optional[date] = None,
     ) -> dict:
-        query = db.query(Transaction).filter(Transaction.usuario_id == usuario_id)
-
-        if data_inicio and data_fim:
-            query = query.filter(
-                and_(
-                    Transaction.data_transacao >= data_inicio,
-                    Transaction.data_transacao <= data_fim,
-                )
+        """Totais e quantidades por tipo."""
+        query = (
+            db.query(
+                TransactionDailyRollup.tipo,
+                func.sum(TransactionDailyRollup.total).label("total"),
+                func.sum(TransactionDailyRollup.quantidade).label("quantidade"),
             )
+            .filter(*self._rollup_filters(usuario_id, data_inicio, data_fim))
+            .group_by(TransactionDailyRollup.tipo)
+        )
 
-        # Get totals by type
-        receitas = query.filter(Transaction.tipo == "receita").all()
-        despesas = query.filter(Transaction.tipo == "despesa").all()
+        totals = {row.tipo: row for row in query.all()}
+        receitas = totals.get("receita")
+        despesas = totals.get("despesa")
 
-        total_receitas = sum(t.valor for t in receitas)
-        total_despesas = sum(t.valor for t in despesas)
+        total_receitas = receitas.total if receitas else Decimal("0")
+        total_despesas = despesas.total if despesas else Decimal("0")
         saldo = total_receitas - total_despesas
 
         return {
             "total_receitas": total_receitas,
             "total_despesas": total_despesas,
             "saldo": saldo,
-            "receitas": len(receitas),
-            "despesas": len(despesas),
+            "receitas": int(receitas.quantidade) if receitas else 0,
+            "despesas": int(despesas.quantidade) if despesas else 0,
         }
 
     def get_by_category_summary(
@@ -115,31 +242,248 @@ class CRUDTransaction(CRUDBase[Transaction, TransactionCreate, TransactionUpdate
         data_inicio: Optional[date] = None,
         data_fim: Optional[date] = None,
     ) -> List[dict]:
+        # Literais inline: com parâmetros ($1, $2...) o GROUP BY não casa com o SELECT
+        categoria_id = TransactionDailyRollup.categoria_id
+        categoria_nome = func.coalesce(Category.nome, literal_column("'Sem categoria'"))
+        tipo = func.coalesce(Category.tipo, TransactionDailyRollup.tipo)
+
+        return (
+            db.query(
+                categoria_id.label("categoria_id"),
+                categoria_nome.label("categoria_nome"),
+                tipo.label("tipo"),
+                func.sum(TransactionDailyRollup.total).label("total_valor"),
+                func.sum(TransactionDailyRollup.quantidade).label("total_transacoes"),
+            )
+            .outerjoin(Category, Category.id == TransactionDailyRollup.categoria_id)
+            .filter(*self._rollup_filters(usuario_id, data_inicio, data_fim))
+            .group_by(categoria_id, categoria_nome, tipo)
+            .all()
+        )
+
+    def get_category_totals(
+        self,
+        db: Session,
+        *,
+        usuario_id: UUID,
+        data_inicio: date,
+        data_fim: date,
+        tipo: Optional[str] = None,
+        categoria_ids: Optional[List[int]] = None,
+    ) -> List[dict]:
+        """Total e quantidade por (nome da categoria, tipo), do maior para o menor."""
+        categoria_nome = func.coalesce(Category.nome, literal_column("'Sem categoria'"))
+        total = func.sum(TransactionDailyRollup.total)
+
         query = (
             db.query(
-                func.coalesce(Category.id, 0).label("categoria_id"),
-                func.coalesce(Category.nome, "Sem categoria").label("categoria_nome"),
-                func.coalesce(Category.tipo, Transaction.tipo).label("tipo"),
-                func.sum(Transaction.valor).label("total_valor"),
-                func.count(Transaction.id).label("total_transacoes"),
+                categoria_nome.label("categoria"),
+                TransactionDailyRollup.tipo.label("tipo"),
+                total.label("valor"),
+                func.sum(TransactionDailyRollup.quantidade).label("quantidade"),
             )
-            .outerjoin(Transaction.categoria)
-            .filter(Transaction.usuario_id == usuario_id)
+            .outerjoin(Category, Category.id == TransactionDailyRollup.categoria_id)
+            .filter(*self._rollup_filters(usuario_id, data_inicio, data_fim))
         )
 
-        if data_inicio and data_fim:
-            query = query.filter(
-                and_(
-                    Transaction.data_transacao >= data_inicio,
-                    Transaction.data_transacao <= data_fim,
-                )
+        if tipo:
+            query = query.filter(TransactionDailyRollup.tipo == tipo)
+        if categoria_ids:
+            query = query.filter(TransactionDailyRollup.categoria_id.in_(categoria_ids))
+
+        return (
+            query.group_by(categoria_nome, TransactionDailyRollup.tipo)
+            .order_by(desc(total))
+            .all()
+        )
+
+    def get_expenses_by_category(
+        self, db: Session, *, usuario_id: UUID, data_inicio: date, data_fim: date
+    ) -> List[dict]:
+        """Total de despesas por nome de categoria, do maior para o menor."""
+        return self.get_category_totals(
+            db,
+            usuario_id=usuario_id,
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+            tipo="despesa",
+        )
+
+    def get_daily_evolution(
+        self, db: Session, *, usuario_id: UUID, data_inicio: date, data_fim: date
+    ) -> List[dict]:
+        """
+        Receitas, despesas e saldo acumulado por dia do período.
+
+        Dias sem transação vêm do generate_series (zerados) e o saldo acumulado
+        é calculado com SUM() OVER no próprio banco.
+        """
+        dias = select(
+            cast(
+                func.generate_series(
+                    cast(data_inicio, Date),
+                    cast(data_fim, Date),
+                    literal_column("interval '1 day'"),
+                ),
+                Date,
+            ).label("dia")
+        ).subquery("dias")
+
+        diario = (
+            select(
+                TransactionDailyRollup.data.label("dia"),
+                func.sum(TransactionDailyRollup.total)
+                .filter(TransactionDailyRollup.tipo == "receita")
+                .label("receitas"),
+                func.sum(TransactionDailyRollup.total)
+                .filter(TransactionDailyRollup.tipo == "despesa")
+                .label("despesas"),
+            )
+            .where(*self._rollup_filters(usuario_id, data_inicio, data_fim))
+            .group_by(TransactionDailyRollup.data)
+            .subquery("diario")
+        )
+
+        receitas = func.coalesce(diario.c.receitas, 0)
+        despesas = func.coalesce(diario.c.despesas, 0)
+
+        query = (
+            select(
+                dias.c.dia,
+                receitas.label("receitas"),
+                despesas.label("despesas"),
+                func.sum(receitas - despesas).over(order_by=dias.c.dia).label("saldo"),
             )
+            .select_from(dias.outerjoin(diario, diario.c.dia == dias.c.dia))
+            .order_by(dias.c.dia)
+        )
+        return db.execute(query).all()
+
+    # ========================================================================
+    # Async Operations (AsyncSession)
+    # ========================================================================
+
+    async def create_async(
+        self, db: AsyncSession, *, obj_in: TransactionCreate
+    ) -> Transaction:
+        db_obj = self.model(**self._create_data(obj_in))
+        db.add(db_obj)
+        await transaction_rollup.apply_async(
+            db, new=transaction_rollup.entry_for(db_obj)
+        )
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def update_async(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: Transaction,
+        obj_in: Union[TransactionUpdate, Dict[str, Any]],
+    ) -> Transaction:
+        from app.services.budget_service import budget_service
+
+        old = transaction_rollup.entry_for(db_obj)
+        self._set_fields(db_obj, obj_in)
+        new = transaction_rollup.entry_for(db_obj)
+        await transaction_rollup.apply_async(db, old=old, new=new)
+        await db.run_sync(budget_service.apply_transaction_change, old, new)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def remove_async(self, db: AsyncSession, *, id: Any) -> Transaction:
+        from app.services.budget_service import budget_service
+
+        obj = await db.get(self.model, id)
+        old = transaction_rollup.entry_for(obj)
+        await transaction_rollup.apply_async(db, old=old)
+        await db.run_sync(budget_service.apply_transaction_change, old)
+        await db.delete(obj)
+        await db.commit()
+        return obj
+
+    async def get_with_category_async(
+        self, db: AsyncSession, *, id: UUID
+    ) -> Optional[Transaction]:
+        """Busca transação já com a categoria carregada (sem lazy load)."""
+        result = await db.execute(
+            select(Transaction)
+            .options(selectinload(Transaction.categoria))
+            .where(Transaction.id == id)
+        )
+        return result.scalars().first()
 
-        return query.group_by(
-            func.coalesce(Category.id, 0),
-            func.coalesce(Category.nome, "Sem categoria"),
-            func.coalesce(Category.tipo, Transaction.tipo),
-        ).all()
+    async def create_with_budget_update_async(
+        self,
+        db: AsyncSession,
+        *,
+        obj_in: TransactionCreate,
+        with_categoria: bool = True,
+    ) -> tuple[Transaction, Optional[dict]]:
+        """
+        Versão assíncrona de create_with_budget_update.
+
+        with_categoria=False não carrega a relação categoria (quem chama já tem
+        a categoria do catálogo em memória).
+        """
+        transaction, alert_info = await db.run_sync(
+            self.create_with_budget_update, obj_in=obj_in
+        )
+        if with_categoria:
+            await db.refresh(transaction, attribute_names=["categoria"])
+        return transaction, alert_info
+
+    async def get_summary_by_user_async(
+        self,
+        db: AsyncSession,
+        *,
+        usuario_id: UUID,
+        data_inicio: Optional[date] = None,
+        data_fim: Optional[date] = None,
+    ) -> dict:
+        return await db.run_sync(
+            self.get_summary_by_user,
+            usuario_id=usuario_id,
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+        )
+
+    async def get_by_category_summary_async(
+        self,
+        db: AsyncSession,
+        *,
+        usuario_id: UUID,
+        data_inicio: Optional[date] = None,
+        data_fim: Optional[date] = None,
+    ) -> List[dict]:
+        return await db.run_sync(
+            self.get_by_category_summary,
+            usuario_id=usuario_id,
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+        )
+
+    async def get_category_totals_async(
+        self,
+        db: AsyncSession,
+        *,
+        usuario_id: UUID,
+        data_inicio: date,
+        data_fim: date,
+        tipo: Optional[str] = None,
+        categoria_ids: Optional[List[int]] = None,
+    ) -> List[dict]:
+        return await db.run_sync(
+            self.get_category_totals,
+            usuario_id=usuario_id,
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+            tipo=tipo,
+            categoria_ids=categoria_ids,
+        )
 
 
 transaction = CRUDTransaction(Transaction)
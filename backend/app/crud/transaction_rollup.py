@@ -0,0 +1,235 @@
+"""
+Manutenção da tabela transaction_daily_rollup.
+
+Cada escrita de transação gera deltas (+/- valor, +/- 1) aplicados com
+INSERT ... ON CONFLICT DO UPDATE na mesma transação do banco, então o rollup
+nunca diverge das transações já commitadas.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import (
+    and_,
+    delete,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+    text,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.transaction import Transaction, TransactionDailyRollup
+
+_KEY_COLUMNS = ("usuario_id", "data", "categoria_id", "tipo")
+
+
+class CRUDTransactionRollup:
+    """Deltas incrementais e reconstrução do rollup diário de transações."""
+
+    @staticmethod
+    def entry_for(transaction: Transaction) -> Dict[str, Any]:
+        """
+        Chave e valor que a transação contribui para o rollup.
+
+        Deve ser chamado antes do flush: data_transacao ainda None usa a data
+        do banco (mesmo default da coluna).
+        """
+        return {
+            "usuario_id": transaction.usuario_id,
+            "data": transaction.data_transacao,
+            "categoria_id": transaction.categoria_id or 0,
+            "tipo": transaction.tipo,
+            "valor": transaction.valor,
+        }
+
+    @staticmethod
+    def _delta_statement(entry: Dict[str, Any], sign: int):
+        stmt = pg_insert(TransactionDailyRollup).values(
+            usuario_id=entry["usuario_id"],
+            data=(entry["data"] if entry["data"] is not None else func.current_date()),
+            categoria_id=entry["categoria_id"],
+            tipo=entry["tipo"],
+            total=entry["valor"] * sign,
+            quantidade=sign,
+        )
+        return stmt.on_conflict_do_update(
+            index_elements=list(_KEY_COLUMNS),
+            set_={
+                "total": TransactionDailyRollup.total + stmt.excluded.total,
+                "quantidade": TransactionDailyRollup.quantidade
+                + stmt.excluded.quantidade,
+            },
+        )
+
+    @staticmethod
+    def _cleanup_statement(entry: Dict[str, Any]):
+        """Remove a linha do dia quando a última transação dela sai."""
+        return delete(TransactionDailyRollup).where(
+            *[
+                getattr(TransactionDailyRollup, column) == entry[column]
+                for column in _KEY_COLUMNS
+            ],
+            TransactionDailyRollup.quantidade <= 0,
+        )
+
+    def _statements(
+        self, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]
+    ) -> List:
+        if old == new:
+            return []
+
+        statements = []
+        if old is not None:
+            statements.append(self._delta_statement(old, -1))
+            statements.append(self._cleanup_statement(old))
+        if new is not None:
+            statements.append(self._delta_statement(new, 1))
+        return statements
+
+    def apply(
+        self,
+        db: Session,
+        *,
+        old: Optional[Dict[str, Any]] = None,
+        new: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Aplica a troca old -> new no rollup (sem commit).
+
+        old=None para criação, new=None para exclusão.
+        """
+        for statement in self._statements(old, new):
+            db.execute(statement)
+
+    async def apply_async(
+        self,
+        db: AsyncSession,
+        *,
+        old: Optional[Dict[str, Any]] = None,
+        new: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Versão assíncrona de apply."""
+        for statement in self._statements(old, new):
+            await db.execute(statement)
+
+    def apply_bulk(self, db: Session, entries: Iterable[Dict[str, Any]]) -> None:
+        """
+        Soma as entradas de transações novas ao rollup (sem commit).
+
+        Agrega por chave antes e grava tudo em um único INSERT ... ON CONFLICT
+        de várias linhas (uma linha por dia/categoria/tipo do lote).
+        """
+        totals: Dict[tuple, List] = {}
+        for entry in entries:
+            key = tuple(entry[column] for column in _KEY_COLUMNS)
+            total = totals.setdefault(key, [0, 0])
+            total[0] += entry["valor"]
+            total[1] += 1
+
+        if not totals:
+            return
+
+        stmt = pg_insert(TransactionDailyRollup).values(
+            [
+                {
+                    **dict(zip(_KEY_COLUMNS, key)),
+                    "data": key[1] if key[1] is not None else func.current_date(),
+                    "total": total,
+                    "quantidade": quantidade,
+                }
+                for key, (total, quantidade) in totals.items()
+            ]
+        )
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=list(_KEY_COLUMNS),
+                set_={
+                    "total": TransactionDailyRollup.total + stmt.excluded.total,
+                    "quantidade": TransactionDailyRollup.quantidade
+                    + stmt.excluded.quantidade,
+                },
+            )
+        )
+
+    @staticmethod
+    def _transaction_totals(usuario_id: Optional[UUID] = None):
+        """Rollup calculado direto das transações (fonte da verdade)."""
+        categoria_id = func.coalesce(Transaction.categoria_id, literal_column("0"))
+        query = select(
+            Transaction.usuario_id.label("usuario_id"),
+            Transaction.data_transacao.label("data"),
+            categoria_id.label("categoria_id"),
+            Transaction.tipo.label("tipo"),
+            func.sum(Transaction.valor).label("total"),
+            func.count(Transaction.id).label("quantidade"),
+        ).where(Transaction.data_transacao.is_not(None))
+
+        if usuario_id:
+            query = query.where(Transaction.usuario_id == usuario_id)
+
+        return query.group_by(
+            Transaction.usuario_id,
+            Transaction.data_transacao,
+            categoria_id,
+            Transaction.tipo,
+        )
+
+    def rebuild(self, db: Session, *, usuario_id: Optional[UUID] = None) -> int:
+        """
+        Reconstrói o rollup a partir das transações (sem commit).
+
+        Bloqueia escritas no rollup até o commit para que transações criadas
+        durante a reconstrução não sejam contadas duas vezes.
+        """
+        db.execute(
+            text("LOCK TABLE transaction_daily_rollup IN SHARE ROW EXCLUSIVE MODE")
+        )
+
+        delete_stmt = delete(TransactionDailyRollup)
+        if usuario_id:
+            delete_stmt = delete_stmt.where(
+                TransactionDailyRollup.usuario_id == usuario_id
+            )
+        db.execute(delete_stmt)
+
+        result = db.execute(
+            insert(TransactionDailyRollup).from_select(
+                [*_KEY_COLUMNS, "total", "quantidade"],
+                self._transaction_totals(usuario_id),
+            )
+        )
+        return result.rowcount
+
+    def count_mismatches(
+        self, db: Session, *, usuario_id: Optional[UUID] = None
+    ) -> int:
+        """Quantidade de chaves em que o rollup difere das transações."""
+        rollup = select(TransactionDailyRollup)
+        if usuario_id:
+            rollup = rollup.where(TransactionDailyRollup.usuario_id == usuario_id)
+
+        source = self._transaction_totals(usuario_id).subquery("source")
+        rollup = rollup.subquery("rollup")
+        same_key = and_(
+            *[source.c[column] == rollup.c[column] for column in _KEY_COLUMNS]
+        )
+
+        mismatches = (
+            select(func.count())
+            .select_from(source.outerjoin(rollup, same_key, full=True))
+            .where(
+                or_(
+                    source.c.total.is_distinct_from(rollup.c.total),
+                    source.c.quantidade.is_distinct_from(rollup.c.quantidade),
+                )
+            )
+        )
+        return db.execute(mismatches).scalar()
+
+
+transaction_rollup = CRUDTransactionRollup()
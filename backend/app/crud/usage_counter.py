@@ -0,0 +1,570 @@
+"""
+Manutenção da tabela user_usage_counters.
+
+Com USAGE_COUNTERS_ENABLED, cada flush que cria ou apaga transações,
+orçamentos, compromissos ou telefones aplica os deltas por usuário com
+INSERT ... ON CONFLICT DO UPDATE na mesma transação do banco (eventos
+before_flush/after_flush do ORM): os contadores nunca divergem do que foi
+commitado, e as contagens dos limites do plano viram leituras O(1).
+
+Limites do plano são reservados antes da criação com UPDATE ... WHERE uso <
+limite RETURNING na linha do usuário: admite ou rejeita atomicamente (a trava
+da linha serializa criações concorrentes do mesmo usuário), e o flush que cria
+o recurso consome a reserva em vez de contar de novo.
+
+Escritas fora do ORM (UPDATE/DELETE em massa, SQL manual) não passam por
+aqui: reconcilie ou reconstrua com scripts/rebuild_usage_counters.py.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from itertools import chain
+from typing import Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import (
+    and_,
+    case,
+    delete,
+    event,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.budget import Budget
+from app.models.commitment import Commitment
+from app.models.transaction import Transaction
+from app.models.usage_counter import UserUsageCounter
+from app.models.user import User
+from app.models.user_phone import UserPhone
+
+# Chaves em session.info: deltas do flush em andamento e reservas ainda não
+# consumidas por um flush ((user_id, contador) -> quantidade)
+_PENDING_KEY = "usage_counter_pending"
+_RESERVED_KEY = "usage_counter_reserved"
+
+# model -> (coluna do usuário, contador)
+_COUNTED_MODELS = {
+    Transaction: ("usuario_id", "transactions"),
+    Budget: ("usuario_id", "budgets"),
+    Commitment: ("usuario_id", "commitments"),
+    UserPhone: ("user_id", "phones"),
+}
+
+_COUNTER_COLUMNS = ("transactions", "transactions_this_month", "budgets")
+_COUNTER_COLUMNS += ("commitments", "phones")
+
+
+def current_month_start() -> datetime:
+    """Início do mês corrente (UTC), mesmo critério das contagens mensais."""
+    return datetime.now(timezone.utc).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+class CRUDUsageCounter:
+    """Deltas por flush, leitura e reconstrução dos contadores de uso."""
+
+    # ========================================================================
+    # Read
+    # ========================================================================
+
+    @staticmethod
+    def get_counts(db: Session, user_id: UUID) -> Optional[Dict[str, int]]:
+        """Contadores do usuário (None se ainda não há linha para ele)."""
+        row = db.get(UserUsageCounter, user_id, populate_existing=True)
+        if row is None:
+            return None
+
+        this_month = current_month_start().date()
+        return {
+            "transactions_this_month": (
+                row.transactions_this_month
+                if row.transactions_month == this_month
+                else 0
+            ),
+            "total_transactions": row.transactions,
+            "budgets": row.budgets,
+            "commitments": row.commitments,
+            "phones": row.phones,
+        }
+
+    # ========================================================================
+    # Incremental maintenance
+    # ========================================================================
+
+    @staticmethod
+    def deltas_for_flush(session: Session) -> Dict[UUID, Dict[str, int]]:
+        """
+        Deltas por usuário das linhas a criar/apagar no próximo flush.
+
+        Chamado no before_flush (objetos apagados ainda podem ser carregados).
+        Transação nova sem data_registro = agora (default do banco). Criações
+        cobertas por uma reserva já foram contadas e consomem a reserva.
+        """
+        month_start = current_month_start()
+        reserved = session.info.get(_RESERVED_KEY, {})
+        deltas: Dict[UUID, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        # Usuários apagados levam os contadores junto (ON DELETE CASCADE)
+        deleted_users = {obj.id for obj in session.deleted if isinstance(obj, User)}
+
+        for obj, sign in chain(
+            ((obj, 1) for obj in session.new), ((obj, -1) for obj in session.deleted)
+        ):
+            counted = _COUNTED_MODELS.get(type(obj))
+            if counted is None:
+                continue
+
+            user_column, counter = counted
+            user_id = getattr(obj, user_column)
+            if user_id is None or user_id in deleted_users:
+                continue
+
+            if sign > 0 and reserved.get((user_id, counter)):
+                reserved[(user_id, counter)] -= 1
+                continue
+
+            deltas[user_id][counter] += sign
+            if counter == "transactions":
+                registered = obj.data_registro
+                if registered is None or registered >= month_start:
+                    deltas[user_id]["transactions_this_month"] += sign
+
+        return deltas
+
+    @staticmethod
+    def _upsert_statement(user_id: UUID, delta: Dict[str, int], month: date):
+        stmt = pg_insert(UserUsageCounter).values(
+            user_id=user_id,
+            transactions_month=month,
+            **{column: max(delta.get(column, 0), 0) for column in _COUNTER_COLUMNS},
+        )
+
+        # Contagem do mês recomeça quando o mês gravado não é o atual
+        same_month = UserUsageCounter.transactions_month == month
+        this_month = case(
+            (same_month, UserUsageCounter.transactions_this_month), else_=0
+        )
+
+        updates = {
+            column: func.greatest(
+                getattr(UserUsageCounter, column) + delta.get(column, 0), 0
+            )
+            for column in ("transactions", "budgets", "commitments", "phones")
+            if delta.get(column)
+        }
+        updates["transactions_this_month"] = func.greatest(
+            this_month + delta.get("transactions_this_month", 0), 0
+        )
+        updates["transactions_month"] = month
+        updates["updated_at"] = func.now()
+
+        return stmt.on_conflict_do_update(index_elements=["user_id"], set_=updates)
+
+    def apply(self, connection, deltas: Dict[UUID, Dict[str, int]]) -> None:
+        """Aplica os deltas (na conexão/transação corrente, sem commit)."""
+        month = current_month_start().date()
+        for user_id, delta in deltas.items():
+            if any(delta.values()):
+                connection.execute(self._upsert_statement(user_id, delta, month))
+
+    # ========================================================================
+    # Quota reservation
+    # ========================================================================
+
+    @staticmethod
+    def _used(counter: str, month: date):
+        """Uso corrente de `counter` (limite mensal: outro mês vale 0)."""
+        counters = UserUsageCounter.__table__
+        if counter == "transactions":
+            return case(
+                (
+                    counters.c.transactions_month == month,
+                    counters.c.transactions_this_month,
+                ),
+                else_=0,
+            )
+        return counters.c[counter]
+
+    def _reserve_statement(
+        self, user_id: UUID, counter: str, limit: int, amount: int, month: date
+    ):
+        counters = UserUsageCounter.__table__
+        used = self._used(counter, month)
+
+        if counter == "transactions":
+            values = {
+                counters.c.transactions_this_month: used + amount,
+                counters.c.transactions_month: month,
+                counters.c.transactions: counters.c.transactions + amount,
+            }
+            returned = counters.c.transactions_this_month
+        else:
+            values = {used: used + amount}
+            returned = used
+        values[counters.c.updated_at] = func.now()
+
+        return (
+            update(counters)
+            .where(counters.c.user_id == user_id, used + amount <= limit)
+            .values(values)
+            .returning(returned)
+        )
+
+    @staticmethod
+    def _has_row(db: Session, user_id: UUID) -> bool:
+        """Se o usuário já tem linha de contadores (leitura pela PK)."""
+        counters = UserUsageCounter.__table__
+        return (
+            db.execute(
+                select(counters.c.user_id).where(counters.c.user_id == user_id)
+            ).first()
+            is not None
+        )
+
+    def _seed(self, db: Session, user_id: UUID) -> None:
+        """Cria a linha do usuário a partir das tabelas, se ainda não existe."""
+        month_start = current_month_start()
+        source = self.source_counts(month_start, user_id).subquery("source")
+        db.execute(
+            pg_insert(UserUsageCounter)
+            .from_select(
+                ["user_id", *_COUNTER_COLUMNS, "transactions_month"],
+                select(
+                    *[source.c[column] for column in ("user_id", *_COUNTER_COLUMNS)],
+                    literal(month_start.date()),
+                ),
+            )
+            .on_conflict_do_nothing(index_elements=["user_id"])
+        )
+
+    def reserve(
+        self,
+        db: Session,
+        *,
+        user_id: UUID,
+        counter: str,
+        limit: int,
+        amount: int = 1,
+    ) -> Optional[int]:
+        """
+        Reserva `amount` unidades de `counter` se couberem em `limit` (tudo ou nada).
+
+        A reserva vale até o fim da transação do banco: o próximo flush que
+        criar o recurso a consome, e um rollback a desfaz junto com o UPDATE.
+        Requer USAGE_COUNTERS_ENABLED (contadores mantidos pelo ORM).
+
+        Args:
+            db: Session do banco
+            user_id: ID do usuário
+            counter: "transactions" (limite mensal), "budgets", "commitments"
+                ou "phones"
+            limit: Limite do plano
+            amount: Unidades a reservar
+
+        Returns:
+            Uso após a reserva, ou None se o limite foi atingido
+        """
+        month = current_month_start().date()
+        statement = self._reserve_statement(user_id, counter, limit, amount, month)
+
+        used = db.execute(statement).scalar()
+        if used is None:
+            if self._has_row(db, user_id):
+                # Limite atingido: rejeita sem recontar as tabelas
+                return None
+            # Sem linha para o usuário: cria a partir das tabelas e tenta de novo
+            self._seed(db, user_id)
+            used = db.execute(statement).scalar()
+        if used is None:
+            return None
+
+        reserved = db.info.setdefault(_RESERVED_KEY, defaultdict(int))
+        reserved[(user_id, counter)] += amount
+        return used
+
+    def reserve_up_to(
+        self, db: Session, *, user_id: UUID, counter: str, limit: int, amount: int
+    ) -> int:
+        """
+        Reserva até `amount` unidades: o que couber no limite.
+
+        Trava a linha do usuário (SELECT ... FOR UPDATE) até o fim da
+        transação, então a quantidade calculada é reservada sem disputa.
+
+        Returns:
+            Unidades reservadas (0 se o limite já foi atingido)
+        """
+        counters = UserUsageCounter.__table__
+        month = current_month_start().date()
+        locked = (
+            select(self._used(counter, month))
+            .where(counters.c.user_id == user_id)
+            .with_for_update()
+        )
+
+        used = db.execute(locked).scalar()
+        if used is None:
+            # Só sem linha para o usuário (com linha, o uso nunca é NULL)
+            self._seed(db, user_id)
+            used = db.execute(locked).scalar() or 0
+
+        granted = max(0, min(amount, limit - used))
+        if granted:
+            self.reserve(
+                db, user_id=user_id, counter=counter, limit=limit, amount=granted
+            )
+        return granted
+
+    def record_created(
+        self, db: Session, *, user_id: UUID, counter: str, amount: int
+    ) -> None:
+        """
+        Conta `amount` linhas criadas fora do ORM (INSERT em lote, sem flush).
+
+        Consome primeiro as reservas da sessão (já contadas); o restante é
+        aplicado como delta. Transações criadas agora contam no mês corrente.
+        """
+        reserved = db.info.get(_RESERVED_KEY, {})
+        covered = min(amount, reserved.get((user_id, counter), 0))
+        if covered:
+            reserved[(user_id, counter)] -= covered
+
+        remaining = amount - covered
+        if remaining:
+            delta = {counter: remaining}
+            if counter == "transactions":
+                delta["transactions_this_month"] = remaining
+            self.apply(db.connection(), {user_id: delta})
+
+    # ========================================================================
+    # Rebuild
+    # ========================================================================
+
+    @staticmethod
+    def source_counts(month_start: datetime, user_id=None):
+        """
+        Contagens calculadas direto das tabelas (fonte da verdade).
+
+        Uma linha por usuário; cada contagem é uma subquery escalar correlata
+        (índice por usuário em cada tabela).
+        """
+
+        def _count(model, user_column, *criteria):
+            column = getattr(model, user_column)
+            return (
+                select(func.count())
+                .select_from(model)
+                .where(column == User.id, *criteria)
+                .scalar_subquery()
+            )
+
+        query = select(
+            User.id.label("user_id"),
+            _count(Transaction, "usuario_id").label("transactions"),
+            _count(
+                Transaction,
+                "usuario_id",
+                Transaction.data_registro >= month_start,
+            ).label("transactions_this_month"),
+            _count(Budget, "usuario_id").label("budgets"),
+            _count(Commitment, "usuario_id").label("commitments"),
+            _count(UserPhone, "user_id").label("phones"),
+        )
+        if user_id:
+            query = query.where(User.id == user_id)
+        return query
+
+    def rebuild(self, db: Session, *, user_id: Optional[UUID] = None) -> int:
+        """
+        Recalcula os contadores a partir das tabelas (sem commit).
+
+        Bloqueia escritas nos contadores até o commit para que criações
+        durante a reconstrução não sejam contadas duas vezes.
+        """
+        db.execute(text("LOCK TABLE user_usage_counters IN SHARE ROW EXCLUSIVE MODE"))
+
+        delete_stmt = delete(UserUsageCounter)
+        if user_id:
+            delete_stmt = delete_stmt.where(UserUsageCounter.user_id == user_id)
+        db.execute(delete_stmt)
+
+        month_start = current_month_start()
+        source = self.source_counts(month_start, user_id).subquery("source")
+        result = db.execute(
+            insert(UserUsageCounter).from_select(
+                ["user_id", *_COUNTER_COLUMNS, "transactions_month"],
+                select(
+                    *[source.c[column] for column in ("user_id", *_COUNTER_COLUMNS)],
+                    literal(month_start.date()),
+                ),
+            )
+        )
+        return result.rowcount
+
+    @staticmethod
+    def _differs(source, month: date):
+        """Condição: contadores da linha diferem das contagens de `source`."""
+        counters = UserUsageCounter.__table__
+        this_month = case(
+            (
+                counters.c.transactions_month == month,
+                counters.c.transactions_this_month,
+            ),
+            else_=0,
+        )
+        return or_(
+            source.c.transactions != counters.c.transactions,
+            source.c.transactions_this_month != this_month,
+            source.c.budgets != counters.c.budgets,
+            source.c.commitments != counters.c.commitments,
+            source.c.phones != counters.c.phones,
+        )
+
+    def count_mismatches(self, db: Session, *, user_id: Optional[UUID] = None) -> int:
+        """Quantidade de usuários cujos contadores diferem das tabelas."""
+        month_start = current_month_start()
+        source = self.source_counts(month_start, user_id).subquery("source")
+        counters = UserUsageCounter.__table__
+
+        mismatches = (
+            select(func.count())
+            .select_from(
+                source.outerjoin(counters, counters.c.user_id == source.c.user_id)
+            )
+            .where(
+                or_(
+                    and_(
+                        counters.c.user_id.is_(None),
+                        source.c.transactions
+                        + source.c.budgets
+                        + source.c.commitments
+                        + source.c.phones
+                        > 0,
+                    ),
+                    and_(
+                        counters.c.user_id.is_not(None),
+                        self._differs(source, month_start.date()),
+                    ),
+                )
+            )
+        )
+        return db.execute(mismatches).scalar()
+
+    def reconcile(
+        self,
+        db: Session,
+        *,
+        user_id: Optional[UUID] = None,
+        batch_size: int = 500,
+    ) -> int:
+        """
+        Corrige os contadores divergentes das tabelas, em lotes de usuários.
+
+        Diferente de rebuild, não bloqueia a tabela: trava só as linhas do
+        lote (reservas e escritas concorrentes desses usuários esperam) antes
+        de contar, e faz commit a cada lote. Pode rodar com o tráfego normal.
+
+        Returns:
+            Quantidade de usuários corrigidos
+        """
+        counters = UserUsageCounter.__table__
+        fixed = 0
+        last_id = None
+
+        while True:
+            query = select(User.id).order_by(User.id).limit(batch_size)
+            if user_id:
+                query = query.where(User.id == user_id)
+            if last_id:
+                query = query.where(User.id > last_id)
+            user_ids = db.execute(query).scalars().all()
+            if not user_ids:
+                break
+
+            # Garante a linha de cada usuário e trava o lote antes de contar
+            db.execute(
+                pg_insert(counters)
+                .values([{"user_id": id_} for id_ in user_ids])
+                .on_conflict_do_nothing(index_elements=["user_id"])
+            )
+            db.execute(
+                select(counters.c.user_id)
+                .where(counters.c.user_id.in_(user_ids))
+                .order_by(counters.c.user_id)
+                .with_for_update()
+            )
+
+            month_start = current_month_start()
+            source = (
+                self.source_counts(month_start)
+                .where(User.id.in_(user_ids))
+                .subquery("source")
+            )
+            result = db.execute(
+                update(counters)
+                .where(
+                    counters.c.user_id == source.c.user_id,
+                    self._differs(source, month_start.date()),
+                )
+                .values(
+                    {
+                        counters.c.transactions: source.c.transactions,
+                        counters.c.transactions_this_month: (
+                            source.c.transactions_this_month
+                        ),
+                        counters.c.transactions_month: month_start.date(),
+                        counters.c.budgets: source.c.budgets,
+                        counters.c.commitments: source.c.commitments,
+                        counters.c.phones: source.c.phones,
+                        counters.c.updated_at: func.now(),
+                    }
+                )
+            )
+            db.commit()
+
+            fixed += result.rowcount
+            last_id = user_ids[-1]
+
+        return fixed
+
+
+usage_counter = CRUDUsageCounter()
+
+
+# ============================================================================
+# Incremental maintenance (ORM events)
+# ============================================================================
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_usage_counter_deltas(session: Session, flush_context, instances) -> None:
+    if not settings.USAGE_COUNTERS_ENABLED:
+        return
+    # Substitui (não acumula): deltas de um flush que falhou são descartados
+    session.info[_PENDING_KEY] = usage_counter.deltas_for_flush(session)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _discard_usage_counter_reservations(session: Session) -> None:
+    # Reservas valem só na transação: o rollback desfez os UPDATEs, e o
+    # commit encerra as não consumidas (não passam para a próxima transação)
+    session.info.pop(_RESERVED_KEY, None)
+    session.info.pop(_PENDING_KEY, None)
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_usage_counter_deltas(session: Session, flush_context) -> None:
+    deltas = session.info.pop(_PENDING_KEY, None)
+    if deltas:
+        # Mesma conexão/transação do flush: commit ou rollback juntos
+        usage_counter.apply(session.connection(), deltas)
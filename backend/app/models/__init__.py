@@ -3,11 +3,13 @@ from .budget import Budget, BudgetPeriod
 from .category import Category
 from .commitment import Commitment, UserGoogleAuth
 from .consent import Consent
+from .job import BackgroundJob
 
 # from .expression_embedding import ExpressionEmbedding  # Temporarily disabled - pgvector dependency
 from .payment import Payment
 from .plan import Plan
-from .transaction import Transaction
+from .transaction import Transaction, TransactionDailyRollup
+from .usage_counter import UserUsageCounter
 from .user import User
 from .user_phone import UserPhone
 from .user_settings import UserSettings
@@ -18,6 +20,7 @@ __all__ = [
     "UserPhone",
     "Category",
     "Transaction",
+    "TransactionDailyRollup",
     "Budget",
     "BudgetPeriod",
     "Commitment",
@@ -26,4 +29,6 @@ __all__ = [
     "Consent",
     "Payment",
     "UserSettings",
+    "UserUsageCounter",
+    "BackgroundJob",
 ]
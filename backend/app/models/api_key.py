@@ -7,7 +7,7 @@ Security features:
 - Soft deletion via is_active
 - Optional expiration dates
 - IP whitelisting support
-- Usage tracking
+- Usage tracking (last use + request count)
 """
 
 import secrets
@@ -15,7 +15,16 @@ import uuid
 from datetime import datetime, timezone
 
 from passlib.context import CryptContext
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    String,
+    Text,
+)
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -112,6 +121,14 @@ class APIKey(Base):
         comment="Last time this key was used for authentication",
     )
 
+    request_count = Column(
+        BigInteger,
+        nullable=False,
+        default=0,
+        server_default="0",
+        comment="Authenticated requests (flushed in batches)",
+    )
+
     expires_at = Column(
         DateTime(timezone=True),
         nullable=True,
@@ -6,10 +6,12 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
     UniqueConstraint,
+    text,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -52,6 +54,23 @@ class Budget(Base):
         "BudgetPeriod", back_populates="budget", cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        # Menor notificar_em dos ativos (início da varredura de alertas)
+        Index(
+            "ix_budgets_notificar_em",
+            "notificar_em",
+            postgresql_where=text("ativo"),
+        ),
+    )
+
+
+# Períodos com alerta pendente: aviso não enviado, ou acima do limite com
+# estouro não enviado (predicado do índice parcial e da varredura)
+ALERT_PENDING_PREDICATE = (
+    "valor_limite > 0 AND (alerta_enviado IS NOT TRUE"
+    " OR (valor_gasto > valor_limite AND estouro_enviado IS NOT TRUE))"
+)
+
 
 class BudgetPeriod(Base):
     """Instâncias automáticas de períodos de orçamento."""
@@ -85,6 +104,10 @@ class BudgetPeriod(Base):
 
     # Controle de alertas
     alerta_enviado = Column(Boolean, default=False)
+    # Alerta de estouro (acima de 100%) enviado, independente do aviso
+    estouro_enviado = Column(
+        Boolean, default=False, nullable=False, server_default="false"
+    )
 
     criado_em = Column(DateTime(timezone=True), server_default=func.now())
     atualizado_em = Column(
@@ -99,4 +122,20 @@ class BudgetPeriod(Base):
         UniqueConstraint(
             "budget_id", "ano", "mes", "quinzena", "semana", name="uq_budget_period"
         ),
+        # Varredura global de alertas: percentual gasto dos períodos com
+        # aviso ou estouro pendente (busca por faixa a partir do menor
+        # notificar_em)
+        Index(
+            "ix_budget_periods_alert_pending",
+            text("(valor_gasto * 100 / valor_limite)"),
+            postgresql_where=text(ALERT_PENDING_PREDICATE),
+        ),
+        # Período atual de cada orçamento (LATERAL ... ORDER BY data_inicio
+        # DESC LIMIT 1 nos resumos do dashboard)
+        Index(
+            "ix_budget_periods_budget_dates",
+            "budget_id",
+            "data_inicio",
+            "data_fim",
+        ),
     )
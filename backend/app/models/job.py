@@ -0,0 +1,74 @@
+import uuid
+
+from sqlalchemy import (
+    UUID,
+    CheckConstraint,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    String,
+    Text,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+JOB_STATUSES = ("pending", "running", "succeeded", "failed")
+# Status em que o job ainda vai (ou está) rodar: no máximo um por nome
+JOB_ACTIVE_STATUSES = ("pending", "running")
+
+
+class BackgroundJob(Base):
+    """
+    Execução de um job de manutenção (app/services/job_runner.py).
+
+    Os workers reservam jobs pendentes com lease (locked_by +
+    lease_expires_at): um job cujo worker morreu volta a ser reservado quando
+    o lease expira e continua do checkpoint salvo em progress.
+    """
+
+    __tablename__ = "background_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    name = Column(String(100), nullable=False)  # "budget_period_rollover"
+    status = Column(
+        String(20), nullable=False, default="pending", server_default="pending"
+    )
+    triggered_by = Column(String(20), nullable=False, default="schedule")
+    run_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    attempts = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    max_attempts = Column(Integer, nullable=False, default=3)
+
+    # Checkpoint do handler (retomado após falha/lease expirado) e resultado
+    progress = Column(JSONB, nullable=False, default=dict, server_default="{}")
+    result = Column(JSONB, nullable=True)
+    error = Column(Text, nullable=True)
+
+    locked_by = Column(String(255), nullable=True)  # "hostname:pid"
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('pending', 'running', 'succeeded', 'failed')",
+            name="ck_background_jobs_status",
+        ),
+        Index("ix_background_jobs_status_run_at", "status", "run_at"),
+        Index("ix_background_jobs_name_created_at", "name", "created_at"),
+        Index(
+            "uq_background_jobs_active_name",
+            "name",
+            unique=True,
+            postgresql_where=text("status IN ('pending', 'running')"),
+        ),
+    )
@@ -42,6 +42,7 @@ class Plan(Base):
     max_categories = Column(Integer, nullable=True)
     max_phones = Column(Integer, nullable=True, default=1)
     data_retention_months = Column(Integer, nullable=False, default=12)
+    api_rate_limit = Column(Integer, nullable=True)  # req/min (None = padrão global)
 
     # Metadata
     is_active = Column(Boolean, nullable=False, default=True, index=True)
@@ -9,7 +9,9 @@ from sqlalchemy import (
     ForeignKey,
     Integer,
     Numeric,
+    PrimaryKeyConstraint,
     String,
+    text,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -50,3 +52,39 @@ class Transaction(Base):
     # Relationships
     usuario = relationship("User", back_populates="transactions")
     categoria = relationship("Category", back_populates="transactions")
+
+    # Defaults do banco voltam no INSERT ... RETURNING (sem refresh após o flush)
+    __mapper_args__ = {"eager_defaults": True}
+
+
+class TransactionDailyRollup(Base):
+    """
+    Totais diários pré-agregados por usuário, categoria e tipo.
+
+    Mantido incrementalmente pelo CRUD de transações (mesma transação do banco)
+    e reconstruído por scripts/rebuild_transaction_rollup.py. Transações sem
+    categoria usam categoria_id = 0.
+    """
+
+    __tablename__ = "transaction_daily_rollup"
+
+    usuario_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    data = Column(Date, nullable=False)
+    categoria_id = Column(Integer, nullable=False, server_default=text("0"))
+    tipo = Column(String(10), nullable=False)
+    total = Column(Numeric(14, 2), nullable=False, server_default=text("0"))
+    quantidade = Column(Integer, nullable=False, server_default=text("0"))
+
+    __table_args__ = (
+        PrimaryKeyConstraint(
+            "usuario_id",
+            "data",
+            "categoria_id",
+            "tipo",
+            name="pk_transaction_daily_rollup",
+        ),
+    )
@@ -0,0 +1,44 @@
+from sqlalchemy import (
+    UUID,
+    BigInteger,
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Integer,
+    text,
+)
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class UserUsageCounter(Base):
+    """
+    Contadores de uso por usuário (limites do plano).
+
+    Mantidos na mesma transação do banco a cada criação/exclusão de
+    transação, orçamento, compromisso ou telefone (ORM) e reconstruídos por
+    scripts/rebuild_usage_counters.py. transactions_this_month vale para o mês
+    em transactions_month; em outro mês, a contagem do mês é 0.
+    """
+
+    __tablename__ = "user_usage_counters"
+
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    transactions = Column(BigInteger, nullable=False, server_default=text("0"))
+    transactions_this_month = Column(Integer, nullable=False, server_default=text("0"))
+    transactions_month = Column(Date, nullable=True)
+    budgets = Column(Integer, nullable=False, server_default=text("0"))
+    commitments = Column(Integer, nullable=False, server_default=text("0"))
+    phones = Column(Integer, nullable=False, server_default=text("0"))
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
@@ -131,6 +131,10 @@ class APIKeyResponse(APIKeyBase):
     )
     is_active: bool
     last_used_at: Optional[datetime] = None
+    request_count: int = Field(
+        0,
+        description="Authenticated requests (written in batches, may lag a few seconds)",
+    )
     expires_at: Optional[datetime] = None
     allowed_ips: Optional[List[str]] = None
     rate_limit: Optional[int] = None
@@ -208,6 +212,17 @@ class APIKeyRevoke(BaseModel):
 # ============================================================================
 
 
+class APIKeyUsage(BaseModel):
+    """Per-key usage counters."""
+
+    id: UUID
+    name: str
+    key_prefix: str
+    is_active: bool
+    request_count: int
+    last_used_at: Optional[datetime] = None
+
+
 class APIKeyStats(BaseModel):
     """Statistics about API key usage."""
 
@@ -221,3 +236,8 @@ class APIKeyStats(BaseModel):
         description="Summary of scopes usage across all keys",
         examples=[{"transactions": 5, "budgets": 3, "reports": 2}],
     )
+    total_requests: int = Field(0, description="Requests across all keys")
+    usage_by_key: List[APIKeyUsage] = Field(
+        default_factory=list,
+        description="Request count and last use per key (most used first)",
+    )
@@ -157,3 +157,28 @@ class BudgetAlertInfo(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class BudgetAlertEvent(BudgetAlertInfo):
+    """Alerta pendente da varredura global (entrega via n8n/WhatsApp)."""
+
+    period_id: UUID = Field(..., description="ID do período (para marcar o envio)")
+    usuario_id: UUID = Field(..., description="ID do usuário a notificar")
+
+
+class BudgetAlertBatch(BaseModel):
+    """Lote de alertas pendentes de todos os usuários."""
+
+    total_alertas: int
+    alertas: List[BudgetAlertEvent]
+
+
+class BudgetAlertsMarkSent(BaseModel):
+    """Períodos cujo alerta foi entregue."""
+
+    period_ids: List[UUID] = Field(..., min_length=1, max_length=5000)
+    estouro_period_ids: List[UUID] = Field(
+        default_factory=list,
+        max_length=5000,
+        description="Períodos de period_ids cujo alerta entregue foi 'estouro'",
+    )
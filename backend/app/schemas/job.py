@@ -0,0 +1,39 @@
+"""
+Pydantic Schemas for background jobs (/sistema/jobs)
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class BackgroundJob(BaseModel):
+    """Execução de um job de manutenção."""
+
+    id: UUID
+    name: str
+    status: str  # pending | running | succeeded | failed
+    triggered_by: str  # schedule | manual
+    run_at: datetime
+    attempts: int
+    max_attempts: int
+    progress: Dict[str, Any] = {}  # checkpoint do último trecho concluído
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    locked_by: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class BackgroundJobEnqueued(BaseModel):
+    """Resposta dos endpoints que disparam um job (202)."""
+
+    message: str
+    job: BackgroundJob
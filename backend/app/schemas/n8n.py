@@ -77,6 +77,11 @@ class CategoryFilterRequest(BaseModel):
     remove_emojis: Optional[bool] = Field(
         False, description="Remove emojis from category names"
     )
+    strategy: Literal["keywords", "embedding"] = Field(
+        "keywords",
+        description="Scoring strategy; embedding falls back to keywords if the "
+        "classifier is not configured",
+    )
 
 
 class FilteredCategory(BaseModel):
@@ -102,6 +107,7 @@ class MessageAnalysis(BaseModel):
     total_categories_available: int
     categories_filtered: int
     confidence_threshold: float
+    strategy: Literal["keywords", "embedding"] = "keywords"
 
 
 class CategoryFilterResponse(BaseModel):
@@ -186,6 +192,79 @@ class N8NTransactionError(BaseModel):
     details: Optional[Dict] = None
 
 
+# Bulk Transaction Schemas for N8N
+class N8NBulkTransactionItem(BaseModel):
+    """One transaction of a bulk request"""
+
+    valor: float = Field(..., description="Transaction amount", gt=0)
+    descricao: str = Field(..., description="Transaction description")
+    tipo: Optional[Literal["despesa", "receita"]] = Field(
+        None, description="Transaction type - detected from descricao if omitted"
+    )
+    categoria_id: Optional[int] = Field(
+        None, description="Category ID - if not provided, will be suggested"
+    )
+    categoria_nome: Optional[str] = Field(
+        None, description="Category name for lookup (alternative to categoria_id)"
+    )
+    data_transacao: Optional[str] = Field(
+        None, description="Transaction date in YYYY-MM-DD format"
+    )
+    mensagem_original: Optional[str] = Field(
+        None, description="Original message (defaults to descricao)"
+    )
+
+
+class N8NBulkTransactionCreate(BaseModel):
+    """Request schema for N8N bulk transaction creation (one user)"""
+
+    usuario_id: Optional[UUID] = Field(
+        None, description="User ID - can be looked up by phone/lid if not provided"
+    )
+    telefone: Optional[str] = Field(
+        None, description="User phone for lookup if usuario_id not provided"
+    )
+    lid: Optional[str] = Field(
+        None, description="User lid for lookup if usuario_id not provided"
+    )
+
+    transactions: List[N8NBulkTransactionItem] = Field(..., min_length=1)
+    canal: Optional[
+        Literal["audioMessage", "conversation", "imageMessage", "webApp"]
+    ] = Field("webApp", description="Source channel")
+    strategy: Literal["keywords", "embedding"] = Field(
+        "keywords", description="Category suggestion strategy for rows without one"
+    )
+
+
+class N8NBulkTransactionResult(BaseModel):
+    """Result of one row of a bulk request or imported file"""
+
+    index: int = Field(
+        ..., description="Position in the request (0-based) or line of the file"
+    )
+    success: bool
+    transaction_id: Optional[UUID] = None
+    tipo: Optional[str] = None
+    categoria_id: Optional[int] = None
+    error_code: Optional[str] = None
+    message: Optional[str] = None
+
+
+class N8NBulkTransactionResponse(BaseModel):
+    """Response schema for N8N bulk transaction creation and file import"""
+
+    success: bool
+    created: int
+    failed: int
+    results: List[N8NBulkTransactionResult]
+    budget_alerts: List[Dict] = Field(
+        default_factory=list,
+        description="One alert per budget period left at threshold or overspent",
+    )
+    message: str
+
+
 # Budget Creation Schemas for N8N
 class N8NBudgetCreate(BaseModel):
     """Request schema for N8N budget creation"""
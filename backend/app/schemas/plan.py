@@ -36,6 +36,7 @@ class PlanLimits(BaseModel):
     max_categories: Optional[int] = Field(None, ge=0)
     max_phones: Optional[int] = Field(1, ge=1)
     data_retention_months: int = Field(12, ge=1)
+    api_rate_limit: Optional[int] = Field(None, ge=1)  # req/min (None = padrão)
 
 
 class PlanMetadata(BaseModel):
@@ -79,6 +80,7 @@ class PlanUpdate(BaseModel):
     max_categories: Optional[int] = Field(None, ge=0)
     max_phones: Optional[int] = Field(None, ge=1)
     data_retention_months: Optional[int] = Field(None, ge=1)
+    api_rate_limit: Optional[int] = Field(None, ge=1)
 
     # Metadata
     is_active: Optional[bool] = None
@@ -1,11 +1,14 @@
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from decimal import Decimal
-from typing import List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
 
+from sqlalchemy import Numeric, column, tuple_, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Session
 
 from app.crud.budget import budget, budget_period
-from app.models.budget import Budget
+from app.models.budget import Budget, BudgetPeriod
 from app.schemas.budget import BudgetSummary
 
 
@@ -34,6 +37,56 @@ class BudgetService:
 
         return updated_budgets
 
+    @staticmethod
+    def _build_alert(
+        user_budget: Budget, current_period, tipo_alerta: Optional[str]
+    ) -> Optional[dict]:
+        """
+        Alerta de estouro/aviso para o período já atualizado, ou None.
+
+        tipo_alerta vem do próprio UPDATE do gasto (ver
+        budget_period.spend_update).
+        """
+        if tipo_alerta is None:
+            return None
+
+        # Calcular percentual gasto
+        percentual_gasto = (
+            (current_period.valor_gasto / current_period.valor_limite * 100)
+            if current_period.valor_limite > 0
+            else 0
+        )
+
+        # Obter nome da categoria
+        categoria_nome = "Categoria"
+        if hasattr(user_budget, "categoria") and user_budget.categoria:
+            categoria_nome = user_budget.categoria.nome
+
+        valor_disponivel = current_period.valor_limite - current_period.valor_gasto
+
+        return {
+            "tipo_alerta": tipo_alerta,
+            "budget_id": user_budget.id,
+            "budget_nome": user_budget.nome,
+            "categoria_id": user_budget.categoria_id,
+            "categoria_nome": categoria_nome,
+            "valor_limite": current_period.valor_limite,
+            "valor_gasto": current_period.valor_gasto,
+            "valor_disponivel": valor_disponivel,
+            "percentual_gasto": Decimal(str(percentual_gasto)),
+            "percentual_notificacao": user_budget.notificar_em,
+            "periodo_info": {
+                "ano": current_period.ano,
+                "mes": current_period.mes,
+                "quinzena": current_period.quinzena,
+                "semana": current_period.semana,
+                "data_inicio": current_period.data_inicio.isoformat(),
+                "data_fim": current_period.data_fim.isoformat(),
+                "periodicidade": user_budget.periodicidade,
+            },
+            "alerta_enviado": current_period.alerta_enviado,
+        }
+
     @staticmethod
     def update_budget_from_transaction(
         db: Session,
@@ -44,7 +97,12 @@ class BudgetService:
         tipo: str = "despesa",
     ) -> tuple[Optional[Budget], Optional[dict]]:
         """
-        Atualiza orçamento quando uma nova transação é criada.
+        Atualiza orçamento quando uma nova transação é criada (sem commit).
+
+        Só faz flush: o commit é o da criação da transação, então transação,
+        período e gasto são gravados juntos (ou nada, em caso de erro).
+        valor negativo é um estorno (edição/exclusão): só ajusta um período
+        que já existe e não gera alerta.
 
         Returns:
             tuple: (Budget ou None, alert_info dict ou None)
@@ -63,327 +121,488 @@ class BudgetService:
         if not user_budget:
             return None, None
 
-        # Buscar período correspondente à data da transação
-        current_period = budget_period.get_current_period(
-            db, budget_id=user_budget.id, current_date=data_transacao
+        # Somar ao período que contém a data da transação (UPDATE atômico)
+        updated = budget_period.update_valor_gasto(
+            db,
+            valor_adicional=valor,
+            budget_id=user_budget.id,
+            target_date=data_transacao,
+            commit=False,
         )
 
-        if not current_period:
-            # Criar período se não existir para esta data
-            current_period = budget_period.create_period_for_budget(
-                db, budget=user_budget, target_date=data_transacao
+        if updated is None and valor > 0:
+            # Criar período se não existir para esta data (estornos não criam)
+            new_period = budget_period.create_period_for_budget(
+                db, budget=user_budget, target_date=data_transacao, commit=False
             )
+            if new_period:
+                updated = budget_period.update_valor_gasto(
+                    db, valor_adicional=valor, period_id=new_period.id, commit=False
+                )
 
-        alert_info = None
+        if updated is None or valor <= 0:
+            return user_budget, None
 
-        if current_period:
-            # Atualizar valor gasto
-            budget_period.update_valor_gasto(
-                db, period_id=current_period.id, valor_adicional=valor
-            )
+        current_period, tipo_alerta = updated
+        return user_budget, BudgetService._build_alert(
+            user_budget, current_period, tipo_alerta
+        )
 
-            # Refresh para obter valores atualizados
-            db.refresh(current_period)
-            db.refresh(user_budget)
+    @staticmethod
+    def apply_transaction_change(
+        db: Session, old: Optional[dict] = None, new: Optional[dict] = None
+    ) -> None:
+        """
+        Ajusta o gasto dos orçamentos na edição/exclusão de uma transação.
 
-            # Calcular percentual gasto
-            percentual_gasto = (
-                (current_period.valor_gasto / current_period.valor_limite * 100)
-                if current_period.valor_limite > 0
-                else 0
+        old/new são as entradas de transaction_rollup.entry_for antes e depois
+        (new=None na exclusão). Cada lado que é despesa com categoria vira um
+        delta (-old, +new) aplicado com o mesmo UPDATE atômico da criação;
+        no mesmo orçamento e data, só a diferença. Sem commit.
+        """
+        deltas: Dict[tuple, Decimal] = {}
+        for entry, sign in ((old, -1), (new, 1)):
+            if not entry or entry["tipo"] != "despesa" or not entry["categoria_id"]:
+                continue
+            key = (
+                entry["usuario_id"],
+                entry["categoria_id"],
+                entry["data"] or date.today(),
             )
-
-            # Verificar se deve gerar alerta
-            deve_alertar = False
-            tipo_alerta = None
-
-            # Alerta de estouro (ultrapassou 100%)
-            if percentual_gasto > 100:
-                deve_alertar = True
-                tipo_alerta = "estouro"
-            # Alerta de aviso (atingiu notificar_em% e ainda não enviou alerta)
-            elif (
-                percentual_gasto >= float(user_budget.notificar_em)
-                and not current_period.alerta_enviado
-            ):
-                deve_alertar = True
-                tipo_alerta = "aviso"
-
-            # Gerar informações do alerta se necessário
-            if deve_alertar:
-                # Obter nome da categoria
-                categoria_nome = "Categoria"
-                if hasattr(user_budget, "categoria") and user_budget.categoria:
-                    categoria_nome = user_budget.categoria.nome
-
-                valor_disponivel = (
-                    current_period.valor_limite - current_period.valor_gasto
+            deltas[key] = deltas.get(key, Decimal("0")) + entry["valor"] * sign
+
+        for (usuario_id, categoria_id, data_transacao), delta in deltas.items():
+            if delta:
+                BudgetService.update_budget_from_transaction(
+                    db,
+                    usuario_id=usuario_id,
+                    categoria_id=categoria_id,
+                    valor=delta,
+                    data_transacao=datetime.combine(
+                        data_transacao, datetime.min.time()
+                    ),
                 )
 
-                alert_info = {
-                    "tipo_alerta": tipo_alerta,
-                    "budget_id": user_budget.id,
-                    "budget_nome": user_budget.nome,
-                    "categoria_id": user_budget.categoria_id,
-                    "categoria_nome": categoria_nome,
-                    "valor_limite": current_period.valor_limite,
-                    "valor_gasto": current_period.valor_gasto,
-                    "valor_disponivel": valor_disponivel,
-                    "percentual_gasto": Decimal(str(percentual_gasto)),
-                    "percentual_notificacao": user_budget.notificar_em,
-                    "periodo_info": {
-                        "ano": current_period.ano,
-                        "mes": current_period.mes,
-                        "quinzena": current_period.quinzena,
-                        "semana": current_period.semana,
-                        "data_inicio": current_period.data_inicio.isoformat(),
-                        "data_fim": current_period.data_fim.isoformat(),
-                        "periodicidade": user_budget.periodicidade,
-                    },
-                    "alerta_enviado": current_period.alerta_enviado,
-                }
-
-        return user_budget, alert_info
-
     @staticmethod
-    def get_budgets_for_alerts(db: Session, usuario_id: str) -> List[dict]:
-        """Retorna orçamentos que precisam de alerta."""
-        user_budgets = budget.get_by_user(db, usuario_id=usuario_id, ativo_only=True)
-        budgets_for_alert = []
-
-        for user_budget in user_budgets:
-            current_period = budget_period.get_current_period(
-                db, budget_id=user_budget.id
-            )
-
-            if not current_period or current_period.alerta_enviado:
-                continue
-
-            # Calcular percentual gasto
-            if current_period.valor_limite > 0:
-                percentual_gasto = (
-                    current_period.valor_gasto / current_period.valor_limite
-                ) * 100
-
-                # Verificar se atingiu o limite para alerta
-                if percentual_gasto >= user_budget.notificar_em:
-                    budgets_for_alert.append(
-                        {
-                            "budget": user_budget,
-                            "period": current_period,
-                            "percentual_gasto": percentual_gasto,
-                            "categoria_nome": (
-                                user_budget.categoria.nome
-                                if user_budget.categoria
-                                else "Categoria"
-                            ),
-                        }
-                    )
-
-        return budgets_for_alert
+    def apply_expenses_bulk(
+        db: Session,
+        usuario_id: UUID,
+        expenses: Iterable[Tuple[Optional[int], Decimal, date]],
+    ) -> List[dict]:
+        """
+        Atualiza orçamentos para um lote de despesas (sem commit).
 
-    @staticmethod
-    def mark_alert_sent(db: Session, period_id: str):
-        """Marca alerta como enviado."""
-        period = budget_period.get(db, id=period_id)
-        if period:
-            budget_period.update(db, db_obj=period, obj_in={"alerta_enviado": True})
+        Equivale a update_budget_from_transaction para cada despesa, mas soma
+        os valores por (orçamento, período) e aplica tudo em um único
+        UPDATE ... FROM (VALUES ...) RETURNING. Períodos que faltam são
+        criados na mesma transação, sob a trava de criação de períodos
+        (lock_period_creation) e conferidos de novo depois dela.
 
-    @staticmethod
-    def get_dashboard_summary(db: Session, usuario_id: str) -> List[BudgetSummary]:
-        """Retorna resumo para dashboard."""
-        user_budgets = budget.get_by_user(db, usuario_id=usuario_id, ativo_only=True)
-        summaries = []
+        Args:
+            expenses: (categoria_id, valor, data_transacao) de cada despesa
 
-        for user_budget in user_budgets:
-            current_period = budget_period.get_current_period(
-                db, budget_id=user_budget.id
+        Returns:
+            Alertas (mesmo formato de update_budget_from_transaction), um por
+            período que terminou o lote em aviso/estouro
+        """
+        budgets_by_category = {
+            user_budget.categoria_id: user_budget
+            for user_budget in budget.get_by_user(
+                db, usuario_id=usuario_id, limit=None, ativo_only=True
             )
+        }
 
-            if not current_period:
-                # Criar período se não existir
-                current_period = budget_period.create_period_for_budget(
-                    db, budget=user_budget
+        # Somar por (orçamento, período)
+        totals: Dict[tuple, Decimal] = {}
+        bounds: Dict[tuple, tuple] = {}
+        for categoria_id, valor, data_transacao in expenses:
+            user_budget = budgets_by_category.get(categoria_id)
+            if user_budget is None:
+                continue
+            period_bounds = budget_period.period_bounds(
+                user_budget.periodicidade,
+                datetime.combine(data_transacao, datetime.min.time()),
+            )
+            key = (user_budget.id, *period_bounds[:4])
+            bounds[key] = period_bounds
+            totals[key] = totals.get(key, Decimal("0")) + Decimal(valor)
+
+        if not totals:
+            return []
+
+        # Períodos existentes (uma consulta) e criação dos que faltam
+        budgets_by_id = {b.id: b for b in budgets_by_category.values()}
+        existing_periods = db.query(BudgetPeriod).filter(
+            BudgetPeriod.budget_id.in_({key[0] for key in totals}),
+            tuple_(BudgetPeriod.ano, BudgetPeriod.mes).in_(
+                {key[1:3] for key in totals}
+            ),
+        )
+        periods = {
+            (p.budget_id, p.ano, p.mes, p.quinzena, p.semana): p
+            for p in existing_periods
+        }
+        if any(key not in periods for key in totals):
+            # Outra importação, o rollover ou uma criação avulsa pode ter
+            # criado o período enquanto esperávamos a trava
+            budget_period.lock_period_creation(db)
+            periods = {
+                (p.budget_id, p.ano, p.mes, p.quinzena, p.semana): p
+                for p in existing_periods
+            }
+        for key in totals:
+            if key not in periods:
+                ano, mes, quinzena, semana, data_inicio, data_fim = bounds[key]
+                periods[key] = BudgetPeriod(
+                    budget_id=key[0],
+                    ano=ano,
+                    mes=mes,
+                    quinzena=quinzena,
+                    semana=semana,
+                    valor_limite=budgets_by_id[key[0]].valor_limite,
+                    data_inicio=data_inicio,
+                    data_fim=data_fim,
                 )
+                db.add(periods[key])
+        db.flush()
+
+        deltas = values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("delta", Numeric(10, 2)),
+            name="deltas",
+        ).data([(periods[key].id, total) for key, total in totals.items()])
+        stmt = budget_period.spend_update(deltas.c.delta).where(
+            BudgetPeriod.id == deltas.c.id
+        )
 
-            if current_period:
-                # Calcular percentual e dias restantes
-                percentual_gasto = (
-                    (current_period.valor_gasto / current_period.valor_limite * 100)
-                    if current_period.valor_limite > 0
-                    else 0
-                )
+        alerts = []
+        for period, tipo_alerta in db.execute(stmt).all():
+            alert_info = BudgetService._build_alert(
+                budgets_by_id[period.budget_id], period, tipo_alerta
+            )
+            if alert_info:
+                alerts.append(alert_info)
+        return alerts
 
-                dias_restantes = max(0, (current_period.data_fim - datetime.now()).days)
-
-                summaries.append(
-                    BudgetSummary(
-                        id=user_budget.id,
-                        nome=user_budget.nome,
-                        categoria_id=user_budget.categoria_id,
-                        categoria_nome=(
-                            user_budget.categoria.nome
-                            if user_budget.categoria
-                            else None
-                        ),
-                        valor_limite=current_period.valor_limite,
-                        valor_gasto=current_period.valor_gasto,
-                        percentual_gasto=percentual_gasto,
-                        status=current_period.status,
-                        periodicidade=user_budget.periodicidade,
-                        dias_restantes=dias_restantes,
-                        ativo=user_budget.ativo,
-                    )
+    @staticmethod
+    def get_budgets_for_alerts(db: Session, usuario_id: str) -> List[dict]:
+        """Retorna orçamentos que precisam de alerta (uma consulta)."""
+        return [
+            {
+                "budget": user_budget,
+                "period": current_period,
+                "percentual_gasto": (
+                    current_period.valor_gasto / current_period.valor_limite
                 )
+                * 100,
+                "categoria_nome": (
+                    user_budget.categoria.nome if user_budget.categoria else "Categoria"
+                ),
+                "tipo_alerta": tipo_alerta,
+            }
+            for (
+                current_period,
+                user_budget,
+                tipo_alerta,
+            ) in budget_period.get_pending_alerts(db, usuario_id=UUID(str(usuario_id)))
+        ]
 
-        return summaries
+    @staticmethod
+    def build_alert_event(
+        current_period: BudgetPeriod, user_budget: Budget, tipo_alerta: str
+    ) -> dict:
+        """Evento de alerta para entrega (n8n/WhatsApp): alerta + ids."""
+        return {
+            "period_id": current_period.id,
+            "usuario_id": user_budget.usuario_id,
+            **BudgetService._build_alert(user_budget, current_period, tipo_alerta),
+        }
 
     @staticmethod
-    def create_next_periods_if_needed(db: Session):
-        """Job automático para criar próximos períodos."""
-        # Buscar todos os orçamentos ativos
-        all_budgets = db.query(Budget).filter(Budget.ativo).all()
+    def dispatch_pending_alerts(
+        db: Session,
+        *,
+        deliver: Callable[[List[dict]], None],
+        batch_size: int = 500,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> dict:
+        """
+        Varredura global de alertas (todos os usuários).
 
-        created_periods = []
-        current_time = datetime.now()
+        Em lotes de batch_size períodos pendentes (get_pending_alerts, uma
+        consulta indexada por lote, maiores percentuais primeiro): entrega os
+        eventos com deliver(eventos) e marca o lote inteiro em um UPDATE
+        (alerta_enviado, e estouro_enviado nos estouros), com commit. Se deliver levantar exceção, o lote não é
+        marcado e volta na próxima varredura (entrega pelo menos uma vez).
 
-        for budget_obj in all_budgets:
-            # Verificar se período atual está terminando (últimos 3 dias)
-            current_period = budget_period.get_current_period(
-                db, budget_id=budget_obj.id
-            )
+        Args:
+            on_progress: chamado após cada lote com o total de alertas enviados
 
-            if current_period:
-                days_until_end = (current_period.data_fim - current_time).days
+        Returns:
+            dict: sent_alerts, avisos, estouros e batches
+        """
+        current_date = datetime.now()
+        percentual_minimo = budget_period.get_min_notificar_em(db)
+        result = {"sent_alerts": 0, "avisos": 0, "estouros": 0, "batches": 0}
+
+        while percentual_minimo is not None:
+            rows = budget_period.get_pending_alerts(
+                db,
+                limit=batch_size,
+                current_date=current_date,
+                percentual_minimo=percentual_minimo,
+            )
+            if not rows:
+                break
+
+            events = [BudgetService.build_alert_event(*row) for row in rows]
+            deliver(events)
+            budget_period.mark_alerts_sent(
+                db,
+                period_ids=[event["period_id"] for event in events],
+                estouro_period_ids=[
+                    event["period_id"]
+                    for event in events
+                    if event["tipo_alerta"] == "estouro"
+                ],
+            )
 
-                if days_until_end <= 3:
-                    # Criar próximo período
-                    next_period = budget_period.create_period_for_budget(
-                        db, budget=budget_obj, target_date=current_period.data_fim
-                    )
+            result["sent_alerts"] += len(events)
+            result["batches"] += 1
+            for event in events:
+                if event["tipo_alerta"] == "estouro":
+                    result["estouros"] += 1
+                else:
+                    result["avisos"] += 1
+            if on_progress:
+                on_progress(result["sent_alerts"])
+            if len(rows) < batch_size:
+                break
+
+        db.rollback()
+        return result
 
-                    if next_period:
-                        created_periods.append(
-                            {
-                                "budget_id": budget_obj.id,
-                                "period_id": next_period.id,
-                                "budget_name": budget_obj.nome,
-                            }
-                        )
+    @staticmethod
+    def mark_alert_sent(db: Session, period_id: str):
+        """
+        Marca alerta como enviado.
 
-        return created_periods
+        Período acima do limite marca também o estouro (senão volta como
+        estouro pendente em get_budgets_for_alerts).
+        """
+        period = budget_period.get(db, id=period_id)
+        if period:
+            budget_period.mark_alerts_sent(
+                db,
+                period_ids=[period.id],
+                estouro_period_ids=(
+                    [period.id] if period.valor_gasto > period.valor_limite else []
+                ),
+            )
 
     @staticmethod
-    def recalculate_all_budgets(db: Session) -> dict:
-        """Recalcula todos os orçamentos baseado nas transações existentes."""
+    def _build_summary(
+        user_budget: Budget, current_period: BudgetPeriod, today: date
+    ) -> BudgetSummary:
+        """Resumo de um orçamento a partir do período atual."""
+        # Calcular percentual gasto
+        percentual_gasto = (
+            (current_period.valor_gasto / current_period.valor_limite * 100)
+            if current_period.valor_limite > 0
+            else 0
+        )
 
-        # Buscar todos os orçamentos ativos
-        all_budgets = db.query(Budget).filter(Budget.ativo).all()
+        # Dias restantes até o fim do período (por data)
+        dias_restantes = (current_period.data_fim.date() - today).days
+
+        return BudgetSummary(
+            id=user_budget.id,
+            nome=user_budget.nome,
+            categoria_id=user_budget.categoria_id,
+            categoria_nome=(
+                user_budget.categoria.nome if user_budget.categoria else None
+            ),
+            valor_limite=current_period.valor_limite,
+            valor_gasto=current_period.valor_gasto,
+            percentual_gasto=percentual_gasto,
+            status=current_period.status,
+            periodicidade=user_budget.periodicidade,
+            dias_restantes=max(0, dias_restantes),
+            ativo=user_budget.ativo,
+        )
 
-        updated_budgets = 0
-        created_periods = 0
-        details = []
+    @staticmethod
+    def get_dashboard_summary(
+        db: Session, usuario_id: str, *, create_missing: bool = True
+    ) -> List[BudgetSummary]:
+        """
+        Retorna resumo para dashboard.
+
+        Uma consulta traz os orçamentos ativos com categoria e período atual
+        (budget.get_by_user_with_current_period). Com create_missing, se
+        algum não tiver período atual, os que faltam são criados juntos em um
+        INSERT ... SELECT (create_periods_for_date) e a consulta é repetida.
+        A criação não espera a trava do rollover: com um job de períodos em
+        andamento ela fica para o job, e esses orçamentos ficam de fora.
+        """
+        usuario_id = UUID(str(usuario_id))
+        current_date = datetime.now()
 
-        for budget_obj in all_budgets:
-            result = BudgetService.recalculate_budget_periods(db, budget_obj)
-            updated_budgets += result["updated_periods"]
-            created_periods += result["created_periods"]
-            details.append(
-                {
-                    "budget_id": str(budget_obj.id),
-                    "budget_name": budget_obj.nome,
-                    "updated_periods": result["updated_periods"],
-                    "created_periods": result["created_periods"],
-                }
+        rows = budget.get_by_user_with_current_period(
+            db, usuario_id=usuario_id, current_date=current_date
+        )
+        if create_missing and any(current_period is None for _, current_period in rows):
+            _, _, created = budget_period.create_periods_for_date(
+                db, target_date=current_date, usuario_id=usuario_id, wait=False
             )
+            db.commit()
+            if created:
+                rows = budget.get_by_user_with_current_period(
+                    db, usuario_id=usuario_id, current_date=current_date
+                )
 
-        return {
-            "updated_budgets": updated_budgets,
-            "created_periods": created_periods,
-            "details": details,
-        }
+        return [
+            BudgetService._build_summary(
+                user_budget, current_period, current_date.date()
+            )
+            for user_budget, current_period in rows
+            if current_period is not None
+        ]
 
     @staticmethod
-    def recalculate_user_budgets(db: Session, usuario_id: str) -> dict:
-        """Recalcula orçamentos de um usuário específico."""
-        user_budgets = budget.get_by_user(db, usuario_id=usuario_id, ativo_only=True)
+    def create_next_periods_if_needed(
+        db: Session,
+        *,
+        dias_antecedencia: int = 3,
+        chunk_size: int = 1000,
+        after_id: Optional[UUID] = None,
+        on_progress: Optional[Callable[[UUID, int, int], None]] = None,
+    ) -> dict:
+        """
+        Job automático para criar próximos períodos.
 
-        updated_budgets = 0
-        created_periods = 0
-        details = []
+        Cria, para todos os orçamentos ativos, o período vigente daqui a
+        dias_antecedencia dias (o próximo, para quem está nos últimos dias do
+        atual). Em trechos de chunk_size orçamentos, cada um com um
+        INSERT ... SELECT e o seu commit: o job pode ser retomado de onde
+        parou com after_id, e rodar de novo não duplica períodos.
 
-        for budget_obj in user_budgets:
-            result = BudgetService.recalculate_budget_periods(db, budget_obj)
-            updated_budgets += result["updated_periods"]
-            created_periods += result["created_periods"]
-            details.append(
-                {
-                    "budget_id": str(budget_obj.id),
-                    "budget_name": budget_obj.nome,
-                    "updated_periods": result["updated_periods"],
-                    "created_periods": result["created_periods"],
-                }
+        Args:
+            on_progress: chamado após cada trecho com (último budget_id,
+                orçamentos verificados, períodos criados) acumulados
+
+        Returns:
+            dict: created_periods, scanned_budgets, last_budget_id e
+                target_date
+        """
+        target_date = datetime.now() + timedelta(days=dias_antecedencia)
+        scanned = 0
+        created = 0
+
+        while True:
+            last_id, chunk_scanned, chunk_created = (
+                budget_period.create_periods_for_date(
+                    db,
+                    target_date=target_date,
+                    after_id=after_id,
+                    chunk_size=chunk_size,
+                )
             )
+            if last_id is None:
+                db.rollback()
+                break
+
+            db.commit()
+            after_id = last_id
+            scanned += chunk_scanned
+            created += chunk_created
+            if on_progress:
+                on_progress(last_id, scanned, created)
 
         return {
-            "updated_budgets": updated_budgets,
-            "created_periods": created_periods,
-            "details": details,
+            "created_periods": created,
+            "scanned_budgets": scanned,
+            "last_budget_id": after_id,
+            "target_date": target_date,
         }
 
     @staticmethod
-    def recalculate_budget_periods(db: Session, budget_obj: Budget) -> dict:
-        """Recalcula períodos de um orçamento específico baseado nas transações."""
-        from sqlalchemy import and_
+    def recalculate_budgets(
+        db: Session,
+        *,
+        usuario_id: Optional[UUID] = None,
+        chunk_size: int = 1000,
+        after_id: Optional[UUID] = None,
+        on_progress: Optional[Callable[[UUID, int, int], None]] = None,
+    ) -> dict:
+        """
+        Recalcula o gasto dos períodos atuais a partir das transações.
 
-        from app.models.transaction import Transaction
+        Em trechos de chunk_size orçamentos ativos (todos, ou só os de
+        usuario_id): cria os períodos atuais que faltam (um INSERT ... SELECT),
+        soma o rollup diário de todos os períodos do trecho em uma consulta e
+        grava só os que mudaram em um UPDATE ... FROM unnest(...). Um commit
+        por trecho: pode ser retomado de onde parou com after_id.
 
-        # Garantir que existe período atual
-        current_period = budget_period.get_current_period(db, budget_id=budget_obj.id)
-        created_periods = 0
+        Args:
+            on_progress: chamado após cada trecho com (último budget_id,
+                orçamentos verificados, períodos atualizados) acumulados
 
-        if not current_period:
-            current_period = budget_period.create_period_for_budget(
-                db, budget=budget_obj
+        Returns:
+            dict: updated_budgets (períodos corrigidos), created_periods,
+                scanned_budgets e details (uma entrada por período corrigido)
+        """
+        current_date = datetime.now()
+        scanned = 0
+        created = 0
+        details = []
+
+        while True:
+            last_id, chunk_scanned, chunk_created = (
+                budget_period.create_periods_for_date(
+                    db,
+                    target_date=current_date,
+                    usuario_id=usuario_id,
+                    after_id=after_id,
+                    chunk_size=chunk_size,
+                )
             )
-            if current_period:
-                created_periods = 1
-
-        updated_periods = 0
-
-        if current_period:
-            # Buscar todas as transações do usuário nesta categoria no período atual
-            transactions = (
-                db.query(Transaction)
-                .filter(
-                    and_(
-                        Transaction.usuario_id == budget_obj.usuario_id,
-                        Transaction.categoria_id == budget_obj.categoria_id,
-                        Transaction.tipo == "despesa",
-                        Transaction.data_transacao >= current_period.data_inicio.date(),
-                        Transaction.data_transacao <= current_period.data_fim.date(),
-                    )
+            if last_id is None:
+                db.rollback()
+                break
+
+            details.extend(
+                budget_period.recalculate_spend(
+                    db,
+                    last_id=last_id,
+                    usuario_id=usuario_id,
+                    after_id=after_id,
+                    current_date=current_date,
                 )
-                .all()
             )
+            db.commit()
+            after_id = last_id
+            scanned += chunk_scanned
+            created += chunk_created
+            if on_progress:
+                on_progress(last_id, scanned, len(details))
 
-            # Calcular valor total gasto
-            total_gasto = sum(float(t.valor) for t in transactions)
-
-            # Atualizar período sempre (forçar atualização)
-            current_period.valor_gasto = total_gasto
-
-            # Atualizar status
-            if total_gasto > float(current_period.valor_limite):
-                current_period.status = "excedido"
-            else:
-                current_period.status = "ativo"
+        return {
+            "updated_budgets": len(details),
+            "created_periods": created,
+            "scanned_budgets": scanned,
+            "details": details,
+        }
 
-            db.add(current_period)
-            db.commit()
-            updated_periods = 1
+    @staticmethod
+    def recalculate_all_budgets(db: Session) -> dict:
+        """Recalcula todos os orçamentos baseado nas transações existentes."""
+        return BudgetService.recalculate_budgets(db)
 
-        return {"updated_periods": updated_periods, "created_periods": created_periods}
+    @staticmethod
+    def recalculate_user_budgets(db: Session, usuario_id: str) -> dict:
+        """Recalcula orçamentos de um usuário específico."""
+        return BudgetService.recalculate_budgets(db, usuario_id=UUID(str(usuario_id)))
 
 
 # Instância única do serviço
@@ -0,0 +1,207 @@
+"""
+Category catalog cache.
+
+As categorias quase nunca mudam, então ficam em memória num snapshot imutável
+com as variações de nome pré-calculadas (sem emoji, minúsculas, sem acento) e
+índices O(1) por id, tipo e nome. O snapshot é versionado: escritas em Category
+via ORM invalidam o cache no commit, e o TTL limita a defasagem entre workers.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import PendingInvalidation, register_commit_invalidation
+from app.core.config import settings
+from app.models.category import Category
+from app.services.text_normalization import normalize_name, remove_emoji_from_name
+
+
+@dataclass(frozen=True)
+class CategoryEntry:
+    """Categoria em cache (somente leitura, compartilhada entre requisições)."""
+
+    id: int
+    nome: str
+    tipo: str
+    nome_sem_emoji: str
+    nome_lower: str
+    nome_sem_emoji_lower: str
+    nome_normalizado: str
+
+
+class CategoryCatalog:
+    """Snapshot imutável das categorias com índices por id, tipo e nome."""
+
+    def __init__(self, categories: Iterable[Category], version: int):
+        self.version = version
+        self.entries: Tuple[CategoryEntry, ...] = tuple(
+            CategoryEntry(
+                id=cat.id,
+                nome=cat.nome,
+                tipo=cat.tipo,
+                nome_sem_emoji=remove_emoji_from_name(cat.nome),
+                nome_lower=cat.nome.lower(),
+                nome_sem_emoji_lower=remove_emoji_from_name(cat.nome).lower(),
+                nome_normalizado=normalize_name(cat.nome),
+            )
+            for cat in sorted(categories, key=lambda cat: cat.id)
+        )
+
+        self._by_id: Dict[int, CategoryEntry] = {e.id: e for e in self.entries}
+        self._by_tipo: Dict[str, Tuple[CategoryEntry, ...]] = {
+            tipo: tuple(e for e in self.entries if e.tipo == tipo)
+            for tipo in ("despesa", "receita")
+        }
+
+        # Um índice por estratégia de busca; em caso de nomes repetidos, vence
+        # o menor id (mesma ordem da busca linear anterior)
+        self._by_nome = self._index(lambda e: [e.nome])
+        self._by_nome_sem_emoji = self._index(lambda e: [e.nome_sem_emoji])
+        self._by_nome_lower = self._index(
+            lambda e: [e.nome_lower, e.nome_sem_emoji_lower]
+        )
+        self._by_nome_normalizado = self._index(lambda e: [e.nome_normalizado])
+
+    def _index(self, keys_for) -> Dict[str, List[CategoryEntry]]:
+        index: Dict[str, List[CategoryEntry]] = {}
+        for entry in self.entries:
+            for key in dict.fromkeys(keys_for(entry)):
+                index.setdefault(key, []).append(entry)
+        return index
+
+    def get(self, id: int) -> Optional[CategoryEntry]:
+        return self._by_id.get(id)
+
+    def by_tipo(self, tipo: str) -> Tuple[CategoryEntry, ...]:
+        return self._by_tipo.get(tipo, ())
+
+    @staticmethod
+    def _first(
+        candidates: Optional[List[CategoryEntry]], tipo: Optional[str]
+    ) -> Optional[CategoryEntry]:
+        for entry in candidates or ():
+            if tipo is None or entry.tipo == tipo:
+                return entry
+        return None
+
+    def find_by_name(
+        self, name: str, tipo: Optional[str] = None
+    ) -> Optional[CategoryEntry]:
+        """
+        Busca flexível por nome, da estratégia mais estrita para a mais solta.
+
+        1. Nome exato; 2. nome sem emoji; 3. sem diferenciar maiúsculas;
+        4. sem acentos; 5. contém o nome (busca linear, poucas categorias).
+        """
+        name_lower = name.lower()
+        entry = (
+            self._first(self._by_nome.get(name), tipo)
+            or self._first(self._by_nome_sem_emoji.get(name), tipo)
+            or self._first(self._by_nome_lower.get(name_lower), tipo)
+            or self._first(
+                self._by_nome_normalizado.get(normalize_name(name)),
+                tipo,
+            )
+        )
+        if entry:
+            return entry
+
+        candidates = self.by_tipo(tipo) if tipo else self.entries
+        for entry in candidates:
+            if (
+                name_lower in entry.nome_lower
+                or name_lower in entry.nome_sem_emoji_lower
+            ):
+                return entry
+        return None
+
+
+class CategoryCatalogCache:
+    """
+    Cache do catálogo de categorias por processo.
+
+    Cada invalidação incrementa a versão; uma carga iniciada antes de uma
+    invalidação não é instalada, então um snapshot antigo nunca sobrescreve
+    um mais novo.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._version = 0
+        self._catalog: Optional[CategoryCatalog] = None
+        self._loaded_at = 0.0
+
+    def _current(self) -> Optional[CategoryCatalog]:
+        catalog = self._catalog
+        if catalog is None or catalog.version != self._version:
+            return None
+        if time.monotonic() - self._loaded_at > self.ttl:
+            return None
+        return catalog
+
+    def _install(self, categories: Iterable[Category], version: int) -> CategoryCatalog:
+        catalog = CategoryCatalog(categories, version)
+        with self._lock:
+            if version == self._version:
+                self._catalog = catalog
+                self._loaded_at = time.monotonic()
+        return catalog
+
+    def get(self, db: Session) -> CategoryCatalog:
+        """Catálogo atual (carrega do banco apenas se expirado ou invalidado)."""
+        catalog = self._current()
+        if catalog is not None:
+            return catalog
+
+        version = self._version
+        categories = db.execute(select(Category)).scalars().all()
+        return self._install(categories, version)
+
+    async def get_async(self, db: AsyncSession) -> CategoryCatalog:
+        """Versão assíncrona de get."""
+        catalog = self._current()
+        if catalog is not None:
+            return catalog
+
+        version = self._version
+        result = await db.execute(select(Category))
+        return self._install(result.scalars().all(), version)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._catalog = None
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+
+category_catalog = CategoryCatalogCache(ttl=settings.CATEGORY_CACHE_TTL_SECONDS)
+
+
+# ============================================================================
+# Cache Invalidation (ORM events)
+# ============================================================================
+
+
+def _collect_category_changes(
+    session: Session, category: Category, pending: PendingInvalidation
+) -> None:
+    pending.all = True
+
+
+register_commit_invalidation(
+    "category_catalog_pending",
+    models=(Category,),
+    collect=_collect_category_changes,
+    invalidate=lambda _ids: category_catalog.invalidate(),
+    invalidate_all=category_catalog.invalidate,
+)
@@ -1,40 +1,14 @@
+import logging
 import re
-from typing import Dict, List
+from collections import Counter, defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.crud.category import category
-
-
-def remove_emoji_from_name(name: str) -> str:
-    """Remove all emojis from category name using comprehensive Unicode regex"""
-    # Remove all emoji characters using Unicode ranges
-    # This pattern covers all emoji ranges in Unicode
-    emoji_pattern = re.compile(
-        "["
-        "\U0001f600-\U0001f64f"  # emoticons
-        "\U0001f300-\U0001f5ff"  # symbols & pictographs
-        "\U0001f680-\U0001f6ff"  # transport & map symbols
-        "\U0001f1e0-\U0001f1ff"  # flags (iOS)
-        "\U00002500-\U00002bef"  # chinese char
-        "\U00002702-\U000027b0"
-        "\U000024c2-\U0001f251"
-        "\U0001f926-\U0001f937"
-        "\U00010000-\U0010ffff"
-        "\u2640-\u2642"
-        "\u2600-\u2b55"
-        "\u200d"
-        "\u23cf"
-        "\u23e9"
-        "\u231a"
-        "\ufe0f"  # dingbats
-        "\u3030"
-        "]+",
-        flags=re.UNICODE,
-    )
-    cleaned = emoji_pattern.sub("", name)
-    cleaned = re.sub(r"\s+", " ", cleaned).strip()  # Remove extra spaces
-    return cleaned
+from app.services.text_normalization import fold_accents, remove_emoji_from_name
+
+logger = logging.getLogger(__name__)
 
 
 def find_category_by_name_flexible(db: Session, name: str, tipo: str = None):
@@ -42,52 +16,84 @@ def find_category_by_name_flexible(db: Session, name: str, tipo: str = None):
     Flexibly find category by name with multiple search strategies.
 
     Args:
-        db: Database session
+        db: Database session (only used if the category catalog is not cached)
         name: Category name to search for
         tipo: Optional filter by type (despesa/receita)
 
     Returns:
-        Category object if found, None otherwise
+        Cached category entry (id, nome, tipo) if found, None otherwise
     """
-    from app.crud.category import category
+    from app.services.category_catalog import category_catalog
 
-    # Strategy 1: Exact match
-    if tipo:
-        categories = category.get_by_tipo(db, tipo=tipo)
-        for cat in categories:
-            if cat.nome == name:
-                return cat
-    else:
-        result = category.get_by_nome(db, nome=name)
-        if result:
-            return result
-
-    # Strategy 2: Exact match without emojis
-    if tipo:
-        categories = category.get_by_tipo(db, tipo=tipo)
-    else:
-        categories = db.query(category.model).all()
-
-    for cat in categories:
-        if remove_emoji_from_name(cat.nome) == name:
-            return cat
-
-    # Strategy 3: Case-insensitive match
-    name_lower = name.lower()
-    for cat in categories:
-        if cat.nome.lower() == name_lower:
-            return cat
-        if remove_emoji_from_name(cat.nome).lower() == name_lower:
-            return cat
-
-    # Strategy 4: Partial match (contains)
-    for cat in categories:
-        if name_lower in cat.nome.lower():
-            return cat
-        if name_lower in remove_emoji_from_name(cat.nome).lower():
-            return cat
-
-    return None
+    return category_catalog.get(db).find_by_name(name, tipo)
+
+
+class KeywordMatcher:
+    """
+    Match every keyword of every target in a single pass over the message.
+
+    Keywords are normalized like the message and compiled once into a single
+    alternation regex anchored at word starts. Keywords with at least
+    STEM_MIN_LENGTH characters also match as stems ("recebi" -> "recebido");
+    shorter ones must be whole words (plural -s/-es allowed), so "br" no longer
+    matches inside "brinquedo".
+    """
+
+    STEM_MIN_LENGTH = 5
+
+    _NON_WORD = re.compile(r"[^\w\s]")
+
+    def __init__(self, keywords_by_target: Dict[Hashable, Iterable[str]]):
+        # normalized keyword -> targets (a keyword may belong to several)
+        self._targets: Dict[str, Set[Hashable]] = defaultdict(set)
+        for target, keywords in keywords_by_target.items():
+            for keyword in keywords:
+                normalized = " ".join(self.normalize(keyword).split())
+                if normalized:
+                    self._targets[normalized].add(target)
+
+        # Longest first so "uber eats" wins over "uber"
+        keywords = sorted(self._targets, key=len, reverse=True)
+        stems = [k for k in keywords if len(k) >= self.STEM_MIN_LENGTH]
+        words = [k for k in keywords if len(k) < self.STEM_MIN_LENGTH]
+
+        alternatives = []
+        if stems:
+            alternatives.append(rf"({self._alternation(stems)})\w*")
+        if words:
+            alternatives.append(rf"({self._alternation(words)})(?:e?s)?\b")
+        self._pattern = (
+            re.compile(r"\b(?:" + "|".join(alternatives) + ")")
+            if alternatives
+            else None
+        )
+
+    @staticmethod
+    def _alternation(keywords: List[str]) -> str:
+        return "|".join(
+            r"\s+".join(re.escape(word) for word in keyword.split())
+            for keyword in keywords
+        )
+
+    @classmethod
+    def normalize(cls, text: str) -> str:
+        """Fold accents and replace punctuation with spaces."""
+        return cls._NON_WORD.sub(" ", fold_accents(text))
+
+    def match(self, text: str) -> Counter:
+        """Number of distinct keywords found per target."""
+        counts: Counter = Counter()
+        if self._pattern is None:
+            return counts
+
+        found = {
+            " ".join((match.group(1) or match.group(2)).split())
+            for match in self._pattern.finditer(self.normalize(text))
+        }
+        for keyword in found:
+            for target in self._targets[keyword]:
+                counts[target] += 1
+        return counts
 
 
 class CategoryFilterService:
@@ -286,58 +292,56 @@ class CategoryFilterService:
             "purchase",
         ]
 
+        # Compiled once: categories and receita/despesa type in a single pass
+        self.matcher = KeywordMatcher(
+            {
+                **{
+                    ("categoria", category_id): keywords
+                    for category_id, keywords in self.category_keywords.items()
+                },
+                ("tipo", "receita"): self.receita_keywords,
+                ("tipo", "despesa"): self.despesa_keywords,
+            }
+        )
+
     def normalize_text(self, text: str) -> str:
         """Normalize text for better keyword matching"""
-        text = text.lower()
-        # Remove acentos básicos
-        text = (
-            text.replace("ã", "a").replace("á", "a").replace("à", "a").replace("â", "a")
-        )
-        text = text.replace("é", "e").replace("ê", "e").replace("ë", "e")
-        text = text.replace("í", "i").replace("î", "i").replace("ï", "i")
-        text = text.replace("ó", "o").replace("ô", "o").replace("õ", "o")
-        text = text.replace("ú", "u").replace("û", "u").replace("ü", "u")
-        text = text.replace("ç", "c")
-        # Remove caracteres especiais, mantém apenas letras, números e espaços
-        text = re.sub(r"[^\w\s]", " ", text)
-        return text
+        return self.matcher.normalize(text)
 
-    def detect_transaction_type(self, message: str) -> str:
-        """Detect if message indicates receita or despesa"""
-        normalized_msg = self.normalize_text(message)
+    def analyze_message(self, message: str) -> Tuple[str, Dict[int, int]]:
+        """
+        Detect the transaction type and count keyword matches per category.
 
-        receita_score = sum(
-            1 for keyword in self.receita_keywords if keyword in normalized_msg
-        )
-        despesa_score = sum(
-            1 for keyword in self.despesa_keywords if keyword in normalized_msg
-        )
+        Returns:
+            tuple: (detected type, {category_id: distinct keywords matched})
+        """
+        counts = self.matcher.match(message)
 
-        if receita_score > despesa_score:
-            return "receita"
+        if counts[("tipo", "receita")] > counts[("tipo", "despesa")]:
+            detected_type = "receita"
         else:
-            return "despesa"  # Default to despesa as it's more common
-
-    def calculate_category_score(self, message: str, category_id: int) -> float:
-        """Calculate relevance score for a category based on message content"""
-        if category_id not in self.category_keywords:
-            return 0.0
-
-        keywords = self.category_keywords[category_id]
-        if not keywords:  # Categoria "Outros" sem keywords específicas
-            return 0.0  # Don't auto-include "Outros" categories
+            detected_type = "despesa"  # Default to despesa as it's more common
 
-        normalized_msg = self.normalize_text(message)
+        category_matches = {
+            target[1]: count
+            for target, count in counts.items()
+            if target[0] == "categoria"
+        }
+        return detected_type, category_matches
 
-        # Count keyword matches
-        matches = 0
-        # total_keywords = len(keywords)
+    def detect_transaction_type(self, message: str) -> str:
+        """Detect if message indicates receita or despesa"""
+        return self.analyze_message(message)[0]
 
-        for keyword in keywords:
-            if keyword in normalized_msg:
-                matches += 1
+    def calculate_category_score(self, message: str, category_id: int) -> float:
+        """Calculate relevance score for a category based on message content"""
+        _, category_matches = self.analyze_message(message)
+        # Categorias "Outros" não têm keywords: nunca são incluídas automaticamente
+        return self._score_for_matches(category_matches.get(category_id, 0))
 
-        # Calculate score with bonus for multiple matches
+    @staticmethod
+    def _score_for_matches(matches: int) -> float:
+        """Score with bonus for multiple matches"""
         if matches == 0:
             return 0.0
         elif matches == 1:
@@ -347,6 +351,105 @@ class CategoryFilterService:
         else:
             return 0.95
 
+    def predict_category(self, db: Session, message: str):
+        """
+        Embedding classifier prediction for the message.
+
+        Returns None when the classifier is not configured or fails, so callers
+        fall back to keyword matching.
+        """
+        from app.services.embedding_classifier import get_embedding_classifier
+
+        try:
+            classifier = get_embedding_classifier()
+            if classifier is None:
+                return None
+            prediction = classifier.classify(db, message)
+        except Exception:
+            logger.warning("Embedding category classifier failed", exc_info=True)
+            return None
+        return prediction if prediction.neighbors else None
+
+    async def predict_category_async(self, db: AsyncSession, message: str):
+        """Async version of predict_category (embedding runs off the event loop)."""
+        from app.services.embedding_classifier import get_embedding_classifier
+
+        try:
+            classifier = get_embedding_classifier()
+            if classifier is None:
+                return None
+            prediction = (await classifier.classify_batch_async(db, [message]))[0]
+        except Exception:
+            logger.warning("Embedding category classifier failed", exc_info=True)
+            return None
+        return prediction if prediction.neighbors else None
+
+    def suggest_batch(
+        self,
+        db: Session,
+        items: Sequence[Tuple[str, Optional[str]]],
+        strategy: str = "keywords",
+        min_score: float = 0.5,
+    ) -> List[Tuple[str, Optional[int]]]:
+        """
+        Tipo e categoria sugeridos para um lote de descrições (importação).
+
+        Versão enxuta de filter_categories: só a melhor categoria por item,
+        sem montar a lista completa. Com strategy="embedding" o lote inteiro
+        vai em uma chamada do classificador; sem classificador configurado
+        (ou se ele falhar), usa keywords.
+
+        Args:
+            items: (descrição, tipo ou None para detectar) de cada item
+            min_score: Confiança mínima para sugerir uma categoria
+
+        Returns:
+            (tipo, categoria_id ou None) na ordem de items
+        """
+        from app.services.category_catalog import category_catalog
+
+        catalog = category_catalog.get(db)
+        predictions = [None] * len(items)
+
+        if strategy == "embedding" and items:
+            from app.services.embedding_classifier import get_embedding_classifier
+
+            try:
+                classifier = get_embedding_classifier()
+                if classifier is not None:
+                    predictions = classifier.classify_batch(
+                        db, [message for message, _ in items]
+                    )
+            except Exception:
+                logger.warning("Embedding category classifier failed", exc_info=True)
+
+        suggestions = []
+        for (message, tipo), prediction in zip(items, predictions):
+            if prediction is not None and prediction.neighbors:
+                tipo = tipo or prediction.tipo
+                category_scores = defaultdict(float)
+                if tipo == prediction.tipo:
+                    for nome, share in prediction.categorias.items():
+                        entry = catalog.find_by_name(nome, tipo)
+                        if entry:
+                            category_scores[entry.id] += share
+            else:
+                detected_type, category_matches = self.analyze_message(message)
+                tipo = tipo or detected_type
+                category_scores = {
+                    category_id: self._score_for_matches(matches)
+                    for category_id, matches in category_matches.items()
+                }
+
+            best_id, best_score = None, 0.0
+            for cat in catalog.by_tipo(tipo):
+                score = category_scores.get(cat.id, 0.0)
+                if score >= min_score and score > best_score:
+                    best_id, best_score = cat.id, score
+            suggestions.append((tipo, best_id))
+
+        return suggestions
+
     def filter_categories(
         self,
         db: Session,
@@ -354,23 +457,45 @@ class CategoryFilterService:
         max_categories: int = 3,
         min_score: float = 0.1,
         remove_emojis: bool = False,
+        prediction=None,
     ) -> Dict:
-        """Filter and score categories based on message content"""
+        """
+        Filter and score categories based on message content.
+
+        If an embedding classifier prediction is given (see predict_category),
+        its tipo and category vote shares are used instead of keyword matching.
+        """
 
-        # Detect transaction type
-        detected_type = self.detect_transaction_type(message)
+        from app.services.category_catalog import category_catalog
 
-        # Get all categories of detected type
-        categories = category.get_by_tipo(db, tipo=detected_type)
+        catalog = category_catalog.get(db)
+
+        if prediction is not None:
+            strategy = "embedding"
+            detected_type = prediction.tipo
+            category_scores = defaultdict(float)
+            for nome, share in prediction.categorias.items():
+                entry = catalog.find_by_name(nome, detected_type)
+                if entry:
+                    category_scores[entry.id] += share
+        else:
+            # Detect transaction type and match keywords (single pass)
+            strategy = "keywords"
+            detected_type, category_matches = self.analyze_message(message)
+            category_scores = {
+                category_id: self._score_for_matches(matches)
+                for category_id, matches in category_matches.items()
+            }
+
+        # Get all categories of detected type (in-memory catalog)
+        categories = catalog.by_tipo(detected_type)
 
         # Calculate scores for each category
         scored_categories = []
         for cat in categories:
-            score = self.calculate_category_score(message, cat.id)
+            score = round(min(category_scores.get(cat.id, 0.0), 1.0), 2)
             if score >= min_score:
-                category_name = (
-                    remove_emoji_from_name(cat.nome) if remove_emojis else cat.nome
-                )
+                category_name = cat.nome_sem_emoji if remove_emojis else cat.nome
                 scored_categories.append(
                     {
                         "id": cat.id,
@@ -394,9 +519,7 @@ class CategoryFilterService:
             # But the compact format will use the full list instead
             if not scored_categories:
                 for cat in categories[:max_categories]:
-                    category_name = (
-                        remove_emoji_from_name(cat.nome) if remove_emojis else cat.nome
-                    )
+                    category_name = cat.nome_sem_emoji if remove_emojis else cat.nome
                     scored_categories.append(
                         {
                             "id": cat.id,
@@ -410,8 +533,8 @@ class CategoryFilterService:
         filtered_categories = scored_categories[:max_categories]
 
         # Get all categories for complete list
-        all_despesas = category.get_by_tipo(db, tipo="despesa")
-        all_receitas = category.get_by_tipo(db, tipo="receita")
+        all_despesas = catalog.by_tipo("despesa")
+        all_receitas = catalog.by_tipo("receita")
 
         # Calculate token savings
         total_categories = len(all_despesas) + len(all_receitas)
@@ -434,6 +557,7 @@ class CategoryFilterService:
                 "total_categories_available": len(categories),
                 "categories_filtered": filtered_count,
                 "confidence_threshold": min_score,
+                "strategy": strategy,
             },
             "use_full_list": use_full_list,  # Indica se deve usar lista completa
             "best_score": best_score,  # Melhor score encontrado
@@ -0,0 +1,363 @@
+"""
+Embedding-based category classifier.
+
+Classifica mensagens por k-NN sobre expressões rotuladas (categoria e tipo no
+metadata de expressions_embeddings): os k vizinhos mais próximos votam,
+ponderados pela similaridade de cosseno.
+
+Dois índices com a mesma interface:
+- PgVectorIndex: busca no Postgres com pgvector (índice HNSW)
+- LocalVectorIndex: força bruta com NumPy em memória, carregado de um arquivo
+  .npz (testes e execução local, sem pgvector)
+
+Os embeddings vêm da API da OpenAI (mesma dimensão da coluna, 1536) ou de um
+embedder local por feature hashing, que não usa rede.
+"""
+
+import asyncio
+import hashlib
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import httpx
+import numpy as np
+from sqlalchemy import bindparam, column, func, select, true
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.text_normalization import fold_accents
+
+# Dimensão de expressions_embeddings.embedding (OpenAI text-embedding-3-small)
+EMBEDDING_DIM = 1536
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Normaliza cada linha para norma 1 (produto escalar = cosseno)."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+# ============================================================================
+# Embedders
+# ============================================================================
+
+
+class HashingEmbedder:
+    """
+    Embeddings locais por feature hashing (palavras e trigramas de caracteres).
+
+    Determinístico e sem rede: serve para testes, execução local e para montar
+    um índice a partir do dataset sem chave da OpenAI.
+    """
+
+    _WORDS = re.compile(r"\w+")
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+
+    def _features(self, text: str) -> List[str]:
+        features = []
+        for word in self._WORDS.findall(fold_accents(text)):
+            features.append(word)
+            padded = f" {word} "
+            features.extend(padded[i : i + 3] for i in range(len(padded) - 2))
+        return features
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+                bucket = int.from_bytes(digest, "little")
+                sign = 1.0 if bucket >> 63 else -1.0
+                matrix[row, bucket % self.dim] += sign
+        return _normalize_rows(matrix)
+
+
+class OpenAIEmbedder:
+    """Embeddings da API da OpenAI (uma requisição por lote de textos)."""
+
+    URL = "https://api.openai.com/v1/embeddings"
+
+    def __init__(self, api_key: str, model: str, timeout: float = 10.0):
+        self.api_key = api_key
+        self.model = model
+        self.timeout = timeout
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        response = httpx.post(
+            self.URL,
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            json={"model": self.model, "input": list(texts)},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        data = sorted(response.json()["data"], key=lambda item: item["index"])
+        matrix = np.array([item["embedding"] for item in data], dtype=np.float32)
+        return _normalize_rows(matrix)
+
+
+def build_embedder(name: str):
+    """Cria o embedder configurado ("openai" ou "hashing")."""
+    if name == "hashing":
+        return HashingEmbedder()
+    if name == "openai":
+        if not settings.OPENAI_API_KEY:
+            raise ValueError("OPENAI_API_KEY is required for the openai embedder")
+        return OpenAIEmbedder(
+            settings.OPENAI_API_KEY, settings.CATEGORY_CLASSIFIER_EMBEDDING_MODEL
+        )
+    raise ValueError(f"Unknown embedder: {name}")
+
+
+# ============================================================================
+# Indexes
+# ============================================================================
+
+
+@dataclass(frozen=True)
+class Neighbor:
+    """Expressão rotulada próxima da mensagem."""
+
+    categoria: str
+    tipo: str
+    similarity: float
+
+
+class LocalVectorIndex:
+    """Índice em memória (força bruta com NumPy), carregado de um arquivo .npz."""
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        categorias: Sequence[str],
+        tipos: Sequence[str],
+    ):
+        self.embeddings = _normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        self.categorias = np.asarray(categorias, dtype=str)
+        self.tipos = np.asarray(tipos, dtype=str)
+
+    def __len__(self) -> int:
+        return len(self.embeddings)
+
+    @classmethod
+    def load(cls, path) -> "LocalVectorIndex":
+        with np.load(Path(path), allow_pickle=False) as data:
+            return cls(data["embeddings"], data["categorias"], data["tipos"])
+
+    def save(self, path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            embeddings=self.embeddings,
+            categorias=self.categorias,
+            tipos=self.tipos,
+        )
+
+    def search(
+        self, db: Optional[Session], vectors: np.ndarray, k: int
+    ) -> List[List[Neighbor]]:
+        """k vizinhos mais próximos de cada vetor (um produto de matrizes por lote)."""
+        if not len(self):
+            return [[] for _ in vectors]
+
+        k = min(k, len(self))
+        scores = vectors @ self.embeddings.T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+        results = []
+        for row, candidates in enumerate(top):
+            ordered = candidates[np.argsort(-scores[row, candidates])]
+            results.append(
+                [
+                    Neighbor(
+                        categoria=str(self.categorias[i]),
+                        tipo=str(self.tipos[i]),
+                        similarity=float(scores[row, i]),
+                    )
+                    for i in ordered
+                ]
+            )
+        return results
+
+
+class PgVectorIndex:
+    """k-NN no Postgres sobre expressions_embeddings (pgvector, índice HNSW)."""
+
+    # Vetores por consulta (cada um vai como texto, ~15 KB com 1536 floats)
+    batch_size = 256
+
+    def search(self, db: Session, vectors: np.ndarray, k: int) -> List[List[Neighbor]]:
+        """
+        k vizinhos de cada vetor: uma consulta por até batch_size vetores.
+
+        unnest(vetores) WITH ORDINALITY + LATERAL (... ORDER BY distância
+        LIMIT k): cada vetor é uma busca no índice HNSW, sem uma ida ao banco
+        por vetor.
+        """
+        results: List[List[Neighbor]] = []
+        for start in range(0, len(vectors), self.batch_size):
+            results.extend(
+                self._search_batch(db, vectors[start : start + self.batch_size], k)
+            )
+        return results
+
+    @staticmethod
+    def _search_batch(db: Session, vectors: np.ndarray, k: int) -> List[List[Neighbor]]:
+        from pgvector.sqlalchemy import Vector
+
+        from app.models.expression_embedding import ExpressionEmbedding
+
+        vector_type = Vector(EMBEDDING_DIM)
+        queries = (
+            func.unnest(
+                # Um parâmetro vector[] (itens ndarray: um vetor por elemento)
+                bindparam("vectors", list(vectors), type_=ARRAY(vector_type))
+            )
+            .table_valued(column("vector", vector_type), with_ordinality="position")
+            .render_derived(name="queries")
+        )
+        distance = ExpressionEmbedding.embedding.cosine_distance(queries.c.vector)
+        neighbors = (
+            select(
+                ExpressionEmbedding.metadata_info.label("metadata"),
+                distance.label("distance"),
+            )
+            .where(ExpressionEmbedding.embedding.isnot(None))
+            .order_by(distance)
+            .limit(k)
+            .lateral("neighbors")
+        )
+        rows = db.execute(
+            select(queries.c.position, neighbors.c.metadata, neighbors.c.distance)
+            .select_from(queries)
+            .join(neighbors, true())
+            .order_by(queries.c.position, neighbors.c.distance)
+        )
+
+        results: List[List[Neighbor]] = [[] for _ in range(len(vectors))]
+        for position, metadata, row_distance in rows:
+            if metadata:
+                results[position - 1].append(
+                    Neighbor(
+                        categoria=metadata.get("categoria", ""),
+                        tipo=metadata.get("tipo", ""),
+                        similarity=1.0 - float(row_distance),
+                    )
+                )
+        return results
+
+
+# ============================================================================
+# Classifier
+# ============================================================================
+
+
+@dataclass
+class CategoryPrediction:
+    """Resultado da votação dos vizinhos para uma mensagem."""
+
+    tipo: str
+    tipo_confidence: float
+    # nome da categoria (rótulo do dataset) -> fração dos votos do tipo
+    categorias: Dict[str, float]
+    neighbors: int
+
+
+class EmbeddingCategoryClassifier:
+    """k-NN com voto ponderado por similaridade sobre expressões rotuladas."""
+
+    def __init__(self, embedder, index, k: int = 10):
+        self.embedder = embedder
+        self.index = index
+        self.k = k
+
+    def classify(self, db: Optional[Session], message: str) -> CategoryPrediction:
+        return self.classify_batch(db, [message])[0]
+
+    def classify_batch(
+        self, db: Optional[Session], messages: Sequence[str]
+    ) -> List[CategoryPrediction]:
+        """Classifica um lote: um embedding por lote e uma busca por lote."""
+        if not messages:
+            return []
+        vectors = self.embedder.embed(messages)
+        return self._vote_batch(db, vectors)
+
+    async def classify_batch_async(
+        self, db: AsyncSession, messages: Sequence[str]
+    ) -> List[CategoryPrediction]:
+        """Versão assíncrona: o embedding (HTTP/CPU) roda fora do event loop."""
+        if not messages:
+            return []
+        vectors = await asyncio.to_thread(self.embedder.embed, list(messages))
+        return await db.run_sync(self._vote_batch, vectors)
+
+    def _vote_batch(
+        self, db: Optional[Session], vectors: np.ndarray
+    ) -> List[CategoryPrediction]:
+        return [self.vote(n) for n in self.index.search(db, vectors, self.k)]
+
+    @staticmethod
+    def vote(neighbors: List[Neighbor]) -> CategoryPrediction:
+        """Tipo por maioria ponderada; categorias votadas só entre as do tipo."""
+        tipo_votes: Dict[str, float] = defaultdict(float)
+        for neighbor in neighbors:
+            tipo_votes[neighbor.tipo] += max(neighbor.similarity, 0.0)
+
+        total = sum(tipo_votes.values())
+        if total <= 0:
+            return CategoryPrediction("despesa", 0.0, {}, len(neighbors))
+
+        # Empate favorece despesa, como na detecção por keywords
+        tipo = max(("despesa", "receita"), key=lambda t: tipo_votes.get(t, 0.0))
+        tipo_total = tipo_votes.get(tipo, 0.0)
+        if tipo_total <= 0:
+            return CategoryPrediction(tipo, 0.0, {}, len(neighbors))
+
+        category_votes: Dict[str, float] = defaultdict(float)
+        for neighbor in neighbors:
+            if neighbor.tipo == tipo and neighbor.categoria:
+                category_votes[neighbor.categoria] += max(neighbor.similarity, 0.0)
+
+        return CategoryPrediction(
+            tipo=tipo,
+            tipo_confidence=tipo_total / total,
+            categorias={
+                nome: votes / tipo_total for nome, votes in category_votes.items()
+            },
+            neighbors=len(neighbors),
+        )
+
+
+@lru_cache(maxsize=1)
+def get_embedding_classifier() -> Optional[EmbeddingCategoryClassifier]:
+    """
+    Classificador configurado (None se CATEGORY_CLASSIFIER_BACKEND não definido).
+
+    Criado no primeiro uso; o índice local é lido do arquivo uma única vez.
+    """
+    backend = settings.CATEGORY_CLASSIFIER_BACKEND
+    if not backend:
+        return None
+
+    if backend == "pgvector":
+        index = PgVectorIndex()
+    elif backend == "local":
+        index = LocalVectorIndex.load(settings.CATEGORY_CLASSIFIER_INDEX_PATH)
+    else:
+        raise ValueError(f"Unknown category classifier backend: {backend}")
+
+    return EmbeddingCategoryClassifier(
+        build_embedder(settings.CATEGORY_CLASSIFIER_EMBEDDER),
+        index,
+        k=settings.CATEGORY_CLASSIFIER_K,
+    )
@@ -1,5 +1,6 @@
 from datetime import datetime
 from typing import Any, Dict, Optional
+from uuid import UUID
 
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
@@ -316,14 +317,24 @@ class GoogleCalendarService:
 
         return success
 
-    def sync_pending_commitments(self, db: Session) -> Dict[str, Any]:
-        """Job para sincronizar compromissos pendentes."""
-        pending_commitments = commitment_crud.get_pendentes_sincronizacao(db)
+    def sync_pending_commitments(
+        self, db: Session, *, after_id: Optional[UUID] = None, limit: int = 100
+    ) -> Dict[str, Any]:
+        """
+        Job para sincronizar compromissos pendentes.
+
+        Sincroniza até limit pendentes com id maior que after_id; ultimo_id é
+        o after_id da próxima página (None se não havia pendentes).
+        """
+        pending_commitments = commitment_crud.get_pendentes_sincronizacao(
+            db, after_id=after_id, limit=limit
+        )
 
         results = {
             "total_pendentes": len(pending_commitments),
             "sincronizados": 0,
             "erros": 0,
+            "ultimo_id": pending_commitments[-1].id if pending_commitments else None,
             "detalhes": [],
         }
 
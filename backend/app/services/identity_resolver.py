@@ -0,0 +1,187 @@
+"""
+Identity resolver for n8n/WhatsApp requests.
+
+Resolve usuario_id, telefone ou lid para o usuário (com plano e telefones) em
+uma única query com joins, atrás de um cache TTL/LRU em memória. O cache é
+invalidado automaticamente quando User, UserPhone ou Plan mudam via ORM.
+"""
+
+from itertools import chain
+from typing import Hashable, Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.cache import (
+    PendingInvalidation,
+    TTLCache,
+    has_changes,
+    register_commit_invalidation,
+)
+from app.core.config import settings
+from app.models.plan import Plan
+from app.models.user import User
+from app.models.user_phone import UserPhone
+
+# Campos do User usados pelos endpoints; mudanças em outros (ex: last_login_at)
+# não invalidam o cache
+_USER_CACHED_FIELDS = ("is_active", "is_verified", "nome", "email", "plano_id")
+
+
+class IdentityResolver:
+    """
+    Resolve a identidade do usuário a partir de usuario_id, telefone ou lid.
+
+    Os usuários retornados estão desanexados da sessão (com plano e telefones
+    já carregados) e são compartilhados entre requisições: use-os apenas para
+    leitura e nunca os adicione a uma sessão. Um usuário carregado antes de
+    uma invalidação não é instalado no cache (geração do TTLCache).
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache: TTLCache[User] = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    # ========================================================================
+    # Resolution
+    # ========================================================================
+
+    @staticmethod
+    def _cache_key(
+        usuario_id: Optional[UUID], phone_number: Optional[str], lid: Optional[str]
+    ) -> Optional[Hashable]:
+        if usuario_id:
+            return ("id", str(usuario_id))
+        if phone_number:
+            return ("phone", phone_number)
+        if lid:
+            return ("lid", lid.lstrip("@"))
+        return None
+
+    @staticmethod
+    def _build_query(
+        usuario_id: Optional[UUID], phone_number: Optional[str], lid: Optional[str]
+    ):
+        """Uma query: usuário + plano + telefones (joins)."""
+        query = select(User).options(joinedload(User.plano), joinedload(User.phones))
+
+        if usuario_id:
+            return query.where(User.id == usuario_id)
+
+        matched_phone = (
+            UserPhone.phone_number == phone_number
+            if phone_number
+            else UserPhone.lid == lid.lstrip("@")
+        )
+        return query.join(UserPhone, UserPhone.user_id == User.id).where(
+            matched_phone, UserPhone.is_active.is_(True)
+        )
+
+    @staticmethod
+    def _detach(db, user: User) -> None:
+        """Desanexa o usuário e os objetos carregados junto com ele."""
+        for obj in chain([user, user.plano], user.phones):
+            if obj is not None and obj in db:
+                db.expunge(obj)
+
+    def resolve(
+        self,
+        db: Session,
+        *,
+        usuario_id: Optional[UUID] = None,
+        phone_number: Optional[str] = None,
+        lid: Optional[str] = None,
+    ) -> Optional[User]:
+        """
+        Resolve o usuário por usuario_id, telefone (já formatado) ou lid.
+
+        Telefone e lid só resolvem para telefones ativos.
+        """
+        key = self._cache_key(usuario_id, phone_number, lid)
+        if key is None:
+            return None
+
+        user = self._cache.get(key)
+        if user is not None:
+            return user
+
+        generation = self._cache.generation
+        query = self._build_query(usuario_id, phone_number, lid)
+        user = db.execute(query).unique().scalars().first()
+        if user is not None:
+            self._detach(db, user)
+            self._cache.set(key, user, generation=generation)
+        return user
+
+    async def resolve_async(
+        self,
+        db: AsyncSession,
+        *,
+        usuario_id: Optional[UUID] = None,
+        phone_number: Optional[str] = None,
+        lid: Optional[str] = None,
+    ) -> Optional[User]:
+        """Versão assíncrona de resolve."""
+        key = self._cache_key(usuario_id, phone_number, lid)
+        if key is None:
+            return None
+
+        user = self._cache.get(key)
+        if user is not None:
+            return user
+
+        generation = self._cache.generation
+        query = self._build_query(usuario_id, phone_number, lid)
+        result = await db.execute(query)
+        user = result.unique().scalars().first()
+        if user is not None:
+            self._detach(db, user)
+            self._cache.set(key, user, generation=generation)
+        return user
+
+    # ========================================================================
+    # Invalidation
+    # ========================================================================
+
+    def invalidate_users(self, user_ids: Iterable[UUID]) -> None:
+        """Remove do cache todas as chaves (id, telefone, lid) dos usuários."""
+        ids = set(user_ids)
+        self._cache.remove_where(lambda _key, user: user.id in ids)
+
+    def invalidate_all(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+identity_resolver = IdentityResolver(
+    maxsize=settings.IDENTITY_CACHE_MAX_SIZE, ttl=settings.IDENTITY_CACHE_TTL_SECONDS
+)
+
+
+# ============================================================================
+# Cache Invalidation (ORM events)
+# ============================================================================
+
+
+def _collect_identity_changes(
+    session: Session, obj, pending: PendingInvalidation
+) -> None:
+    if isinstance(obj, UserPhone):
+        pending.ids.add(obj.user_id)
+    elif isinstance(obj, User):
+        if obj in session.deleted or has_changes(obj, _USER_CACHED_FIELDS):
+            pending.ids.add(obj.id)
+    else:  # Plan: afeta todos os usuários do plano
+        pending.all = True
+
+
+register_commit_invalidation(
+    "identity_resolver_pending",
+    models=(User, UserPhone, Plan),
+    collect=_collect_identity_changes,
+    invalidate=identity_resolver.invalidate_users,
+    invalidate_all=identity_resolver.invalidate_all,
+)
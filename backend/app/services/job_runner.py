@@ -0,0 +1,514 @@
+"""
+Jobs de manutenção em background (antes executados dentro de /sistema/*).
+
+Os endpoints /sistema/* só enfileiram o job (tabela background_jobs) e
+respondem 202; cada processo da API roda um worker que, a cada
+JOB_POLL_INTERVAL_SECONDS, reserva jobs vencidos com lease (ver
+app/crud/job.py) e os executa no threadpool, fora do event loop.
+
+- Handlers trabalham em trechos com commit e chamam context.report() após
+  cada um: grava o checkpoint e renova o lease. Se o worker morrer, outro
+  reserva o job quando o lease expira e o handler continua do checkpoint
+- Falhas voltam para a fila com backoff exponencial
+  (JOB_RETRY_BASE_SECONDS * 2^(tentativa - 1)) até max_attempts
+- Jobs com intervalo são reagendados ao terminar (sucesso ou falha final) e
+  garantidos na fila a cada minuto (primeiro deploy, job abandonado)
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID
+
+import httpx
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud.api_key import api_key as api_key_crud
+from app.crud.job import background_job
+from app.models.job import BackgroundJob
+from app.services.budget_service import budget_service
+from app.services.google_calendar_service import google_calendar_service
+
+logger = logging.getLogger(__name__)
+
+# Jobs registrados
+BUDGET_PERIOD_ROLLOVER = "budget_period_rollover"
+BUDGET_RECALCULATION = "budget_recalculation"
+COMMITMENT_GOOGLE_SYNC = "commitment_google_sync"
+API_KEY_CLEANUP = "api_key_cleanup"
+BUDGET_ALERT_FANOUT = "budget_alert_fanout"
+
+# Frequência com que cada worker garante os jobs agendados na fila
+_SCHEDULE_INTERVAL_SECONDS = 60.0
+
+
+class LeaseLostError(Exception):
+    """O job não está mais reservado para este worker (lease expirado)."""
+
+
+class JobInterrupted(Exception):
+    """Worker encerrando: o job volta para a fila e continua do checkpoint."""
+
+
+@dataclass
+class JobDefinition:
+    """Job registrado no runner."""
+
+    name: str
+    handler: Callable[[Session, "JobContext"], Dict[str, Any]]
+    interval_seconds: float = 0  # 0: só sob demanda
+    max_attempts: int = 3
+
+
+class JobContext:
+    """Checkpoint e progresso do job em execução (passado ao handler)."""
+
+    def __init__(self, runner: "JobRunner", job: BackgroundJob):
+        self._runner = runner
+        self.job_id = job.id
+        self.checkpoint: Dict[str, Any] = dict(job.progress or {})
+
+    def report(self, **progress: Any) -> None:
+        """
+        Grava o checkpoint (valores JSON) e renova o lease.
+
+        Chame após o commit de cada trecho. Levanta LeaseLostError se outro
+        worker assumiu o job e JobInterrupted se o worker está encerrando (o
+        checkpoint já está gravado).
+        """
+        self.checkpoint.update(progress)
+        db = SessionLocal()
+        try:
+            owned = background_job.heartbeat(
+                db,
+                job_id=self.job_id,
+                worker_id=self._runner.worker_id,
+                lease_seconds=self._runner.lease_seconds,
+                progress=self.checkpoint,
+            )
+        finally:
+            db.close()
+
+        if not owned:
+            raise LeaseLostError(f"Job {self.job_id} não está mais reservado")
+        if self._runner.stopping:
+            raise JobInterrupted()
+
+
+class JobRunner:
+    """Registro dos jobs e worker em background (um por processo)."""
+
+    def __init__(
+        self, poll_interval: float, lease_seconds: float, retry_base_seconds: float
+    ):
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.retry_base_seconds = retry_base_seconds
+        self.worker_id = self._make_worker_id()
+        self._jobs: Dict[str, JobDefinition] = {}
+        self._stopping = threading.Event()
+        self._scheduled_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _make_worker_id() -> str:
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    @property
+    def stopping(self) -> bool:
+        return self._stopping.is_set()
+
+    # ========================================================================
+    # Registry
+    # ========================================================================
+
+    def register(
+        self,
+        name: str,
+        handler: Callable[[Session, JobContext], Dict[str, Any]],
+        *,
+        interval_seconds: float = 0,
+        max_attempts: Optional[int] = None,
+    ) -> None:
+        """Registra um job (intervalo 0 = só sob demanda)."""
+        self._jobs[name] = JobDefinition(
+            name=name,
+            handler=handler,
+            interval_seconds=interval_seconds,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        )
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._jobs
+
+    @property
+    def job_names(self) -> List[str]:
+        return list(self._jobs)
+
+    # ========================================================================
+    # Enqueue / Schedule
+    # ========================================================================
+
+    def enqueue(
+        self, db: Session, name: str, *, triggered_by: str = "manual"
+    ) -> BackgroundJob:
+        """
+        Enfileira o job para rodar agora (ou retorna o que já está na fila
+        ou rodando). Levanta KeyError se o job não está registrado.
+        """
+        definition = self._jobs[name]
+        return background_job.enqueue(
+            db,
+            name=definition.name,
+            max_attempts=definition.max_attempts,
+            triggered_by=triggered_by,
+        )
+
+    def _enqueue_next_run(self, db: Session, definition: JobDefinition) -> None:
+        """Agenda a próxima execução de um job com intervalo (sem commit)."""
+        if not definition.interval_seconds:
+            return
+        background_job.enqueue(
+            db,
+            name=definition.name,
+            max_attempts=definition.max_attempts,
+            triggered_by="schedule",
+            run_at=datetime.now(timezone.utc)
+            + timedelta(seconds=definition.interval_seconds),
+            commit=False,
+        )
+
+    def schedule(self) -> None:
+        """
+        Garante uma execução na fila para cada job com intervalo: falha os
+        jobs abandonados (lease expirado na última tentativa) e agenda os que
+        não têm job pendente nem rodando para o fim da última execução +
+        intervalo (ou agora, se nunca rodaram).
+        """
+        db = SessionLocal()
+        try:
+            for name in background_job.fail_abandoned(db):
+                logger.error(f"[JOBS] Job {name} abandoned after its last attempt")
+
+            active = set(background_job.get_active_names(db))
+            for definition in self._jobs.values():
+                if not definition.interval_seconds or definition.name in active:
+                    continue
+                last_finished_at = background_job.get_last_finished_at(
+                    db, definition.name
+                )
+                background_job.enqueue(
+                    db,
+                    name=definition.name,
+                    max_attempts=definition.max_attempts,
+                    triggered_by="schedule",
+                    run_at=(
+                        last_finished_at
+                        + timedelta(seconds=definition.interval_seconds)
+                        if last_finished_at
+                        else datetime.now(timezone.utc)
+                    ),
+                    commit=False,
+                )
+            db.commit()
+        finally:
+            db.close()
+
+    # ========================================================================
+    # Execution
+    # ========================================================================
+
+    def run_next(self) -> bool:
+        """Reserva e executa um job vencido. Returns: False se não havia job."""
+        # O job é usado depois do commit da reserva (fora da sessão)
+        db = SessionLocal(expire_on_commit=False)
+        try:
+            job = background_job.claim(
+                db,
+                names=self.job_names,
+                worker_id=self.worker_id,
+                lease_seconds=self.lease_seconds,
+            )
+        finally:
+            db.close()
+
+        if job is None:
+            return False
+
+        self._execute(job)
+        return True
+
+    def _execute(self, job: BackgroundJob) -> None:
+        definition = self._jobs[job.name]
+        context = JobContext(self, job)
+        logger.info(
+            f"[JOBS] Running {job.name} ({job.id}), attempt {job.attempts}/"
+            f"{job.max_attempts}"
+        )
+
+        db = SessionLocal()
+        try:
+            result = definition.handler(db, context)
+        except JobInterrupted:
+            db.rollback()
+            self._release(job)
+            return
+        except LeaseLostError:
+            db.rollback()
+            logger.warning(f"[JOBS] Lost the lease of {job.name} ({job.id})")
+            return
+        except Exception as e:
+            db.rollback()
+            logger.exception(f"[JOBS] Job {job.name} ({job.id}) failed")
+            self._fail(job, definition, e)
+            return
+        finally:
+            db.close()
+
+        db = SessionLocal()
+        try:
+            if background_job.complete(
+                db, job_id=job.id, worker_id=self.worker_id, result=result or {}
+            ):
+                self._enqueue_next_run(db, definition)
+            db.commit()
+        finally:
+            db.close()
+        logger.info(f"[JOBS] Job {job.name} ({job.id}) succeeded: {result}")
+
+    def _fail(self, job: BackgroundJob, definition: JobDefinition, error: Exception):
+        retry_in_seconds = None
+        if job.attempts < job.max_attempts:
+            retry_in_seconds = self.retry_base_seconds * 2 ** (job.attempts - 1)
+
+        db = SessionLocal()
+        try:
+            failed = background_job.fail(
+                db,
+                job_id=job.id,
+                worker_id=self.worker_id,
+                error=f"{type(error).__name__}: {error}",
+                retry_in_seconds=retry_in_seconds,
+            )
+            if failed and retry_in_seconds is None:
+                self._enqueue_next_run(db, definition)
+            db.commit()
+        finally:
+            db.close()
+
+    def _release(self, job: BackgroundJob) -> None:
+        db = SessionLocal()
+        try:
+            background_job.release(db, job_id=job.id, worker_id=self.worker_id)
+        finally:
+            db.close()
+        logger.info(f"[JOBS] Job {job.name} ({job.id}) released on shutdown")
+
+    def run_pending(self) -> int:
+        """
+        Agenda (no máximo a cada minuto) e executa os jobs vencidos, um por
+        vez. Returns: número de jobs executados.
+        """
+        now = time.monotonic()
+        if (
+            self._scheduled_at is None
+            or now - self._scheduled_at >= _SCHEDULE_INTERVAL_SECONDS
+        ):
+            self.schedule()
+            self._scheduled_at = now
+
+        executed = 0
+        while not self.stopping and self.run_next():
+            executed += 1
+        return executed
+
+    # ========================================================================
+    # Background worker
+    # ========================================================================
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await run_in_threadpool(self.run_pending)
+            except Exception:
+                logger.exception("[JOBS] Worker iteration failed; will retry")
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        """Inicia o worker (chamado no startup da aplicação, se JOBS_ENABLED)."""
+        if not settings.JOBS_ENABLED:
+            return
+        if self._task is None or self._task.done():
+            # pid do processo que executa (workers podem ser forks)
+            self.worker_id = self._make_worker_id()
+            self._stopping.clear()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Para o worker (shutdown). Um job em execução termina o trecho atual e
+        volta para a fila, continuando do checkpoint em outro worker.
+        """
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# ============================================================================
+# Handlers
+# ============================================================================
+
+
+def _uuid_or_none(value: Optional[str]) -> Optional[UUID]:
+    return UUID(value) if value else None
+
+
+def _chunk_reporter(context: JobContext, *keys: str) -> Callable[..., None]:
+    """
+    on_progress(último id, *contadores) que soma os contadores aos do
+    checkpoint (tentativas anteriores) e grava after_id para retomar.
+    """
+    base = {key: context.checkpoint.get(key, 0) for key in keys}
+
+    def on_progress(last_id: UUID, *counts: int) -> None:
+        context.report(
+            after_id=str(last_id),
+            **{key: base[key] + count for key, count in zip(keys, counts)},
+        )
+
+    return on_progress
+
+
+def run_budget_period_rollover(db: Session, context: JobContext) -> Dict[str, Any]:
+    """Cria os próximos períodos dos orçamentos (criar-proximos-periodos)."""
+    keys = ("scanned_budgets", "created_periods")
+    result = budget_service.create_next_periods_if_needed(
+        db,
+        chunk_size=settings.JOB_CHUNK_SIZE,
+        after_id=_uuid_or_none(context.checkpoint.get("after_id")),
+        on_progress=_chunk_reporter(context, *keys),
+    )
+    return {
+        **{key: context.checkpoint.get(key, 0) for key in keys},
+        "target_date": result["target_date"].isoformat(),
+    }
+
+
+def run_budget_recalculation(db: Session, context: JobContext) -> Dict[str, Any]:
+    """Recalcula o gasto dos períodos atuais (recalcular-orcamentos)."""
+    keys = ("scanned_budgets", "updated_budgets")
+    result = budget_service.recalculate_budgets(
+        db,
+        chunk_size=settings.JOB_CHUNK_SIZE,
+        after_id=_uuid_or_none(context.checkpoint.get("after_id")),
+        on_progress=_chunk_reporter(context, *keys),
+    )
+    # Só as contagens: os detalhes têm uma entrada por período corrigido
+    return {
+        **{key: context.checkpoint.get(key, 0) for key in keys},
+        "created_periods": result["created_periods"],
+    }
+
+
+def run_commitment_google_sync(db: Session, context: JobContext) -> Dict[str, Any]:
+    """Sincroniza com o Google os compromissos pendentes, 100 por trecho."""
+    keys = ("total_pendentes", "sincronizados", "erros")
+    on_progress = _chunk_reporter(context, *keys)
+    after_id = _uuid_or_none(context.checkpoint.get("after_id"))
+    totals = dict.fromkeys(keys, 0)
+
+    while True:
+        results = google_calendar_service.sync_pending_commitments(
+            db, after_id=after_id
+        )
+        if results["ultimo_id"] is None:
+            break
+        after_id = results["ultimo_id"]
+        for key in keys:
+            totals[key] += results[key]
+        on_progress(after_id, *totals.values())
+
+    return {key: context.checkpoint.get(key, 0) for key in keys}
+
+
+def run_api_key_cleanup(db: Session, context: JobContext) -> Dict[str, Any]:
+    """Remove as API keys expiradas."""
+    return {"deleted_keys": api_key_crud.delete_expired_keys(db)}
+
+
+def deliver_budget_alerts(events: List[Dict[str, Any]]) -> None:
+    """POST de um lote de alertas no webhook do n8n (envio pelo WhatsApp)."""
+    if not settings.N8N_BUDGET_ALERT_WEBHOOK_URL:
+        raise RuntimeError("N8N_BUDGET_ALERT_WEBHOOK_URL não configurada")
+
+    response = httpx.post(
+        settings.N8N_BUDGET_ALERT_WEBHOOK_URL,
+        json=jsonable_encoder({"total_alertas": len(events), "alertas": events}),
+        timeout=settings.BUDGET_ALERT_WEBHOOK_TIMEOUT_SECONDS,
+    )
+    response.raise_for_status()
+
+
+def run_budget_alert_fanout(db: Session, context: JobContext) -> Dict[str, Any]:
+    """Entrega e marca os alertas de orçamento pendentes de todos os usuários."""
+    # Lotes entregues já saem da varredura: não há posição a retomar, só o
+    # lease a renovar
+    return budget_service.dispatch_pending_alerts(
+        db,
+        deliver=deliver_budget_alerts,
+        batch_size=settings.BUDGET_ALERT_BATCH_SIZE,
+        on_progress=lambda sent_alerts: context.report(sent_alerts=sent_alerts),
+    )
+
+
+# Instância única do runner
+job_runner = JobRunner(
+    poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+    retry_base_seconds=settings.JOB_RETRY_BASE_SECONDS,
+)
+job_runner.register(
+    BUDGET_PERIOD_ROLLOVER,
+    run_budget_period_rollover,
+    interval_seconds=settings.JOB_BUDGET_ROLLOVER_INTERVAL_SECONDS,
+)
+job_runner.register(
+    BUDGET_RECALCULATION,
+    run_budget_recalculation,
+    interval_seconds=settings.JOB_BUDGET_RECALCULATION_INTERVAL_SECONDS,
+)
+job_runner.register(
+    COMMITMENT_GOOGLE_SYNC,
+    run_commitment_google_sync,
+    interval_seconds=settings.JOB_COMMITMENT_SYNC_INTERVAL_SECONDS,
+)
+job_runner.register(
+    API_KEY_CLEANUP,
+    run_api_key_cleanup,
+    interval_seconds=settings.JOB_API_KEY_CLEANUP_INTERVAL_SECONDS,
+)
+job_runner.register(
+    BUDGET_ALERT_FANOUT,
+    run_budget_alert_fanout,
+    # Sem webhook não há para onde entregar: só sob demanda
+    interval_seconds=(
+        settings.JOB_BUDGET_ALERT_INTERVAL_SECONDS
+        if settings.N8N_BUDGET_ALERT_WEBHOOK_URL
+        else 0
+    ),
+)
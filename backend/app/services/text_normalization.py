@@ -0,0 +1,88 @@
+"""
+Text normalization helpers shared by category lookups and keyword matching.
+
+Patterns are compiled once at import time and accent folding is a single
+str.translate() over a lazily filled per-codepoint table, so normalizing a
+string never recompiles a regex or decomposes the same character twice.
+Category names come from a small fixed set, so their normalized forms are
+also memoized.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+# Same ranges the category names have always been cleaned with
+EMOJI_PATTERN = re.compile(
+    "["
+    "\U0001f600-\U0001f64f"  # emoticons
+    "\U0001f300-\U0001f5ff"  # symbols & pictographs
+    "\U0001f680-\U0001f6ff"  # transport & map symbols
+    "\U0001f1e0-\U0001f1ff"  # flags (iOS)
+    "\U00002500-\U00002bef"  # chinese char
+    "\U00002702-\U000027b0"
+    "\U000024c2-\U0001f251"
+    "\U0001f926-\U0001f937"
+    "\U00010000-\U0010ffff"
+    "\u2640-\u2642"
+    "\u2600-\u2b55"
+    "\u200d"
+    "\u23cf"
+    "\u23e9"
+    "\u231a"
+    "\ufe0f"  # dingbats
+    "\u3030"
+    "]+",
+    flags=re.UNICODE,
+)
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+# Upper bound for the memoized name helpers (category names are a few dozen)
+NAME_CACHE_SIZE = 1024
+
+
+class _FoldTable(dict):
+    """
+    str.translate() table built on demand: each codepoint is folded once
+    (casefold + NFKD without combining marks) and the result is kept.
+    """
+
+    def __init__(self, strip_emoji: bool):
+        super().__init__()
+        self.strip_emoji = strip_emoji
+
+    def __missing__(self, codepoint: int):
+        char = chr(codepoint)
+        if self.strip_emoji and EMOJI_PATTERN.fullmatch(char):
+            folded = None
+        else:
+            decomposed = unicodedata.normalize("NFKD", char.casefold())
+            folded = "".join(c for c in decomposed if not unicodedata.combining(c))
+        self[codepoint] = folded
+        return folded
+
+
+_ACCENT_FOLD = _FoldTable(strip_emoji=False)
+_NAME_FOLD = _FoldTable(strip_emoji=True)
+
+
+def fold_accents(text: str) -> str:
+    """Lowercase text and strip every Unicode accent (NFKD decomposition)."""
+    return text.translate(_ACCENT_FOLD)
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def remove_emoji_from_name(name: str) -> str:
+    """Remove all emojis from category name and collapse extra spaces."""
+    cleaned = EMOJI_PATTERN.sub("", name)
+    return WHITESPACE_PATTERN.sub(" ", cleaned).strip()
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def normalize_name(name: str) -> str:
+    """
+    Comparison key for category names: no emoji, no accents, case-folded and
+    single-spaced ("💊 Saúde" and " saude " both become "saude").
+    """
+    return " ".join(name.translate(_NAME_FOLD).split())
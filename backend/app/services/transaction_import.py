@@ -0,0 +1,369 @@
+"""
+Ingestão de transações em lote (n8n bulk-create e importação CSV/OFX).
+
+O usuário é resolvido uma vez por requisição; as categorias são sugeridas em
+lote, as transações entram em um único INSERT de várias linhas e os orçamentos
+recebem os valores somados por (orçamento, período). Cada linha tem o seu
+resultado: linhas inválidas ou além do limite do plano não impedem as demais.
+"""
+
+import csv
+import io
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.validators import sanitize_input
+from app.crud.transaction import transaction as transaction_crud
+from app.models.user import User
+from app.services.budget_service import budget_service
+from app.services.category_catalog import category_catalog
+from app.services.category_filter import category_filter_service
+from app.services.text_normalization import fold_accents
+from app.services.usage_service import usage_service
+
+_DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d/%m/%y", "%d-%m-%Y")
+
+# Cabeçalho do CSV (sem acentos, minúsculo) -> campo
+_CSV_HEADERS = {
+    "data": "data_transacao",
+    "date": "data_transacao",
+    "data_transacao": "data_transacao",
+    "descricao": "descricao",
+    "description": "descricao",
+    "historico": "descricao",
+    "lancamento": "descricao",
+    "memo": "descricao",
+    "valor": "valor",
+    "amount": "valor",
+    "value": "valor",
+    "tipo": "tipo",
+    "type": "tipo",
+    "categoria": "categoria",
+    "category": "categoria",
+}
+
+_TIPOS = {
+    "despesa": "despesa",
+    "debito": "despesa",
+    "debit": "despesa",
+    "saida": "despesa",
+    "receita": "receita",
+    "credito": "receita",
+    "credit": "receita",
+    "entrada": "receita",
+}
+
+_OFX_TRANSACTION = re.compile(r"<STMTTRN>(.*?)(?:</STMTTRN>|(?=<STMTTRN>)|$)", re.S)
+_OFX_FIELD = re.compile(r"<(TRNTYPE|DTPOSTED|TRNAMT|MEMO|NAME)>([^<\r\n]*)")
+
+
+@dataclass
+class ImportRow:
+    """Linha a importar (já lida do JSON, CSV ou OFX)."""
+
+    index: int  # posição na requisição ou linha do arquivo
+    valor: Optional[Decimal] = None
+    descricao: Optional[str] = None
+    tipo: Optional[str] = None  # None: detectado pela descrição
+    categoria_id: Optional[int] = None
+    categoria_nome: Optional[str] = None
+    data_transacao: Optional[date] = None
+    mensagem_original: Optional[str] = None
+    error: Optional[str] = None  # erro de leitura (linha não é importada)
+
+
+class ImportFormatError(ValueError):
+    """Arquivo ilegível como CSV/OFX."""
+
+
+# ============================================================================
+# Parsing
+# ============================================================================
+
+
+def parse_amount(raw: str) -> Decimal:
+    """Valor em formato brasileiro ("1.234,56", "R$ -10,00") ou "1234.56"."""
+    text = re.sub(r"[^\d,.\-+]", "", raw or "")
+    if "," in text and "." in text:
+        # O último separador é o decimal
+        if text.rfind(",") > text.rfind("."):
+            text = text.replace(".", "").replace(",", ".")
+        else:
+            text = text.replace(",", "")
+    elif "," in text:
+        text = text.replace(",", ".")
+    return Decimal(text)
+
+
+def parse_date(raw: str) -> date:
+    raw = (raw or "").strip()
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(raw, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date '{raw}'")
+
+
+def parse_csv(content: str, max_rows: int) -> List[ImportRow]:
+    """
+    Lê um CSV com cabeçalho (separador , ; ou tab detectado).
+
+    Colunas obrigatórias: data, descricao e valor (aceita também os nomes em
+    inglês e "historico"/"lancamento"). Sem coluna tipo, valor negativo é
+    despesa e positivo tem o tipo detectado pela descrição. A coluna
+    categoria aceita ID ou nome.
+    """
+    try:
+        dialect = csv.Sniffer().sniff(content[:4096], delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(io.StringIO(content), dialect)
+
+    header = next(reader, None)
+    if not header:
+        raise ImportFormatError("Empty CSV file")
+    fields = [_CSV_HEADERS.get(fold_accents(name.strip())) for name in header]
+    missing = {"data_transacao", "descricao", "valor"} - set(fields)
+    if missing:
+        raise ImportFormatError(f"Missing CSV columns: {', '.join(sorted(missing))}")
+
+    rows = []
+    for line, values in enumerate(reader, start=2):
+        if not any(value.strip() for value in values):
+            continue
+        if len(rows) >= max_rows:
+            raise ImportFormatError(f"File has more than {max_rows} rows")
+
+        data = {
+            field: value.strip()
+            for field, value in zip(fields, values)
+            if field is not None
+        }
+        row = ImportRow(index=line, descricao=data.get("descricao"))
+        try:
+            row.data_transacao = parse_date(data.get("data_transacao"))
+            row.valor = parse_amount(data.get("valor"))
+        except (ValueError, InvalidOperation):
+            row.error = "Invalid date or amount"
+            rows.append(row)
+            continue
+
+        tipo = data.get("tipo")
+        if tipo:
+            row.tipo = _TIPOS.get(fold_accents(tipo))
+            if row.tipo is None:
+                row.error = f"Invalid type '{tipo}'"
+        elif row.valor < 0:
+            row.tipo = "despesa"
+        row.valor = abs(row.valor)
+
+        categoria = data.get("categoria")
+        if categoria and categoria.isdigit():
+            row.categoria_id = int(categoria)
+        elif categoria:
+            row.categoria_nome = categoria
+        rows.append(row)
+
+    return rows
+
+
+def parse_ofx(content: str, max_rows: int) -> List[ImportRow]:
+    """
+    Lê as transações (<STMTTRN>) de um extrato OFX 1.x (SGML) ou 2.x (XML).
+
+    Valor negativo (ou TRNTYPE DEBIT) é despesa; positivo, receita. A
+    descrição vem de MEMO (ou NAME).
+    """
+    if "<OFX>" not in content.upper():
+        raise ImportFormatError("Not an OFX file")
+
+    rows = []
+    for position, block in enumerate(_OFX_TRANSACTION.findall(content), start=1):
+        if len(rows) >= max_rows:
+            raise ImportFormatError(f"File has more than {max_rows} rows")
+
+        data = {tag: value.strip() for tag, value in _OFX_FIELD.findall(block)}
+        row = ImportRow(index=position, descricao=data.get("MEMO") or data.get("NAME"))
+        try:
+            row.data_transacao = datetime.strptime(
+                data.get("DTPOSTED", "")[:8], "%Y%m%d"
+            ).date()
+            row.valor = parse_amount(data.get("TRNAMT"))
+        except (ValueError, InvalidOperation):
+            row.error = "Invalid DTPOSTED or TRNAMT"
+            rows.append(row)
+            continue
+
+        debit = row.valor < 0 or data.get("TRNTYPE", "").upper() == "DEBIT"
+        row.tipo = "despesa" if debit else "receita"
+        row.valor = abs(row.valor)
+        rows.append(row)
+
+    return rows
+
+
+def decode_file(raw: bytes) -> str:
+    """Texto do arquivo: UTF-8 (com ou sem BOM) ou Latin-1 (extratos antigos)."""
+    try:
+        return raw.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return raw.decode("latin-1")
+
+
+# ============================================================================
+# Import
+# ============================================================================
+
+
+class TransactionImportService:
+    """Validação, categorização e gravação de um lote de transações."""
+
+    @staticmethod
+    def _result(row: ImportRow, error_code: str, message: str) -> Dict:
+        return {
+            "index": row.index,
+            "success": False,
+            "error_code": error_code,
+            "message": message,
+        }
+
+    def import_rows(
+        self,
+        db: Session,
+        user: User,
+        rows: Iterable[ImportRow],
+        canal: str = "webApp",
+        strategy: str = "keywords",
+    ) -> Dict:
+        """
+        Valida e grava as linhas para um usuário em uma única transação.
+
+        Linhas com erro (leitura, categoria, tipo) e as que passam do limite
+        mensal do plano voltam com error_code; as demais são criadas juntas.
+
+        Returns:
+            dict: results (um por linha, na ordem), created, failed e
+                budget_alerts (um por orçamento/período em aviso ou estouro)
+        """
+        catalog = category_catalog.get(db)
+        results: Dict[int, Dict] = {}
+        valid: List[Tuple[int, ImportRow]] = []
+
+        for position, row in enumerate(rows):
+            if row.error:
+                results[position] = self._result(row, "INVALID_ROW", row.error)
+                continue
+            row.descricao = sanitize_input(row.descricao or "", 200)
+            if not row.descricao or row.valor is None or row.valor <= 0:
+                results[position] = self._result(
+                    row, "INVALID_ROW", "Description and a positive amount required"
+                )
+                continue
+
+            # Categoria informada (ID ou nome)
+            cat = None
+            if row.categoria_id:
+                cat = catalog.get(row.categoria_id)
+                if not cat:
+                    results[position] = self._result(
+                        row,
+                        "CATEGORY_NOT_FOUND",
+                        f"Category ID {row.categoria_id} not found",
+                    )
+                    continue
+            elif row.categoria_nome:
+                cat = catalog.find_by_name(row.categoria_nome, row.tipo)
+                if not cat:
+                    results[position] = self._result(
+                        row,
+                        "CATEGORY_NOT_FOUND_BY_NAME",
+                        f"Category with name '{row.categoria_nome}' not found",
+                    )
+                    continue
+            if cat:
+                if row.tipo and cat.tipo != row.tipo:
+                    results[position] = self._result(
+                        row,
+                        "CATEGORY_TYPE_MISMATCH",
+                        f"Category '{cat.nome}' is for {cat.tipo}, but transaction is {row.tipo}",
+                    )
+                    continue
+                row.categoria_id, row.tipo = cat.id, cat.tipo
+
+            valid.append((position, row))
+
+        # Sugestão de tipo/categoria em lote para o que faltou
+        pending = [(position, row) for position, row in valid if not row.categoria_id]
+        suggestions = category_filter_service.suggest_batch(
+            db,
+            [(row.mensagem_original or row.descricao, row.tipo) for _, row in pending],
+            strategy=strategy,
+        )
+        for (_, row), (tipo, categoria_id) in zip(pending, suggestions):
+            row.tipo, row.categoria_id = tipo, categoria_id
+
+        # Limite do plano: o que couber, na ordem das linhas
+        if valid:
+            granted, limit_message = usage_service.reserve_quota_up_to(
+                db, user, "transaction", len(valid)
+            )
+            for position, row in valid[granted:]:
+                results[position] = self._result(
+                    row, "PLAN_LIMIT_REACHED", limit_message
+                )
+            valid = valid[:granted]
+
+        ids = transaction_crud.create_bulk(
+            db,
+            rows=[
+                {
+                    "usuario_id": user.id,
+                    "mensagem_original": sanitize_input(
+                        row.mensagem_original or row.descricao, 500
+                    ),
+                    "valor": row.valor,
+                    "descricao": row.descricao,
+                    "tipo": row.tipo,
+                    "categoria_id": row.categoria_id,
+                    "canal": canal,
+                    "data_transacao": row.data_transacao,
+                }
+                for _, row in valid
+            ],
+        )
+        budget_alerts = budget_service.apply_expenses_bulk(
+            db,
+            user.id,
+            (
+                (row.categoria_id, row.valor, row.data_transacao or date.today())
+                for _, row in valid
+                if row.tipo == "despesa" and row.categoria_id
+            ),
+        )
+        db.commit()
+
+        for (position, row), transaction_id in zip(valid, ids):
+            results[position] = {
+                "index": row.index,
+                "success": True,
+                "transaction_id": transaction_id,
+                "tipo": row.tipo,
+                "categoria_id": row.categoria_id,
+            }
+
+        return {
+            "results": [results[position] for position in sorted(results)],
+            "created": len(ids),
+            "failed": len(results) - len(ids),
+            "budget_alerts": budget_alerts,
+        }
+
+
+# Instância única do serviço
+transaction_import_service = TransactionImportService()
@@ -6,9 +6,11 @@ from datetime import datetime
 from typing import Dict, Optional
 from uuid import UUID
 
-from sqlalchemy import and_, func
+from sqlalchemy import and_, func, select
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.crud.usage_counter import current_month_start, usage_counter
 from app.models.budget import Budget
 from app.models.commitment import Commitment
 from app.models.transaction import Transaction
@@ -19,8 +21,61 @@ from app.models.user_phone import UserPhone
 class UsageService:
     """
     Serviço para rastrear uso de recursos e validar limites do plano.
+
+    Com USAGE_COUNTERS_ENABLED as contagens vêm da tabela user_usage_counters
+    (uma leitura por PK); sem ela, de COUNTs nas tabelas.
     """
 
+    # ========================================================================
+    # Counters
+    # ========================================================================
+
+    @staticmethod
+    def _counters(db: Session, user_id: UUID) -> Optional[Dict[str, int]]:
+        """Contadores mantidos do usuário (None se desativados ou sem linha)."""
+        if not settings.USAGE_COUNTERS_ENABLED:
+            return None
+        return usage_counter.get_counts(db, user_id)
+
+    @staticmethod
+    def get_usage_counts(db: Session, user_id: UUID) -> Dict[str, int]:
+        """
+        Todas as contagens de uso do usuário em uma única ida ao banco.
+
+        Args:
+            db: Session do banco
+            user_id: ID do usuário
+
+        Returns:
+            Dicionário com transactions_this_month, total_transactions,
+            budgets, commitments e phones
+        """
+        counts = UsageService._counters(db, user_id)
+        if counts is not None:
+            return counts
+
+        def _count(column, *criteria):
+            return (
+                select(func.count())
+                .where(column == user_id, *criteria)
+                .scalar_subquery()
+            )
+
+        row = db.execute(
+            select(
+                _count(
+                    Transaction.usuario_id,
+                    Transaction.data_registro >= current_month_start(),
+                ).label("transactions_this_month"),
+                _count(Transaction.usuario_id).label("total_transactions"),
+                _count(Budget.usuario_id).label("budgets"),
+                _count(Commitment.usuario_id).label("commitments"),
+                _count(UserPhone.user_id).label("phones"),
+            )
+        ).one()
+
+        return dict(row._mapping)
+
     # ========================================================================
     # Transaction Usage
     # ========================================================================
@@ -37,6 +92,10 @@ class UsageService:
         Returns:
             Número de transações no mês atual
         """
+        counts = UsageService._counters(db, user_id)
+        if counts is not None:
+            return counts["transactions_this_month"]
+
         now = datetime.utcnow()
         start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
 
@@ -65,6 +124,10 @@ class UsageService:
         Returns:
             Número total de transações
         """
+        counts = UsageService._counters(db, user_id)
+        if counts is not None:
+            return counts["total_transactions"]
+
         count = (
             db.query(func.count(Transaction.id))
             .filter(Transaction.usuario_id == user_id)
@@ -89,6 +152,10 @@ class UsageService:
         Returns:
             Número de orçamentos
         """
+        counts = UsageService._counters(db, user_id)
+        if counts is not None:
+            return counts["budgets"]
+
         count = (
             db.query(func.count(Budget.id))
             .filter(Budget.usuario_id == user_id)
@@ -113,6 +180,10 @@ class UsageService:
         Returns:
             Número de compromissos
         """
+        counts = UsageService._counters(db, user_id)
+        if counts is not None:
+            return counts["commitments"]
+
         count = (
             db.query(func.count(Commitment.id))
             .filter(Commitment.usuario_id == user_id)
@@ -159,6 +230,10 @@ class UsageService:
         Returns:
             Número de telefones
         """
+        counts = UsageService._counters(db, user_id)
+        if counts is not None:
+            return counts["phones"]
+
         count = (
             db.query(func.count(UserPhone.id))
             .filter(UserPhone.user_id == user_id)
@@ -194,16 +269,15 @@ class UsageService:
 
         plan = user.plano
 
-        # Contar uso atual
+        # Contar uso atual (uma query)
+        counts = UsageService.get_usage_counts(db, user.id)
         usage = {
-            "transactions_this_month": UsageService.count_transactions_this_month(
-                db, user.id
-            ),
-            "total_transactions": UsageService.count_total_transactions(db, user.id),
-            "budgets": UsageService.count_budgets(db, user.id),
-            "commitments": UsageService.count_commitments(db, user.id),
+            "transactions_this_month": counts["transactions_this_month"],
+            "total_transactions": counts["total_transactions"],
+            "budgets": counts["budgets"],
+            "commitments": counts["commitments"],
             "categories": UsageService.count_user_categories(db, user.id),
-            "phones": UsageService.count_phones(db, user.id),
+            "phones": counts["phones"],
         }
 
         # Obter limites do plano
@@ -333,6 +407,160 @@ class UsageService:
 
         return True, None
 
+    @staticmethod
+    def _quota_for(
+        user: User, resource_type: str, default_limit: Optional[int]
+    ) -> Optional[tuple]:
+        """(contador, limite, método de contagem, nome) ou None se ilimitado."""
+        # Tipo de recurso -> (contador, nome do limite, método de contagem, nome)
+        resource_mapping = {
+            "transaction": (
+                "transactions",
+                "max_transactions_per_month",
+                UsageService.count_transactions_this_month,
+                "transações este mês",
+            ),
+            "budget": (
+                "budgets",
+                "max_budgets",
+                UsageService.count_budgets,
+                "orçamentos",
+            ),
+            "commitment": (
+                "commitments",
+                "max_commitments",
+                UsageService.count_commitments,
+                "compromissos",
+            ),
+            "phone": (
+                "phones",
+                "max_phones",
+                UsageService.count_phones,
+                "telefones",
+            ),
+        }
+
+        if resource_type not in resource_mapping:
+            return None  # Tipo desconhecido, permitir
+
+        counter, limit_name, count_method, display_name = resource_mapping[
+            resource_type
+        ]
+        limit = user.plano.get_limit(limit_name)
+        if limit is None:
+            limit = default_limit
+
+        # None = ilimitado
+        if limit is None:
+            return None
+        return counter, limit, count_method, display_name
+
+    @staticmethod
+    def _lock_quota(db: Session, user_id: UUID, counter: str) -> None:
+        """Trava consultiva por usuário/recurso até o fim da transação."""
+        db.execute(
+            select(
+                func.pg_advisory_xact_lock(
+                    func.hashtext(f"usage_quota:{user_id}:{counter}")
+                )
+            )
+        )
+
+    @staticmethod
+    def reserve_quota(
+        db: Session,
+        user: User,
+        resource_type: str,
+        default_limit: Optional[int] = None,
+    ) -> tuple[bool, Optional[str]]:
+        """
+        Reservar uma unidade do limite do plano antes de criar o recurso.
+
+        Diferente de check_can_create, admite ou rejeita atomicamente: duas
+        criações concorrentes não passam as duas pelo último lugar livre. A
+        reserva vale até o commit da transação que cria o recurso (um rollback
+        a desfaz).
+
+        - Com USAGE_COUNTERS_ENABLED: UPDATE ... WHERE uso < limite RETURNING
+          na linha de user_usage_counters (a própria reserva conta o recurso)
+        - Sem: trava consultiva por usuário/recurso até o fim da transação e
+          COUNT nas tabelas
+
+        Args:
+            db: Session do banco
+            user: Objeto User
+            resource_type: Tipo de recurso ("transaction", "budget", "commitment", "phone")
+            default_limit: Limite quando o plano não define um (None = ilimitado)
+
+        Returns:
+            Tupla (pode_criar, mensagem_erro)
+        """
+        if not user.plano:
+            return False, "Nenhum plano ativo. Assine um plano para continuar."
+
+        quota = UsageService._quota_for(user, resource_type, default_limit)
+        if quota is None:
+            return True, None
+        counter, limit, count_method, display_name = quota
+
+        if settings.USAGE_COUNTERS_ENABLED:
+            used = usage_counter.reserve(
+                db, user_id=user.id, counter=counter, limit=limit
+            )
+            if used is not None:
+                return True, None
+            current_count = count_method(db, user.id)
+        else:
+            UsageService._lock_quota(db, user.id, counter)
+            current_count = count_method(db, user.id)
+            if current_count < limit:
+                return True, None
+
+        return (
+            False,
+            f"Limite de {display_name} atingido ({current_count}/{limit}). Faça upgrade do seu plano.",
+        )
+
+    @staticmethod
+    def reserve_quota_up_to(
+        db: Session,
+        user: User,
+        resource_type: str,
+        amount: int,
+        default_limit: Optional[int] = None,
+    ) -> tuple[int, Optional[str]]:
+        """
+        Reservar até `amount` unidades do limite do plano (criação em lote).
+
+        Reserva o que couber no limite; a reserva segue as mesmas regras de
+        reserve_quota (vale até o commit, um rollback a desfaz).
+
+        Returns:
+            Tupla (unidades_reservadas, mensagem_erro se reservou menos que amount)
+        """
+        if not user.plano:
+            return 0, "Nenhum plano ativo. Assine um plano para continuar."
+
+        quota = UsageService._quota_for(user, resource_type, default_limit)
+        if quota is None:
+            return amount, None
+        counter, limit, count_method, display_name = quota
+
+        if settings.USAGE_COUNTERS_ENABLED:
+            granted = usage_counter.reserve_up_to(
+                db, user_id=user.id, counter=counter, limit=limit, amount=amount
+            )
+        else:
+            UsageService._lock_quota(db, user.id, counter)
+            granted = max(0, min(amount, limit - count_method(db, user.id)))
+
+        if granted == amount:
+            return granted, None
+        return (
+            granted,
+            f"Limite de {display_name} atingido ({limit}). Faça upgrade do seu plano.",
+        )
+
 
 # Singleton instance
 usage_service = UsageService()
@@ -1,4 +1,6 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi.errors import RateLimitExceeded
 
@@ -7,6 +9,7 @@ from app.api.budget import router as budget_router
 from app.api.categoria import router as categoria_router
 from app.api.commitment import router as commitment_router
 from app.api.dashboard import router as dashboard_router
+from app.api.jobs import router as jobs_router
 from app.api.n8n_integration import router as n8n_router
 from app.api.plans import router as plans_router
 from app.api.transactions import router as transactions_router
@@ -14,10 +17,28 @@ from app.api.usage import router as usage_router
 from app.api.user_phones import router as user_phones_router
 from app.api.user_settings import router as user_settings_router
 from app.api.users import router as users_router
+from app.core.api_key_auth import require_api_key
+from app.core.api_key_usage import api_key_usage
 from app.core.config import settings
+from app.core.database import get_pool_metrics
 from app.core.rate_limiter import custom_rate_limit_handler, limiter
+from app.services.job_runner import job_runner
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background flush of API key usage (last_used_at/request_count)
+    api_key_usage.start()
+    # Maintenance jobs (/sistema/*) - no-op when JOBS_ENABLED is False
+    job_runner.start()
+    try:
+        yield
+    finally:
+        await job_runner.stop()
+        await api_key_usage.stop()
 
-app = FastAPI(title=settings.APP_NAME, debug=settings.DEBUG)
+
+app = FastAPI(title=settings.APP_NAME, debug=settings.DEBUG, lifespan=lifespan)
 
 # Add rate limiter state
 app.state.limiter = limiter
@@ -30,6 +51,13 @@ async def health_check():
     return {"status": "healthy", "message": "Synca API is running"}
 
 
+# Database pool metrics (saturation shows up here before it becomes latency);
+# pool sizes and replica lag are internal, so only API keys may read them
+@app.get("/health/db-pool", dependencies=[Depends(require_api_key)])
+async def db_pool_metrics():
+    return {"status": "healthy", "pools": get_pool_metrics()}
+
+
 # Include routers
 app.include_router(categoria_router, tags=["categorias"])
 app.include_router(budget_router, tags=["orçamentos"])
@@ -41,6 +69,7 @@ app.include_router(
 app.include_router(user_phones_router, prefix="/user/phones", tags=["user-phones"])
 app.include_router(api_keys_router, prefix="/api-keys", tags=["api-keys"])
 app.include_router(dashboard_router, tags=["dashboard"])
+app.include_router(jobs_router, tags=["jobs"])
 app.include_router(transactions_router, prefix="/transactions", tags=["transactions"])
 app.include_router(plans_router, prefix="/plans", tags=["plans"])
 app.include_router(usage_router, prefix="/usage", tags=["usage"])
@@ -17,7 +17,9 @@ from app.core.database import Base
 from app.models.budget import Budget, BudgetPeriod
 from app.models.category import Category
 from app.models.commitment import Commitment, UserGoogleAuth
+from app.models.expression_embedding import ExpressionEmbedding
 from app.models.transaction import Transaction
+from app.models.usage_counter import UserUsageCounter
 
 # Import all models for autogenerate to work
 from app.models.user import User
@@ -0,0 +1,96 @@
+"""add transaction_daily_rollup table
+
+Revision ID: 20261017_001
+Revises: 20251003_001
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = "20261017_001"
+down_revision = "20251003_001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Criar tabela transaction_daily_rollup (totais diários por usuário/categoria/tipo).
+
+    - Mantida incrementalmente pelo CRUD de transações
+    - Resumos de período passam a custar O(dias) em vez de O(transações)
+    - Transações sem categoria usam categoria_id = 0
+    - Populada aqui a partir das transações existentes
+    """
+
+    op.create_table(
+        "transaction_daily_rollup",
+        sa.Column(
+            "usuario_id",
+            postgresql.UUID(as_uuid=True),
+            nullable=False,
+        ),
+        sa.Column("data", sa.Date(), nullable=False),
+        sa.Column(
+            "categoria_id",
+            sa.Integer(),
+            nullable=False,
+            server_default=sa.text("0"),
+            comment="0 = sem categoria",
+        ),
+        sa.Column("tipo", sa.String(length=10), nullable=False),
+        sa.Column(
+            "total",
+            sa.Numeric(precision=14, scale=2),
+            nullable=False,
+            server_default=sa.text("0"),
+        ),
+        sa.Column(
+            "quantidade",
+            sa.Integer(),
+            nullable=False,
+            server_default=sa.text("0"),
+        ),
+        sa.ForeignKeyConstraint(
+            ["usuario_id"],
+            ["users.id"],
+            ondelete="CASCADE",
+            name="fk_transaction_daily_rollup_usuario_id",
+        ),
+        sa.PrimaryKeyConstraint(
+            "usuario_id",
+            "data",
+            "categoria_id",
+            "tipo",
+            name="pk_transaction_daily_rollup",
+        ),
+    )
+
+    # Backfill a partir das transações existentes
+    op.execute(
+        """
+        INSERT INTO transaction_daily_rollup
+            (usuario_id, data, categoria_id, tipo, total, quantidade)
+        SELECT usuario_id, data_transacao, COALESCE(categoria_id, 0), tipo,
+               SUM(valor), COUNT(*)
+        FROM transactions
+        WHERE data_transacao IS NOT NULL
+        GROUP BY usuario_id, data_transacao, COALESCE(categoria_id, 0), tipo
+        """
+    )
+
+    print("[OK] transaction_daily_rollup table created and populated")
+
+
+def downgrade() -> None:
+    """
+    Remover tabela transaction_daily_rollup.
+    """
+
+    op.drop_table("transaction_daily_rollup")
+
+    print("[OK] transaction_daily_rollup table removed")
@@ -0,0 +1,71 @@
+"""recreate expressions_embeddings with pgvector HNSW index
+
+Revision ID: 20261017_002
+Revises: 20261017_001
+Create Date: 2026-10-17 00:00:01.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from pgvector.sqlalchemy import Vector
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = "20261017_002"
+down_revision = "20261017_001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Recriar expressions_embeddings (removida pelo autogenerate em 68f0cded3490).
+
+    - Base do classificador de categorias por embeddings (k-NN)
+    - metadata guarda o rótulo: {"categoria": ..., "tipo": ...}
+    - Índice HNSW com distância de cosseno para a busca dos vizinhos
+    """
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+
+    op.create_table(
+        "expressions_embeddings",
+        sa.Column(
+            "id",
+            postgresql.UUID(as_uuid=True),
+            server_default=sa.text("gen_random_uuid()"),
+            nullable=False,
+        ),
+        sa.Column("document", sa.Text(), nullable=False),
+        sa.Column("metadata", postgresql.JSONB(), nullable=True),
+        sa.Column("embedding", Vector(1536), nullable=True),
+        sa.PrimaryKeyConstraint("id", name="expressions_embeddings_pkey"),
+    )
+    op.create_index(
+        "ix_expressions_embeddings_id",
+        "expressions_embeddings",
+        ["id"],
+        unique=False,
+    )
+    op.execute(
+        """
+        CREATE INDEX ix_expressions_embeddings_embedding_hnsw
+        ON expressions_embeddings
+        USING hnsw (embedding vector_cosine_ops)
+        """
+    )
+
+    print("[OK] expressions_embeddings table and HNSW index created")
+
+
+def downgrade() -> None:
+    """
+    Remover expressions_embeddings e o índice HNSW.
+    """
+
+    op.execute("DROP INDEX ix_expressions_embeddings_embedding_hnsw")
+    op.drop_index("ix_expressions_embeddings_id", table_name="expressions_embeddings")
+    op.drop_table("expressions_embeddings")
+
+    print("[OK] expressions_embeddings table removed")
@@ -0,0 +1,48 @@
+"""add request_count to api_keys
+
+Revision ID: 20261017_003
+Revises: 20261017_002
+Create Date: 2026-10-17 00:00:02.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers
+revision = "20261017_003"
+down_revision = "20261017_002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Adicionar contador de requisições por API key.
+
+    - Incrementado em lote pelo flusher de uso (junto com last_used_at)
+    - Exibido por key em /api-keys/stats
+    """
+
+    op.add_column(
+        "api_keys",
+        sa.Column(
+            "request_count",
+            sa.BigInteger(),
+            nullable=False,
+            server_default=sa.text("0"),
+            comment="Authenticated requests (flushed in batches)",
+        ),
+    )
+
+    print("[OK] api_keys.request_count column added")
+
+
+def downgrade() -> None:
+    """
+    Remover contador de requisições.
+    """
+
+    op.drop_column("api_keys", "request_count")
+
+    print("[OK] api_keys.request_count column removed")
@@ -0,0 +1,42 @@
+"""add api_rate_limit to plans
+
+Revision ID: 20261017_004
+Revises: 20261017_003
+Create Date: 2026-10-17 00:00:03.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers
+revision = "20261017_004"
+down_revision = "20261017_003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Adicionar limite de requisições por minuto do plano.
+
+    - Padrão do token bucket para keys sem rate_limit próprio e tokens Bearer
+    - NULL = usa API_RATE_LIMIT_DEFAULT
+    """
+
+    op.add_column(
+        "plans",
+        sa.Column("api_rate_limit", sa.Integer(), nullable=True),
+    )
+
+    print("[OK] plans.api_rate_limit column added")
+
+
+def downgrade() -> None:
+    """
+    Remover limite de requisições do plano.
+    """
+
+    op.drop_column("plans", "api_rate_limit")
+
+    print("[OK] plans.api_rate_limit column removed")
@@ -0,0 +1,114 @@
+"""add user_usage_counters table
+
+Revision ID: 20261017_005
+Revises: 20261017_004
+Create Date: 2026-10-17 00:00:04.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = "20261017_005"
+down_revision = "20261017_004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Criar tabela user_usage_counters (contagens dos limites do plano por usuário).
+
+    - Mantida na mesma transação das criações/remoções via ORM quando
+      USAGE_COUNTERS_ENABLED está ativo
+    - Contagens de uso passam a ser uma leitura por PK em vez de COUNTs
+    - transactions_this_month vale para o mês em transactions_month (UTC)
+    - Populada aqui a partir das tabelas existentes
+    """
+
+    op.create_table(
+        "user_usage_counters",
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            nullable=False,
+        ),
+        sa.Column(
+            "transactions",
+            sa.BigInteger(),
+            nullable=False,
+            server_default=sa.text("0"),
+        ),
+        sa.Column(
+            "transactions_this_month",
+            sa.Integer(),
+            nullable=False,
+            server_default=sa.text("0"),
+        ),
+        sa.Column("transactions_month", sa.Date(), nullable=True),
+        sa.Column(
+            "budgets",
+            sa.Integer(),
+            nullable=False,
+            server_default=sa.text("0"),
+        ),
+        sa.Column(
+            "commitments",
+            sa.Integer(),
+            nullable=False,
+            server_default=sa.text("0"),
+        ),
+        sa.Column(
+            "phones",
+            sa.Integer(),
+            nullable=False,
+            server_default=sa.text("0"),
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["users.id"],
+            ondelete="CASCADE",
+            name="fk_user_usage_counters_user_id",
+        ),
+        sa.PrimaryKeyConstraint("user_id", name="pk_user_usage_counters"),
+    )
+
+    # Backfill a partir das tabelas existentes
+    op.execute(
+        """
+        INSERT INTO user_usage_counters
+            (user_id, transactions, transactions_this_month, transactions_month,
+             budgets, commitments, phones)
+        SELECT u.id,
+               (SELECT COUNT(*) FROM transactions t WHERE t.usuario_id = u.id),
+               (SELECT COUNT(*) FROM transactions t
+                 WHERE t.usuario_id = u.id
+                   AND t.data_registro >= date_trunc('month', now() AT TIME ZONE 'UTC')
+                                          AT TIME ZONE 'UTC'),
+               date_trunc('month', now() AT TIME ZONE 'UTC')::date,
+               (SELECT COUNT(*) FROM budgets b WHERE b.usuario_id = u.id),
+               (SELECT COUNT(*) FROM commitments c WHERE c.usuario_id = u.id),
+               (SELECT COUNT(*) FROM user_phones p WHERE p.user_id = u.id)
+        FROM users u
+        """
+    )
+
+    print("[OK] user_usage_counters table created and populated")
+
+
+def downgrade() -> None:
+    """
+    Remover tabela user_usage_counters.
+    """
+
+    op.drop_table("user_usage_counters")
+
+    print("[OK] user_usage_counters table removed")
@@ -0,0 +1,117 @@
+"""add background_jobs table
+
+Revision ID: 20261017_006
+Revises: 20261017_005
+Create Date: 2026-10-17 00:00:05.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = "20261017_006"
+down_revision = "20261017_005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Criar tabela background_jobs (jobs de manutenção em background).
+
+    - Substitui a execução síncrona de /sistema/* dentro da requisição
+    - Workers reservam jobs com lease (locked_by + lease_expires_at) e
+      FOR UPDATE SKIP LOCKED: seguro com vários workers/réplicas
+    - progress guarda o checkpoint para retomar após falha
+    - No máximo um job pendente/rodando por nome (índice único parcial)
+    """
+
+    op.create_table(
+        "background_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column(
+            "status",
+            sa.String(length=20),
+            nullable=False,
+            server_default="pending",
+        ),
+        sa.Column("triggered_by", sa.String(length=20), nullable=False),
+        sa.Column(
+            "run_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+        sa.Column(
+            "attempts",
+            sa.Integer(),
+            nullable=False,
+            server_default=sa.text("0"),
+        ),
+        sa.Column("max_attempts", sa.Integer(), nullable=False),
+        sa.Column(
+            "progress",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=False,
+            server_default="{}",
+        ),
+        sa.Column("result", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("locked_by", sa.String(length=255), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.CheckConstraint(
+            "status IN ('pending', 'running', 'succeeded', 'failed')",
+            name="ck_background_jobs_status",
+        ),
+        sa.PrimaryKeyConstraint("id", name="pk_background_jobs"),
+    )
+
+    op.create_index(
+        "ix_background_jobs_status_run_at",
+        "background_jobs",
+        ["status", "run_at"],
+    )
+    op.create_index(
+        "ix_background_jobs_name_created_at",
+        "background_jobs",
+        ["name", "created_at"],
+    )
+    op.create_index(
+        "uq_background_jobs_active_name",
+        "background_jobs",
+        ["name"],
+        unique=True,
+        postgresql_where=sa.text("status IN ('pending', 'running')"),
+    )
+
+    print("[OK] background_jobs table created")
+
+
+def downgrade() -> None:
+    """
+    Remover tabela background_jobs.
+    """
+
+    op.drop_index("uq_background_jobs_active_name", table_name="background_jobs")
+    op.drop_index("ix_background_jobs_name_created_at", table_name="background_jobs")
+    op.drop_index("ix_background_jobs_status_run_at", table_name="background_jobs")
+    op.drop_table("background_jobs")
+
+    print("[OK] background_jobs table removed")
@@ -0,0 +1,55 @@
+"""add partial indexes for the budget alert scan
+
+Revision ID: 20261017_007
+Revises: 20261017_006
+Create Date: 2026-10-17 00:00:06.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers
+revision = "20261017_007"
+down_revision = "20261017_006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Criar índices parciais para a varredura global de alertas de orçamento.
+
+    - Só períodos com alerta ainda não enviado (parcial)
+    - Indexa o percentual gasto (valor_gasto * 100 / valor_limite): a
+      varredura lê por faixa só os períodos acima do menor notificar_em, não
+      todos os períodos vigentes
+    """
+
+    op.create_index(
+        "ix_budget_periods_alert_pending",
+        "budget_periods",
+        [sa.text("(valor_gasto * 100 / valor_limite)")],
+        postgresql_where=sa.text("alerta_enviado IS NOT TRUE AND valor_limite > 0"),
+    )
+
+    # min(notificar_em) dos orçamentos ativos: início da faixa da varredura
+    op.create_index(
+        "ix_budgets_notificar_em",
+        "budgets",
+        ["notificar_em"],
+        postgresql_where=sa.text("ativo"),
+    )
+
+    print("[OK] budget alert scan indexes created")
+
+
+def downgrade() -> None:
+    """
+    Remover índice parcial de alertas pendentes.
+    """
+
+    op.drop_index("ix_budgets_notificar_em", table_name="budgets")
+    op.drop_index("ix_budget_periods_alert_pending", table_name="budget_periods")
+
+    print("[OK] budget alert scan indexes removed")
@@ -0,0 +1,44 @@
+"""add composite index on budget_periods (budget_id, data_inicio, data_fim)
+
+Revision ID: 20261017_008
+Revises: 20261017_007
+Create Date: 2026-10-17 00:00:07.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers
+revision = "20261017_008"
+down_revision = "20261017_007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Criar índice composto para o período atual de cada orçamento.
+
+    - Resumos do dashboard buscam o período atual de todos os orçamentos do
+      usuário em uma consulta (LEFT JOIN LATERAL ... LIMIT 1)
+    - (budget_id, data_inicio, data_fim) atende o filtro por datas e a
+      ordenação por data_inicio sem ler todos os períodos do orçamento
+    """
+
+    op.create_index(
+        "ix_budget_periods_budget_dates",
+        "budget_periods",
+        ["budget_id", "data_inicio", "data_fim"],
+    )
+
+    print("[OK] budget_periods current period index created")
+
+
+def downgrade() -> None:
+    """
+    Remover índice composto de budget_periods.
+    """
+
+    op.drop_index("ix_budget_periods_budget_dates", table_name="budget_periods")
+
+    print("[OK] budget_periods current period index removed")
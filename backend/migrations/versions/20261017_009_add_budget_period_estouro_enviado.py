@@ -0,0 +1,71 @@
+"""add estouro_enviado to budget_periods and include it in the alert index
+
+Revision ID: 20261017_009
+Revises: 20261017_008
+Create Date: 2026-10-17 00:00:08.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers
+revision = "20261017_009"
+down_revision = "20261017_008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Controlar o alerta de estouro separado do aviso.
+
+    - estouro_enviado: alerta de estouro (acima de 100%) já enviado; um
+      período que avisou em notificar_em% ainda gera o estouro depois
+    - ix_budget_periods_alert_pending passa a cobrir também os períodos acima
+      do limite com estouro não enviado
+    """
+
+    op.add_column(
+        "budget_periods",
+        sa.Column(
+            "estouro_enviado", sa.Boolean(), nullable=False, server_default="false"
+        ),
+    )
+
+    # Períodos já acima do limite com alerta enviado: o alerta da varredura
+    # foi o estouro (get_pending_alerts classificava pelo gasto atual)
+    op.execute(
+        "UPDATE budget_periods SET estouro_enviado = true "
+        "WHERE alerta_enviado IS TRUE AND valor_gasto > valor_limite"
+    )
+
+    op.drop_index("ix_budget_periods_alert_pending", table_name="budget_periods")
+    op.create_index(
+        "ix_budget_periods_alert_pending",
+        "budget_periods",
+        [sa.text("(valor_gasto * 100 / valor_limite)")],
+        postgresql_where=sa.text(
+            "valor_limite > 0 AND (alerta_enviado IS NOT TRUE"
+            " OR (valor_gasto > valor_limite AND estouro_enviado IS NOT TRUE))"
+        ),
+    )
+
+    print("[OK] budget_periods.estouro_enviado added")
+
+
+def downgrade() -> None:
+    """
+    Remover estouro_enviado e voltar o índice de alertas ao aviso.
+    """
+
+    op.drop_index("ix_budget_periods_alert_pending", table_name="budget_periods")
+    op.create_index(
+        "ix_budget_periods_alert_pending",
+        "budget_periods",
+        [sa.text("(valor_gasto * 100 / valor_limite)")],
+        postgresql_where=sa.text("alerta_enviado IS NOT TRUE AND valor_limite > 0"),
+    )
+    op.drop_column("budget_periods", "estouro_enviado")
+
+    print("[OK] budget_periods.estouro_enviado removed")
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Script CLI para medir o recálculo dos orçamentos (/sistema/recalcular-orcamentos).
+
+Cria N orçamentos sintéticos (mensal, quinzenal e semanal), os períodos
+atuais e M despesas no mês corrente para um usuário e compara:
+- Em lote: budget_service.recalculate_budgets (uma soma agrupada e um
+  UPDATE ... FROM unnest(...) por trecho)
+- Por orçamento: o caminho antigo (período atual, soma do rollup em float e
+  um commit por orçamento) para uma amostra, extrapolado
+
+Confere também, na amostra, se os valores batem com os do lote. Tudo roda
+dentro de uma transação desfeita no final: nada fica gravado.
+
+Uso:
+    python -m scripts.benchmark_budget_recalculation --user-id <uuid>
+
+Ou com opções:
+    python -m scripts.benchmark_budget_recalculation --user-id <uuid> --budgets 100000 --transactions 50000
+
+Argumentos:
+    --user-id       UUID do usuário dono dos orçamentos sintéticos
+    --budgets       Orçamentos sintéticos (padrão: 100000)
+    --transactions  Despesas sintéticas no mês corrente (padrão: 20000)
+    --baseline      Orçamentos da amostra por orçamento (padrão: 500; 0 para pular)
+    --chunk-size    Orçamentos por trecho do lote (padrão: 1000)
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+from sqlalchemy import and_, event, func, select, text
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401 - registra todos os models (relationships)
+import app.models.api_key  # noqa: F401
+from app.core.database import engine
+from app.crud.budget import budget_period
+from app.crud.transaction import transaction as transaction_crud
+from app.models.budget import Budget, BudgetPeriod
+from app.models.category import Category
+from app.models.transaction import TransactionDailyRollup
+from app.models.user import User
+from app.services.budget_service import budget_service
+
+
+def print_banner():
+    """Exibe banner do script."""
+    print("\n" + "=" * 70)
+    print(" Synca - Benchmark do recálculo de orçamentos")
+    print("=" * 70 + "\n")
+
+
+def validate_uuid(uuid_string: str) -> UUID:
+    """Valida e converte string UUID."""
+    try:
+        return UUID(uuid_string)
+    except ValueError:
+        print(f"❌ Erro: '{uuid_string}' não é um UUID válido")
+        print("   Formato esperado: xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx")
+        sys.exit(1)
+
+
+class StatementCounter:
+    """Conta os comandos enviados ao banco (round trips) na conexão."""
+
+    def __init__(self, connection):
+        self.count = 0
+        event.listen(connection, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def seed(db: Session, user_id: UUID, budgets: int, transactions: int):
+    """Orçamentos e despesas sintéticos (sem commit)."""
+    categorias = db.scalars(select(Category.id).where(Category.tipo == "despesa")).all()
+
+    db.execute(
+        text(
+            """
+            INSERT INTO budgets (id, usuario_id, categoria_id, nome, valor_limite,
+                                 ativo, notificar_em, periodicidade)
+            SELECT gen_random_uuid(), :user_id, (:categorias)[1 + g % :total],
+                   'Benchmark ' || g, 100 + g % 900, true, 80,
+                   (ARRAY['mensal', 'quinzenal', 'semanal'])[1 + g % 3]
+            FROM generate_series(1, :budgets) AS g
+            """
+        ),
+        {
+            "user_id": user_id,
+            "categorias": categorias,
+            "total": len(categorias),
+            "budgets": budgets,
+        },
+    )
+
+    rng = random.Random(42)
+    today = date.today()
+    transaction_crud.create_bulk(
+        db,
+        rows=[
+            {
+                "usuario_id": user_id,
+                "mensagem_original": "benchmark",
+                "descricao": "benchmark",
+                "valor": Decimal(rng.randint(1, 20000)) / 100,
+                "tipo": "despesa",
+                "categoria_id": rng.choice(categorias),
+                "canal": "webApp",
+                "data_transacao": today.replace(day=rng.randint(1, today.day)),
+            }
+            for _ in range(transactions)
+        ],
+    )
+
+
+def legacy_recalculate(db: Session, budget_obj: Budget) -> float:
+    """Caminho antigo: uma consulta, soma em float e um commit por orçamento."""
+    current_period = budget_period.get_current_period(db, budget_id=budget_obj.id)
+    if not current_period:
+        current_period = budget_period.create_period_for_budget(db, budget=budget_obj)
+
+    total_gasto = (
+        db.query(func.coalesce(func.sum(TransactionDailyRollup.total), 0))
+        .filter(
+            and_(
+                TransactionDailyRollup.usuario_id == budget_obj.usuario_id,
+                TransactionDailyRollup.categoria_id == budget_obj.categoria_id,
+                TransactionDailyRollup.tipo == "despesa",
+                TransactionDailyRollup.data >= current_period.data_inicio.date(),
+                TransactionDailyRollup.data <= current_period.data_fim.date(),
+            )
+        )
+        .scalar()
+    )
+    total_gasto = float(total_gasto)
+
+    current_period.valor_gasto = total_gasto
+    if total_gasto > float(current_period.valor_limite):
+        current_period.status = "excedido"
+    else:
+        current_period.status = "ativo"
+
+    db.add(current_period)
+    db.commit()
+    return total_gasto
+
+
+def run_benchmark(
+    user_id: UUID, budgets: int, transactions: int, baseline: int, chunk_size: int
+):
+    """Executa o benchmark e imprime o relatório (sem gravar nada)."""
+    connection = engine.connect()
+    outer = connection.begin()
+    counter = StatementCounter(connection)
+    # commit() das rotinas só libera um savepoint; o rollback final desfaz tudo
+    db = Session(
+        bind=connection,
+        join_transaction_mode="create_savepoint",
+        expire_on_commit=False,
+    )
+
+    try:
+        user = db.get(User, user_id)
+        if not user:
+            print(f"❌ Erro: usuário {user_id} não encontrado")
+            sys.exit(1)
+
+        print(f"👤 Usuário: {user.nome or user.email} ({user_id})")
+        print(f"📄 {budgets} orçamentos, {transactions} despesas\n")
+
+        started = time.perf_counter()
+        seed(db, user_id, budgets, transactions)
+        db.commit()
+        # Períodos atuais (como após a virada de período) e estatísticas do
+        # planner: sem ANALYZE, tabelas recém-populadas parecem vazias e o
+        # plano vira nested loop
+        budget_service.create_next_periods_if_needed(db, dias_antecedencia=0)
+        db.execute(
+            text(
+                "ANALYZE budgets; ANALYZE budget_periods; "
+                "ANALYZE transaction_daily_rollup"
+            )
+        )
+        print(f"🌱 Dados sintéticos: {time.perf_counter() - started:.2f} s\n")
+
+        started_count = counter.count
+        started = time.perf_counter()
+        result = budget_service.recalculate_budgets(
+            db, usuario_id=user_id, chunk_size=chunk_size
+        )
+        bulk_s = time.perf_counter() - started
+        bulk_statements = counter.count - started_count
+        scanned = result["scanned_budgets"]
+
+        print("📦 Lote (recalculate_budgets):")
+        print(f"   Orçamentos:  {scanned}")
+        print(f"   Períodos:    {result['created_periods']} criados")
+        print(f"   Corrigidos:  {result['updated_budgets']}")
+        print(f"   Tempo:       {bulk_s:8.2f} s")
+        print(f"   Comandos:    {bulk_statements}\n")
+
+        if baseline and scanned:
+            sample = (
+                db.query(Budget)
+                .filter(Budget.usuario_id == user_id, Budget.ativo)
+                .order_by(func.random())
+                .limit(baseline)
+                .all()
+            )
+            expected = {
+                period.budget_id: period.valor_gasto
+                for period in db.query(BudgetPeriod).filter(
+                    BudgetPeriod.budget_id.in_([b.id for b in sample]),
+                    BudgetPeriod.data_inicio <= datetime.now(),
+                    BudgetPeriod.data_fim >= datetime.now(),
+                )
+            }
+
+            started_count = counter.count
+            started = time.perf_counter()
+            legacy = {b.id: legacy_recalculate(db, b) for b in sample}
+            row_s = time.perf_counter() - started
+            row_statements = counter.count - started_count
+
+            # float da soma antiga x Decimal do lote, em centavos
+            differ = sum(
+                1
+                for budget_id, total in legacy.items()
+                if Decimal(str(total)) != expected.get(budget_id)
+            )
+
+            per_budget_ms = row_s / len(sample) * 1000
+            estimated_s = per_budget_ms * scanned / 1000
+            print(f"🐢 Por orçamento (amostra de {len(sample)}, extrapolado):")
+            print(f"   Por orçamento: {per_budget_ms:8.3f} ms")
+            print(f"   {scanned} orçamentos: {estimated_s:8.2f} s (estimado)")
+            print(
+                f"   Comandos:      "
+                f"{row_statements / len(sample) * scanned:.0f} (estimado)"
+            )
+            if bulk_s:
+                print(f"   Speedup:       {estimated_s / bulk_s:8.1f}x")
+            print(f"   Divergências:  {differ} de {len(sample)} na amostra\n")
+    finally:
+        db.close()
+        outer.rollback()
+        connection.close()
+        print("↩️  Transação desfeita: nenhuma linha gravada.\n")
+
+
+def main():
+    """Entry point do script CLI."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark do recálculo de orçamentos",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemplos:
+  python -m scripts.benchmark_budget_recalculation --user-id f47ac10b-58cc-4372-a567-0e02b2c3d479
+  python -m scripts.benchmark_budget_recalculation --user-id f47ac10b-58cc-4372-a567-0e02b2c3d479 --budgets 100000 --transactions 50000
+        """,
+    )
+
+    parser.add_argument(
+        "--user-id",
+        required=True,
+        help="UUID do usuário dono dos orçamentos sintéticos",
+    )
+    parser.add_argument(
+        "--budgets",
+        type=int,
+        default=100000,
+        help="Orçamentos sintéticos (padrão: 100000)",
+    )
+    parser.add_argument(
+        "--transactions",
+        type=int,
+        default=20000,
+        help="Despesas sintéticas no mês corrente (padrão: 20000)",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=int,
+        default=500,
+        help="Orçamentos da amostra por orçamento (padrão: 500; 0 para pular)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1000,
+        help="Orçamentos por trecho do lote (padrão: 1000)",
+    )
+
+    args = parser.parse_args()
+
+    print_banner()
+
+    run_benchmark(
+        validate_uuid(args.user_id),
+        args.budgets,
+        args.transactions,
+        args.baseline,
+        args.chunk_size,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Script CLI para comparar o matcher de categorias compilado com a
+implementação anterior (substring por keyword).
+
+Para cada mensagem do dataset, mede o trabalho feito por filter_categories:
+detectar o tipo (receita/despesa) e pontuar todas as categorias do mapa de
+keywords. Não acessa o banco de dados.
+
+Uso:
+    python -m scripts.benchmark_category_matcher
+
+Ou com opções:
+    python -m scripts.benchmark_category_matcher --repeat 50 --show-diff 10
+
+Argumentos:
+    --file       Dataset JSON (padrão: docs/expressions_1000_com_categoria.json)
+    --repeat     Quantas vezes percorrer o dataset (padrão: 20)
+    --show-diff  Exibe N mensagens em que os dois matchers divergem
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from app.services.category_filter import category_filter_service
+
+DEFAULT_DATASET = (
+    Path(__file__).resolve().parents[2] / "docs" / "expressions_1000_com_categoria.json"
+)
+
+
+# ============================================================================
+# Implementação anterior (referência)
+# ============================================================================
+
+
+def legacy_normalize(text: str) -> str:
+    text = text.lower()
+    text = text.replace("ã", "a").replace("á", "a").replace("à", "a").replace("â", "a")
+    text = text.replace("é", "e").replace("ê", "e").replace("ë", "e")
+    text = text.replace("í", "i").replace("î", "i").replace("ï", "i")
+    text = text.replace("ó", "o").replace("ô", "o").replace("õ", "o")
+    text = text.replace("ú", "u").replace("û", "u").replace("ü", "u")
+    text = text.replace("ç", "c")
+    return re.sub(r"[^\w\s]", " ", text)
+
+
+def legacy_analyze(message: str) -> Tuple[str, Dict[int, int]]:
+    service = category_filter_service
+
+    normalized = legacy_normalize(message)
+    receita = sum(1 for k in service.receita_keywords if k in normalized)
+    despesa = sum(1 for k in service.despesa_keywords if k in normalized)
+    detected_type = "receita" if receita > despesa else "despesa"
+
+    matches = {}
+    for category_id, keywords in service.category_keywords.items():
+        # A implementação antiga normalizava a mensagem de novo por categoria
+        normalized = legacy_normalize(message)
+        count = sum(1 for k in keywords if k in normalized)
+        if count:
+            matches[category_id] = count
+    return detected_type, matches
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+
+def load_messages(path: Path) -> List[dict]:
+    """Carrega o dataset de expressões."""
+    if not path.exists():
+        print(f"❌ Erro: dataset não encontrado em {path}")
+        sys.exit(1)
+    with path.open(encoding="utf-8") as f:
+        return json.load(f)
+
+
+def time_per_message(analyze, messages: List[str], repeat: int) -> float:
+    """Tempo médio por mensagem, em microssegundos."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for message in messages:
+            analyze(message)
+    elapsed = time.perf_counter() - started
+    return elapsed / (repeat * len(messages)) * 1_000_000
+
+
+def run_benchmark(path: Path, repeat: int, show_diff: int):
+    """Executa o benchmark e imprime o relatório."""
+    dataset = load_messages(path)
+    messages = [item["mensagem"] for item in dataset]
+
+    print(f"📄 Dataset: {path.name} ({len(messages)} mensagens, x{repeat})\n")
+
+    legacy_us = time_per_message(legacy_analyze, messages, repeat)
+    compiled_us = time_per_message(
+        category_filter_service.analyze_message, messages, repeat
+    )
+
+    print("⏱️  Tempo por mensagem:")
+    print(f"   Anterior (substring): {legacy_us:8.1f} µs")
+    print(f"   Compilado (regex):    {compiled_us:8.1f} µs")
+    print(f"   Speedup:              {legacy_us / compiled_us:8.1f}x\n")
+
+    # Qualidade: acerto do tipo e divergências de categorias
+    legacy_results = [legacy_analyze(m) for m in messages]
+    compiled_results = [category_filter_service.analyze_message(m) for m in messages]
+
+    legacy_hits = sum(
+        1 for item, (tipo, _) in zip(dataset, legacy_results) if item["tipo"] == tipo
+    )
+    compiled_hits = sum(
+        1 for item, (tipo, _) in zip(dataset, compiled_results) if item["tipo"] == tipo
+    )
+    diffs = [
+        (message, legacy, compiled)
+        for message, legacy, compiled in zip(messages, legacy_results, compiled_results)
+        if legacy != compiled
+    ]
+
+    print("🎯 Tipo detectado igual ao do dataset:")
+    print(f"   Anterior:  {legacy_hits}/{len(messages)}")
+    print(f"   Compilado: {compiled_hits}/{len(messages)}\n")
+    print(f"🔀 Mensagens com resultado diferente: {len(diffs)}\n")
+
+    for message, legacy, compiled in diffs[:show_diff]:
+        print(f"   {message}")
+        print(f"      anterior:  {legacy}")
+        print(f"      compilado: {compiled}")
+    if show_diff and diffs:
+        print()
+
+
+def main():
+    """Entry point do script CLI."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark do matcher de categorias (compilado x anterior)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemplos:
+  python -m scripts.benchmark_category_matcher
+  python -m scripts.benchmark_category_matcher --repeat 50 --show-diff 10
+        """,
+    )
+
+    parser.add_argument(
+        "--file",
+        type=Path,
+        default=DEFAULT_DATASET,
+        help="Dataset JSON (padrão: docs/expressions_1000_com_categoria.json)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=20,
+        help="Quantas vezes percorrer o dataset (padrão: 20)",
+    )
+    parser.add_argument(
+        "--show-diff",
+        type=int,
+        default=0,
+        help="Exibe N mensagens em que os matchers divergem",
+    )
+
+    args = parser.parse_args()
+
+    print("\n" + "=" * 70)
+    print(" Synca - Benchmark do matcher de categorias")
+    print("=" * 70 + "\n")
+
+    run_benchmark(args.file, args.repeat, args.show_diff)
+
+
+if __name__ == "__main__":
+    main()
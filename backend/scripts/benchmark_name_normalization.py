@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Script CLI para medir o custo de CPU da normalização de nomes de categoria
+por requisição, antes e depois do módulo text_normalization.
+
+Cada mensagem do dataset simula o trabalho de nomes de uma requisição do n8n:
+buscar a categoria informada pelo nome (busca flexível) e montar a lista
+compacta de nomes sem emoji para a IA. Usa as categorias padrão em memória,
+sem acessar o banco de dados.
+
+Uso:
+    python -m scripts.benchmark_name_normalization
+
+Ou com opções:
+    python -m scripts.benchmark_name_normalization --repeat 50
+
+Argumentos:
+    --file       Dataset JSON (padrão: docs/expressions_1000_com_categoria.json)
+    --repeat     Quantas vezes percorrer o dataset (padrão: 20)
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+import unicodedata
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List
+
+from app.services.category_catalog import CategoryCatalog
+from app.services.text_normalization import fold_accents, remove_emoji_from_name
+
+DEFAULT_DATASET = (
+    Path(__file__).resolve().parents[2] / "docs" / "expressions_1000_com_categoria.json"
+)
+
+# Categorias padrão (migrations/versions/20250125_initial.py)
+DEFAULT_CATEGORIES = [
+    ("🛒 Mercado", "despesa"),
+    ("🥗 Alimentação", "despesa"),
+    ("🚗 Automóvel", "despesa"),
+    ("🎉 Lazer", "despesa"),
+    ("📺 Contas a Pagar", "despesa"),
+    ("📚 Educação", "despesa"),
+    ("💊 Saúde", "despesa"),
+    ("🏋️ Academia", "despesa"),
+    ("🐶 Pets", "despesa"),
+    ("📄 Aluguéis", "despesa"),
+    ("🎁 Presentes", "despesa"),
+    ("📌 Outros", "despesa"),
+    ("💼 Salário", "receita"),
+    ("🏦 Rendimentos", "receita"),
+    ("💵 Renda Extra", "receita"),
+    ("💳 Reembolso", "receita"),
+    ("📌 Outras", "receita"),
+]
+
+
+# ============================================================================
+# Implementação anterior (referência)
+# ============================================================================
+
+
+def legacy_remove_emoji_from_name(name: str) -> str:
+    emoji_pattern = re.compile(
+        "["
+        "\U0001f600-\U0001f64f"
+        "\U0001f300-\U0001f5ff"
+        "\U0001f680-\U0001f6ff"
+        "\U0001f1e0-\U0001f1ff"
+        "\U00002500-\U00002bef"
+        "\U00002702-\U000027b0"
+        "\U000024c2-\U0001f251"
+        "\U0001f926-\U0001f937"
+        "\U00010000-\U0010ffff"
+        "\u2640-\u2642"
+        "\u2600-\u2b55"
+        "\u200d"
+        "\u23cf"
+        "\u23e9"
+        "\u231a"
+        "\ufe0f"
+        "\u3030"
+        "]+",
+        flags=re.UNICODE,
+    )
+    cleaned = emoji_pattern.sub("", name)
+    return re.sub(r"\s+", " ", cleaned).strip()
+
+
+def legacy_fold_accents(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def legacy_find_by_name(categories, name: str, tipo: str):
+    """Busca flexível linear, recalculando os nomes sem emoji a cada estratégia."""
+    categories = [cat for cat in categories if cat.tipo == tipo]
+    for cat in categories:
+        if cat.nome == name:
+            return cat
+    for cat in categories:
+        if legacy_remove_emoji_from_name(cat.nome) == name:
+            return cat
+    name_lower = name.lower()
+    for cat in categories:
+        if cat.nome.lower() == name_lower:
+            return cat
+        if legacy_remove_emoji_from_name(cat.nome).lower() == name_lower:
+            return cat
+    for cat in categories:
+        if name_lower in cat.nome.lower():
+            return cat
+        if name_lower in legacy_remove_emoji_from_name(cat.nome).lower():
+            return cat
+    return None
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+
+def load_dataset(path: Path) -> List[dict]:
+    """Carrega o dataset de expressões."""
+    if not path.exists():
+        print(f"❌ Erro: dataset não encontrado em {path}")
+        sys.exit(1)
+    with path.open(encoding="utf-8") as f:
+        return json.load(f)
+
+
+def cpu_per_request(handle, requests: List[dict], repeat: int) -> float:
+    """Tempo de CPU médio por requisição, em microssegundos."""
+    started = time.process_time()
+    for _ in range(repeat):
+        for request in requests:
+            handle(request)
+    elapsed = time.process_time() - started
+    return elapsed / (repeat * len(requests)) * 1_000_000
+
+
+def run_benchmark(path: Path, repeat: int):
+    """Executa o benchmark e imprime o relatório."""
+    dataset = load_dataset(path)
+    categories = [
+        SimpleNamespace(id=index, nome=nome, tipo=tipo)
+        for index, (nome, tipo) in enumerate(DEFAULT_CATEGORIES, start=1)
+    ]
+    # Em produção o catálogo é montado uma vez e reaproveitado entre requisições
+    catalog = CategoryCatalog(categories, version=0)
+
+    def legacy_request(item: dict):
+        cat = legacy_find_by_name(categories, item["categoria"], item["tipo"])
+        names = [
+            legacy_remove_emoji_from_name(c.nome)
+            for c in categories
+            if c.tipo == item["tipo"]
+        ]
+        return cat.id if cat else None, names
+
+    def current_request(item: dict):
+        cat = catalog.find_by_name(item["categoria"], item["tipo"])
+        names = [remove_emoji_from_name(c.nome) for c in catalog.by_tipo(item["tipo"])]
+        return cat.id if cat else None, names
+
+    print(f"📄 Dataset: {path.name} ({len(dataset)} requisições, x{repeat})\n")
+
+    legacy_us = cpu_per_request(legacy_request, dataset, repeat)
+    current_us = cpu_per_request(current_request, dataset, repeat)
+
+    print("⏱️  CPU por requisição (busca por nome + lista compacta):")
+    print(f"   Anterior: {legacy_us:8.1f} µs")
+    print(f"   Atual:    {current_us:8.1f} µs")
+    print(f"   Speedup:  {legacy_us / current_us:8.1f}x\n")
+
+    # Normalização das mensagens (feita uma vez por requisição pelo matcher)
+    messages = [item["mensagem"] for item in dataset]
+    legacy_fold_us = cpu_per_request(legacy_fold_accents, messages, repeat)
+    current_fold_us = cpu_per_request(fold_accents, messages, repeat)
+
+    print("⏱️  CPU por mensagem (remoção de acentos):")
+    print(f"   Anterior (NFKD):          {legacy_fold_us:8.1f} µs")
+    print(f"   Atual (str.translate):    {current_fold_us:8.1f} µs\n")
+
+    # Conferência: mesmos resultados, exceto os novos acertos sem acento
+    mismatched_folds = sum(
+        1 for m in messages if legacy_fold_accents(m) != fold_accents(m)
+    )
+    legacy_ids = [legacy_request(item)[0] for item in dataset]
+    current_ids = [current_request(item)[0] for item in dataset]
+    diffs = [
+        (item["categoria"], old, new)
+        for item, old, new in zip(dataset, legacy_ids, current_ids)
+        if old != new
+    ]
+
+    print(f"🔀 Mensagens com remoção de acentos diferente: {mismatched_folds}")
+    print(f"🔀 Buscas por nome com resultado diferente: {len(diffs)}")
+    for name, old, new in sorted(set(diffs)):
+        print(f"   {name!r}: anterior={old} atual={new}")
+    print()
+
+
+def main():
+    """Entry point do script CLI."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark da normalização de nomes de categoria",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemplos:
+  python -m scripts.benchmark_name_normalization
+  python -m scripts.benchmark_name_normalization --repeat 50
+        """,
+    )
+
+    parser.add_argument(
+        "--file",
+        type=Path,
+        default=DEFAULT_DATASET,
+        help="Dataset JSON (padrão: docs/expressions_1000_com_categoria.json)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=20,
+        help="Quantas vezes percorrer o dataset (padrão: 20)",
+    )
+
+    args = parser.parse_args()
+
+    print("\n" + "=" * 70)
+    print(" Synca - Benchmark da normalização de nomes de categoria")
+    print("=" * 70 + "\n")
+
+    run_benchmark(args.file, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
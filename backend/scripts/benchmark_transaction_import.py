@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Script CLI para medir a ingestão de transações em lote (bulk-create/import).
+
+Gera N transações sintéticas para um usuário e compara:
+- Lote: transaction_import_service.import_rows (categorização em lote, um
+  INSERT de várias linhas, orçamentos somados por período, um commit)
+- Por linha: o caminho de /n8n/transaction/create para uma amostra (reserva
+  de limite, sugestão de categoria, create_with_budget_update), extrapolado
+
+Tudo roda dentro de uma transação desfeita no final: nada fica gravado. O
+limite mensal do plano vale: use um usuário com plano sem limite para
+importar todas as linhas.
+
+Uso:
+    python -m scripts.benchmark_transaction_import --user-id <uuid>
+
+Ou com opções:
+    python -m scripts.benchmark_transaction_import --user-id <uuid> --rows 10000 --baseline 200
+
+Argumentos:
+    --user-id    UUID do usuário dono das transações
+    --rows       Linhas do lote (padrão: 10000)
+    --baseline   Linhas da amostra por linha (padrão: 200; 0 para pular)
+    --strategy   Sugestão de categoria: keywords ou embedding (padrão: keywords)
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import date
+from decimal import Decimal
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401 - registra todos os models (relationships)
+import app.models.api_key  # noqa: F401
+from app.core.database import engine
+from app.crud.transaction import transaction as transaction_crud
+from app.models.user import User
+from app.schemas.transaction import TransactionCreate
+from app.services.category_filter import category_filter_service
+from app.services.transaction_import import ImportRow, transaction_import_service
+from app.services.usage_service import usage_service
+
+DESCRIPTIONS = [
+    ("almoço no restaurante", "despesa"),
+    ("mercado do mês", "despesa"),
+    ("uber para o trabalho", "despesa"),
+    ("gasolina no posto", "despesa"),
+    ("aluguel do apartamento", "despesa"),
+    ("farmácia remédio", "despesa"),
+    ("cinema com amigos", "despesa"),
+    ("padaria", "despesa"),
+    ("salário da empresa", "receita"),
+    ("freelance de design", "receita"),
+]
+
+
+def print_banner():
+    """Exibe banner do script."""
+    print("\n" + "=" * 70)
+    print(" Synca - Benchmark da importação de transações em lote")
+    print("=" * 70 + "\n")
+
+
+def validate_uuid(uuid_string: str) -> UUID:
+    """Valida e converte string UUID."""
+    try:
+        return UUID(uuid_string)
+    except ValueError:
+        print(f"❌ Erro: '{uuid_string}' não é um UUID válido")
+        print("   Formato esperado: xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx")
+        sys.exit(1)
+
+
+def synthetic_rows(count: int, seed: int = 42):
+    """Linhas no mês corrente, metade sem tipo (detectado pela descrição)."""
+    rng = random.Random(seed)
+    today = date.today()
+    rows = []
+    for index in range(count):
+        descricao, tipo = rng.choice(DESCRIPTIONS)
+        rows.append(
+            ImportRow(
+                index=index,
+                valor=Decimal(rng.randint(100, 50000)) / 100,
+                descricao=descricao,
+                tipo=tipo if index % 2 else None,
+                data_transacao=today.replace(day=rng.randint(1, today.day)),
+            )
+        )
+    return rows
+
+
+class StatementCounter:
+    """Conta os comandos enviados ao banco (round trips) na conexão."""
+
+    def __init__(self, connection):
+        self.count = 0
+        event.listen(connection, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def run_bulk(db: Session, user: User, rows, strategy: str, counter):
+    started_count = counter.count
+    started = time.perf_counter()
+    result = transaction_import_service.import_rows(db, user, rows, strategy=strategy)
+    elapsed = time.perf_counter() - started
+    return result, elapsed, counter.count - started_count
+
+
+def run_per_row(db: Session, user: User, rows, counter):
+    """Mesmo trabalho de /n8n/transaction/create, uma linha por vez."""
+    started_count = counter.count
+    started = time.perf_counter()
+    created = 0
+    for row in rows:
+        can_create, _ = usage_service.reserve_quota(db, user, "transaction")
+        if not can_create:
+            db.rollback()
+            break
+        filter_result = category_filter_service.filter_categories(
+            db, message=row.descricao, max_categories=1, min_score=0.5
+        )
+        suggested = filter_result["categorias_filtradas"]
+        transaction_crud.create_with_budget_update(
+            db,
+            obj_in=TransactionCreate(
+                usuario_id=user.id,
+                mensagem_original=row.descricao,
+                valor=row.valor,
+                descricao=row.descricao,
+                tipo=row.tipo or filter_result["tipo_sugerido"],
+                categoria_id=suggested[0]["id"] if suggested else None,
+                canal="webApp",
+                data_transacao=row.data_transacao,
+            ),
+        )
+        created += 1
+    elapsed = time.perf_counter() - started
+    return created, elapsed, counter.count - started_count
+
+
+def run_benchmark(user_id: UUID, rows_count: int, baseline: int, strategy: str):
+    """Executa o benchmark e imprime o relatório (sem gravar nada)."""
+    connection = engine.connect()
+    outer = connection.begin()
+    counter = StatementCounter(connection)
+    # commit() das rotinas só libera um savepoint; o rollback final desfaz tudo
+    db = Session(bind=connection, join_transaction_mode="create_savepoint")
+
+    try:
+        user = db.get(User, user_id)
+        if not user:
+            print(f"❌ Erro: usuário {user_id} não encontrado")
+            sys.exit(1)
+
+        print(f"👤 Usuário: {user.nome or user.email} ({user_id})")
+        print(f"📄 Lote: {rows_count} linhas, estratégia {strategy}\n")
+
+        result, bulk_s, bulk_statements = run_bulk(
+            db, user, synthetic_rows(rows_count), strategy, counter
+        )
+        created = result["created"]
+        print("📦 Lote (import_rows):")
+        print(f"   Criadas:   {created}/{rows_count} ({result['failed']} com erro)")
+        print(f"   Tempo:     {bulk_s:8.2f} s")
+        if created:
+            print(f"   Por linha: {bulk_s / created * 1000:8.3f} ms")
+        print(f"   Comandos:  {bulk_statements}")
+        print(f"   Alertas:   {len(result['budget_alerts'])}\n")
+        if created < rows_count:
+            print("⚠️  Linhas recusadas (limite do plano ou validação).\n")
+
+        if baseline:
+            sample = synthetic_rows(baseline, seed=7)
+            done, row_s, row_statements = run_per_row(db, user, sample, counter)
+            if not done:
+                print("⚠️  Amostra por linha não rodou (limite do plano atingido).\n")
+                return
+
+            per_row_ms = row_s / done * 1000
+            estimated_s = per_row_ms * rows_count / 1000
+            print(f"🐢 Por linha (amostra de {done}, extrapolado):")
+            print(f"   Por linha: {per_row_ms:8.3f} ms")
+            print(f"   {rows_count} linhas: {estimated_s:8.2f} s (estimado)")
+            print(f"   Comandos:  {row_statements / done * rows_count:.0f} (estimado)")
+            if created:
+                speedup = per_row_ms / (bulk_s / created * 1000)
+                print(f"   Speedup:   {speedup:8.1f}x")
+            print()
+    finally:
+        db.close()
+        outer.rollback()
+        connection.close()
+        print("↩️  Transação desfeita: nenhuma linha gravada.\n")
+
+
+def main():
+    """Entry point do script CLI."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark da importação de transações em lote",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemplos:
+  python -m scripts.benchmark_transaction_import --user-id f47ac10b-58cc-4372-a567-0e02b2c3d479
+  python -m scripts.benchmark_transaction_import --user-id f47ac10b-58cc-4372-a567-0e02b2c3d479 --rows 10000 --baseline 200
+        """,
+    )
+
+    parser.add_argument(
+        "--user-id",
+        required=True,
+        help="UUID do usuário dono das transações",
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=10000,
+        help="Linhas do lote (padrão: 10000)",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=int,
+        default=200,
+        help="Linhas da amostra por linha (padrão: 200; 0 para pular)",
+    )
+    parser.add_argument(
+        "--strategy",
+        choices=["keywords", "embedding"],
+        default="keywords",
+        help="Sugestão de categoria (padrão: keywords)",
+    )
+
+    args = parser.parse_args()
+
+    print_banner()
+
+    run_benchmark(validate_uuid(args.user_id), args.rows, args.baseline, args.strategy)
+
+
+if __name__ == "__main__":
+    main()
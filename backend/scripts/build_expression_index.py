@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Script CLI para montar o índice do classificador de categorias por embeddings.
+
+Gera os embeddings das expressões rotuladas do dataset (em lotes) e grava:
+- local:    arquivo .npz lido pelo LocalVectorIndex (NumPy, sem pgvector)
+- pgvector: linhas em expressions_embeddings (busca com índice HNSW)
+
+Com --evaluate, separa parte do dataset, monta um índice local com o resto e
+mede o acerto de tipo e categoria (classificação em lote) contra as keywords.
+
+Uso:
+    python -m scripts.build_expression_index
+
+Ou com opções:
+    python -m scripts.build_expression_index --embedder hashing --evaluate
+    python -m scripts.build_expression_index --target pgvector --replace
+
+Argumentos:
+    --file        Dataset JSON (padrão: docs/expressions_1000_com_categoria.json)
+    --target      local ou pgvector (padrão: local)
+    --output      Arquivo .npz do índice local (padrão: CATEGORY_CLASSIFIER_INDEX_PATH)
+    --embedder    openai ou hashing (padrão: CATEGORY_CLASSIFIER_EMBEDDER)
+    --batch-size  Expressões por requisição de embedding (padrão: 100)
+    --replace     Apaga as expressões existentes antes de inserir (pgvector)
+    --evaluate    Mede o acerto com 20% do dataset separado, sem gravar nada
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+import app.models  # noqa: F401 - registra todos os models (relationships)
+import app.models.api_key  # noqa: F401
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.category_filter import category_filter_service
+from app.services.embedding_classifier import (
+    EmbeddingCategoryClassifier,
+    LocalVectorIndex,
+    build_embedder,
+)
+
+DEFAULT_DATASET = (
+    Path(__file__).resolve().parents[2] / "docs" / "expressions_1000_com_categoria.json"
+)
+
+
+def print_banner():
+    """Exibe banner do script."""
+    print("\n" + "=" * 70)
+    print(" Synca - Índice do classificador de categorias por embeddings")
+    print("=" * 70 + "\n")
+
+
+def load_dataset(path: Path) -> List[dict]:
+    """Carrega o dataset de expressões rotuladas."""
+    if not path.exists():
+        print(f"❌ Erro: dataset não encontrado em {path}")
+        sys.exit(1)
+    with path.open(encoding="utf-8") as f:
+        return json.load(f)
+
+
+def embed_in_batches(embedder, texts: List[str], batch_size: int) -> np.ndarray:
+    """Gera os embeddings em lotes (uma requisição por lote na OpenAI)."""
+    batches = [
+        embedder.embed(texts[start : start + batch_size])
+        for start in range(0, len(texts), batch_size)
+    ]
+    return np.vstack(batches)
+
+
+def build_local(dataset: List[dict], embedder, batch_size: int, output: Path):
+    """Grava o índice local (.npz)."""
+    embeddings = embed_in_batches(
+        embedder, [item["mensagem"] for item in dataset], batch_size
+    )
+    index = LocalVectorIndex(
+        embeddings,
+        [item["categoria"] for item in dataset],
+        [item["tipo"] for item in dataset],
+    )
+    index.save(output)
+    print(f"✅ {len(index)} expressões gravadas em {output}\n")
+
+
+def build_pgvector(dataset: List[dict], embedder, batch_size: int, replace: bool):
+    """Grava as expressões em expressions_embeddings."""
+    from app.models.expression_embedding import ExpressionEmbedding
+
+    db = SessionLocal()
+
+    try:
+        if replace:
+            deleted = db.query(ExpressionEmbedding).delete()
+            print(f"🗑️  {deleted} expressão(ões) removidas")
+
+        for start in range(0, len(dataset), batch_size):
+            batch = dataset[start : start + batch_size]
+            embeddings = embedder.embed([item["mensagem"] for item in batch])
+            db.add_all(
+                ExpressionEmbedding(
+                    document=item["mensagem"],
+                    metadata_info={
+                        "categoria": item["categoria"],
+                        "tipo": item["tipo"],
+                        "intencao": item.get("intencao"),
+                    },
+                    embedding=embedding.tolist(),
+                )
+                for item, embedding in zip(batch, embeddings)
+            )
+            db.flush()
+
+        db.commit()
+        print(f"✅ {len(dataset)} expressões gravadas em expressions_embeddings\n")
+
+    except Exception as e:
+        print(f"\n❌ Erro ao gravar expressões: {str(e)}\n")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+def evaluate(dataset: List[dict], embedder, batch_size: int):
+    """Acerto do k-NN (índice local) x keywords em 20% do dataset."""
+    items = list(dataset)
+    random.Random(42).shuffle(items)
+    split = len(items) // 5
+    test, train = items[:split], items[split:]
+
+    index = LocalVectorIndex(
+        embed_in_batches(embedder, [item["mensagem"] for item in train], batch_size),
+        [item["categoria"] for item in train],
+        [item["tipo"] for item in train],
+    )
+    classifier = EmbeddingCategoryClassifier(
+        embedder, index, k=settings.CATEGORY_CLASSIFIER_K
+    )
+
+    messages = [item["mensagem"] for item in test]
+    started = time.perf_counter()
+    predictions = []
+    for start in range(0, len(messages), batch_size):
+        predictions.extend(
+            classifier.classify_batch(None, messages[start : start + batch_size])
+        )
+    elapsed = time.perf_counter() - started
+
+    tipo_hits = sum(1 for item, p in zip(test, predictions) if p.tipo == item["tipo"])
+    categoria_hits = sum(
+        1
+        for item, p in zip(test, predictions)
+        if p.categorias and max(p.categorias, key=p.categorias.get) == item["categoria"]
+    )
+    keyword_hits = sum(
+        1
+        for item in test
+        if category_filter_service.detect_transaction_type(item["mensagem"])
+        == item["tipo"]
+    )
+
+    print(f"📊 Treino: {len(train)} | Teste: {len(test)} | k={classifier.k}\n")
+    print("🎯 Tipo correto:")
+    print(f"   Embeddings: {tipo_hits}/{len(test)}")
+    print(f"   Keywords:   {keyword_hits}/{len(test)}\n")
+    print(f"🎯 Categoria correta (embeddings): {categoria_hits}/{len(test)}")
+    print(f"⏱️  Classificação em lote: {elapsed / len(test) * 1000:.2f} ms/mensagem\n")
+
+
+def main():
+    """Entry point do script CLI."""
+    parser = argparse.ArgumentParser(
+        description="Montar o índice do classificador de categorias por embeddings",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemplos:
+  python -m scripts.build_expression_index
+  python -m scripts.build_expression_index --embedder hashing --evaluate
+  python -m scripts.build_expression_index --target pgvector --replace
+        """,
+    )
+
+    parser.add_argument(
+        "--file",
+        type=Path,
+        default=DEFAULT_DATASET,
+        help="Dataset JSON (padrão: docs/expressions_1000_com_categoria.json)",
+    )
+    parser.add_argument(
+        "--target",
+        choices=["local", "pgvector"],
+        default="local",
+        help="Onde gravar o índice (padrão: local)",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path(settings.CATEGORY_CLASSIFIER_INDEX_PATH),
+        help="Arquivo .npz do índice local",
+    )
+    parser.add_argument(
+        "--embedder",
+        choices=["openai", "hashing"],
+        default=settings.CATEGORY_CLASSIFIER_EMBEDDER,
+        help="Embedder usado (padrão: CATEGORY_CLASSIFIER_EMBEDDER)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=100,
+        help="Expressões por lote de embedding (padrão: 100)",
+    )
+    parser.add_argument(
+        "--replace",
+        action="store_true",
+        help="Apaga as expressões existentes antes de inserir (pgvector)",
+    )
+    parser.add_argument(
+        "--evaluate",
+        action="store_true",
+        help="Apenas mede o acerto com parte do dataset separada",
+    )
+
+    args = parser.parse_args()
+
+    # Exibir banner
+    print_banner()
+
+    dataset = load_dataset(args.file)
+    try:
+        embedder = build_embedder(args.embedder)
+    except ValueError as e:
+        print(f"❌ Erro: {str(e)}")
+        sys.exit(1)
+
+    print(f"📄 Dataset: {args.file.name} ({len(dataset)} expressões)")
+    print(f"🧠 Embedder: {args.embedder}\n")
+
+    if args.evaluate:
+        evaluate(dataset, embedder, args.batch_size)
+    elif args.target == "local":
+        build_local(dataset, embedder, args.batch_size, args.output)
+    else:
+        build_pgvector(dataset, embedder, args.batch_size, args.replace)
+
+
+if __name__ == "__main__":
+    main()
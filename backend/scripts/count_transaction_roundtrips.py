@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Script CLI para contar os comandos enviados ao banco na criação de uma
+transação (caminho de /n8n/transaction/create e POST /transactions/).
+
+Mede reserve_quota + create_with_budget_update para uma despesa com
+orçamento, uma despesa sem orçamento e uma receita, e informa quantos
+comandos (round trips) e commits cada uma faz. Tudo roda dentro de uma
+transação desfeita no final: nada fica gravado.
+
+Com --max-statements o script sai com código 1 se algum caso passar do
+limite (para usar como verificação no CI).
+
+Uso:
+    python -m scripts.count_transaction_roundtrips --user-id <uuid>
+
+Ou com opções:
+    python -m scripts.count_transaction_roundtrips --user-id <uuid> --max-statements 8
+
+Argumentos:
+    --user-id         UUID do usuário (precisa de um orçamento ativo para o
+                      caso "despesa com orçamento")
+    --max-statements  Falha se algum caso enviar mais comandos que isso
+"""
+
+import argparse
+import sys
+from datetime import date
+from decimal import Decimal
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401 - registra todos os models (relationships)
+import app.models.api_key  # noqa: F401
+from app.core.database import engine
+from app.crud.transaction import transaction as transaction_crud
+from app.models.budget import Budget
+from app.models.category import Category
+from app.models.user import User
+from app.schemas.transaction import TransactionCreate
+from app.services.usage_service import usage_service
+
+# Comandos de controle do savepoint do script (não contam como round trip
+# do caminho medido)
+_SAVEPOINT_PREFIXES = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+def print_banner():
+    """Exibe banner do script."""
+    print("\n" + "=" * 70)
+    print(" Synca - Round trips na criação de transação")
+    print("=" * 70 + "\n")
+
+
+def validate_uuid(uuid_string: str) -> UUID:
+    """Valida e converte string UUID."""
+    try:
+        return UUID(uuid_string)
+    except ValueError:
+        print(f"❌ Erro: '{uuid_string}' não é um UUID válido")
+        print("   Formato esperado: xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx")
+        sys.exit(1)
+
+
+class RoundTripCounter:
+    """Conta comandos enviados ao banco e commits da sessão."""
+
+    def __init__(self, connection, session: Session):
+        self.statements = []
+        self.commits = 0
+        event.listen(connection, "before_cursor_execute", self._on_execute)
+        event.listen(session, "after_commit", self._on_commit)
+
+    def _on_execute(self, conn, cursor, statement, *args):
+        if not statement.lstrip().upper().startswith(_SAVEPOINT_PREFIXES):
+            self.statements.append(statement.split("\n", 1)[0][:70])
+
+    def _on_commit(self, session):
+        self.commits += 1
+
+    def reset(self):
+        self.statements = []
+        self.commits = 0
+
+
+def measure(db: Session, counter: RoundTripCounter, user: User, **fields):
+    """Reserva de limite + criação (mesma sequência dos endpoints)."""
+    counter.reset()
+    usage_service.reserve_quota(db, user, "transaction")
+    transaction_crud.create_with_budget_update(
+        db,
+        obj_in=TransactionCreate(
+            usuario_id=user.id,
+            mensagem_original="contagem de round trips",
+            descricao="contagem de round trips",
+            valor=Decimal("1.00"),
+            canal="webApp",
+            data_transacao=date.today(),
+            **fields,
+        ),
+    )
+    return list(counter.statements), counter.commits
+
+
+def run(user_id: UUID, max_statements: int = None):
+    """Mede os casos e imprime o relatório (sem gravar nada)."""
+    connection = engine.connect()
+    outer = connection.begin()
+    # commit() das rotinas só libera um savepoint; o rollback final desfaz tudo.
+    # expire_on_commit=False como nas sessões async dos endpoints
+    db = Session(
+        bind=connection,
+        join_transaction_mode="create_savepoint",
+        expire_on_commit=False,
+    )
+    counter = RoundTripCounter(connection, db)
+    failed = False
+
+    try:
+        user = db.get(User, user_id)
+        if not user:
+            print(f"❌ Erro: usuário {user_id} não encontrado")
+            sys.exit(1)
+
+        budget = (
+            db.query(Budget).filter(Budget.usuario_id == user_id, Budget.ativo).first()
+        )
+        budgeted = {budget.categoria_id} if budget else set()
+        other = (
+            db.query(Category)
+            .filter(Category.tipo == "despesa", Category.id.notin_(budgeted))
+            .first()
+        )
+        receita = db.query(Category).filter(Category.tipo == "receita").first()
+
+        cases = []
+        if budget:
+            cases.append(("Despesa com orçamento", budget.categoria_id, "despesa"))
+        else:
+            print("⚠️  Usuário sem orçamento ativo: caso com orçamento pulado.\n")
+        if other:
+            cases.append(("Despesa sem orçamento", other.id, "despesa"))
+        if receita:
+            cases.append(("Receita", receita.id, "receita"))
+
+        for label, categoria_id, tipo in cases:
+            statements, commits = measure(
+                db, counter, user, categoria_id=categoria_id, tipo=tipo
+            )
+            over = max_statements is not None and len(statements) > max_statements
+            failed = failed or over
+            status = "❌" if over else "✅"
+            print(f"{status} {label}: {len(statements)} comandos, {commits} commit(s)")
+            for statement in statements:
+                print(f"      {statement}")
+            print()
+    finally:
+        db.close()
+        outer.rollback()
+        connection.close()
+
+    if failed:
+        print(f"❌ Algum caso passou de {max_statements} comandos.\n")
+        sys.exit(1)
+
+
+def main():
+    """Entry point do script CLI."""
+    parser = argparse.ArgumentParser(
+        description="Contar round trips na criação de transação",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemplos:
+  python -m scripts.count_transaction_roundtrips --user-id f47ac10b-58cc-4372-a567-0e02b2c3d479
+  python -m scripts.count_transaction_roundtrips --user-id f47ac10b-58cc-4372-a567-0e02b2c3d479 --max-statements 8
+        """,
+    )
+
+    parser.add_argument(
+        "--user-id",
+        required=True,
+        help="UUID do usuário",
+    )
+    parser.add_argument(
+        "--max-statements",
+        type=int,
+        help="Falha (código 1) se algum caso passar desse número de comandos",
+    )
+
+    args = parser.parse_args()
+
+    print_banner()
+
+    run(validate_uuid(args.user_id), args.max_statements)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Script CLI para reconstruir a tabela transaction_daily_rollup.
+
+O rollup é mantido incrementalmente a cada escrita de transação; este script
+recalcula tudo a partir da tabela transactions (backfill, correção após
+carga manual de dados ou após --check apontar divergências).
+
+Uso:
+    python -m scripts.rebuild_transaction_rollup
+
+Ou com opções:
+    python -m scripts.rebuild_transaction_rollup --user-id <uuid>
+    python -m scripts.rebuild_transaction_rollup --check
+
+Argumentos:
+    --user-id    Reconstrói apenas o rollup de um usuário (opcional)
+    --check      Só compara rollup x transações, sem alterar nada
+"""
+
+import argparse
+import sys
+import time
+from uuid import UUID
+
+import app.models  # noqa: F401 - registra todos os models (relationships)
+import app.models.api_key  # noqa: F401
+from app.core.database import SessionLocal
+from app.crud.transaction_rollup import transaction_rollup
+
+
+def print_banner():
+    """Exibe banner do script."""
+    print("\n" + "=" * 70)
+    print(" Synca - Reconstrução do rollup diário de transações")
+    print("=" * 70 + "\n")
+
+
+def validate_uuid(uuid_string: str) -> UUID:
+    """Valida e converte string UUID."""
+    try:
+        return UUID(uuid_string)
+    except ValueError:
+        print(f"❌ Erro: '{uuid_string}' não é um UUID válido")
+        print("   Formato esperado: xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx")
+        sys.exit(1)
+
+
+def rebuild_rollup(user_id_str: str = None, check_only: bool = False):
+    """
+    Reconstrói (ou verifica) o rollup.
+
+    Args:
+        user_id_str: UUID do usuário (string, opcional)
+        check_only: Se True, apenas conta divergências
+    """
+    user_id = validate_uuid(user_id_str) if user_id_str else None
+    scope = f"usuário {user_id}" if user_id else "todos os usuários"
+
+    db = SessionLocal()
+
+    try:
+        print(f"👤 Escopo: {scope}\n")
+
+        if check_only:
+            mismatches = transaction_rollup.count_mismatches(db, usuario_id=user_id)
+            if mismatches:
+                print(f"⚠️  {mismatches} dia(s)/categoria(s) divergentes.")
+                print("   Rode sem --check para reconstruir.\n")
+                sys.exit(1)
+            print("✅ Rollup consistente com as transações.\n")
+            return
+
+        print("🔨 Reconstruindo rollup...\n")
+        started = time.perf_counter()
+        rows = transaction_rollup.rebuild(db, usuario_id=user_id)
+        db.commit()
+        elapsed = time.perf_counter() - started
+
+        print(f"✅ {rows} linha(s) gravadas em {elapsed:.2f}s\n")
+
+    except Exception as e:
+        print(f"\n❌ Erro ao reconstruir rollup: {str(e)}\n")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+def main():
+    """Entry point do script CLI."""
+    parser = argparse.ArgumentParser(
+        description="Reconstruir a tabela transaction_daily_rollup",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemplos:
+  python -m scripts.rebuild_transaction_rollup
+  python -m scripts.rebuild_transaction_rollup --user-id f47ac10b-58cc-4372-a567-0e02b2c3d479
+  python -m scripts.rebuild_transaction_rollup --check
+        """,
+    )
+
+    parser.add_argument(
+        "--user-id",
+        help="UUID do usuário (padrão: todos)",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Apenas verifica divergências, sem alterar o rollup",
+    )
+
+    args = parser.parse_args()
+
+    # Exibir banner
+    print_banner()
+
+    rebuild_rollup(user_id_str=args.user_id, check_only=args.check)
+
+
+if __name__ == "__main__":
+    main()
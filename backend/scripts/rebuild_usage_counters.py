@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Script CLI para reconstruir a tabela user_usage_counters.
+
+Com USAGE_COUNTERS_ENABLED os contadores são mantidos a cada criação/remoção
+via ORM; este script recalcula tudo a partir das tabelas (antes de ativar a
+flag, após carga manual de dados ou após --check apontar divergências).
+
+--reconcile corrige só os usuários divergentes, em lotes, sem bloquear a
+tabela: pode rodar periodicamente com a API no ar (as reservas de limite do
+plano dependem dos contadores).
+
+Uso:
+    python -m scripts.rebuild_usage_counters
+
+Ou com opções:
+    python -m scripts.rebuild_usage_counters --user-id <uuid>
+    python -m scripts.rebuild_usage_counters --check
+    python -m scripts.rebuild_usage_counters --reconcile
+
+Argumentos:
+    --user-id    Reconstrói apenas os contadores de um usuário (opcional)
+    --check      Só compara contadores x tabelas, sem alterar nada
+    --reconcile  Corrige só os divergentes, em lotes (sem bloquear a tabela)
+"""
+
+import argparse
+import sys
+import time
+from uuid import UUID
+
+import app.models  # noqa: F401 - registra todos os models (relationships)
+import app.models.api_key  # noqa: F401
+from app.core.database import SessionLocal
+from app.crud.usage_counter import usage_counter
+
+
+def print_banner():
+    """Exibe banner do script."""
+    print("\n" + "=" * 70)
+    print(" Synca - Reconstrução dos contadores de uso")
+    print("=" * 70 + "\n")
+
+
+def validate_uuid(uuid_string: str) -> UUID:
+    """Valida e converte string UUID."""
+    try:
+        return UUID(uuid_string)
+    except ValueError:
+        print(f"❌ Erro: '{uuid_string}' não é um UUID válido")
+        print("   Formato esperado: xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx")
+        sys.exit(1)
+
+
+def rebuild_counters(
+    user_id_str: str = None, check_only: bool = False, reconcile: bool = False
+):
+    """
+    Reconstrói (ou verifica) os contadores.
+
+    Args:
+        user_id_str: UUID do usuário (string, opcional)
+        check_only: Se True, apenas conta divergências
+        reconcile: Se True, corrige só os usuários divergentes
+    """
+    user_id = validate_uuid(user_id_str) if user_id_str else None
+    scope = f"usuário {user_id}" if user_id else "todos os usuários"
+
+    db = SessionLocal()
+
+    try:
+        print(f"👤 Escopo: {scope}\n")
+
+        if check_only:
+            mismatches = usage_counter.count_mismatches(db, user_id=user_id)
+            if mismatches:
+                print(f"⚠️  {mismatches} usuário(s) com contadores divergentes.")
+                print("   Rode sem --check para reconstruir.\n")
+                sys.exit(1)
+            print("✅ Contadores consistentes com as tabelas.\n")
+            return
+
+        if reconcile:
+            print("🔧 Reconciliando contadores...\n")
+            started = time.perf_counter()
+            fixed = usage_counter.reconcile(db, user_id=user_id)
+            elapsed = time.perf_counter() - started
+
+            print(f"✅ {fixed} usuário(s) corrigidos em {elapsed:.2f}s\n")
+            return
+
+        print("🔨 Reconstruindo contadores...\n")
+        started = time.perf_counter()
+        rows = usage_counter.rebuild(db, user_id=user_id)
+        db.commit()
+        elapsed = time.perf_counter() - started
+
+        print(f"✅ {rows} usuário(s) gravados em {elapsed:.2f}s\n")
+
+    except Exception as e:
+        print(f"\n❌ Erro ao reconstruir contadores: {str(e)}\n")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+def main():
+    """Entry point do script CLI."""
+    parser = argparse.ArgumentParser(
+        description="Reconstruir a tabela user_usage_counters",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemplos:
+  python -m scripts.rebuild_usage_counters
+  python -m scripts.rebuild_usage_counters --user-id f47ac10b-58cc-4372-a567-0e02b2c3d479
+  python -m scripts.rebuild_usage_counters --check
+  python -m scripts.rebuild_usage_counters --reconcile
+        """,
+    )
+
+    parser.add_argument(
+        "--user-id",
+        help="UUID do usuário (padrão: todos)",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Apenas verifica divergências, sem alterar os contadores",
+    )
+    parser.add_argument(
+        "--reconcile",
+        action="store_true",
+        help="Corrige só os usuários divergentes, sem bloquear a tabela",
+    )
+
+    args = parser.parse_args()
+
+    # Exibir banner
+    print_banner()
+
+    rebuild_counters(
+        user_id_str=args.user_id, check_only=args.check, reconcile=args.reconcile
+    )
+
+
+if __name__ == "__main__":
+    main()
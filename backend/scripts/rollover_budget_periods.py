@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Script CLI para a virada de períodos dos orçamentos.
+
+Cria, para todos os orçamentos ativos, o período vigente daqui a N dias (o
+próximo período de quem está terminando o atual), mesmo trabalho de
+POST /sistema/criar-proximos-periodos. Roda em trechos, cada um com um
+INSERT ... SELECT e o seu commit, e mostra o progresso a cada trecho.
+
+Se for interrompido, rode de novo com --after <último id exibido> para
+continuar de onde parou (rodar do início também é seguro: períodos que já
+existem não são duplicados).
+
+Uso:
+    python -m scripts.rollover_budget_periods
+
+Ou com opções:
+    python -m scripts.rollover_budget_periods --dias 3 --chunk-size 5000
+    python -m scripts.rollover_budget_periods --after <uuid>
+
+Argumentos:
+    --dias        Antecedência em dias (padrão: 3)
+    --chunk-size  Orçamentos por trecho/commit (padrão: 1000)
+    --after       Retoma após este budget_id (último id do progresso)
+"""
+
+import argparse
+import sys
+import time
+from uuid import UUID
+
+import app.models  # noqa: F401 - registra todos os models (relationships)
+import app.models.api_key  # noqa: F401
+from app.core.database import SessionLocal
+from app.services.budget_service import budget_service
+
+
+def print_banner():
+    """Exibe banner do script."""
+    print("\n" + "=" * 70)
+    print(" Synca - Virada de períodos dos orçamentos")
+    print("=" * 70 + "\n")
+
+
+def validate_uuid(uuid_string: str) -> UUID:
+    """Valida e converte string UUID."""
+    try:
+        return UUID(uuid_string)
+    except ValueError:
+        print(f"❌ Erro: '{uuid_string}' não é um UUID válido")
+        print("   Formato esperado: xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx")
+        sys.exit(1)
+
+
+def rollover(dias: int, chunk_size: int, after_id: UUID = None):
+    """Executa a virada em trechos, exibindo o progresso."""
+    db = SessionLocal()
+    started = time.perf_counter()
+    last_id = after_id
+
+    def progress(budget_id: UUID, scanned: int, created: int):
+        nonlocal last_id
+        last_id = budget_id
+        elapsed = time.perf_counter() - started
+        print(
+            f"   {scanned:>9} orçamentos | {created:>9} períodos criados | "
+            f"{elapsed:7.1f}s | último id {budget_id}"
+        )
+
+    try:
+        if after_id:
+            print(f"↪️  Retomando após {after_id}\n")
+        print(f"🔄 Criando períodos ({dias} dia(s) de antecedência)...\n")
+
+        result = budget_service.create_next_periods_if_needed(
+            db,
+            dias_antecedencia=dias,
+            chunk_size=chunk_size,
+            after_id=after_id,
+            on_progress=progress,
+        )
+        elapsed = time.perf_counter() - started
+
+        print(
+            f"\n✅ {result['created_periods']} período(s) criados para "
+            f"{result['target_date']:%d/%m/%Y} em {elapsed:.2f}s "
+            f"({result['scanned_budgets']} orçamentos verificados)\n"
+        )
+
+    except KeyboardInterrupt:
+        db.rollback()
+        print("\n⏸️  Interrompido.")
+        if last_id:
+            print(f"   Para continuar: --after {last_id}\n")
+        sys.exit(1)
+    except Exception as e:
+        db.rollback()
+        print(f"\n❌ Erro na virada de períodos: {str(e)}")
+        if last_id:
+            print(f"   Para continuar: --after {last_id}\n")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+def main():
+    """Entry point do script CLI."""
+    parser = argparse.ArgumentParser(
+        description="Virada de períodos dos orçamentos",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemplos:
+  python -m scripts.rollover_budget_periods
+  python -m scripts.rollover_budget_periods --dias 3 --chunk-size 5000
+  python -m scripts.rollover_budget_periods --after f47ac10b-58cc-4372-a567-0e02b2c3d479
+        """,
+    )
+
+    parser.add_argument(
+        "--dias",
+        type=int,
+        default=3,
+        help="Antecedência em dias (padrão: 3)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1000,
+        help="Orçamentos por trecho/commit (padrão: 1000)",
+    )
+    parser.add_argument(
+        "--after",
+        help="Retoma após este budget_id (último id do progresso)",
+    )
+
+    args = parser.parse_args()
+
+    print_banner()
+
+    rollover(
+        args.dias,
+        args.chunk_size,
+        validate_uuid(args.after) if args.after else None,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Fixtures compartilhadas dos testes.
+
+Testes de integração usam o banco de DATABASE_URL dentro de uma transação
+desfeita no final (nada fica gravado). Sem banco configurado, ou com o banco
+fora do ar, eles são pulados.
+"""
+
+import pytest
+from sqlalchemy.orm import Session
+
+
+@pytest.fixture
+def db_connection():
+    """Conexão com uma transação externa desfeita no final do teste."""
+    try:
+        import app.models  # noqa: F401 - registra todos os models
+        import app.models.api_key  # noqa: F401
+        from app.core.database import engine
+    except Exception as e:  # settings sem DATABASE_URL
+        pytest.skip(f"Banco não configurado: {e}")
+
+    try:
+        connection = engine.connect()
+    except Exception as e:
+        pytest.skip(f"Banco indisponível: {e}")
+
+    outer = connection.begin()
+    try:
+        yield connection
+    finally:
+        outer.rollback()
+        connection.close()
+
+
+@pytest.fixture
+def db(db_connection) -> Session:
+    """
+    Session na transação do teste: commit() das rotinas só libera um
+    savepoint. expire_on_commit=False como nas sessões async dos endpoints.
+    """
+    session = Session(
+        bind=db_connection,
+        join_transaction_mode="create_savepoint",
+        expire_on_commit=False,
+    )
+    try:
+        yield session
+    finally:
+        session.close()
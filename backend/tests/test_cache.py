@@ -0,0 +1,45 @@
+"""
+Geração do TTLCache: valores carregados antes de uma invalidação (sem banco).
+"""
+
+import pytest
+
+from app.core.cache import TTLCache
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.mark.parametrize(
+    "invalidate",
+    [
+        lambda cache: cache.pop("other"),
+        lambda cache: cache.remove_where(lambda key, value: False),
+        lambda cache: cache.clear(),
+    ],
+)
+def test_stale_generation_is_not_installed(invalidate):
+    cache = TTLCache(maxsize=10, ttl=60)
+    generation = cache.generation
+
+    invalidate(cache)  # commit concorrente enquanto o valor era carregado
+    cache.set("key", "stale", generation=generation)
+
+    assert cache.get("key") is None
+
+
+def test_current_generation_is_installed():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.clear()
+
+    cache.set("key", "fresh", generation=cache.generation)
+
+    assert cache.get("key") == "fresh"
+
+
+def test_set_without_generation_always_installs():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.clear()
+
+    cache.set("key", "value")
+
+    assert cache.get("key") == "value"
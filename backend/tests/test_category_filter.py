@@ -0,0 +1,88 @@
+"""
+KeywordMatcher e detecção de tipo do CategoryFilterService (sem banco).
+"""
+
+import pytest
+
+from app.services.category_filter import CategoryFilterService, KeywordMatcher
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture(scope="module")
+def service():
+    return CategoryFilterService()
+
+
+def test_single_regex_for_all_targets():
+    matcher = KeywordMatcher({"a": ["mercado", "uber eats"], "b": ["uber", "br"]})
+
+    # Um único padrão compilado, com as keywords normalizadas
+    assert matcher._pattern.pattern.count(r"\b(?:") == 1
+    assert matcher.match("Uber Eats no mercado!") == {"a": 2}
+    assert matcher.match("corrida de uber") == {"b": 1}
+
+
+def test_keyword_shared_by_targets_counts_for_each():
+    matcher = KeywordMatcher({"a": ["pix"], "b": ["PIX", "salario"]})
+
+    assert matcher.match("recebi o pix do salário") == {"a": 1, "b": 2}
+
+
+def test_repeated_keyword_counts_once():
+    matcher = KeywordMatcher({"a": ["pizza"]})
+
+    assert matcher.match("pizza, pizza e mais pizza") == {"a": 1}
+
+
+def test_short_keywords_match_whole_words_only():
+    matcher = KeywordMatcher({"a": ["br", "gas"]})
+
+    assert matcher.match("comprei um brinquedo") == {}
+    assert matcher.match("gasolina") == {}
+    assert matcher.match("conta de gas") == {"a": 1}
+    # Plural -s/-es continua valendo
+    assert matcher.match("dois gases") == {"a": 1}
+
+
+def test_long_keywords_match_as_stems():
+    matcher = KeywordMatcher({"a": ["recebi"], "b": ["brinq"]})
+
+    assert matcher.match("valor recebido ontem") == {"a": 1}
+    assert matcher.match("brinquedo novo") == {"b": 1}
+    # Só no início da palavra
+    assert matcher.match("abrinquedo") == {}
+
+
+def test_accents_and_punctuation_are_ignored():
+    matcher = KeywordMatcher({"a": ["combustível", "café"]})
+
+    assert matcher.match("COMBUSTIVEL...cafe!") == {"a": 2}
+
+
+def test_empty_matcher_matches_nothing():
+    assert KeywordMatcher({"a": ["", "  "]}).match("qualquer coisa") == {}
+
+
+@pytest.mark.parametrize(
+    "message,expected",
+    [
+        ("Recebi meu salário", "receita"),
+        ("paguei o aluguel", "despesa"),
+        ("pizza de 40 reais", "despesa"),  # sem keyword de tipo: despesa
+        ("recebi e paguei", "despesa"),  # empate favorece despesa
+    ],
+)
+def test_detect_transaction_type(service, message, expected):
+    assert service.detect_transaction_type(message) == expected
+
+
+def test_analyze_message_counts_categories(service):
+    detected_type, category_matches = service.analyze_message(
+        "Gastei no supermercado e no ifood"
+    )
+
+    assert detected_type == "despesa"
+    assert category_matches[1] >= 1
+    assert category_matches[2] >= 1
+    assert ("tipo", "despesa") not in category_matches
@@ -0,0 +1,142 @@
+"""
+LocalVectorIndex e voto ponderado do classificador por embeddings (sem banco).
+"""
+
+import numpy as np
+import pytest
+
+try:
+    from app.services.embedding_classifier import (
+        EmbeddingCategoryClassifier,
+        HashingEmbedder,
+        LocalVectorIndex,
+        Neighbor,
+    )
+except Exception as e:  # settings sem DATABASE_URL
+    pytest.skip(f"Configuração indisponível: {e}", allow_module_level=True)
+
+pytestmark = pytest.mark.unit
+
+vote = EmbeddingCategoryClassifier.vote
+
+
+@pytest.fixture
+def index():
+    return LocalVectorIndex(
+        embeddings=[[1, 0, 0], [0.9, 0.1, 0], [0, 1, 0], [0, 0, 2]],
+        categorias=["Mercado", "Mercado", "Salário", "Lazer"],
+        tipos=["despesa", "despesa", "receita", "despesa"],
+    )
+
+
+def test_embeddings_are_normalized(index):
+    assert np.allclose(np.linalg.norm(index.embeddings, axis=1), 1.0)
+    assert len(index) == 4
+
+
+def test_search_orders_neighbors_by_similarity(index):
+    results = index.search(None, np.array([[1, 0, 0], [0, 0, 1]]), k=2)
+
+    assert [n.categoria for n in results[0]] == ["Mercado", "Mercado"]
+    assert results[0][0].similarity == pytest.approx(1.0)
+    assert results[0][0].similarity > results[0][1].similarity
+    assert results[1][0] == Neighbor("Lazer", "despesa", pytest.approx(1.0))
+
+
+def test_search_caps_k_at_index_size(index):
+    assert len(index.search(None, np.array([[1, 0, 0]]), k=10)[0]) == 4
+
+
+def test_search_on_empty_index():
+    empty = LocalVectorIndex(np.zeros((0, 3)), [], [])
+
+    assert empty.search(None, np.array([[1, 0, 0], [0, 1, 0]]), k=3) == [[], []]
+
+
+def test_save_and_load_roundtrip(index, tmp_path):
+    path = tmp_path / "index" / "expressions.npz"
+    index.save(path)
+    loaded = LocalVectorIndex.load(path)
+
+    assert np.allclose(loaded.embeddings, index.embeddings)
+    assert list(loaded.categorias) == ["Mercado", "Mercado", "Salário", "Lazer"]
+    assert list(loaded.tipos) == ["despesa", "despesa", "receita", "despesa"]
+
+
+def test_vote_weights_by_similarity():
+    prediction = vote(
+        [
+            Neighbor("Salário", "receita", 0.9),
+            Neighbor("Mercado", "despesa", 0.5),
+            Neighbor("Lazer", "despesa", 0.2),
+        ]
+    )
+
+    assert prediction.tipo == "receita"
+    assert prediction.tipo_confidence == pytest.approx(0.9 / 1.6)
+    assert prediction.categorias == {"Salário": pytest.approx(1.0)}
+    assert prediction.neighbors == 3
+
+
+def test_vote_categories_only_within_winning_tipo():
+    prediction = vote(
+        [
+            Neighbor("Mercado", "despesa", 0.6),
+            Neighbor("Mercado", "despesa", 0.3),
+            Neighbor("Lazer", "despesa", 0.3),
+            Neighbor("Salário", "receita", 0.4),
+        ]
+    )
+
+    assert prediction.tipo == "despesa"
+    assert prediction.categorias == {
+        "Mercado": pytest.approx(0.75),
+        "Lazer": pytest.approx(0.25),
+    }
+
+
+def test_vote_ignores_negative_similarity():
+    prediction = vote(
+        [Neighbor("Salário", "receita", -0.8), Neighbor("Mercado", "despesa", 0.1)]
+    )
+
+    assert prediction.tipo == "despesa"
+    assert prediction.tipo_confidence == pytest.approx(1.0)
+
+
+def test_vote_tie_favors_despesa():
+    prediction = vote(
+        [Neighbor("Salário", "receita", 0.5), Neighbor("Mercado", "despesa", 0.5)]
+    )
+
+    assert prediction.tipo == "despesa"
+    assert prediction.tipo_confidence == pytest.approx(0.5)
+
+
+def test_vote_without_positive_votes():
+    prediction = vote([Neighbor("Mercado", "despesa", 0.0)])
+
+    assert (prediction.tipo, prediction.tipo_confidence) == ("despesa", 0.0)
+    assert prediction.categorias == {}
+    assert vote([]).neighbors == 0
+
+
+def test_classify_batch_with_hashing_embedder():
+    embedder = HashingEmbedder(dim=256)
+    texts = ["compras no supermercado", "salário do mês", "cinema com amigos"]
+    index = LocalVectorIndex(
+        embedder.embed(texts),
+        ["Mercado", "Salário", "Lazer"],
+        ["despesa", "receita", "despesa"],
+    )
+    classifier = EmbeddingCategoryClassifier(embedder, index, k=1)
+
+    predictions = classifier.classify_batch(None, texts)
+
+    assert [p.tipo for p in predictions] == ["despesa", "receita", "despesa"]
+    assert [max(p.categorias, key=p.categorias.get) for p in predictions] == [
+        "Mercado",
+        "Salário",
+        "Lazer",
+    ]
+    assert classifier.classify_batch(None, []) == []
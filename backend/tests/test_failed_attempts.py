@@ -0,0 +1,107 @@
+"""
+Janela deslizante e bloqueios do InMemoryAttemptStore, com relógio explícito.
+"""
+
+import pytest
+
+try:
+    from app.core.failed_attempts import FailedAttemptTracker, InMemoryAttemptStore
+except Exception as e:  # settings sem DATABASE_URL
+    pytest.skip(f"Configuração indisponível: {e}", allow_module_level=True)
+
+pytestmark = pytest.mark.unit
+
+WINDOW = 60.0
+
+
+@pytest.fixture
+def store():
+    return InMemoryAttemptStore()
+
+
+def test_counts_within_current_window(store):
+    assert [store.increment("ip", WINDOW, now=120.0) for _ in range(3)] == [1, 2, 3]
+    assert store.count("ip", WINDOW, now=150.0) == 3
+    assert store.count("other", WINDOW, now=150.0) == 0
+
+
+def test_sliding_estimate_across_rollover(store):
+    for _ in range(3):
+        store.increment("ip", WINDOW, now=120.0)
+
+    # Nova janela, 15 s dentro dela: 3/4 da anterior ainda contam
+    assert store.increment("ip", WINDOW, now=195.0) == pytest.approx(1 + 3 * 0.75)
+    assert store.count("ip", WINDOW, now=225.0) == pytest.approx(1 + 3 * 0.25)
+    # Mais uma virada: a janela de 195 vira a anterior
+    assert store.count("ip", WINDOW, now=240.0) == pytest.approx(1.0)
+
+
+def test_entry_expires_after_two_windows(store):
+    for _ in range(3):
+        store.increment("ip", WINDOW, now=120.0)
+
+    assert store.count("ip", WINDOW, now=239.0) > 0
+    assert store.count("ip", WINDOW, now=240.0) == 0
+    assert store.increment("ip", WINDOW, now=250.0) == 1
+
+
+def test_previous_window_dropped_after_idle_window(store):
+    store.increment("ip", WINDOW, now=120.0)
+    store.block("ip", 1000.0, WINDOW, now=120.0)  # mantém a entrada viva
+
+    # Janela 5, última tentativa na 2: nada da anterior (4) conta
+    assert store.count("ip", WINDOW, now=300.0) == 0
+    assert store.increment("ip", WINDOW, now=330.0) == 1
+
+
+def test_block_expires(store):
+    store.block("ip", 900.0, WINDOW, now=100.0)
+
+    assert store.blocked_for("ip", now=100.0) == 900.0
+    assert store.blocked_for("ip", now=700.0) == 300.0
+    assert store.blocked_for("ip", now=1000.0) == 0.0
+    assert store.blocked_for("other", now=100.0) == 0.0
+
+
+def test_expired_entries_swept_but_active_block_kept(store):
+    store.increment("a", WINDOW, now=0.0)
+    store.block("b", 600.0, WINDOW, now=0.0)
+
+    # "a" expirou (duas janelas); "b" segue bloqueado além da janela
+    store.increment("c", WINDOW, now=130.0)
+
+    assert list(store._entries) == ["b", "c"]
+    assert store.blocked_for("b", now=130.0) == 470.0
+
+
+def test_lru_evicts_least_recently_used():
+    store = InMemoryAttemptStore(maxsize=2)
+    store.increment("a", WINDOW, now=0.0)
+    store.increment("b", WINDOW, now=1.0)
+    store.block("a", 600.0, WINDOW, now=2.0)  # "a" volta a ser o mais recente
+
+    store.increment("c", WINDOW, now=3.0)  # descarta "b"
+
+    assert list(store._entries) == ["a", "c"]
+    assert store.blocked_for("a", now=3.0) == 599.0
+    assert store.count("b", WINDOW, now=3.0) == 0
+
+
+def test_clear(store):
+    store.increment("ip", WINDOW, now=0.0)
+    store.block("ip", 600.0, WINDOW, now=0.0)
+
+    store.clear("ip")
+
+    assert store.count("ip", WINDOW, now=1.0) == 0
+    assert store.blocked_for("ip", now=1.0) == 0.0
+
+
+def test_tracker_passes_explicit_now():
+    tracker = FailedAttemptTracker(InMemoryAttemptStore())
+
+    tracker.record("ip", WINDOW, now=120.0)
+    tracker.block("ip", 60.0, WINDOW, now=120.0)
+
+    assert tracker.count("ip", WINDOW, now=150.0) == 1
+    assert tracker.blocked_for("ip", now=150.0) == 30.0
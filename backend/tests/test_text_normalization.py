@@ -0,0 +1,48 @@
+"""
+Normalização de nomes de categoria e remoção de acentos (sem banco).
+"""
+
+import pytest
+
+from app.services.text_normalization import (
+    fold_accents,
+    normalize_name,
+    remove_emoji_from_name,
+)
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        ("Saúde", "saude"),
+        ("AÇÃO Pão", "acao pao"),
+        ("ÉÈÊË àáâãä", "eeee aaaaa"),
+        ("straße", "strasse"),  # casefold, não só lower
+        ("sem acento", "sem acento"),
+        ("", ""),
+    ],
+)
+def test_fold_accents(text, expected):
+    assert fold_accents(text) == expected
+
+
+def test_fold_accents_keeps_emoji_and_spacing():
+    assert fold_accents("🍕  Pizza") == "🍕  pizza"
+
+
+@pytest.mark.parametrize(
+    "name",
+    ["💊 Saúde", " saude ", "SAÚDE", "Saúde 💊", "  💊   saúde  "],
+)
+def test_normalize_name_variants_share_key(name):
+    assert normalize_name(name) == "saude"
+
+
+def test_normalize_name_collapses_inner_spaces():
+    assert normalize_name("🏠  Casa   e  Moradia") == "casa e moradia"
+
+
+def test_remove_emoji_from_name_keeps_case_and_accents():
+    assert remove_emoji_from_name("💊  Saúde ") == "Saúde"
@@ -0,0 +1,128 @@
+"""
+Token bucket em memória e decisões do limiter, com relógio explícito.
+"""
+
+import pytest
+
+try:
+    from app.core.token_bucket import (
+        InMemoryBucketStore,
+        RateLimitDecision,
+        TokenBucketLimiter,
+    )
+except Exception as e:  # settings sem DATABASE_URL
+    pytest.skip(f"Configuração indisponível: {e}", allow_module_level=True)
+
+pytestmark = pytest.mark.unit
+
+# 60 requisições por minuto: um token por segundo, contas exatas em float
+LIMIT = 60
+
+
+@pytest.fixture
+def limiter():
+    return TokenBucketLimiter(InMemoryBucketStore())
+
+
+def _drain(limiter, key="k", now=1000.0):
+    for _ in range(LIMIT):
+        assert limiter.hit(key, LIMIT, now=now).allowed
+
+
+def test_burst_up_to_capacity(limiter):
+    first = limiter.hit("k", LIMIT, now=1000.0)
+
+    assert (first.allowed, first.remaining) == (True, LIMIT - 1)
+    assert first.reset_after == pytest.approx(1.0)
+    assert first.retry_after == 0.0
+
+    for _ in range(LIMIT - 1):
+        last = limiter.hit("k", LIMIT, now=1000.0)
+    assert (last.allowed, last.remaining) == (True, 0)
+
+    blocked = limiter.hit("k", LIMIT, now=1000.0)
+    assert (blocked.allowed, blocked.remaining) == (False, 0)
+    assert blocked.retry_after == pytest.approx(1.0)
+    assert blocked.reset_after == pytest.approx(60.0)
+
+
+def test_refill_is_continuous(limiter):
+    _drain(limiter)
+
+    half = limiter.hit("k", LIMIT, now=1000.5)
+    assert not half.allowed
+    assert half.retry_after == pytest.approx(0.5)
+
+    assert limiter.hit("k", LIMIT, now=1001.0).allowed
+    assert not limiter.hit("k", LIMIT, now=1001.0).allowed
+
+    # Dez segundos depois: dez tokens (menos o consumido agora)
+    later = limiter.hit("k", LIMIT, now=1011.0)
+    assert (later.allowed, later.remaining) == (True, 9)
+
+
+def test_refill_is_capped_at_capacity(limiter):
+    limiter.hit("k", LIMIT, now=1000.0)
+
+    decision = limiter.hit("k", LIMIT, now=1000.0 + 3600)
+
+    assert decision.remaining == LIMIT - 1
+
+
+def test_keys_have_separate_buckets(limiter):
+    _drain(limiter, "a")
+
+    assert not limiter.hit("a", LIMIT, now=1000.0).allowed
+    assert limiter.hit("b", LIMIT, now=1000.0).allowed
+
+
+@pytest.mark.parametrize(
+    "retry_after,header",
+    [(0.2, "1"), (1.0, "1"), (1.01, "2"), (12.0, "12")],
+)
+def test_retry_after_header_rounds_up(retry_after, header):
+    decision = RateLimitDecision(False, 5, 0, 59.5, retry_after)
+
+    headers = decision.headers()
+
+    assert headers["Retry-After"] == header
+    assert headers["X-RateLimit-Reset"] == "60"
+    assert headers["X-RateLimit-Remaining"] == "0"
+
+
+def test_allowed_decision_has_no_retry_after():
+    assert "Retry-After" not in RateLimitDecision(True, 5, 4, 12.0, 0.0).headers()
+
+
+def test_retry_after_with_slow_refill():
+    # 5 por minuto: um token a cada 12 s
+    limiter = TokenBucketLimiter(InMemoryBucketStore())
+    for _ in range(5):
+        limiter.hit("k", 5, now=0.0)
+
+    blocked = limiter.hit("k", 5, now=3.0)
+
+    assert not blocked.allowed
+    assert blocked.retry_after == pytest.approx(9.0)
+    assert blocked.headers()["Retry-After"] == "9"
+
+
+def test_lru_evicts_idle_buckets():
+    limiter = TokenBucketLimiter(InMemoryBucketStore(maxsize=2))
+    _drain(limiter, "a")
+    limiter.hit("b", LIMIT, now=1000.0)
+    limiter.hit("a", LIMIT, now=1000.0)  # "a" volta a ser o mais recente
+    limiter.hit("c", LIMIT, now=1000.0)  # descarta "b"
+
+    assert set(limiter.store._buckets) == {"a", "c"}
+    assert not limiter.hit("a", LIMIT, now=1000.0).allowed
+
+
+def test_store_failure_allows_request():
+    class BrokenStore:
+        def consume(self, *args):
+            raise ConnectionError("redis down")
+
+    decision = TokenBucketLimiter(BrokenStore()).hit("k", LIMIT, now=0.0)
+
+    assert (decision.allowed, decision.remaining) == (True, LIMIT)
@@ -0,0 +1,209 @@
+"""
+Leitura de CSV/OFX e de valores da importação de transações (sem banco).
+"""
+
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+import pytest
+
+try:
+    from app.services.transaction_import import (
+        ImportFormatError,
+        parse_amount,
+        parse_csv,
+        parse_ofx,
+    )
+except Exception as e:  # settings sem DATABASE_URL
+    pytest.skip(f"Configuração indisponível: {e}", allow_module_level=True)
+
+pytestmark = pytest.mark.unit
+
+
+# ============================================================================
+# parse_amount
+# ============================================================================
+
+
+@pytest.mark.parametrize(
+    "raw,expected",
+    [
+        ("1.234,56", Decimal("1234.56")),
+        ("R$ -10,00", Decimal("-10.00")),
+        ("R$ 1.234.567,89", Decimal("1234567.89")),
+        ("1,234.56", Decimal("1234.56")),
+        ("1234.56", Decimal("1234.56")),
+        ("45,9", Decimal("45.9")),
+        ("+300", Decimal("300")),
+    ],
+)
+def test_parse_amount(raw, expected):
+    assert parse_amount(raw) == expected
+
+
+@pytest.mark.parametrize("raw", ["", None, "R$", "abc"])
+def test_parse_amount_invalid(raw):
+    with pytest.raises(InvalidOperation):
+        parse_amount(raw)
+
+
+# ============================================================================
+# parse_csv
+# ============================================================================
+
+
+@pytest.mark.parametrize("delimiter", [";", "\t", ","])
+def test_parse_csv_sniffs_delimiter(delimiter):
+    content = "\n".join(
+        delimiter.join(line)
+        for line in [
+            ("Data", "Descrição", "Valor"),
+            ("05/03/2026", "Mercado", "-150.00"),
+            ("2026-03-06", "Salário", "3000"),
+        ]
+    )
+
+    rows = parse_csv(content, max_rows=10)
+
+    assert [(r.index, r.descricao, r.valor, r.tipo) for r in rows] == [
+        (2, "Mercado", Decimal("150.00"), "despesa"),
+        (3, "Salário", Decimal("3000"), None),  # tipo detectado depois
+    ]
+    assert rows[0].data_transacao == date(2026, 3, 5)
+    assert all(r.error is None for r in rows)
+
+
+def test_parse_csv_brazilian_amounts_with_semicolon():
+    content = 'data;historico;valor\n05/03/2026;Aluguel;"R$ -1.234,56"\n'
+
+    (row,) = parse_csv(content, max_rows=10)
+
+    assert (row.valor, row.tipo) == (Decimal("1234.56"), "despesa")
+
+
+def test_parse_csv_tipo_and_categoria_columns():
+    content = (
+        "date,description,amount,type,category\n"
+        "2026-03-05,Pix,50,crédito,Salário\n"
+        "2026-03-05,Uber,20,debito,3\n"
+    )
+
+    first, second = parse_csv(content, max_rows=10)
+
+    assert (first.tipo, first.categoria_nome, first.categoria_id) == (
+        "receita",
+        "Salário",
+        None,
+    )
+    assert (second.tipo, second.categoria_id) == ("despesa", 3)
+
+
+def test_parse_csv_invalid_tipo_marks_row():
+    content = (
+        "data,descricao,valor,tipo\n"
+        "05/03/2026,Mercado,10,transferencia\n"
+        "05/03/2026,Padaria,5,despesa\n"
+    )
+
+    invalid, valid = parse_csv(content, max_rows=10)
+
+    assert invalid.error == "Invalid type 'transferencia'"
+    assert invalid.tipo is None
+    assert valid.error is None and valid.tipo == "despesa"
+
+
+def test_parse_csv_invalid_date_or_amount_marks_row():
+    content = "data,descricao,valor\n31/02/2026,Mercado,10\n05/03/2026,Padaria,x\n"
+
+    rows = parse_csv(content, max_rows=10)
+
+    assert [r.error for r in rows] == ["Invalid date or amount"] * 2
+
+
+def test_parse_csv_skips_blank_lines_and_limits_rows():
+    content = "data,descricao,valor\n05/03/2026,A,1\n\n,,\n05/03/2026,B,2\n"
+
+    assert [r.descricao for r in parse_csv(content, max_rows=2)] == ["A", "B"]
+    with pytest.raises(ImportFormatError, match="more than 1 rows"):
+        parse_csv(content, max_rows=1)
+
+
+@pytest.mark.parametrize(
+    "content,message",
+    [("", "Empty CSV file"), ("data,valor\n05/03/2026,1\n", "descricao")],
+)
+def test_parse_csv_format_errors(content, message):
+    with pytest.raises(ImportFormatError, match=message):
+        parse_csv(content, max_rows=10)
+
+
+# ============================================================================
+# parse_ofx
+# ============================================================================
+
+OFX_SGML = """OFXHEADER:100
+DATA:OFXSGML
+
+<OFX>
+<BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20260305120000[-3:BRT]
+<TRNAMT>-150.00
+<MEMO>Supermercado
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20260306
+<TRNAMT>3000,00
+<NAME>Salario
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20260307
+<TRNAMT>42.50
+<MEMO>Tarifa
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1>
+</OFX>
+"""
+
+
+def test_parse_ofx_sgml_without_closing_tags():
+    rows = parse_ofx(OFX_SGML, max_rows=10)
+
+    assert [(r.index, r.descricao, r.valor, r.tipo) for r in rows] == [
+        (1, "Supermercado", Decimal("150.00"), "despesa"),
+        (2, "Salario", Decimal("3000.00"), "receita"),
+        # DEBIT com TRNAMT positivo continua sendo despesa
+        (3, "Tarifa", Decimal("42.50"), "despesa"),
+    ]
+    assert rows[0].data_transacao == date(2026, 3, 5)
+
+
+def test_parse_ofx_xml():
+    content = (
+        "<?xml version='1.0'?><OFX><STMTTRN><TRNTYPE>OTHER</TRNTYPE>"
+        "<DTPOSTED>20260305</DTPOSTED><TRNAMT>-9.90</TRNAMT>"
+        "<MEMO>Streaming</MEMO></STMTTRN></OFX>"
+    )
+
+    (row,) = parse_ofx(content, max_rows=10)
+
+    assert (row.descricao, row.valor, row.tipo) == (
+        "Streaming",
+        Decimal("9.90"),
+        "despesa",
+    )
+
+
+def test_parse_ofx_invalid_transaction_marks_row():
+    content = "<OFX><STMTTRN><DTPOSTED>2026<TRNAMT>10<MEMO>X</OFX>"
+
+    (row,) = parse_ofx(content, max_rows=10)
+
+    assert row.error == "Invalid DTPOSTED or TRNAMT"
+
+
+def test_parse_ofx_limits_rows_and_format():
+    with pytest.raises(ImportFormatError, match="more than 2 rows"):
+        parse_ofx(OFX_SGML, max_rows=2)
+    with pytest.raises(ImportFormatError, match="Not an OFX file"):
+        parse_ofx("data,descricao,valor\n", max_rows=10)
@@ -0,0 +1,99 @@
+"""
+Round trips na criação de transação (reserve_quota + create_with_budget_update,
+caminho de /n8n/transaction/create e POST /transactions/).
+
+Mesma medição de scripts/count_transaction_roundtrips.py: uma despesa com
+orçamento é um único commit e no máximo MAX_STATEMENTS comandos, mesmo quando
+o período atual ainda precisa ser criado.
+"""
+
+import uuid
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+try:
+    from app.models.budget import Budget
+    from app.models.category import Category
+    from app.models.plan import Plan
+    from app.models.user import User
+    from scripts.count_transaction_roundtrips import RoundTripCounter, measure
+except Exception as e:  # settings sem DATABASE_URL
+    pytest.skip(f"Banco não configurado: {e}", allow_module_level=True)
+
+# Despesa com orçamento criando o período: plano, INSERT da transação e do
+# rollup, orçamentos, UPDATE do gasto, período atual, INSERT do período e
+# UPDATE do gasto de novo
+MAX_STATEMENTS = 8
+
+pytestmark = pytest.mark.integration
+
+
+def _next_id(db, model) -> int:
+    return db.scalar(select(func.coalesce(func.max(model.id), 0))) + 1
+
+
+@pytest.fixture
+def user_with_budget(db):
+    """Usuário com plano e um orçamento mensal ativo, ainda sem período."""
+    suffix = uuid.uuid4().hex[:8]
+    # Planos e categorias são semeados com ids explícitos (sequência atrasada)
+    plan = Plan(
+        id=_next_id(db, Plan),
+        nome=f"Round trips {suffix}",
+        valor_mensal=0,
+        valor_anual=0,
+    )
+    category = Category(
+        id=_next_id(db, Category), nome=f"Round trips {suffix}", tipo="despesa"
+    )
+    db.add_all([plan, category])
+    db.flush()
+
+    user = User(
+        nome="Round Trips",
+        email=f"roundtrips-{suffix}@example.com",
+        senha="x",
+        plano_id=plan.id,
+    )
+    db.add(user)
+    db.flush()
+
+    budget = Budget(
+        usuario_id=user.id,
+        categoria_id=category.id,
+        nome="Round trips",
+        valor_limite=Decimal("100.00"),
+        periodicidade="mensal",
+    )
+    db.add(budget)
+    db.commit()
+    return user, budget
+
+
+def _measure_expense(db, counter, user, budget):
+    return measure(db, counter, user, categoria_id=budget.categoria_id, tipo="despesa")
+
+
+def test_budgeted_expense_creating_period_is_one_commit(db, user_with_budget):
+    user, budget = user_with_budget
+    counter = RoundTripCounter(db.connection(), db)
+
+    statements, commits = _measure_expense(db, counter, user, budget)
+
+    assert commits == 1
+    assert len(statements) <= MAX_STATEMENTS, statements
+    assert sum(s.startswith("INSERT INTO budget_periods") for s in statements) == 1
+
+
+def test_budgeted_expense_with_current_period_is_one_commit(db, user_with_budget):
+    user, budget = user_with_budget
+    counter = RoundTripCounter(db.connection(), db)
+    _measure_expense(db, counter, user, budget)
+
+    statements, commits = _measure_expense(db, counter, user, budget)
+
+    assert commits == 1
+    assert len(statements) <= MAX_STATEMENTS, statements
+    assert not any(s.startswith("INSERT INTO budget_periods") for s in statements)